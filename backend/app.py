@@ -48,8 +48,9 @@ def create_app():
     CORS(app, 
          origins=["http://localhost:5000", "http://127.0.0.1:5000"],
          supports_credentials=True,
-         allow_headers=["Content-Type", "Authorization"],
-         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
+         allow_headers=["Content-Type", "Authorization", "Idempotency-Key"],
+         expose_headers=["Idempotent-Replayed"],
+         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
     
     # Flask-Login Configuration
     login_manager = LoginManager()
@@ -95,6 +96,45 @@ def create_app():
     except ImportError as e:
         print(f"⚠️  User routes skipped: {e}")
     
+    # Tables first: the scheduler and the full-text index need them on a fresh database
+    with app.app_context():
+        db.create_all()
+        # Full-text search index (FTS5 table and triggers / tsvector column)
+        from app.utils.survey_search import ensure_search_index
+        ensure_search_index()
+    
+    # Survey activation/expiry at starts_at/ends_at (catches up on missed transitions)
+    if app.config.get('SURVEY_SCHEDULER_ENABLED'):
+        from app.utils.survey_scheduler import start_survey_scheduler
+        start_survey_scheduler(app)
+        print("✅ Survey scheduler started")
+    
+    # Slot leases of started surveys: free the ones that expired, then sweep periodically
+    from app.utils.reservations import start_reservation_sweeper
+    start_reservation_sweeper(app)
+    print("✅ Reservation sweeper started")
+    
+    # Started-but-never-submitted responses older than ABANDONED_RESPONSE_AGE_HOURS
+    from app.utils.response_reaper import start_response_reaper
+    start_response_reaper(app)
+    print("✅ Response reaper started")
+    
+    # GDPR export archives: deleted once they expire (EXPORT_ARCHIVE_TTL_HOURS)
+    from app.utils.data_export import start_export_sweeper
+    start_export_sweeper(app)
+    print("✅ Export sweeper started")
+    
+    # Completion times: buffered per worker, merged into the sketches by a background thread
+    from app.utils.completion_times import start_completion_flusher
+    start_completion_flusher(app)
+    print("✅ Completion time flusher started")
+    
+    # Write-behind ingestion: apply submissions still queued from a previous run
+    if app.config.get('INGESTION_MODE') == 'queue':
+        from app.utils.ingestion import start_ingestion_writer
+        start_ingestion_writer(app)
+        print("✅ Ingestion writer started")
+    
     # =========================
     # FRONTEND ROUTES (KORRIGIERT)
     # =========================
@@ -154,6 +194,8 @@ def create_app():
     
     @app.route('/health')
     def health_check():
+        from app.utils.response_reaper import metrics as reaper_metrics
+        from app.utils.ingestion import ingestion_status
         return jsonify({
             'status': 'healthy',
             'timestamp': datetime.utcnow().isoformat(),
@@ -169,6 +211,10 @@ def create_app():
                 'dashboard': True,
                 'earnings': 'partial',
                 'data_permissions': 'active'  # JETZT AKTIV!
+            },
+            'jobs': {
+                'response_reaper': reaper_metrics.snapshot(),
+                'ingestion': ingestion_status()
             }
         })
     
@@ -6,6 +6,7 @@ Database Models for DataFair Survey System
 
 from datetime import datetime
 from flask_login import UserMixin
+from sqlalchemy import event
 from .database import db
 
 class User(UserMixin, db.Model):
@@ -21,6 +22,7 @@ class User(UserMixin, db.Model):
     # Account status
     is_verified = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
+    role = db.Column(db.String(20), nullable=False, default='panelist', server_default='panelist')  # see utils/access.py
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -51,6 +53,7 @@ class User(UserMixin, db.Model):
             'last_name': self.last_name,
             'full_name': self.full_name,
             'is_verified': self.is_verified,
+            'role': self.role,
             'created_at': self.created_at.isoformat(),
             'last_login': self.last_login.isoformat() if self.last_login else None
         }
@@ -60,17 +63,25 @@ class Survey(db.Model):
     __tablename__ = 'surveys'
     
     id = db.Column(db.Integer, primary_key=True)
+    external_id = db.Column(db.String(100), unique=True)  # customer's own id, key of the bulk authoring API
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)  # customer who manages it (NULL = admins only)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     
     # Survey content (stored as JSON)
-    questions = db.Column(db.Text)  # JSON string of questions
+    questions = db.Column(db.Text)  # JSON string of questions (copy of the current version)
+    current_version_id = db.Column(db.Integer)  # survey_versions.id of the published questions
+    qualification_criteria = db.Column(db.Text)  # JSON string of qualification criteria
+    
+    category = db.Column(db.String(50))  # e.g. 'technology', 'lifestyle', 'finance'
     
     # Survey settings
     reward_amount = db.Column(db.Numeric(10, 2), default=0.00)
     estimated_duration = db.Column(db.Integer, default=5)  # minutes
+    reward_per_minute = db.Column(db.Float, default=0.0, server_default='0')  # reward_amount / estimated_duration, kept in sync on flush
     max_responses = db.Column(db.Integer, default=1000)
-    total_responses = db.Column(db.Integer, default=0)
+    total_responses = db.Column(db.Integer, default=0, server_default='0')
+    reserved_slots = db.Column(db.Integer, default=0, server_default='0')  # live leases in survey_reservations
     
     # Status
     is_active = db.Column(db.Boolean, default=True)
@@ -79,15 +90,39 @@ class Survey(db.Model):
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    content_updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # CATALOG_FIELDS only, not counters
     starts_at = db.Column(db.DateTime)
     ends_at = db.Column(db.DateTime)
     
+    # Measured completion times (from survey_duration_sketches, see utils/completion_times.py)
+    median_duration_seconds = db.Column(db.Integer)
+    p90_duration_seconds = db.Column(db.Integer)
+    duration_samples = db.Column(db.Integer, default=0, server_default='0')
+    
     # Relationships
     responses = db.relationship('SurveyResponse', backref='survey', lazy='dynamic')
     
+    # Catalog indexes: one per sort order (reward, reward per minute, newest), with and
+    # without a category filter; id breaks ties for cursor pagination
+    __table_args__ = (
+        db.Index('idx_surveys_catalog_reward', 'is_active', 'reward_amount', 'id'),
+        db.Index('idx_surveys_catalog_rpm', 'is_active', 'reward_per_minute', 'id'),
+        db.Index('idx_surveys_catalog_newest', 'is_active', 'created_at', 'id'),
+        db.Index('idx_surveys_catalog_category_reward', 'is_active', 'category', 'reward_amount', 'id'),
+        db.Index('idx_surveys_catalog_category_rpm', 'is_active', 'category', 'reward_per_minute', 'id'),
+        db.Index('idx_surveys_catalog_category_newest', 'is_active', 'category', 'created_at', 'id'),
+        # max(content_updated_at) = catalog ETag / Last-Modified
+        db.Index('idx_surveys_content_updated_at', 'content_updated_at'),
+    )
+    
     def __repr__(self):
         return f'<Survey {self.title}>'
     
+    @staticmethod
+    def compute_reward_per_minute(reward_amount, estimated_duration):
+        """EUR per minute; a missing duration counts as the 5 minute default"""
+        return round(float(reward_amount or 0) / max(estimated_duration or 5, 1), 4)
+    
     @property
     def response_rate(self):
         """Calculate response rate percentage"""
@@ -100,20 +135,33 @@ class Survey(db.Model):
         """Check if survey has reached maximum responses"""
         return self.total_responses >= self.max_responses
     
+    @property
+    def available_slots(self):
+        """Slots neither completed nor held by a lease"""
+        return max((self.max_responses or 0) - (self.total_responses or 0) - (self.reserved_slots or 0), 0)
+    
     def to_dict(self, include_questions=False):
         """Convert survey to dictionary"""
         data = {
             'id': self.id,
+            'external_id': self.external_id,
+            'owner_id': self.owner_id,
             'title': self.title,
             'description': self.description,
+            'category': self.category,
             'reward_amount': float(self.reward_amount),
             'estimated_duration': self.estimated_duration,
+            'reward_per_minute': self.reward_per_minute,
+            'median_duration_seconds': self.median_duration_seconds,
+            'p90_duration_seconds': self.p90_duration_seconds,
             'max_responses': self.max_responses,
             'total_responses': self.total_responses,
+            'available_slots': self.available_slots,
             'response_rate': self.response_rate,
             'is_active': self.is_active,
             'is_published': self.is_published,
             'is_full': self.is_full,
+            'current_version_id': self.current_version_id,
             'created_at': self.created_at.isoformat(),
             'starts_at': self.starts_at.isoformat() if self.starts_at else None,
             'ends_at': self.ends_at.isoformat() if self.ends_at else None
@@ -128,15 +176,134 @@ class Survey(db.Model):
         
         return data
 
+@event.listens_for(Survey, 'before_insert')
+@event.listens_for(Survey, 'before_update')
+def _sync_reward_per_minute(mapper, connection, target):
+    target.reward_per_minute = Survey.compute_reward_per_minute(target.reward_amount, target.estimated_duration)
+
+# Columns of the public catalog page (and its filters) - counters like total_responses and
+# reserved_slots are left out, so starts and submits keep the catalog ETag stable
+CATALOG_FIELDS = ('title', 'description', 'category', 'questions', 'reward_amount', 'estimated_duration',
+                  'max_responses', 'is_active', 'median_duration_seconds', 'p90_duration_seconds')
+
+@event.listens_for(Survey, 'before_update')
+def _touch_content(mapper, connection, target):
+    state = db.inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in CATALOG_FIELDS):
+        target.content_updated_at = datetime.utcnow()
+
+class QuestionSet(db.Model):
+    """Immutable question snapshot - stored once per content hash, shared across surveys"""
+    __tablename__ = 'question_sets'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of the canonical JSON
+    questions = db.Column(db.Text, nullable=False)  # canonical JSON, never updated
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<QuestionSet {self.content_hash[:12]}>'
+
+class SurveyVersion(db.Model):
+    """Published version of a survey - pins one immutable question set"""
+    __tablename__ = 'survey_versions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False)  # 1, 2, ... per survey
+    question_set_id = db.Column(db.Integer, db.ForeignKey('question_sets.id'), nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    question_set = db.relationship('QuestionSet')
+    
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint('survey_id', 'version', name='unique_survey_version'),
+    )
+    
+    def __repr__(self):
+        return f'<SurveyVersion Survey:{self.survey_id} v{self.version}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'survey_id': self.survey_id,
+            'version': self.version,
+            'content_hash': self.question_set.content_hash,
+            'created_at': self.created_at.isoformat()
+        }
+
+class SurveyTransition(db.Model):
+    """Scheduled activation/expiry of a survey - applied exactly once by the survey scheduler"""
+    __tablename__ = 'survey_transitions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    action = db.Column(db.String(20), nullable=False)  # 'activate', 'deactivate'
+    due_at = db.Column(db.DateTime, nullable=False)
+    applied_at = db.Column(db.DateTime)  # NULL = pending
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint('survey_id', 'action', 'due_at', name='unique_survey_transition'),
+        db.Index('idx_survey_transitions_pending', 'applied_at', 'due_at'),
+    )
+    
+    def __repr__(self):
+        return f'<SurveyTransition Survey:{self.survey_id} {self.action} at {self.due_at}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'survey_id': self.survey_id,
+            'action': self.action,
+            'due_at': self.due_at.isoformat(),
+            'applied_at': self.applied_at.isoformat() if self.applied_at else None
+        }
+
+class SurveyReservation(db.Model):
+    """Time-limited lease on one survey slot - taken on start, converted on submit"""
+    __tablename__ = 'survey_reservations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    response_id = db.Column(db.Integer, db.ForeignKey('survey_responses.id'), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Constraints
+    __table_args__ = (
+        db.Index('idx_survey_reservations_expiry', 'expires_at'),
+        db.Index('idx_survey_reservations_survey', 'survey_id', 'expires_at'),
+    )
+    
+    def __repr__(self):
+        return f'<SurveyReservation Survey:{self.survey_id} Response:{self.response_id} until {self.expires_at}>'
+    
+    def to_dict(self):
+        return {
+            'survey_id': self.survey_id,
+            'response_id': self.response_id,
+            'expires_at': self.expires_at.isoformat()
+        }
+
 class SurveyResponse(db.Model):
     """Survey Response Model"""
     __tablename__ = 'survey_responses'
     
     id = db.Column(db.Integer, primary_key=True)
     
-    # Foreign keys
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Foreign keys (user_id wird bei Kontolöschung anonymisiert)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    survey_version_id = db.Column(db.Integer, db.ForeignKey('survey_versions.id'))  # questions answered
     
     # Response data (stored as JSON)
     responses = db.Column(db.Text)  # JSON string of user responses
@@ -153,9 +320,15 @@ class SurveyResponse(db.Model):
     # Status
     is_completed = db.Column(db.Boolean, default=False)
     
+    # Quality (set on submit: 1.0 = no signs of junk, see utils/response_quality.py)
+    quality_score = db.Column(db.Float)
+    quality_flags = db.Column(db.Text)  # JSON list, e.g. ["speeder", "straight_liner"]
+    
     # Constraints
     __table_args__ = (
         db.UniqueConstraint('user_id', 'survey_id', name='unique_user_survey'),
+        db.Index('idx_survey_responses_stale', 'is_completed', 'started_at'),  # abandoned-response reaper
+        db.Index('idx_survey_responses_completed', 'survey_id', 'is_completed', 'completed_at'),  # analysis frames
     )
     
     def __repr__(self):
@@ -174,10 +347,12 @@ class SurveyResponse(db.Model):
             'id': self.id,
             'user_id': self.user_id,
             'survey_id': self.survey_id,
+            'survey_version_id': self.survey_version_id,
             'is_completed': self.is_completed,
             'started_at': self.started_at.isoformat(),
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'completion_time': str(self.completion_time) if self.completion_time else None
+            'completion_time': str(self.completion_time) if self.completion_time else None,
+            'quality_score': self.quality_score
         }
         
         if include_responses and self.responses:
@@ -189,6 +364,278 @@ class SurveyResponse(db.Model):
         
         return data
 
+class SurveyAnswer(db.Model):
+    """Survey Answer Model - normalized, typed copy of SurveyResponse.responses for SQL analysis"""
+    __tablename__ = 'survey_answers'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Foreign keys
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    question_id = db.Column(db.String(50), nullable=False)
+    response_id = db.Column(db.Integer, db.ForeignKey('survey_responses.id'), nullable=False)
+    answer_index = db.Column(db.Integer, default=0)  # position within multiple choice answers
+    
+    # Typed values (exactly one is set)
+    text_value = db.Column(db.String(500))
+    numeric_value = db.Column(db.Float)
+    bool_value = db.Column(db.Boolean)
+    
+    # Constraints and indexes
+    __table_args__ = (
+        db.UniqueConstraint('survey_id', 'question_id', 'response_id', 'answer_index', name='unique_answer'),
+        db.Index('idx_survey_answers_text', 'survey_id', 'question_id', 'text_value'),
+        db.Index('idx_survey_answers_numeric', 'survey_id', 'question_id', 'numeric_value'),
+        db.Index('idx_survey_answers_bool', 'survey_id', 'question_id', 'bool_value'),
+        db.Index('idx_survey_answers_response', 'response_id'),
+    )
+    
+    def __repr__(self):
+        return f'<SurveyAnswer Response:{self.response_id} Question:{self.question_id}>'
+    
+    @property
+    def value(self):
+        """The typed value of this answer"""
+        if self.bool_value is not None:
+            return self.bool_value
+        if self.numeric_value is not None:
+            return self.numeric_value
+        return self.text_value
+
+class ResponseDelta(db.Model):
+    """Response Delta Model - append-only autosave log of an unfinished SurveyResponse"""
+    __tablename__ = 'response_deltas'
+    
+    id = db.Column(db.Integer, primary_key=True)  # ascending id = save order
+    
+    # Foreign keys
+    response_id = db.Column(db.Integer, db.ForeignKey('survey_responses.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    question_id = db.Column(db.String(50), nullable=False)
+    
+    # Answer (stored as JSON, 'null' clears the answer)
+    value = db.Column(db.Text)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Indexes
+    __table_args__ = (
+        db.Index('idx_response_deltas_response', 'response_id', 'id'),
+    )
+    
+    def __repr__(self):
+        return f'<ResponseDelta Response:{self.response_id} Question:{self.question_id}>'
+    
+    def to_dict(self):
+        """Convert response delta to dictionary"""
+        import json
+        return {
+            'id': self.id,
+            'response_id': self.response_id,
+            'question_id': self.question_id,
+            'value': json.loads(self.value) if self.value is not None else None,
+            'created_at': self.created_at.isoformat()
+        }
+
+class QuestionAggregate(db.Model):
+    """Question Aggregate Model - incrementally maintained results per survey question"""
+    __tablename__ = 'question_aggregates'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Foreign keys
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    survey_version_id = db.Column(db.Integer, nullable=False, default=0)  # 0 = responses without a version
+    question_id = db.Column(db.String(50), nullable=False)
+    
+    # Aggregates
+    answer_count = db.Column(db.Integer, default=0)
+    
+    # Running numeric statistics (Welford; batches are merged in one UPDATE)
+    numeric_count = db.Column(db.Integer, default=0)
+    numeric_mean = db.Column(db.Float, default=0.0)
+    numeric_m2 = db.Column(db.Float, default=0.0)  # sum of squared deviations from the mean
+    numeric_min = db.Column(db.Float)
+    numeric_max = db.Column(db.Float)
+    
+    # Timestamps
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint('survey_id', 'survey_version_id', 'question_id', name='unique_survey_version_question'),
+    )
+    
+    def __repr__(self):
+        return f'<QuestionAggregate Survey:{self.survey_id} Version:{self.survey_version_id} Question:{self.question_id}>'
+    
+    @property
+    def variance(self):
+        """Sample variance of numeric answers"""
+        if not self.numeric_count or self.numeric_count < 2:
+            return None
+        return self.numeric_m2 / (self.numeric_count - 1)
+    
+    def to_dict(self, option_counts=None, histogram=None):
+        """Convert question aggregate to dictionary (counts from QuestionAggregateCount)"""
+        data = {
+            'question_id': self.question_id,
+            'answer_count': self.answer_count or 0,
+            'option_counts': option_counts or {}
+        }
+        
+        if self.numeric_count:
+            data['numeric'] = {
+                'count': self.numeric_count,
+                'mean': self.numeric_mean,
+                'variance': self.variance,
+                'std_dev': self.variance ** 0.5 if self.variance is not None else None,
+                'min': self.numeric_min,
+                'max': self.numeric_max,
+                'histogram': histogram or {}
+            }
+        
+        return data
+
+class QuestionAggregateCount(db.Model):
+    """Question Aggregate Count Model - answers per option or histogram bucket of a survey question"""
+    __tablename__ = 'question_aggregate_counts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Foreign keys
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    survey_version_id = db.Column(db.Integer, nullable=False, default=0)  # 0 = responses without a version
+    question_id = db.Column(db.String(50), nullable=False)
+    
+    # Counter - incremented with UPDATE ... SET count = count + n
+    kind = db.Column(db.String(10), nullable=False)  # 'option' or 'bucket'
+    value = db.Column(db.String(500), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint('survey_id', 'survey_version_id', 'question_id', 'kind', 'value',
+                            name='unique_survey_version_question_value'),
+    )
+    
+    def __repr__(self):
+        return f'<QuestionAggregateCount Survey:{self.survey_id} Question:{self.question_id} {self.kind}:{self.value}>'
+
+class SurveyDurationSketch(db.Model):
+    """Completion Time Sketch - mergeable quantile sketch of a survey's completion times"""
+    __tablename__ = 'survey_duration_sketches'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False, unique=True)
+    
+    # Sketch
+    sketch = db.Column(db.Text, nullable=False)  # JSON of DurationSketch.to_dict()
+    sample_count = db.Column(db.Integer, default=0, server_default='0')
+    revision = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # optimistic lock - workers merge their deltas
+    
+    # Timestamps
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SurveyDurationSketch Survey:{self.survey_id} n={self.sample_count}>'
+
+class QualificationAnswer(db.Model):
+    """Qualification Answer Model - screening answers and profile attributes per user"""
+    __tablename__ = 'qualification_answers'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Foreign keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    question_id = db.Column(db.String(50), nullable=False)  # screening question id or profile attribute ('age', 'location')
+    
+    # Answer (stored as JSON)
+    value = db.Column(db.Text)  # JSON string of the answer
+    
+    # Timestamps
+    answered_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'question_id', name='unique_user_qualification'),
+    )
+    
+    def __repr__(self):
+        return f'<QualificationAnswer User:{self.user_id} Question:{self.question_id}>'
+    
+    @property
+    def parsed_value(self):
+        """Decoded answer value"""
+        import json
+        try:
+            return json.loads(self.value) if self.value is not None else None
+        except ValueError:
+            return None
+    
+    def to_dict(self):
+        """Convert qualification answer to dictionary"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'question_id': self.question_id,
+            'value': self.parsed_value,
+            'answered_at': self.answered_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class SurveyQuota(db.Model):
+    """Survey Quota Model - response cap per survey segment (age band, region, ...)"""
+    __tablename__ = 'survey_quotas'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Foreign keys
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    segment = db.Column(db.String(100), nullable=False)  # e.g. 'age_18_29', 'region_de'
+    
+    # Segment definition (qualification criteria format, stored as JSON)
+    criteria = db.Column(db.Text, nullable=False)
+    
+    # Counter - only changed by conditional UPDATEs (see utils/quotas.py)
+    max_responses = db.Column(db.Integer, nullable=False)
+    current_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    is_full = db.Column(db.Boolean, default=False, server_default='0', nullable=False)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint('survey_id', 'segment', name='unique_survey_segment'),
+        db.Index('idx_survey_quotas_full', 'survey_id', 'is_full'),
+    )
+    
+    def __repr__(self):
+        return f'<SurveyQuota Survey:{self.survey_id} Segment:{self.segment}>'
+    
+    @property
+    def remaining(self):
+        """Responses left in this segment"""
+        return max(self.max_responses - (self.current_count or 0), 0)
+    
+    def to_dict(self):
+        """Convert survey quota to dictionary"""
+        import json
+        return {
+            'id': self.id,
+            'survey_id': self.survey_id,
+            'segment': self.segment,
+            'criteria': json.loads(self.criteria) if self.criteria else {},
+            'max_responses': self.max_responses,
+            'current_count': self.current_count or 0,
+            'remaining': self.remaining,
+            'is_full': self.is_full
+        }
+
 class DataType(db.Model):
     """Data Type Model - Verfügbare Datentypen für Nutzer"""
     __tablename__ = 'data_types'
@@ -275,8 +722,8 @@ class Earning(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     
-    # Foreign keys
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Foreign keys (user_id wird bei Kontolöschung anonymisiert, Buchung bleibt erhalten)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     survey_response_id = db.Column(db.Integer, db.ForeignKey('survey_responses.id'))
     
     # Earning details
@@ -317,8 +764,8 @@ class Payout(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     
-    # Foreign keys
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Foreign keys (user_id wird bei Kontolöschung anonymisiert, Buchung bleibt erhalten)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     
     # Payout details
     amount = db.Column(db.Numeric(10, 2), nullable=False)
@@ -391,4 +838,95 @@ class Activity(db.Model):
             'company': self.company,
             'created_at': self.created_at.isoformat(),
             'timestamp': self.created_at.strftime('%d.%m.%Y %H:%M')
-        }
\ No newline at end of file
+        }
+
+class BackgroundJob(db.Model):
+    """Background Job Model to track long-running tasks and their progress"""
+    __tablename__ = 'background_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Job details
+    job_type = db.Column(db.String(50), nullable=False, index=True)  # 'account_deletion', ...
+    user_id = db.Column(db.Integer, index=True)  # Kein FK - der Nutzer kann während des Jobs gelöscht werden
+    status = db.Column(db.String(20), default='pending')  # 'pending', 'running', 'completed', 'failed', 'expired'
+    status_token = db.Column(db.String(64), unique=True)  # unguessable key of a status view without login
+    
+    # Progress
+    total_items = db.Column(db.Integer, default=0)
+    processed_items = db.Column(db.Integer, default=0)
+    progress_data = db.Column(db.Text)  # JSON string with per-step counters
+    error_message = db.Column(db.Text)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, index=True)  # result files (export archives) are deleted after this
+    
+    def __repr__(self):
+        return f'<BackgroundJob {self.job_type}:{self.id} Status:{self.status}>'
+    
+    @property
+    def progress(self):
+        """Calculate progress percentage"""
+        if self.status == 'completed':
+            return 100.0
+        if not self.total_items:
+            return 0.0
+        return min(100.0, (self.processed_items / self.total_items) * 100)
+    
+    def to_dict(self):
+        """Convert background job to dictionary"""
+        data = {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'total_items': self.total_items,
+            'processed_items': self.processed_items,
+            'progress': round(self.progress, 1),
+            'error': self.error_message,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+        
+        if self.progress_data:
+            import json
+            try:
+                data['details'] = json.loads(self.progress_data)
+            except:
+                data['details'] = {}
+        
+        return data
+
+class IdempotencyKey(db.Model):
+    """Idempotency Key Model - stored response of a request sent with an Idempotency-Key header"""
+    __tablename__ = 'idempotency_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Key (unique per user and endpoint)
+    user_id = db.Column(db.Integer, nullable=False)  # Kein FK - Einträge laufen nach der TTL ab
+    scope = db.Column(db.String(100), nullable=False)  # endpoint name, e.g. 'earning.request_payout'
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of method, path and body
+    
+    # Stored response
+    status = db.Column(db.String(20), default='in_progress')  # 'in_progress', 'completed'
+    response_status = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'scope', 'key', name='unique_idempotency_key'),
+    )
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.scope}:{self.key} Status:{self.status}>'
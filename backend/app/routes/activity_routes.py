@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta
 from app.database import db
@@ -12,8 +12,9 @@ def get_activities():
     """Get user's activity feed"""
     try:
         # Get query parameters
-        limit = request.args.get('limit', 20, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', current_app.config.get('API_PAGINATION_DEFAULT', 20), type=int)
+        limit = max(1, min(limit, current_app.config.get('API_PAGINATION_MAX', 100)))
+        offset = max(request.args.get('offset', 0, type=int), 0)
         activity_type = request.args.get('type', None)
         
         # Build query
@@ -10,7 +10,8 @@ from datetime import datetime, timedelta
 import json
 
 from ..database import db
-from ..models import User, Survey, SurveyResponse
+from ..models import User, Survey, SurveyResponse, BackgroundJob
+from ..utils.idempotency import idempotent
 
 # Create Blueprint
 api_bp = Blueprint('api', __name__)
@@ -170,6 +171,7 @@ def get_payouts():
 
 @api_bp.route('/payout', methods=['POST'])
 @login_required
+@idempotent
 def request_payout():
     """Request a Payout"""
     try:
@@ -321,4 +323,26 @@ def manage_data_permissions():
             
     except Exception as e:
         print(f"Data permissions error: {str(e)}")
-        return jsonify({'error': 'Failed to manage data permissions'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to manage data permissions'}), 500
+
+@api_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_job_status(job_id):
+    """Get Progress of a Background Job started by the user"""
+    try:
+        job = BackgroundJob.query.filter_by(
+            id=job_id,
+            user_id=current_user.id
+        ).first()
+        
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
+        
+    except Exception as e:
+        print(f"Job status error: {str(e)}")
+        return jsonify({'error': 'Failed to load job status'}), 500
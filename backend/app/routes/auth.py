@@ -13,6 +13,7 @@ from datetime import datetime
 
 from ..database import db
 from ..models import User
+from ..utils.eligibility_index import register_user
 
 # Create Blueprint
 auth_bp = Blueprint('auth', __name__)
@@ -161,6 +162,7 @@ def register():
         
         db.session.add(user)
         db.session.commit()
+        register_user(user.id)
         
         return jsonify({
             'success': True,
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import func, extract
 from app.database import db
 from app.models import Earning, Payout, DataPermission, DataType, Activity
+from app.utils.idempotency import idempotent
 
 earning_bp = Blueprint('earning', __name__)
 
@@ -133,6 +134,7 @@ def generate_monthly_earnings():
 
 @earning_bp.route('/payout', methods=['POST'])
 @login_required
+@idempotent
 def request_payout():
     """Request a payout"""
     try:
@@ -166,7 +168,8 @@ def request_payout():
             Payout.status.in_(['completed', 'processing', 'pending'])
         ).scalar() or 0.0
         
-        available_balance = total_earnings - total_payouts
+        # SUM over Numeric columns returns Decimal (or None) - compare as float
+        available_balance = float(total_earnings) - float(total_payouts)
         
         if amount > available_balance:
             return jsonify({'error': f'Insufficient balance. Available: €{available_balance:.2f}'}), 400
@@ -279,6 +282,7 @@ def update_payout_status(payout_id):
 
 @earning_bp.route('/earnings/bonus', methods=['POST'])
 @login_required
+@idempotent
 def add_bonus_earning():
     """Add a bonus earning (Admin function or special promotions)"""
     try:
@@ -305,7 +309,7 @@ def add_bonus_earning():
         earning = Earning(
             user_id=current_user.id,
             amount=amount,
-            source='bonus',
+            source_type='bonus',
             description=description
         )
         db.session.add(earning)
@@ -5,13 +5,48 @@ Survey Routes for DataFair Survey System
 Korrigiert: Optionaler Login-Schutz für API-Tests
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, url_for, Response, stream_with_context
 from flask_login import login_required, current_user
 from datetime import datetime
 import json
 
 from ..database import db
-from ..models import Survey, SurveyResponse, User
+from ..models import Survey, SurveyResponse, SurveyVersion, SurveyTransition, User, Earning
+from ..utils.jobs import start_background_job
+from ..utils.response_analytics import record_response, get_results, rebuild_aggregates_job
+from ..utils.response_validation import question_graph, shown_answers, validate_responses
+from ..utils.survey_scheduler import sync_schedule, apply_due_transitions, schedule_changed
+from ..utils.catalog_events import publish
+from ..utils.survey_search import search_surveys
+from ..utils.survey_versions import (
+    check_questions, current_version_id, publish_version, version_questions
+)
+from ..utils.eligibility_index import (
+    get_eligibility_index, save_user_answers, load_user_answers, iter_ids
+)
+from ..utils.answer_store import (
+    store_answers, backfill_answers_job, parse_filters, count_answers, crosstab
+)
+from ..utils.response_export import EXPORT_FORMATS, iter_export, format_available
+from ..utils.idempotency import idempotent
+from ..utils.access import owner_or_admin_required, role_required, is_admin
+from ..utils.autosave import load_draft, append_deltas, finalize_draft, merge_draft
+from ..utils.ingestion import queue_mode_enabled, get_ingestion_service, survey_earning_row
+from ..utils.quotas import claim_quotas, full_segments, set_quotas, quota_status
+from ..utils.response_quality import score_response, record_origin
+from ..utils.completion_times import record_completion, rebuild_completion_times_job
+from ..utils.reservations import reserve_slot, convert_reservation
+from ..utils.survey_catalog import (
+    CatalogQueryError, parse_filters as parse_catalog_filters, catalog_page, completed_survey_ids
+)
+from ..utils.survey_analysis import analysis_available, crosstab_report, margins_report
+from ..utils.survey_authoring import bulk_upsert, parse_timestamp
+from ..utils.http_cache import (
+    survey_validators, catalog_validators, is_not_modified, not_modified, cacheable, private
+)
+from ..utils.recommendations import (
+    recommend_surveys, survey_changed, survey_started, user_changed
+)
 
 # Create Blueprint
 surveys_bp = Blueprint('surveys', __name__)
@@ -36,39 +71,61 @@ def test_survey_system():
         print(f"Survey test error: {str(e)}")
         return jsonify({'error': 'Survey system test failed'}), 500
 
+def _limit_param(default_key='API_PAGINATION_DEFAULT'):
+    """?limit= clamped to 1..API_PAGINATION_MAX"""
+    config = current_app.config
+    limit = request.args.get('limit', config.get(default_key, 20), type=int)
+    return max(1, min(limit, config.get('API_PAGINATION_MAX', 100)))
+
 @surveys_bp.route('/available', methods=['GET'])
 def get_available_surveys():
     """
     Get Available Surveys - Ohne Login-Schutz für API-Tests
     Für Produktion sollte @login_required aktiviert werden
+    
+    Filter: ?category=&min_reward=&max_reward=&max_duration=&exclude_completed=1
+    Sortierung: ?sort=newest|reward|reward_per_minute, Paginierung: ?limit=&cursor=
+    
+    The page is the same for every visitor (ETag/Last-Modified, public Cache-Control) and
+    only changes with the survey content; live slot counters and completion flags come
+    from /available/overlay. Only exclude_completed=1 with a logged-in user makes the page
+    personal and uncacheable for shared caches.
     """
     try:
-        # Optional: Check if user is logged in for personalized results
-        user_id = current_user.id if hasattr(current_user, 'id') and current_user.is_authenticated else None
+        try:
+            filters = parse_catalog_filters(request.args)
+            limit = _limit_param()
+        except CatalogQueryError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        user_id = None
+        if filters.get('exclude_completed') and current_user.is_authenticated:
+            user_id = current_user.id
+        
+        # Revalidation costs one indexed lookup - no query for the page, no JSON
+        if user_id is None:
+            etag, last_modified = catalog_validators()
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified)
         
-        # Get active surveys
-        surveys = Survey.query.filter_by(is_active=True).all()
+        try:
+            surveys, next_cursor = catalog_page(filters, limit, request.args.get('cursor'), user_id)
+        except CatalogQueryError as e:
+            return jsonify({'error': str(e)}), 400
         
         survey_list = []
         for survey in surveys:
-            # Check if user has already completed this survey
-            completed = False
-            if user_id:
-                existing_response = SurveyResponse.query.filter_by(
-                    survey_id=survey.id,
-                    user_id=user_id
-                ).first()
-                completed = existing_response is not None
-            
             survey_data = {
                 'id': survey.id,
                 'title': survey.title,
                 'description': survey.description,
+                'category': survey.category,
                 'reward_amount': float(survey.reward_amount),
                 'estimated_duration': survey.estimated_duration or 5,
-                'total_responses': survey.total_responses,
+                'reward_per_minute': survey.reward_per_minute,
+                'median_duration_seconds': survey.median_duration_seconds,
+                'p90_duration_seconds': survey.p90_duration_seconds,
                 'max_responses': survey.max_responses,
-                'completed_by_user': completed,
                 'created_at': survey.created_at.isoformat()
             }
             
@@ -84,16 +141,90 @@ def get_available_surveys():
             
             survey_list.append(survey_data)
         
-        return jsonify({
+        response = jsonify({
             'surveys': survey_list,
             'total_count': len(survey_list),
-            'user_authenticated': user_id is not None
+            'sort': filters['sort'],
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
+        if user_id is not None:
+            return private(response)
+        return cacheable(response, etag, last_modified)
         
     except Exception as e:
         print(f"Available surveys error: {str(e)}")
         return jsonify({'error': 'Failed to load available surveys'}), 500
 
+@surveys_bp.route('/available/overlay', methods=['GET'])
+def get_available_overlay():
+    """
+    Live Overlay for the cached catalog - ?ids=1,2,3 -> current response and slot counts
+    of these surveys and, for a logged-in user, which of them they already took part in
+    """
+    try:
+        try:
+            survey_ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma-separated list of survey ids'}), 400
+        
+        if len(survey_ids) > current_app.config.get('API_PAGINATION_MAX', 100):
+            return jsonify({'error': 'Too many survey ids'}), 400
+        
+        availability = [{
+            'id': survey_id,
+            'total_responses': total or 0,
+            'available_slots': max((maximum or 0) - (total or 0) - (reserved or 0), 0)
+        } for survey_id, total, maximum, reserved in db.session.query(
+            Survey.id, Survey.total_responses, Survey.max_responses, Survey.reserved_slots
+        ).filter(Survey.id.in_(survey_ids)).order_by(Survey.id)] if survey_ids else []
+        
+        completed = completed_survey_ids(current_user.id, survey_ids) if current_user.is_authenticated else set()
+        
+        return private(jsonify({
+            'availability': availability,
+            'completed_survey_ids': sorted(completed),
+            'user_authenticated': current_user.is_authenticated
+        }))
+        
+    except Exception as e:
+        print(f"Available overlay error: {str(e)}")
+        return jsonify({'error': 'Failed to load survey overlay'}), 500
+
+@surveys_bp.route('/search', methods=['GET'])
+def search_surveys_route():
+    """
+    Full-Text Search - ?q=umwelt+mobil&limit=20&offset=0 (ranked by relevance and reward)
+    """
+    try:
+        query = (request.args.get('q') or '').strip()
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        
+        limit = _limit_param()
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        rows, has_more = search_surveys(query, limit, offset)
+        
+        return jsonify({
+            'query': query,
+            'results': [{
+                'id': row['id'],
+                'title': row['title'],
+                'description': row['description'],
+                'reward_amount': float(row['reward_amount'] or 0),
+                'estimated_duration': row['estimated_duration'] or 5,
+                'score': round(float(row['score']), 4)
+            } for row in rows],
+            'limit': limit,
+            'offset': offset,
+            'has_more': has_more
+        })
+        
+    except Exception as e:
+        print(f"Survey search error: {str(e)}")
+        return jsonify({'error': 'Failed to search surveys'}), 500
+
 @surveys_bp.route('/available-auth', methods=['GET'])
 @login_required
 def get_available_surveys_auth():
@@ -102,17 +233,139 @@ def get_available_surveys_auth():
     """
     return get_available_surveys()
 
+@surveys_bp.route('/qualification', methods=['GET'])
+@login_required
+def get_qualification_answers():
+    """
+    Get the User's Screening Answers and Profile Attributes
+    """
+    try:
+        return jsonify({
+            'answers': load_user_answers(current_user.id)
+        })
+        
+    except Exception as e:
+        print(f"Qualification answers error: {str(e)}")
+        return jsonify({'error': 'Failed to load qualification answers'}), 500
+
+@surveys_bp.route('/qualification', methods=['POST'])
+@login_required
+def save_qualification_answers():
+    """
+    Save Screening Answers - updates the eligibility index incrementally
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('answers'), dict):
+            return jsonify({'error': 'Qualification answers are required'}), 400
+        
+        answers = save_user_answers(current_user.id, data['answers'])
+        user_changed(current_user.id)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Qualification answers saved',
+            'answers': answers,
+            'eligible_survey_ids': _eligible_survey_ids(current_user.id)
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Save qualification error: {str(e)}")
+        return jsonify({'error': 'Failed to save qualification answers'}), 500
+
+def _eligible_survey_ids(user_id):
+    """Active surveys the user qualifies for - one bit test per survey"""
+    criteria_by_survey = {
+        survey_id: criteria for survey_id, criteria in
+        db.session.query(Survey.id, Survey.qualification_criteria).filter(Survey.is_active == True)
+    }
+    return get_eligibility_index().eligible_surveys(user_id, criteria_by_survey)
+
+@surveys_bp.route('/eligible', methods=['GET'])
+@login_required
+def get_eligible_surveys():
+    """
+    Get Active Surveys the User qualifies for (eligibility index)
+    """
+    try:
+        survey_ids = _eligible_survey_ids(current_user.id)
+        surveys = Survey.query.filter(Survey.id.in_(survey_ids)).all() if survey_ids else []
+        
+        return jsonify({
+            'surveys': [survey.to_dict() for survey in surveys],
+            'total_count': len(surveys)
+        })
+        
+    except Exception as e:
+        print(f"Eligible surveys error: {str(e)}")
+        return jsonify({'error': 'Failed to load eligible surveys'}), 500
+
+@surveys_bp.route('/recommended', methods=['GET'])
+@login_required
+def get_recommended_surveys():
+    """
+    Get Recommended Surveys - ranked by reward per minute, only open surveys the
+    user qualifies for and has not started (?limit=, ?exclude=<survey_id>)
+    """
+    try:
+        limit = min(request.args.get('limit', 5, type=int), current_app.config.get('API_PAGINATION_MAX', 100))
+        exclude = request.args.getlist('exclude', type=int)
+        
+        surveys = recommend_surveys(current_user.id, max(limit, 0), exclude)
+        
+        survey_list = [survey.to_dict() for survey in surveys]
+        
+        return jsonify({
+            'surveys': survey_list,
+            'total_count': len(survey_list)
+        })
+        
+    except Exception as e:
+        print(f"Recommended surveys error: {str(e)}")
+        return jsonify({'error': 'Failed to load recommended surveys'}), 500
+
+@surveys_bp.route('/<int:survey_id>/eligible-users', methods=['GET'])
+@login_required
+@owner_or_admin_required
+def get_eligible_users(survey_id):
+    """
+    Get Users qualifying for a Survey - count plus up to ?limit= user ids
+    """
+    try:
+        survey = Survey.query.get_or_404(survey_id)
+        
+        limit = min(request.args.get('limit', 100, type=int), current_app.config.get('API_PAGINATION_MAX', 100))
+        bitmap = get_eligibility_index().eligible_users(survey.id, survey.qualification_criteria)
+        
+        return jsonify({
+            'survey_id': survey.id,
+            'eligible_count': bitmap.bit_count(),
+            'user_ids': list(iter_ids(bitmap, limit))
+        })
+        
+    except Exception as e:
+        print(f"Eligible users error: {str(e)}")
+        return jsonify({'error': 'Failed to load eligible users'}), 500
+
 @surveys_bp.route('/<int:survey_id>', methods=['GET'])
 def get_survey_details(survey_id):
     """
     Get Survey Details - Ohne Login für Public Preview
     """
     try:
-        survey = Survey.query.get_or_404(survey_id)
-        
-        if not survey.is_active:
+        validators = survey_validators(survey_id)
+        if validators is None:
+            Survey.query.get_or_404(survey_id)
             return jsonify({'error': 'Survey is not active'}), 404
         
+        etag, last_modified = validators
+        if is_not_modified(etag, last_modified):
+            return not_modified(etag, last_modified)
+        
+        survey = db.session.get(Survey, survey_id)
+        
         # Parse questions
         questions = []
         if survey.questions:
@@ -126,14 +379,18 @@ def get_survey_details(survey_id):
             'title': survey.title,
             'description': survey.description,
             'questions': questions,
+            'version_id': survey.current_version_id,
             'reward_amount': float(survey.reward_amount),
             'estimated_duration': survey.estimated_duration or 5,
+            'median_duration_seconds': survey.median_duration_seconds,
+            'p90_duration_seconds': survey.p90_duration_seconds,
             'max_responses': survey.max_responses,
             'total_responses': survey.total_responses,
+            'available_slots': survey.available_slots,
             'created_at': survey.created_at.isoformat()
         }
         
-        return jsonify(survey_data)
+        return cacheable(jsonify(survey_data), etag, last_modified)
         
     except Exception as e:
         print(f"Survey details error: {str(e)}")
@@ -160,25 +417,49 @@ def start_survey(survey_id):
         if existing_response:
             return jsonify({'error': 'You have already completed this survey'}), 400
         
-        # Check if survey has reached max responses
+        # Check if survey has reached max responses (leased slots are checked by reserve_slot)
         if survey.total_responses >= survey.max_responses:
             return jsonify({'error': 'Survey has reached maximum responses'}), 400
         
+        # Segment quotas - O(1) unless one of the survey's segments is already full
+        full = full_segments(survey_id, current_user.id)
+        if full:
+            return jsonify({'error': 'Quota for your segment is full', 'segments': full}), 400
+        
         # Create survey response entry
+        # Pin the question version - later edits do not change what this response answers
         response = SurveyResponse(
             survey_id=survey_id,
+            survey_version_id=current_version_id(survey),
             user_id=current_user.id,
+            ip_address=request.remote_addr,
+            user_agent=(request.user_agent.string or '')[:500] or None,
             started_at=datetime.utcnow(),
             is_completed=False
         )
         
         db.session.add(response)
+        db.session.flush()
+        
+        # Lease a slot - it is held for this response until submit or expiry
+        last_slot = survey.available_slots <= 1
+        reservation = reserve_slot(survey, response)
+        if reservation is None:
+            db.session.rollback()
+            return jsonify({'error': 'Survey has reached maximum responses'}), 409
+        
         db.session.commit()
+        survey_started(current_user.id, survey_id)
+        if last_slot:
+            # Fully leased now - drop it from the recommendations
+            survey_changed(db.session.get(Survey, survey_id, populate_existing=True))
         
         return jsonify({
             'success': True,
             'message': 'Survey started successfully',
             'response_id': response.id,
+            'survey_version_id': response.survey_version_id,
+            'reservation_expires_at': reservation.expires_at.isoformat(),
             'survey': {
                 'id': survey.id,
                 'title': survey.title,
@@ -192,17 +473,91 @@ def start_survey(survey_id):
         print(f"Start survey error: {str(e)}")
         return jsonify({'error': 'Failed to start survey'}), 500
 
+def _open_response(survey_id):
+    """The current user's unfinished response to a survey (None if not started)"""
+    return SurveyResponse.query.filter_by(
+        survey_id=survey_id,
+        user_id=current_user.id,
+        is_completed=False
+    ).first()
+
+@surveys_bp.route('/<int:survey_id>/progress', methods=['GET'])
+@login_required
+def get_survey_progress(survey_id):
+    """
+    Resume a Survey - saved answers of the unfinished response
+    """
+    try:
+        survey_response = _open_response(survey_id)
+        if not survey_response:
+            return jsonify({'error': 'Survey not started or already completed'}), 404
+        
+        answers = load_draft(survey_response)
+        
+        return jsonify(dict({
+            'response_id': survey_response.id,
+            'survey_id': survey_id,
+            'survey_version_id': survey_response.survey_version_id,
+            'answers': answers,
+            'started_at': survey_response.started_at.isoformat()
+        }, **question_graph(survey_response).navigation(answers)))
+        
+    except Exception as e:
+        print(f"Survey progress error: {str(e)}")
+        return jsonify({'error': 'Failed to load survey progress'}), 500
+
+@surveys_bp.route('/<int:survey_id>/progress', methods=['PATCH'])
+@login_required
+def save_survey_progress(survey_id):
+    """
+    Autosave - {"answers": {"q1": "...", "q2": null}} appends one small delta per question
+    (null clears an answer); the full answer set is only written on submit
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data or not isinstance(data.get('answers'), dict) or not data['answers']:
+            return jsonify({'error': 'answers object is required'}), 400
+        
+        survey_response = _open_response(survey_id)
+        if not survey_response:
+            return jsonify({'error': 'Survey not started or already completed'}), 400
+        
+        errors = validate_responses(survey_response, data['answers'], partial=True)
+        if errors:
+            return jsonify({'error': 'Invalid answers', 'details': errors}), 400
+        
+        pending = append_deltas(survey_response, data['answers'])
+        db.session.commit()
+        
+        result = {
+            'success': True,
+            'saved_questions': list(data['answers']),
+            'pending_deltas': pending
+        }
+        # Only answers other questions depend on can change what is shown next
+        graph = question_graph(survey_response)
+        if graph.affects(data['answers']):
+            result.update(graph.navigation(load_draft(survey_response)))
+        return jsonify(result)
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Save progress error: {str(e)}")
+        return jsonify({'error': 'Failed to save survey progress'}), 500
+
 @surveys_bp.route('/<int:survey_id>/submit', methods=['POST'])
 @login_required
+@idempotent
 def submit_survey(survey_id):
     """
     Submit Survey Response
     """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         
-        if not data or 'responses' not in data:
-            return jsonify({'error': 'Survey responses are required'}), 400
+        if not isinstance(data.get('responses', {}), dict):
+            return jsonify({'error': 'Survey responses must be an object'}), 400
         
         # Find the survey response
         survey_response = SurveyResponse.query.filter_by(
@@ -214,16 +569,56 @@ def submit_survey(survey_id):
         if not survey_response:
             return jsonify({'error': 'Survey not started or already completed'}), 400
         
+        if queue_mode_enabled():
+            return _enqueue_submission(survey_response, data.get('responses'))
+        
+        # Autosaved answers plus the answers sent with the submit (these win)
+        # Answers to questions the skip logic hides are not stored
+        responses = shown_answers(survey_response, finalize_draft(survey_response, data.get('responses')))
+        if not responses:
+            db.session.rollback()
+            return jsonify({'error': 'Survey responses are required'}), 400
+        
+        errors = validate_responses(survey_response, responses)
+        if errors:
+            db.session.rollback()
+            return jsonify({'error': 'Invalid survey responses', 'details': errors}), 400
+        
         # Update survey response
-        survey_response.responses = json.dumps(data['responses'])
+        survey_response.responses = json.dumps(responses)
         survey_response.completed_at = datetime.utcnow()
         survey_response.is_completed = True
         
-        # Update survey total responses
-        survey = Survey.query.get(survey_id)
-        survey.total_responses += 1
+        # Convert the lease into a response (or claim a free slot if it expired), then count
+        # against the segment quotas with atomic conditional increments - concurrent submits
+        # can never overshoot a cap
+        if not convert_reservation(survey_id, survey_response.id):
+            db.session.rollback()
+            return jsonify({'error': 'Survey has reached maximum responses'}), 409
+        
+        full_segment = claim_quotas(survey_id, current_user.id, responses)
+        if full_segment:
+            db.session.rollback()
+            return jsonify({'error': 'Quota for your segment is full', 'segment': full_segment}), 409
+        
+        survey = db.session.get(Survey, survey_id, populate_existing=True)
+        
+        # Speed, straight-lining and IP/device collisions -> quality score on the response
+        survey_response.quality_score, survey_response.quality_flags = score_response(
+            survey, survey_response, responses, survey_response.completed_at)
+        
+        # Update per-question aggregates and normalized answers in the same transaction
+        record_response(survey, responses, survey_response.survey_version_id)
+        store_answers(survey_response, responses)
+        db.session.add(Earning(**survey_earning_row(survey, survey_response.id, current_user.id,
+                                                    survey_response.completed_at)))
         
         db.session.commit()
+        record_origin(survey_response)
+        
+        # Remaining capacity changed - a full survey drops out of all recommendations
+        survey_changed(survey)
+        record_completion(survey_id, survey_response.started_at, survey_response.completed_at)
         
         return jsonify({
             'success': True,
@@ -237,6 +632,539 @@ def submit_survey(survey_id):
         print(f"Submit survey error: {str(e)}")
         return jsonify({'error': 'Failed to submit survey'}), 500
 
+def _enqueue_submission(survey_response, submitted):
+    """
+    Write-behind submit (INGESTION_MODE = 'queue'): validate, persist to the local
+    queue and acknowledge - the ingestion writer applies it with the next batch
+    """
+    service = get_ingestion_service()
+    if service.queue.contains(survey_response.id):
+        return jsonify({'error': 'Survey not started or already completed'}), 400
+    
+    responses = shown_answers(survey_response, merge_draft(survey_response, submitted))
+    if not responses:
+        return jsonify({'error': 'Survey responses are required'}), 400
+    
+    survey = db.session.get(Survey, survey_response.survey_id)
+    errors = validate_responses(survey_response, responses)
+    if errors:
+        return jsonify({'error': 'Invalid survey responses', 'details': errors}), 400
+    
+    quality = score_response(survey, survey_response, responses)
+    error = service.submit(survey, survey_response, responses, quality)
+    if error:
+        return jsonify({'error': error}), 409
+    record_origin(survey_response)
+    
+    return jsonify({
+        'success': True,
+        'queued': True,
+        'message': 'Survey submission accepted',
+        'reward_amount': float(survey.reward_amount),
+        'completion_time': datetime.utcnow().isoformat()
+    }), 202
+
+@surveys_bp.route('/<int:survey_id>/versions', methods=['GET'])
+@login_required
+def get_survey_versions(survey_id):
+    """
+    List Question Versions of a Survey
+    """
+    try:
+        survey = Survey.query.get_or_404(survey_id)
+        versions = SurveyVersion.query.filter_by(survey_id=survey_id).order_by(SurveyVersion.version).all()
+        
+        response_counts = dict(db.session.query(SurveyResponse.survey_version_id, db.func.count(SurveyResponse.id))
+                                 .filter(SurveyResponse.survey_id == survey_id)
+                                 .group_by(SurveyResponse.survey_version_id))
+        
+        return jsonify({
+            'survey_id': survey_id,
+            'current_version_id': survey.current_version_id,
+            'versions': [dict(version.to_dict(), response_count=response_counts.get(version.id, 0))
+                         for version in versions]
+        })
+        
+    except Exception as e:
+        print(f"Survey versions error: {str(e)}")
+        return jsonify({'error': 'Failed to load survey versions'}), 500
+
+@surveys_bp.route('/<int:survey_id>/versions/<int:version>', methods=['GET'])
+@login_required
+def get_survey_version(survey_id, version):
+    """
+    Get the Questions of one Survey Version
+    """
+    try:
+        survey_version = SurveyVersion.query.filter_by(survey_id=survey_id, version=version).first()
+        if not survey_version:
+            return jsonify({'error': 'Survey version not found'}), 404
+        
+        return jsonify(dict(survey_version.to_dict(), questions=version_questions(survey_version.id)))
+        
+    except Exception as e:
+        print(f"Survey version error: {str(e)}")
+        return jsonify({'error': 'Failed to load survey version'}), 500
+
+@surveys_bp.route('/<int:survey_id>/versions', methods=['POST'])
+@login_required
+@owner_or_admin_required
+def publish_survey_version(survey_id):
+    """
+    Publish new Questions - {"questions": [...]}; responses already started keep their version
+    """
+    try:
+        survey = Survey.query.get_or_404(survey_id)
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            questions = check_questions(data.get('questions'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        version, created = publish_version(survey, questions)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'created': created,
+            'version': version.to_dict()
+        }), 201 if created else 200
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Publish survey version error: {str(e)}")
+        return jsonify({'error': 'Failed to publish survey version'}), 500
+
+@surveys_bp.route('/bulk', methods=['POST'])
+@login_required
+@role_required('admin', 'customer')
+def bulk_author_surveys():
+    """
+    Bulk Create/Update - {"surveys": [{"external_id": "acme-42", "title": "...", "questions": [...]}],
+    "dry_run": false}; upsert by external_id with one result per item.
+    Customers own the surveys they create and may only update those; admins may update every survey.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('surveys')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'surveys must be a non-empty list'}), 400
+        
+        max_items = current_app.config.get('SURVEY_BULK_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            return jsonify({'error': f'At most {max_items} surveys per request'}), 400
+        
+        owner_id = None if is_admin(current_user) else current_user.id
+        summary = bulk_upsert(items, dry_run=bool(data.get('dry_run')), owner_id=owner_id)
+        
+        return jsonify(dict(summary, success=summary['invalid'] == 0))
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Bulk survey authoring error: {str(e)}")
+        return jsonify({'error': 'Failed to save surveys'}), 500
+
+@surveys_bp.route('/<int:survey_id>/schedule', methods=['GET'])
+@login_required
+def get_survey_schedule(survey_id):
+    """
+    Get Activation/Expiry Schedule with applied and pending Transitions
+    """
+    try:
+        survey = Survey.query.get_or_404(survey_id)
+        transitions = SurveyTransition.query.filter_by(survey_id=survey_id)\
+                                            .order_by(SurveyTransition.due_at).all()
+        
+        return jsonify({
+            'survey_id': survey_id,
+            'is_active': survey.is_active,
+            'starts_at': survey.starts_at.isoformat() if survey.starts_at else None,
+            'ends_at': survey.ends_at.isoformat() if survey.ends_at else None,
+            'transitions': [transition.to_dict() for transition in transitions]
+        })
+        
+    except Exception as e:
+        print(f"Survey schedule error: {str(e)}")
+        return jsonify({'error': 'Failed to load survey schedule'}), 500
+
+@surveys_bp.route('/<int:survey_id>/schedule', methods=['PUT'])
+@login_required
+@owner_or_admin_required
+def update_survey_schedule(survey_id):
+    """
+    Schedule Activation/Expiry - {"starts_at": "2025-07-01T08:00:00Z", "ends_at": null}
+    """
+    try:
+        survey = Survey.query.get_or_404(survey_id)
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            starts_at = parse_timestamp(data.get('starts_at'))
+            ends_at = parse_timestamp(data.get('ends_at'))
+        except ValueError:
+            return jsonify({'error': 'starts_at and ends_at must be ISO 8601 timestamps'}), 400
+        if starts_at and ends_at and ends_at <= starts_at:
+            return jsonify({'error': 'ends_at must be after starts_at'}), 400
+        
+        was_active = survey.is_active
+        survey.starts_at = starts_at
+        survey.ends_at = ends_at
+        sync_schedule(survey)
+        db.session.commit()
+        
+        # Times in the past take effect right away
+        applied = apply_due_transitions()
+        schedule_changed()
+        if survey.is_active != was_active and survey not in applied:
+            publish(survey, 'schedule')
+        
+        return get_survey_schedule(survey_id)
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Update survey schedule error: {str(e)}")
+        return jsonify({'error': 'Failed to update survey schedule'}), 500
+
+@surveys_bp.route('/<int:survey_id>/quotas', methods=['GET'])
+@login_required
+def get_survey_quotas(survey_id):
+    """
+    Get Segment Quotas with current Counters
+    """
+    try:
+        Survey.query.get_or_404(survey_id)
+        
+        return jsonify({
+            'survey_id': survey_id,
+            'quotas': quota_status(survey_id)
+        })
+        
+    except Exception as e:
+        print(f"Survey quotas error: {str(e)}")
+        return jsonify({'error': 'Failed to load quotas'}), 500
+
+@surveys_bp.route('/<int:survey_id>/quotas', methods=['PUT'])
+@login_required
+@owner_or_admin_required
+def update_survey_quotas(survey_id):
+    """
+    Define Segment Quotas - {"quotas": [{"segment", "criteria", "max_responses"}]}
+    """
+    try:
+        Survey.query.get_or_404(survey_id)
+        
+        data = request.get_json()
+        if not data or not isinstance(data.get('quotas'), list):
+            return jsonify({'error': 'quotas list is required'}), 400
+        
+        try:
+            set_quotas(survey_id, data['quotas'])
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+        
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Quotas updated',
+            'quotas': quota_status(survey_id)
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Update quotas error: {str(e)}")
+        return jsonify({'error': 'Failed to update quotas'}), 500
+
+@surveys_bp.route('/<int:survey_id>/results', methods=['GET'])
+@login_required
+@owner_or_admin_required
+def get_survey_results(survey_id):
+    """
+    Get Aggregated Survey Results - O(questions), reads the precomputed aggregates
+    of the current version or of ?version=<number>
+    """
+    try:
+        survey = Survey.query.get_or_404(survey_id)
+        
+        version = request.args.get('version', type=int)
+        if version is None:
+            return jsonify(get_results(survey))
+        
+        survey_version = SurveyVersion.query.filter_by(survey_id=survey_id, version=version).first()
+        if not survey_version:
+            return jsonify({'error': 'Survey version not found'}), 404
+        return jsonify(get_results(survey, survey_version.id))
+        
+    except Exception as e:
+        print(f"Survey results error: {str(e)}")
+        return jsonify({'error': 'Failed to load survey results'}), 500
+
+@surveys_bp.route('/<int:survey_id>/results/rebuild', methods=['POST'])
+@login_required
+@owner_or_admin_required
+def rebuild_survey_results(survey_id):
+    """
+    Rebuild Survey Results from the raw responses (background job)
+    """
+    try:
+        Survey.query.get_or_404(survey_id)
+        
+        job = start_background_job(
+            'results_rebuild',
+            rebuild_aggregates_job,
+            user_id=current_user.id,
+            survey_id=survey_id,
+            chunk_size=current_app.config.get('ANALYTICS_REBUILD_CHUNK_SIZE', 1000)
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'Results rebuild started',
+            'job': job.to_dict(),
+            'status_url': url_for('api.get_job_status', job_id=job.id)
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Rebuild results error: {str(e)}")
+        return jsonify({'error': 'Failed to start results rebuild'}), 500
+
+@surveys_bp.route('/<int:survey_id>/durations/rebuild', methods=['POST'])
+@login_required
+@owner_or_admin_required
+def rebuild_survey_durations(survey_id):
+    """
+    Rebuild Completion Time Statistics from started_at/completed_at (background job)
+    """
+    try:
+        Survey.query.get_or_404(survey_id)
+        
+        job = start_background_job(
+            'durations_rebuild',
+            rebuild_completion_times_job,
+            user_id=current_user.id,
+            survey_id=survey_id,
+            chunk_size=current_app.config.get('ANALYTICS_REBUILD_CHUNK_SIZE', 1000)
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'Completion time rebuild started',
+            'job': job.to_dict(),
+            'status_url': url_for('api.get_job_status', job_id=job.id)
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Rebuild durations error: {str(e)}")
+        return jsonify({'error': 'Failed to start completion time rebuild'}), 500
+
+@surveys_bp.route('/<int:survey_id>/answers/counts', methods=['GET'])
+@login_required
+@owner_or_admin_required
+def get_answer_counts(survey_id):
+    """
+    Count Answers of one Question - optional filters like ?filter=q2>=3&filter=q1=Täglich
+    """
+    try:
+        Survey.query.get_or_404(survey_id)
+        
+        question_id = request.args.get('question')
+        if not question_id:
+            return jsonify({'error': 'question parameter is required'}), 400
+        
+        try:
+            filters = parse_filters(request.args.getlist('filter'))
+            counts = count_answers(survey_id, question_id, filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'survey_id': survey_id,
+            'question_id': question_id,
+            'counts': counts,
+            'total': sum(counts.values())
+        })
+        
+    except Exception as e:
+        print(f"Answer counts error: {str(e)}")
+        return jsonify({'error': 'Failed to count answers'}), 500
+
+@surveys_bp.route('/<int:survey_id>/answers/crosstab', methods=['GET'])
+@login_required
+@owner_or_admin_required
+def get_answer_crosstab(survey_id):
+    """
+    Crosstab of two Questions - ?row=q1&col=q2, optional filters
+    """
+    try:
+        Survey.query.get_or_404(survey_id)
+        
+        row_question = request.args.get('row')
+        column_question = request.args.get('col')
+        if not row_question or not column_question:
+            return jsonify({'error': 'row and col parameters are required'}), 400
+        
+        try:
+            filters = parse_filters(request.args.getlist('filter'))
+            table = crosstab(survey_id, row_question, column_question, filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'survey_id': survey_id,
+            'row': row_question,
+            'col': column_question,
+            'crosstab': table
+        })
+        
+    except Exception as e:
+        print(f"Crosstab error: {str(e)}")
+        return jsonify({'error': 'Failed to build crosstab'}), 500
+
+def _analysis_request(survey_id):
+    """Shared body of the analysis endpoints -> (data, filters, version_id) or an error response"""
+    if not analysis_available():
+        return None, (jsonify({'error': 'Survey analysis requires numpy'}), 501)
+    
+    data = request.get_json(silent=True) or {}
+    targets = data.get('targets')
+    if targets is not None and not isinstance(targets, dict):
+        return None, (jsonify({'error': 'targets must map question ids to {answer: share}'}), 400)
+    
+    version_id = None
+    if data.get('version') is not None:
+        survey_version = SurveyVersion.query.filter_by(survey_id=survey_id, version=data['version']).first()
+        if survey_version is None:
+            return None, (jsonify({'error': 'Survey version not found'}), 404)
+        version_id = survey_version.id
+    
+    try:
+        filters = parse_filters(data.get('filters') or [])
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+    return (data, filters, version_id), None
+
+@surveys_bp.route('/<int:survey_id>/analysis/crosstab', methods=['POST'])
+@login_required
+@owner_or_admin_required
+def analyze_crosstab(survey_id):
+    """
+    Weighted Crosstab - {row, column, segment?, filters?, targets?: {question: {answer: share}}, version?}
+    """
+    try:
+        Survey.query.get_or_404(survey_id)
+        
+        parsed, error = _analysis_request(survey_id)
+        if error:
+            return error
+        data, filters, version_id = parsed
+        if not data.get('row') or not data.get('column'):
+            return jsonify({'error': 'row and column are required'}), 400
+        
+        try:
+            report = crosstab_report(survey_id, data['row'], data['column'], segment=data.get('segment'),
+                                     filters=filters, targets=data.get('targets'), version_id=version_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(dict(report, survey_id=survey_id, version=data.get('version')))
+    
+    except Exception as e:
+        print(f"Analysis crosstab error: {str(e)}")
+        return jsonify({'error': 'Failed to build crosstab'}), 500
+
+@surveys_bp.route('/<int:survey_id>/analysis/margins', methods=['POST'])
+@login_required
+@owner_or_admin_required
+def analyze_margins(survey_id):
+    """
+    Weighted Margins - {questions: [...], filters?, targets?: {question: {answer: share}}, version?}
+    """
+    try:
+        Survey.query.get_or_404(survey_id)
+        
+        parsed, error = _analysis_request(survey_id)
+        if error:
+            return error
+        data, filters, version_id = parsed
+        questions = data.get('questions')
+        if not isinstance(questions, list) or not questions:
+            return jsonify({'error': 'questions must be a non-empty list'}), 400
+        
+        try:
+            report = margins_report(survey_id, [str(question) for question in questions], filters=filters,
+                                    targets=data.get('targets'), version_id=version_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(dict(report, survey_id=survey_id, version=data.get('version')))
+    
+    except Exception as e:
+        print(f"Analysis margins error: {str(e)}")
+        return jsonify({'error': 'Failed to compute margins'}), 500
+
+@surveys_bp.route('/answers/backfill', methods=['POST'])
+@login_required
+@owner_or_admin_required
+def backfill_survey_answers():
+    """
+    Normalize existing Responses into survey_answers (Admin function, background job)
+    """
+    try:
+        job = start_background_job(
+            'answer_backfill',
+            backfill_answers_job,
+            user_id=current_user.id,
+            chunk_size=current_app.config.get('ANSWER_BACKFILL_CHUNK_SIZE', 1000)
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'Answer backfill started',
+            'job': job.to_dict(),
+            'status_url': url_for('api.get_job_status', job_id=job.id)
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Answer backfill error: {str(e)}")
+        return jsonify({'error': 'Failed to start answer backfill'}), 500
+
+@surveys_bp.route('/<int:survey_id>/export', methods=['GET'])
+@login_required
+@owner_or_admin_required
+def export_survey_responses(survey_id):
+    """
+    Export Raw Survey Responses - chunked download as CSV, Parquet or Arrow
+    """
+    try:
+        survey = Survey.query.get_or_404(survey_id)
+        
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f'Unsupported format. Use one of: {", ".join(EXPORT_FORMATS)}'}), 400
+        if not format_available(export_format):
+            return jsonify({'error': f'{export_format} export requires pyarrow'}), 501
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        chunk_size = current_app.config.get('RESPONSE_EXPORT_CHUNK_SIZE', 5000)
+        filename = f'survey_{survey.id}_responses.{extension}'
+        
+        # No Content-Length - Werkzeug sends the body with chunked transfer encoding
+        return Response(
+            stream_with_context(iter_export(survey, export_format, chunk_size)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+        
+    except Exception as e:
+        print(f"Export responses error: {str(e)}")
+        return jsonify({'error': 'Failed to export responses'}), 500
+
 @surveys_bp.route('/my-responses', methods=['GET'])
 @login_required
 def get_my_responses():
@@ -1,8 +1,15 @@
-from flask import Blueprint, jsonify, request
-from flask_login import login_required, current_user
+import os
+from flask import Blueprint, jsonify, request, current_app, url_for, Response, send_file, stream_with_context
+from flask_login import login_required, current_user, logout_user
+from werkzeug.security import check_password_hash
 from datetime import datetime
 from app.database import db
-from app.models import User
+from app.models import User, BackgroundJob
+from app.utils.jobs import start_background_job
+from app.utils.account_deletion import delete_account_job
+from app.utils.eligibility_index import forget_user
+from app.utils.recommendations import user_changed
+from app.utils.data_export import iter_ndjson, export_archive_job, get_export_path, is_expired
 
 user_bp = Blueprint('user', __name__)
 
@@ -132,7 +139,7 @@ def change_password():
 @user_bp.route('/profile/delete', methods=['DELETE'])
 @login_required
 def delete_account():
-    """Delete user account (GDPR compliance)"""
+    """Delete user account (GDPR compliance) - runs as background job"""
     try:
         data = request.get_json()
         password = data.get('password') if data else None
@@ -141,23 +148,158 @@ def delete_account():
             return jsonify({'error': 'Password required to delete account'}), 400
             
         # Verify password
-        if not current_user.check_password(password):
+        if not check_password_hash(current_user.password_hash, password):
             return jsonify({'error': 'Incorrect password'}), 400
-            
-        # In a real app, you might want to:
-        # 1. Anonymize data instead of deleting
-        # 2. Keep some records for legal/accounting purposes
-        # 3. Send confirmation email
         
         user_id = current_user.id
-        db.session.delete(current_user)
+        
+        # Deactivate immediately - the job deletes activities, permissions and open
+        # responses and anonymizes responses, earnings and payouts (kept for accounting)
+        current_user.is_active = False
         db.session.commit()
+        logout_user()
+        forget_user(user_id)
+        user_changed(user_id)
         
+        job = start_background_job(
+            'account_deletion',
+            delete_account_job,
+            user_id=user_id,
+            status_token=True,
+            chunk_size=current_app.config.get('ACCOUNT_DELETION_CHUNK_SIZE', 500)
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'Account deletion started',
+            'job': job.to_dict(),
+            'status_token': job.status_token,
+            'status_url': url_for('user.get_deletion_status', token=job.status_token)
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/profile/delete/<token>', methods=['GET'])
+def get_deletion_status(token):
+    """
+    Get progress of an account deletion job (no login - the account is already gone);
+    looked up by the random status token of the 202 response, never by the sequential id
+    """
+    try:
+        job = BackgroundJob.query.filter_by(
+            status_token=token,
+            job_type='account_deletion'
+        ).first()
+        
+        if not job:
+            return jsonify({'error': 'Deletion job not found'}), 404
+            
         return jsonify({
             'success': True,
-            'message': 'Account deleted successfully'
+            'job': job.to_dict()
         })
         
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/profile/export', methods=['GET'])
+@login_required
+def export_profile_data():
+    """Stream all data stored about the user as NDJSON (GDPR Art. 15/20)"""
+    try:
+        batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+        filename = f'datafair_export_{current_user.id}_{datetime.utcnow().strftime("%Y%m%d")}.ndjson'
+        
+        return Response(
+            stream_with_context(iter_ndjson(current_user.id, batch_size)),
+            mimetype='application/x-ndjson',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/profile/export', methods=['POST'])
+@login_required
+def create_export_archive():
+    """Build a zip archive of the user's data in the background (resumable download)"""
+    try:
+        job = start_background_job(
+            'data_export',
+            export_archive_job,
+            user_id=current_user.id,
+            batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': 'Data export started',
+            'job': job.to_dict(),
+            'status_url': url_for('user.get_export_status', job_id=job.id),
+            'download_url': url_for('user.download_export_archive', job_id=job.id)
+        }), 202
+        
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/profile/export/<int:job_id>', methods=['GET'])
+@login_required
+def get_export_status(job_id):
+    """Get progress of a data export job"""
+    try:
+        job = BackgroundJob.query.filter_by(
+            id=job_id,
+            job_type='data_export',
+            user_id=current_user.id
+        ).first()
+        
+        if not job:
+            return jsonify({'error': 'Export job not found'}), 404
+            
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/profile/export/<int:job_id>/download', methods=['GET'])
+@login_required
+def download_export_archive(job_id):
+    """Download a finished export archive - supports Range/If-Range for resumed downloads"""
+    try:
+        job = BackgroundJob.query.filter_by(
+            id=job_id,
+            job_type='data_export',
+            user_id=current_user.id
+        ).first()
+        
+        if not job:
+            return jsonify({'error': 'Export job not found'}), 404
+            
+        if is_expired(job):
+            return jsonify({'error': 'Export archive has expired - please request a new export'}), 410
+        
+        if job.status != 'completed':
+            return jsonify({'error': 'Export is not ready yet', 'job': job.to_dict()}), 409
+        
+        path = get_export_path(job)
+        if not os.path.exists(path):
+            return jsonify({'error': 'Export archive no longer available'}), 410
+        
+        # conditional=True lets Werkzeug answer Range requests with 206 and validate If-Range via ETag
+        return send_file(
+            path,
+            mimetype='application/zip',
+            as_attachment=True,
+            download_name=os.path.basename(path),
+            conditional=True,
+            etag=True
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,66 @@
+# backend/app/utils/access.py
+"""
+Access Control for DataFair Survey System
+Rollen (panelist, customer, admin) und Besitzer-Prüfung für die Verwaltungsrouten einer Umfrage
+
+Panelists take surveys; customers own the surveys they create (Survey.owner_id) and may
+manage, analyze and export only those; admins may manage every survey and run the global
+jobs. Routes without a survey_id (backfills, bulk jobs) are admin-only.
+"""
+
+from functools import wraps
+
+from flask import jsonify
+from flask_login import current_user
+
+from ..database import db
+from ..models import Survey
+
+ROLES = ('panelist', 'customer', 'admin')
+
+
+def is_admin(user) -> bool:
+    return bool(user and user.is_authenticated and user.role == 'admin')
+
+
+def can_manage_survey(user, survey: Survey) -> bool:
+    """Admins manage every survey, customers the ones they own"""
+    if is_admin(user):
+        return True
+    return bool(user and user.is_authenticated and survey.owner_id is not None and survey.owner_id == user.id)
+
+
+def role_required(*roles):
+    """Route decorator (below @login_required) - only users with one of these roles"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_user.is_authenticated:
+                return jsonify({'error': 'Authentication required'}), 401
+            if current_user.role not in roles:
+                return jsonify({'error': f"Requires role: {', '.join(roles)}"}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def owner_or_admin_required(view):
+    """Route decorator (below @login_required) - survey_id routes need owner or admin, all others admin"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({'error': 'Authentication required'}), 401
+
+        survey_id = kwargs.get('survey_id')
+        if survey_id is None:
+            if not is_admin(current_user):
+                return jsonify({'error': 'Admin access required'}), 403
+            return view(*args, **kwargs)
+
+        survey = db.session.get(Survey, survey_id)
+        if survey is None:
+            return jsonify({'error': 'Survey not found'}), 404
+        if not can_manage_survey(current_user, survey):
+            return jsonify({'error': 'Only the survey owner or an admin can do this'}), 403
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,80 @@
+# backend/app/utils/account_deletion.py
+"""
+Account Deletion Job for DataFair Survey System
+Löscht bzw. anonymisiert alle Daten eines Nutzers in kleinen Blöcken (DSGVO)
+"""
+
+from sqlalchemy import and_
+
+from ..database import db
+from ..models import (User, Survey, SurveyResponse, DataPermission, Earning, Payout, Activity,
+                      QualificationAnswer, ResponseDelta, IdempotencyKey)
+from .data_export import delete_user_archives
+from .jobs import update_job_progress
+from .reservations import release_user_reservations
+
+
+def get_deletion_steps(user_id: int):
+    """
+    Steps in processing order: (name, model, criterion, values)
+    values=None deletes the rows, a dict anonymizes them (rows kept for accounting)
+    """
+    return [
+        ('activities', Activity, Activity.user_id == user_id, None),
+        ('data_permissions', DataPermission, DataPermission.user_id == user_id, None),
+        ('qualification_answers', QualificationAnswer, QualificationAnswer.user_id == user_id, None),
+        ('idempotency_keys', IdempotencyKey, IdempotencyKey.user_id == user_id, None),
+        ('response_deltas', ResponseDelta, ResponseDelta.user_id == user_id, None),
+        ('open_responses', SurveyResponse,
+         and_(SurveyResponse.user_id == user_id, SurveyResponse.is_completed == False), None),
+        ('survey_responses', SurveyResponse, SurveyResponse.user_id == user_id,
+         {'user_id': None, 'ip_address': None, 'user_agent': None}),
+        ('earnings', Earning, Earning.user_id == user_id, {'user_id': None}),
+        ('payouts', Payout, Payout.user_id == user_id, {'user_id': None}),
+        ('owned_surveys', Survey, Survey.owner_id == user_id, {'owner_id': None}),
+    ]
+
+
+def delete_account_job(job, chunk_size: int = 500):
+    """Delete/anonymize the rows of ``job.user_id`` chunk by chunk, committing after each chunk"""
+    user_id = job.user_id
+    steps = get_deletion_steps(user_id)
+
+    job.total_items = sum(
+        db.session.query(model.id).filter(criterion).count()
+        for _, model, criterion, _ in steps
+    ) + 1  # + User row
+    db.session.commit()
+
+    # Slot leases reference the open responses - release them (and their capacity) first
+    release_user_reservations(user_id)
+    db.session.commit()
+
+    for step, model, criterion, values in steps:
+        while True:
+            ids = [row.id for row in db.session.query(model.id)
+                   .filter(criterion)
+                   .order_by(model.id)
+                   .limit(chunk_size)
+                   .all()]
+            if not ids:
+                break
+
+            chunk_query = model.query.filter(model.id.in_(ids))
+            if values is None:
+                chunk_query.delete(synchronize_session=False)
+            else:
+                chunk_query.update(values, synchronize_session=False)
+
+            update_job_progress(job, len(ids), step)
+            db.session.commit()
+
+    # Export archives are files, not rows - they go with the account
+    update_job_progress(job, delete_user_archives(user_id), 'export_archives')
+    db.session.commit()
+
+    user = db.session.get(User, user_id)
+    if user:
+        db.session.delete(user)
+    update_job_progress(job, 1, 'user')
+    db.session.commit()
@@ -0,0 +1,237 @@
+# backend/app/utils/answer_store.py
+"""
+Normalized Answer Storage for DataFair Survey System
+Schreibt jede Antwort zusätzlich typisiert in survey_answers, damit Zählungen,
+Kreuztabellen und Filter als indizierte SQL-Abfragen laufen
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import and_, func, or_
+
+from ..database import db
+from ..models import SurveyResponse, SurveyAnswer
+from .jobs import update_job_progress
+
+FILTER_PATTERN = re.compile(r'^([\w\-]+)\s*(>=|<=|=)\s*(.+)$')
+
+
+def _typed_columns(value: Any) -> Dict[str, Any]:
+    """Put a scalar answer into the matching typed column"""
+    if isinstance(value, bool):
+        return {'bool_value': value}
+    if isinstance(value, (int, float)):
+        return {'numeric_value': float(value)}
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return {'text_value': str(value)[:500]}
+
+
+def build_answer_rows(survey_id: int, response_id: int, answers: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One row per scalar answer, one row per selected option for list answers"""
+    rows = []
+    for question_id, value in answers.items():
+        values = value if isinstance(value, list) else [value]
+        for index, item in enumerate(values):
+            if item is None or item == '':
+                continue
+            row = {'survey_id': survey_id, 'question_id': str(question_id)[:50],
+                   'response_id': response_id, 'answer_index': index}
+            row.update(_typed_columns(item))
+            rows.append(row)
+    return rows
+
+
+def _insert_rows(rows: List[Dict[str, Any]]):
+    if not rows:
+        return
+    # Fill all typed columns so every row has the same keys (executemany batch)
+    for row in rows:
+        for column in ('text_value', 'numeric_value', 'bool_value'):
+            row.setdefault(column, None)
+    db.session.execute(SurveyAnswer.__table__.insert(), rows)
+
+
+def store_answers(survey_response: SurveyResponse, answers: Dict[str, Any]):
+    """Replace the normalized answers of one response (caller commits)"""
+    if not isinstance(answers, dict):
+        return
+    SurveyAnswer.query.filter_by(response_id=survey_response.id).delete(synchronize_session=False)
+    _insert_rows(build_answer_rows(survey_response.survey_id, survey_response.id, answers))
+
+
+def store_answers_bulk(responses: List[Tuple[int, int, Dict[str, Any]]]):
+    """Replace the normalized answers of many (survey_id, response_id, answers) at once (caller commits)"""
+    responses = [(survey_id, response_id, answers) for survey_id, response_id, answers in responses
+                 if isinstance(answers, dict)]
+    if not responses:
+        return
+    SurveyAnswer.query.filter(SurveyAnswer.response_id.in_([response_id for _, response_id, _ in responses]))\
+                      .delete(synchronize_session=False)
+    rows = []
+    for survey_id, response_id, answers in responses:
+        rows.extend(build_answer_rows(survey_id, response_id, answers))
+    _insert_rows(rows)
+
+
+def backfill_answers(chunk_size: int = 1000, job=None) -> int:
+    """
+    Normalize completed responses that have no answer rows yet, chunk by chunk.
+    Safe to re-run - already normalized responses are skipped.
+    """
+    missing = and_(
+        SurveyResponse.is_completed == True,
+        ~db.session.query(SurveyAnswer.id).filter(SurveyAnswer.response_id == SurveyResponse.id).exists()
+    )
+
+    if job is not None:
+        job.total_items = db.session.query(SurveyResponse.id).filter(missing).count()
+        db.session.commit()
+
+    processed = 0
+    last_id = 0
+    while True:
+        chunk = db.session.query(SurveyResponse.id, SurveyResponse.survey_id, SurveyResponse.responses)\
+                          .filter(missing, SurveyResponse.id > last_id)\
+                          .order_by(SurveyResponse.id)\
+                          .limit(chunk_size)\
+                          .all()
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+
+        rows = []
+        for response_id, survey_id, raw in chunk:
+            try:
+                answers = json.loads(raw) if raw else {}
+            except ValueError:
+                continue
+            if isinstance(answers, dict):
+                rows.extend(build_answer_rows(survey_id, response_id, answers))
+        _insert_rows(rows)
+
+        processed += len(chunk)
+        if job is not None:
+            update_job_progress(job, len(chunk), 'responses')
+        db.session.commit()
+
+    return processed
+
+
+def backfill_answers_job(job, chunk_size: int = 1000):
+    """Background job wrapper for backfill_answers"""
+    backfill_answers(chunk_size, job=job)
+
+
+# =========================
+# QUERIES
+# =========================
+
+def _value_condition(operator: str, raw: str):
+    """SQL condition on the typed columns for a filter value"""
+    try:
+        number = float(raw)
+    except ValueError:
+        number = None
+
+    if operator == '>=':
+        return SurveyAnswer.numeric_value >= number if number is not None else None
+    if operator == '<=':
+        return SurveyAnswer.numeric_value <= number if number is not None else None
+
+    conditions = [SurveyAnswer.text_value == raw]
+    if number is not None:
+        conditions.append(SurveyAnswer.numeric_value == number)
+    if raw.lower() in ('true', 'false'):
+        conditions.append(SurveyAnswer.bool_value == (raw.lower() == 'true'))
+    return or_(*conditions)
+
+
+def parse_filters(expressions: List[str]):
+    """Parse filter expressions like 'q1=Täglich', 'q2>=3' into (question_id, operator, value)"""
+    filters = []
+    for expression in expressions:
+        match = FILTER_PATTERN.match(expression.strip())
+        if not match:
+            raise ValueError(f'Invalid filter: {expression}')
+        filters.append(match.groups())
+    return filters
+
+
+def filtered_response_ids(survey_id: int, filters):
+    """Subquery of response ids matching all filters (None when there are no filters)"""
+    subquery = None
+    for question_id, operator, raw in filters:
+        condition = _value_condition(operator, raw)
+        if condition is None:
+            raise ValueError(f'Range filter needs a number: {question_id}{operator}{raw}')
+        matching = db.session.query(SurveyAnswer.response_id).filter(
+            SurveyAnswer.survey_id == survey_id,
+            SurveyAnswer.question_id == question_id,
+            condition
+        )
+        subquery = matching if subquery is None else subquery.intersect(matching)
+    return subquery
+
+
+def _value_key(text_value, numeric_value, bool_value) -> str:
+    if bool_value is not None:
+        return 'true' if bool_value else 'false'
+    if numeric_value is not None:
+        return str(int(numeric_value)) if float(numeric_value).is_integer() else str(numeric_value)
+    return text_value
+
+
+def count_answers(survey_id: int, question_id: str, filters=()) -> Dict[str, int]:
+    """Answer counts for one question - GROUP BY on the indexed typed columns"""
+    query = db.session.query(
+        SurveyAnswer.text_value, SurveyAnswer.numeric_value, SurveyAnswer.bool_value,
+        func.count(SurveyAnswer.id)
+    ).filter(
+        SurveyAnswer.survey_id == survey_id,
+        SurveyAnswer.question_id == question_id
+    )
+
+    response_ids = filtered_response_ids(survey_id, filters)
+    if response_ids is not None:
+        query = query.filter(SurveyAnswer.response_id.in_(response_ids))
+
+    query = query.group_by(SurveyAnswer.text_value, SurveyAnswer.numeric_value, SurveyAnswer.bool_value)
+    return {_value_key(text, number, flag): count for text, number, flag, count in query.all()}
+
+
+def crosstab(survey_id: int, row_question: str, column_question: str, filters=()) -> Dict[str, Dict[str, int]]:
+    """Question A x question B counts via a self-join on response_id"""
+    row_answer = db.aliased(SurveyAnswer)
+    column_answer = db.aliased(SurveyAnswer)
+
+    query = db.session.query(
+        row_answer.text_value, row_answer.numeric_value, row_answer.bool_value,
+        column_answer.text_value, column_answer.numeric_value, column_answer.bool_value,
+        func.count()
+    ).join(
+        column_answer, and_(column_answer.response_id == row_answer.response_id,
+                            column_answer.survey_id == survey_id,
+                            column_answer.question_id == column_question)
+    ).filter(
+        row_answer.survey_id == survey_id,
+        row_answer.question_id == row_question
+    )
+
+    response_ids = filtered_response_ids(survey_id, filters)
+    if response_ids is not None:
+        query = query.filter(row_answer.response_id.in_(response_ids))
+
+    query = query.group_by(
+        row_answer.text_value, row_answer.numeric_value, row_answer.bool_value,
+        column_answer.text_value, column_answer.numeric_value, column_answer.bool_value
+    )
+
+    table = {}
+    for row in query.all():
+        row_key = _value_key(*row[0:3])
+        column_key = _value_key(*row[3:6])
+        table.setdefault(row_key, {})[column_key] = row[6]
+    return table
@@ -0,0 +1,105 @@
+# backend/app/utils/autosave.py
+"""
+Incremental Answer Autosave for DataFair Survey System
+Speichert Zwischenstände als kleine Deltas pro Frage in einem Append-Log,
+statt bei jedem Speichern den kompletten Antwort-JSON-Blob neu zu schreiben
+
+Draft state = SurveyResponse.responses (snapshot, may be empty) + response_deltas in id order.
+Once the log of a response grows past AUTOSAVE_COMPACT_THRESHOLD rows it is folded into
+the snapshot; submit folds the rest and clears the log.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from flask import current_app
+
+from ..database import db
+from ..models import SurveyResponse, ResponseDelta
+
+
+def _parse_snapshot(raw) -> Dict[str, Any]:
+    try:
+        answers = json.loads(raw) if isinstance(raw, str) else raw
+    except (TypeError, ValueError):
+        return {}
+    return dict(answers) if isinstance(answers, dict) else {}
+
+
+def _replay(survey_response: SurveyResponse) -> Tuple[Dict[str, Any], int, int]:
+    """(merged answers, id of the last delta applied, number of deltas) - one indexed range scan"""
+    answers = _parse_snapshot(survey_response.responses)
+    last_id, count = 0, 0
+    for delta_id, question_id, raw in db.session.query(ResponseDelta.id, ResponseDelta.question_id,
+                                                       ResponseDelta.value)\
+                                                .filter(ResponseDelta.response_id == survey_response.id)\
+                                                .order_by(ResponseDelta.id):
+        value = json.loads(raw) if raw is not None else None
+        if value is None:
+            answers.pop(question_id, None)
+        else:
+            answers[question_id] = value
+        last_id, count = delta_id, count + 1
+    return answers, last_id, count
+
+
+def load_draft(survey_response: SurveyResponse) -> Dict[str, Any]:
+    """Saved answers of an unfinished response (snapshot plus pending deltas)"""
+    return _replay(survey_response)[0]
+
+
+def append_deltas(survey_response: SurveyResponse, answers: Dict[str, Any]) -> int:
+    """
+    Append one log row per changed question (caller commits); None clears an answer.
+    Returns the number of deltas pending after this save.
+    """
+    now = datetime.utcnow()
+    rows = [{'response_id': survey_response.id, 'user_id': survey_response.user_id,
+             'question_id': str(question_id)[:50], 'value': json.dumps(value, ensure_ascii=False),
+             'created_at': now}
+            for question_id, value in answers.items()]
+    if rows:
+        db.session.execute(ResponseDelta.__table__.insert(), rows)
+
+    pending = ResponseDelta.query.filter_by(response_id=survey_response.id).count()
+    if pending > current_app.config.get('AUTOSAVE_COMPACT_THRESHOLD', 50):
+        compact_draft(survey_response)
+        return 0
+    return pending
+
+
+def compact_draft(survey_response: SurveyResponse) -> Dict[str, Any]:
+    """Fold the log into the snapshot; deltas appended meanwhile stay in the log (caller commits)"""
+    answers, last_id, _ = _replay(survey_response)
+    survey_response.responses = json.dumps(answers, ensure_ascii=False)
+    ResponseDelta.query.filter(ResponseDelta.response_id == survey_response.id,
+                               ResponseDelta.id <= last_id).delete(synchronize_session=False)
+    return answers
+
+
+def merge_draft(survey_response: SurveyResponse, answers: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Saved draft overridden by the answers sent with the submit (read only)"""
+    final = load_draft(survey_response)
+    for question_id, value in (answers or {}).items():
+        if value is None:
+            final.pop(question_id, None)
+        else:
+            final[question_id] = value
+    return final
+
+
+def clear_drafts(response_ids):
+    """Drop the autosave log of submitted responses (caller commits)"""
+    ResponseDelta.query.filter(ResponseDelta.response_id.in_(list(response_ids)))\
+                       .delete(synchronize_session=False)
+
+
+def finalize_draft(survey_response: SurveyResponse, answers: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Final answers for submit: saved draft overridden by the answers sent with the submit.
+    Clears the log (caller stores the result in survey_response.responses and commits).
+    """
+    final = merge_draft(survey_response, answers)
+    clear_drafts([survey_response.id])
+    return final
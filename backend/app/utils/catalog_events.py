@@ -0,0 +1,51 @@
+# backend/app/utils/catalog_events.py
+"""
+Catalog Change Events for DataFair Survey System
+Benachrichtigt Caches, wenn sich der Umfragekatalog ändert (Aktivierung, Ablauf, Zeitplan),
+statt bei jedem Lesezugriff nach Zeit zu filtern
+
+catalog_version() is a process-local counter bumped on every change; caches compare it
+to decide whether their copy is still current. Events are not shared between processes,
+so the caches they keep current (recommendations, eligibility index) assume one app process.
+"""
+
+import itertools
+import threading
+from typing import Callable, List
+
+from ..models import Survey
+from .recommendations import survey_changed
+
+# listener(survey_id, reason)
+Listener = Callable[[int, str], None]
+
+_listeners: List[Listener] = []
+_counter = itertools.count(1)
+_version = 0
+_lock = threading.Lock()
+
+
+def subscribe(listener: Listener):
+    """Register a callback for catalog changes (e.g. at import time of a cache module)"""
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def catalog_version() -> int:
+    return _version
+
+
+def publish(survey: Survey, reason: str):
+    """Survey entered or left the catalog or its schedule changed"""
+    global _version
+    with _lock:
+        _version = next(_counter)
+        listeners = list(_listeners)
+
+    survey_changed(survey)
+    for listener in listeners:
+        try:
+            listener(survey.id, reason)
+        except Exception as e:
+            print(f"Catalog listener error: {str(e)}")
@@ -0,0 +1,322 @@
+# backend/app/utils/completion_times.py
+"""
+Completion Time Statistics for DataFair Survey System
+Misst die Bearbeitungszeit (started_at -> completed_at) jeder Abgabe in einer mergebaren
+Quantil-Skizze pro Umfrage und kalibriert estimated_duration aus dem Median
+
+DurationSketch stores counts in logarithmic buckets (DDSketch): every quantile is within
+DURATION_SKETCH_ACCURACY relative error, adding a value is one dict increment, and merging
+two sketches adds their bucket counts - lossless, so the order in which workers merge
+does not matter. Memory is bounded by DURATION_SKETCH_MAX_BUCKETS (the lowest buckets are
+collapsed first, which only affects quantiles far below the median).
+
+Each worker keeps a delta sketch per survey; a background thread merges it into
+survey_duration_sketches every DURATION_SKETCH_FLUSH_SECONDS (and once more at shutdown)
+with a revision check (a conflicting write keeps the delta for the next flush), so a
+submit only pays for one dict increment. The flush also writes median/p90 onto the survey and,
+once DURATION_CALIBRATION_MIN_SAMPLES completions are known, sets estimated_duration to
+the median in whole minutes.
+"""
+
+import atexit
+import json
+import math
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from ..database import db
+from ..models import Survey, SurveyDurationSketch, SurveyResponse
+from .jobs import update_job_progress
+from .recommendations import survey_changed
+
+
+class DurationSketch:
+    """Relative-error quantile sketch over positive values (seconds)"""
+
+    def __init__(self, accuracy: float = 0.01, max_buckets: int = 512):
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float, count: int = 1):
+        if value <= 0 or count <= 0:
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: 'DurationSketch'):
+        if other.accuracy != self.accuracy:
+            raise ValueError('Sketches with different accuracy cannot be merged')
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the lowest buckets into one until max_buckets remain"""
+        indexes = sorted(self.buckets)
+        excess = indexes[:len(indexes) - self.max_buckets + 1]
+        folded = sum(self.buckets.pop(index) for index in excess)
+        self.buckets[excess[-1]] = folded
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'accuracy': self.accuracy, 'count': self.count, 'min': self.min, 'max': self.max,
+                'buckets': {str(index): count for index, count in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_buckets: int = 512) -> 'DurationSketch':
+        sketch = cls(data.get('accuracy', 0.01), max_buckets)
+        sketch.buckets = {int(index): count for index, count in (data.get('buckets') or {}).items()}
+        sketch.count = data.get('count', 0)
+        sketch.min = data.get('min')
+        sketch.max = data.get('max')
+        return sketch
+
+
+class CompletionTimeTracker:
+    """Per-worker delta sketches, merged into the database every flush_interval seconds"""
+
+    def __init__(self, config):
+        self.accuracy = config.get('DURATION_SKETCH_ACCURACY', 0.01)
+        self.max_buckets = config.get('DURATION_SKETCH_MAX_BUCKETS', 512)
+        self.flush_interval = config.get('DURATION_SKETCH_FLUSH_SECONDS', 60)
+        self.min_samples = config.get('DURATION_CALIBRATION_MIN_SAMPLES', 30)
+        self.calibrate = config.get('DURATION_AUTO_CALIBRATE', True)
+        self._deltas: Dict[int, DurationSketch] = {}
+        self._lock = threading.Lock()
+
+    def new_sketch(self) -> DurationSketch:
+        return DurationSketch(self.accuracy, self.max_buckets)
+
+    def observe(self, survey_id: int, seconds: float):
+        with self._lock:
+            delta = self._deltas.get(survey_id)
+            if delta is None:
+                delta = self._deltas[survey_id] = self.new_sketch()
+            delta.add(seconds)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._deltas)
+
+    def flush(self) -> int:
+        """Merge all deltas into their stored sketches -> number of surveys written"""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+
+        written = 0
+        for survey_id, delta in deltas.items():
+            try:
+                stored = self._merge_stored(survey_id, delta)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Completion time flush error: {str(e)}")
+                stored = None
+            if stored is None:
+                # Another worker won the race (or the write failed) - retry with the next flush
+                with self._lock:
+                    self._deltas.setdefault(survey_id, self.new_sketch()).merge(delta)
+                continue
+            self._apply(survey_id, stored)
+            written += 1
+        return written
+
+    def _merge_stored(self, survey_id: int, delta: DurationSketch) -> Optional[DurationSketch]:
+        """Merge delta into the stored sketch in one revision-checked write (commits)"""
+        row = SurveyDurationSketch.query.filter_by(survey_id=survey_id).first()
+        if row is None:
+            db.session.add(SurveyDurationSketch(survey_id=survey_id, sketch=json.dumps(delta.to_dict()),
+                                                sample_count=delta.count, revision=1))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                return None
+            return delta
+
+        sketch = DurationSketch.from_dict(json.loads(row.sketch), self.max_buckets)
+        sketch.merge(delta)
+        result = db.session.execute(
+            update(SurveyDurationSketch)
+            .where(SurveyDurationSketch.id == row.id, SurveyDurationSketch.revision == row.revision)
+            .values(sketch=json.dumps(sketch.to_dict()), sample_count=sketch.count, revision=row.revision + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            return None
+        db.session.commit()
+        return sketch
+
+    def _apply(self, survey_id: int, sketch: DurationSketch):
+        """Median/p90 onto the survey; estimated_duration follows the median"""
+        survey = db.session.get(Survey, survey_id)
+        if survey is None:
+            return
+        apply_statistics(survey, sketch, self.min_samples if self.calibrate else None)
+        if db.session.is_modified(survey):
+            db.session.commit()
+            survey_changed(survey)
+
+
+def apply_statistics(survey: Survey, sketch: DurationSketch, min_samples: Optional[int]):
+    """Copy sketch quantiles onto the survey (caller commits); min_samples None = no calibration"""
+    median, p90 = sketch.quantile(0.5), sketch.quantile(0.9)
+    survey.median_duration_seconds = round(median) if median is not None else None
+    survey.p90_duration_seconds = round(p90) if p90 is not None else None
+    survey.duration_samples = sketch.count
+    if min_samples is not None and median is not None and sketch.count >= min_samples:
+        survey.estimated_duration = max(1, round(median / 60))
+
+
+_tracker: Optional[CompletionTimeTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_completion_tracker() -> CompletionTimeTracker:
+    """Process-wide tracker (needs an app context on first use)"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = CompletionTimeTracker(current_app.config)
+    return _tracker
+
+
+def record_completion(survey_id: int, started_at: Optional[datetime], completed_at: Optional[datetime]):
+    """Count one committed completion - written by the flusher thread, not by this request"""
+    if started_at is None or completed_at is None:
+        return
+    get_completion_tracker().observe(survey_id, (completed_at - started_at).total_seconds())
+
+
+class CompletionTimeFlusher:
+    """Background thread: merges the worker's deltas every DURATION_SKETCH_FLUSH_SECONDS"""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config.get('DURATION_SKETCH_FLUSH_SECONDS', 60)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='completion-time-flusher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def flush(self) -> int:
+        """One flush in its own app context -> number of surveys written"""
+        with self.app.app_context():
+            try:
+                tracker = get_completion_tracker()
+                return tracker.flush() if tracker.pending() else 0
+            except Exception as e:
+                db.session.rollback()
+                print(f"Completion time flusher error: {str(e)}")
+                return 0
+            finally:
+                db.session.remove()
+
+    def shutdown(self):
+        """atexit: stop the thread and write what is still buffered"""
+        self.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def start_completion_flusher(app):
+    """Call at startup - flushes periodically and once more when the process exits"""
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = CompletionTimeFlusher(app)
+            _flusher.start()
+            atexit.register(_flusher.shutdown)
+    return _flusher
+
+
+def rebuild_completion_times_job(job, survey_id: int, chunk_size: int = 1000):
+    """
+    Background job: rebuild a survey's sketch from started_at/completed_at of all completed
+    responses (e.g. for surveys that existed before completion times were tracked).
+    Completions still buffered in worker deltas at that moment are counted twice - at most
+    one flush interval's worth.
+    """
+    tracker = get_completion_tracker()
+    sketch = tracker.new_sketch()
+
+    base = db.session.query(SurveyResponse.id, SurveyResponse.started_at, SurveyResponse.completed_at).filter(
+        SurveyResponse.survey_id == survey_id,
+        SurveyResponse.is_completed == True
+    )
+    job.total_items = base.count()
+    db.session.commit()
+
+    last_id = 0
+    while True:
+        rows = base.filter(SurveyResponse.id > last_id).order_by(SurveyResponse.id).limit(chunk_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for _, started_at, completed_at in rows:
+            if started_at is not None and completed_at is not None:
+                sketch.add((completed_at - started_at).total_seconds())
+        update_job_progress(job, len(rows), 'responses')
+        db.session.commit()
+
+    row = SurveyDurationSketch.query.filter_by(survey_id=survey_id).first()
+    if row is None:
+        row = SurveyDurationSketch(survey_id=survey_id, revision=0)
+        db.session.add(row)
+    row.sketch = json.dumps(sketch.to_dict())
+    row.sample_count = sketch.count
+    row.revision = (row.revision or 0) + 1
+
+    survey = db.session.get(Survey, survey_id)
+    apply_statistics(survey, sketch, tracker.min_samples if tracker.calibrate else None)
+    db.session.commit()
+    survey_changed(survey)
@@ -0,0 +1,205 @@
+# backend/app/utils/data_export.py
+"""
+GDPR Data Export for DataFair Survey System
+Exportiert alle Daten eines Nutzers als NDJSON-Stream bzw. ZIP-Archiv mit konstantem Speicherbedarf
+
+Archives hold personal data, so they do not stay on disk: a finished archive expires after
+EXPORT_ARCHIVE_TTL_HOURS (BackgroundJob.expires_at), the export sweeper deletes expired
+archives every EXPORT_SWEEP_INTERVAL seconds, and account deletion removes all of a user's
+archives right away.
+"""
+
+import glob
+import json
+import os
+import threading
+import zipfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from flask import current_app
+
+from ..database import db
+from ..models import (User, SurveyResponse, DataPermission, Earning, Payout, Activity, QualificationAnswer,
+                      ResponseDelta, BackgroundJob)
+from .jobs import update_job_progress
+
+# Section name -> (model, serializer); rows are read with server-side cursors
+EXPORT_SECTIONS = [
+    ('survey_responses', SurveyResponse, lambda row: row.to_dict(include_responses=True)),
+    ('earnings', Earning, lambda row: row.to_dict()),
+    ('payouts', Payout, lambda row: row.to_dict()),
+    ('activities', Activity, lambda row: row.to_dict()),
+    ('data_permissions', DataPermission, lambda row: row.to_dict()),
+    ('qualification_answers', QualificationAnswer, lambda row: row.to_dict()),
+    ('response_deltas', ResponseDelta, lambda row: row.to_dict()),
+]
+
+
+def iter_section(model, user_id: int, batch_size: int = 1000):
+    """Server-side cursor over a user's rows of one model, batch_size rows at a time"""
+    return model.query.filter(model.user_id == user_id)\
+                      .order_by(model.id)\
+                      .execution_options(stream_results=True)\
+                      .yield_per(batch_size)
+
+
+def iter_export_records(user_id: int, batch_size: int = 1000) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (section, record) for everything stored about a user"""
+    user = db.session.get(User, user_id)
+    yield 'user', user.to_dict()
+
+    for section, model, serialize in EXPORT_SECTIONS:
+        for row in iter_section(model, user_id, batch_size):
+            yield section, serialize(row)
+
+
+def iter_ndjson(user_id: int, batch_size: int = 1000) -> Iterator[bytes]:
+    """NDJSON lines ({"type": section, "data": record}) for a streamed HTTP response"""
+    for section, record in iter_export_records(user_id, batch_size):
+        yield (json.dumps({'type': section, 'data': record}, default=str) + '\n').encode('utf-8')
+
+
+def get_export_path(job) -> str:
+    """Archive location for an export job"""
+    export_folder = current_app.config['EXPORT_FOLDER']
+    return os.path.join(export_folder, f'datafair_export_{job.user_id}_{job.id}.zip')
+
+
+def write_export_archive(path: str, user_id: int, batch_size: int = 1000, job=None):
+    """Write one NDJSON file per section into a zip archive, streaming row by row"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.part'
+
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            user = db.session.get(User, user_id)
+            archive.writestr('user.json', json.dumps(user.to_dict(), default=str, indent=2))
+            _report_progress(job, 1, 'user')
+
+            for section, model, serialize in EXPORT_SECTIONS:
+                count = 0
+                with archive.open(f'{section}.ndjson', 'w') as handle:
+                    for row in iter_section(model, user_id, batch_size):
+                        handle.write((json.dumps(serialize(row), default=str) + '\n').encode('utf-8'))
+                        count += 1
+                # Cursor is exhausted here, so committing the progress is safe
+                _report_progress(job, count, section)
+    except Exception:
+        # A failed export leaves no partial copy of the data behind
+        _remove(tmp_path)
+        raise
+
+    # Rename at the end so a download never sees a half-written archive
+    os.replace(tmp_path, path)
+
+
+def _report_progress(job, processed: int, step: str):
+    """Commit export progress for background jobs (no-op for direct calls)"""
+    if job is not None:
+        update_job_progress(job, processed, step)
+        db.session.commit()
+
+
+def export_archive_job(job, batch_size: int = 1000):
+    """Background job: build the export archive for ``job.user_id``"""
+    job.total_items = 1 + sum(
+        model.query.filter(model.user_id == job.user_id).count()
+        for _, model, _ in EXPORT_SECTIONS
+    )
+    db.session.commit()
+
+    path = get_export_path(job)
+    write_export_archive(path, job.user_id, batch_size, job=job)
+
+    # The account was deleted while the archive was written - do not keep it
+    if db.session.get(User, job.user_id, populate_existing=True) is None:
+        _remove(path)
+        raise RuntimeError('User was deleted during the export')
+    job.expires_at = datetime.utcnow() + timedelta(hours=current_app.config.get('EXPORT_ARCHIVE_TTL_HOURS', 24))
+    db.session.commit()
+
+
+def is_expired(job, now: Optional[datetime] = None) -> bool:
+    return job.status == 'expired' or (job.expires_at is not None and job.expires_at <= (now or datetime.utcnow()))
+
+
+def delete_user_archives(user_id: int) -> int:
+    """Account deletion: remove every export archive of the user and expire their export jobs (caller commits)"""
+    export_folder = current_app.config['EXPORT_FOLDER']
+    removed = 0
+    for path in glob.glob(os.path.join(export_folder, f'datafair_export_{user_id}_*.zip*')):
+        removed += _remove(path)
+    BackgroundJob.query.filter(BackgroundJob.job_type == 'data_export', BackgroundJob.user_id == user_id,
+                               BackgroundJob.status == 'completed')\
+                       .update({'status': 'expired', 'expires_at': datetime.utcnow()}, synchronize_session=False)
+    return removed
+
+
+def sweep_expired_exports(now: Optional[datetime] = None) -> int:
+    """Delete the archives of expired export jobs and mark the jobs expired (commits) -> archives removed"""
+    now = now or datetime.utcnow()
+    jobs = BackgroundJob.query.filter(BackgroundJob.job_type == 'data_export',
+                                      BackgroundJob.status == 'completed',
+                                      BackgroundJob.expires_at <= now).all()
+    removed = 0
+    for job in jobs:
+        removed += _remove(get_export_path(job))
+        job.status = 'expired'
+    db.session.commit()
+    if removed:
+        print(f"Export sweeper: deleted {removed} expired export archives")
+    return removed
+
+
+def _remove(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+
+class ExportSweeper:
+    """Background thread: delete expired export archives every EXPORT_SWEEP_INTERVAL seconds"""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config.get('EXPORT_SWEEP_INTERVAL', 600)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='export-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    sweep_expired_exports()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Export sweeper error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def start_export_sweeper(app):
+    """Call at startup: delete archives that expired while the app was down, then sweep periodically"""
+    global _sweeper
+    with app.app_context():
+        sweep_expired_exports()
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = ExportSweeper(app)
+            _sweeper.start()
+    return _sweeper
@@ -0,0 +1,377 @@
+# backend/app/utils/eligibility_index.py
+"""
+Eligibility Inverted Index for DataFair Survey System
+Bildet Qualifikationsantworten auf Nutzer-Bitmaps ab, damit "wer darf Umfrage X machen"
+und "welche Umfragen darf Nutzer Y machen" reine Mengenoperationen sind
+
+Bitmaps are plain Python ints (bit n = user id n): AND/OR/NOT and bit_count run in C,
+so intersections over a million users take well under a millisecond per posting.
+The index lives in process memory, is built once from qualification_answers and
+is then maintained incrementally whenever a user answers screening questions.
+Numeric answers are posted to buckets of two significant digits instead of one bitmap
+per distinct value, so range rules OR a bounded number of bitmaps and only check the
+exact values of the (at most two) buckets a bound falls into.
+
+Incremental updates only come from save_user_answers/register_user/forget_user calls
+in the same process - nothing is read back from the database after the build. Run the
+app as a single process (threads are fine): with several workers, an index would miss
+the answers and accounts another worker saved until it is restarted.
+"""
+
+import json
+import math
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from ..database import db
+from ..models import User, QualificationAnswer
+from .qualification import compile_criteria
+
+
+def value_key(value: Any) -> str:
+    """Posting key for a scalar answer (1 and 1.0 share a key, True does not)"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)) and float(value).is_integer():
+        return str(int(value))
+    return json.dumps(value, sort_keys=True)
+
+
+def bitmap_from_ids(ids: Iterable[int]) -> int:
+    """Build a bitmap in O(n) (setting bits one by one on an int would be O(n²))"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for user_id in ids:
+        buffer[user_id >> 3] |= 1 << (user_id & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def iter_ids(bitmap: int, limit: Optional[int] = None) -> Iterator[int]:
+    """Set bits of a bitmap in ascending order"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    found = 0
+    for byte_index, byte in enumerate(data):
+        if not byte:
+            continue
+        for bit in range(8):
+            if byte >> bit & 1:
+                yield byte_index * 8 + bit
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+NUMBER_BUCKET_DIGITS = 2
+
+
+def number_bucket(value) -> float:
+    """Bucket key of a numeric answer: rounded down to NUMBER_BUCKET_DIGITS significant digits"""
+    if value == 0 or not math.isfinite(value):
+        return value
+    step = 10.0 ** (math.floor(math.log10(abs(value))) - NUMBER_BUCKET_DIGITS + 1)
+    return math.floor(value / step) * step
+
+
+def _is_range_number(value) -> bool:
+    return _is_number(value) and not math.isnan(value)
+
+
+class EligibilityIndex:
+    """Inverted index: (field, value) -> bitmap of user ids"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.users = 0           # every user known to the index (universe for NOT)
+        self.postings = {}       # field -> {value_key: bitmap}; list answers post every element
+        self.numbers = {}        # field -> {bucket: [bitmap, lowest, highest]}; scalar numeric answers
+        self.number_values = {}  # field -> {user_id: number}; exact values for partly covered buckets
+        self.answered = {}       # field -> bitmap of users with any answer
+        self._surveys = {}       # survey_id -> (criteria_key, eligible bitmap)
+
+    # =========================
+    # BUILD / UPDATE
+    # =========================
+
+    def build(self, batch_size: int = 10000):
+        """Load all active users and qualification answers with one streaming pass each"""
+        user_ids = [row.id for row in db.session.query(User.id).filter(User.is_active == True)
+                    .execution_options(stream_results=True).yield_per(batch_size)]
+        rows = db.session.query(QualificationAnswer.user_id, QualificationAnswer.question_id,
+                                QualificationAnswer.value)\
+                         .execution_options(stream_results=True)\
+                         .yield_per(batch_size)
+        self.load(user_ids, rows)
+
+    def load(self, user_ids: Iterable[int], rows: Iterable):
+        """Bulk load from (user_id, question_id, JSON value) rows - collects id lists, then one bitmap each"""
+        postings, numbers, number_values, answered = {}, {}, {}, {}
+        for user_id, field, raw in rows:
+            try:
+                value = json.loads(raw) if raw is not None else None
+            except ValueError:
+                continue
+            answered.setdefault(field, []).append(user_id)
+            for key in self._keys(value):
+                postings.setdefault(field, {}).setdefault(key, []).append(user_id)
+            if _is_range_number(value):
+                entry = numbers.setdefault(field, {}).setdefault(number_bucket(value), [[], value, value])
+                entry[0].append(user_id)
+                entry[1], entry[2] = min(entry[1], value), max(entry[2], value)
+                number_values.setdefault(field, {})[user_id] = value
+
+        with self._lock:
+            self.users = bitmap_from_ids(user_ids)
+            self.answered = {field: bitmap_from_ids(ids) for field, ids in answered.items()}
+            self.postings = {field: {key: bitmap_from_ids(ids) for key, ids in values.items()}
+                             for field, values in postings.items()}
+            self.numbers = {field: {bucket: [bitmap_from_ids(ids), lowest, highest]
+                                    for bucket, (ids, lowest, highest) in buckets.items()}
+                            for field, buckets in numbers.items()}
+            self.number_values = number_values
+            self._surveys = {}
+
+    @staticmethod
+    def _keys(value: Any) -> List[str]:
+        if value is None:
+            return []
+        if isinstance(value, list):
+            return [value_key(item) for item in value if item is not None]
+        return [value_key(value)]
+
+    def update_user(self, user_id: int, old_answers: Dict[str, Any], new_answers: Dict[str, Any]):
+        """Apply a user's changed answers (full before/after dicts) and refresh survey bits"""
+        bit = 1 << user_id
+        with self._lock:
+            self.users |= bit
+            for field in set(old_answers) | set(new_answers):
+                old = old_answers.get(field)
+                new = new_answers.get(field)
+                if field in old_answers and field in new_answers and old == new:
+                    continue
+                if field in old_answers:
+                    self._unpost(field, old, user_id)
+                if field in new_answers:
+                    self._post(field, new, user_id)
+
+            # Cached survey bitmaps: re-evaluate just this user with the compiled predicates
+            for survey_id, (criteria_key, bitmap) in self._surveys.items():
+                if compile_criteria(criteria_key)(new_answers):
+                    bitmap |= bit
+                else:
+                    bitmap &= ~bit
+                self._surveys[survey_id] = (criteria_key, bitmap)
+
+    def _post(self, field: str, value: Any, user_id: int):
+        bit = 1 << user_id
+        self.answered[field] = self.answered.get(field, 0) | bit
+        values = self.postings.setdefault(field, {})
+        for key in self._keys(value):
+            values[key] = values.get(key, 0) | bit
+        if _is_range_number(value):
+            # Bounds only ever widen: a stale bound costs an exact check, never a wrong answer
+            buckets = self.numbers.setdefault(field, {})
+            entry = buckets.get(number_bucket(value))
+            if entry is None:
+                buckets[number_bucket(value)] = [bit, value, value]
+            else:
+                entry[0] |= bit
+                entry[1], entry[2] = min(entry[1], value), max(entry[2], value)
+            self.number_values.setdefault(field, {})[user_id] = value
+
+    def _unpost(self, field: str, value: Any, user_id: int):
+        mask = ~(1 << user_id)
+        self.answered[field] = self.answered.get(field, 0) & mask
+        values = self.postings.get(field, {})
+        for key in self._keys(value):
+            if key in values:
+                values[key] &= mask
+                if not values[key]:
+                    del values[key]
+        if _is_range_number(value):
+            buckets = self.numbers.get(field, {})
+            bucket = number_bucket(value)
+            if bucket in buckets:
+                buckets[bucket][0] &= mask
+                if not buckets[bucket][0]:
+                    del buckets[bucket]
+            self.number_values.get(field, {}).pop(user_id, None)
+
+    def add_user(self, user_id: int):
+        """Make a user without answers known to the index (new registration) - no-op if known"""
+        with self._lock:
+            if not self.users >> user_id & 1:
+                self.update_user(user_id, {}, {})
+
+    def remove_user(self, user_id: int, answers: Dict[str, Any]):
+        """Drop a user (e.g. account deletion) from all postings and survey bitmaps"""
+        bit = 1 << user_id
+        with self._lock:
+            for field, value in answers.items():
+                self._unpost(field, value, user_id)
+            self.users &= ~bit
+            for survey_id, (criteria_key, bitmap) in self._surveys.items():
+                self._surveys[survey_id] = (criteria_key, bitmap & ~bit)
+
+    # =========================
+    # QUERIES
+    # =========================
+
+    def eligible_users(self, survey_id: int, criteria_json: Optional[str]) -> int:
+        """Bitmap of users qualifying for a survey (cached until its criteria change)"""
+        criteria_key = criteria_json or '{}'
+        with self._lock:
+            cached = self._surveys.get(survey_id)
+            if cached is not None and cached[0] == criteria_key:
+                return cached[1]
+            bitmap = self.evaluate(json.loads(criteria_key))
+            self._surveys[survey_id] = (criteria_key, bitmap)
+            return bitmap
+
+    def eligible_surveys(self, user_id: int, criteria_by_survey: Dict[int, Optional[str]]) -> List[int]:
+        """Survey ids whose eligible bitmap contains the user (unknown users have no answers yet)"""
+        bit = 1 << user_id
+        self.add_user(user_id)
+        return [survey_id for survey_id, criteria_json in criteria_by_survey.items()
+                if self.eligible_users(survey_id, criteria_json) & bit]
+
+    def evaluate(self, criteria: Dict[str, Any]) -> int:
+        """Evaluate criteria as bitmap operations - mirrors qualification.compile_criteria"""
+        with self._lock:
+            result = self.users
+            for question in criteria.get('questions', []):
+                if question.get('required_answer') is None:
+                    result &= self.answered.get(question['id'], 0)
+                else:
+                    result &= self._eq(question['id'], question['required_answer'])
+            for field, constraint in criteria.get('demographics', {}).items():
+                if isinstance(constraint, dict):
+                    rule = dict(constraint, field=field)
+                elif isinstance(constraint, list):
+                    rule = {'field': field, 'in': constraint}
+                else:
+                    rule = {'field': field, 'eq': constraint}
+                # Unknown profile attributes do not disqualify
+                unknown = self.users & ~self.answered.get(field, 0)
+                result &= unknown | self._rule(rule)
+            for rule in criteria.get('rules', []):
+                result &= self._rule(rule)
+            return result
+
+    def _rule(self, rule: Dict[str, Any]) -> int:
+        if 'all' in rule:
+            result = self.users
+            for child in rule['all']:
+                result &= self._rule(child)
+            return result
+        if 'any' in rule:
+            result = 0
+            for child in rule['any']:
+                result |= self._rule(child)
+            return result
+        if 'not' in rule:
+            return self.users & ~self._rule(rule['not'])
+
+        field = rule['field']
+        result = self.answered.get(field, 0)
+        if 'eq' in rule:
+            result &= self._eq(field, rule['eq'])
+        if 'ne' in rule:
+            result &= ~self._eq(field, rule['ne'])
+        if 'in' in rule:
+            result &= self._any_of(field, rule['in'])
+        if 'not_in' in rule:
+            result &= ~self._any_of(field, rule['not_in'])
+        if 'min' in rule or 'max' in rule:
+            result &= self._range(field, rule.get('min'), rule.get('max'))
+        return result
+
+    def _range(self, field: str, minimum: Any, maximum: Any) -> int:
+        """Users whose numeric answer lies in [minimum, maximum] - whole buckets, exact checks at the edges"""
+        def inside(number):
+            return (minimum is None or number >= minimum) and (maximum is None or number <= maximum)
+
+        values = self.number_values.get(field, {})
+        result = 0
+        for bitmap, lowest, highest in self.numbers.get(field, {}).values():
+            if inside(lowest) and inside(highest):
+                result |= bitmap
+            elif (minimum is None or highest >= minimum) and (maximum is None or lowest <= maximum):
+                result |= bitmap_from_ids(user_id for user_id in iter_ids(bitmap) if inside(values[user_id]))
+        return result
+
+    def _eq(self, field: str, expected: Any) -> int:
+        if isinstance(expected, list):
+            # Whole-list equality is not indexed - require every element instead
+            result = self.answered.get(field, 0)
+            for item in expected:
+                result &= self.postings.get(field, {}).get(value_key(item), 0)
+            return result
+        return self.postings.get(field, {}).get(value_key(expected), 0)
+
+    def _any_of(self, field: str, values: Iterable[Any]) -> int:
+        postings = self.postings.get(field, {})
+        result = 0
+        for value in values:
+            result |= postings.get(value_key(value), 0)
+        return result
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_eligibility_index() -> EligibilityIndex:
+    """Process-wide index, built from the database on first use (needs an app context)"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = EligibilityIndex()
+                index.build()
+                _index = index
+    return _index
+
+
+def load_user_answers(user_id: int) -> Dict[str, Any]:
+    """All qualification answers of one user as {question_id: value}"""
+    return {row.question_id: row.parsed_value
+            for row in QualificationAnswer.query.filter_by(user_id=user_id).all()}
+
+
+def save_user_answers(user_id: int, answers: Dict[str, Any]) -> Dict[str, Any]:
+    """Upsert answers, commit and update the index incrementally - returns the full answer set"""
+    rows = {row.question_id: row for row in QualificationAnswer.query.filter_by(user_id=user_id).all()}
+    old_answers = {question_id: row.parsed_value for question_id, row in rows.items()}
+
+    for question_id, value in answers.items():
+        question_id = str(question_id)[:50]
+        row = rows.get(question_id)
+        if row is None:
+            row = QualificationAnswer(user_id=user_id, question_id=question_id)
+            db.session.add(row)
+            rows[question_id] = row
+        row.value = json.dumps(value)
+    db.session.commit()
+
+    new_answers = {question_id: row.parsed_value for question_id, row in rows.items()}
+    if _index is not None:
+        _index.update_user(user_id, old_answers, new_answers)
+    return new_answers
+
+
+def register_user(user_id: int):
+    """Add a newly registered user to the index (no-op while the index has not been built)"""
+    if _index is not None:
+        _index.add_user(user_id)
+
+
+def forget_user(user_id: int):
+    """Remove a user from the index (no-op while the index has not been built)"""
+    if _index is not None:
+        _index.remove_user(user_id, load_user_answers(user_id))
@@ -0,0 +1,83 @@
+# backend/app/utils/http_cache.py
+"""
+HTTP Caching for DataFair Survey System
+Bedingte Anfragen (ETag / Last-Modified -> 304) und Cache-Control für öffentliche Antworten
+
+A survey's validators are derived from Survey.updated_at, which every change of the row
+bumps (ORM flushes and the counter UPDATEs of slots, reservations and ingestion alike).
+The catalog's are derived from Survey.content_updated_at, which only changes with the
+columns the catalog page shows (models.CATALOG_FIELDS); its volatile counters are served
+by the uncached overlay instead, so starts and submits do not invalidate shared caches.
+Both are computed from one indexed lookup before the payload is built, so a revalidation
+costs no JSON work. Public responses must not depend on the user - per-user data goes
+into a separate private overlay call.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import Response, current_app, request
+from sqlalchemy import func, select
+
+from ..database import db
+from ..models import Survey
+
+
+def _http_date(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC timestamp -> aware, truncated to the one-second resolution of HTTP dates"""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def survey_validators(survey_id: int):
+    """(etag, last_modified) of one survey's public data, or None if it is missing/inactive"""
+    row = db.session.query(Survey.updated_at, Survey.created_at, Survey.current_version_id)\
+                    .filter(Survey.id == survey_id, Survey.is_active == True).first()
+    if row is None:
+        return None
+    modified = row.updated_at or row.created_at
+    stamp = modified.strftime('%Y%m%d%H%M%S%f') if modified else '0'
+    return f'survey-{survey_id}-{row.current_version_id or 0}-{stamp}', modified
+
+
+def catalog_validators():
+    """(etag, last_modified) of the whole catalog - new surveys and content changes produce a new tag"""
+    # Two scalar subqueries: SQLite answers a lone max() from the index end, max(a), max(b) scans
+    last_id, modified = db.session.query(select(func.max(Survey.id)).scalar_subquery(),
+                                         select(func.max(Survey.content_updated_at)).scalar_subquery()).one()
+    stamp = modified.strftime('%Y%m%d%H%M%S%f') if modified else '0'
+    return f'catalog-{last_id or 0}-{stamp}', modified
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    """Does the client's copy still match? If-None-Match wins over If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    modified = _http_date(last_modified)
+    return since is not None and modified is not None and modified <= since
+
+
+def cacheable(response: Response, etag: str, last_modified: Optional[datetime],
+              max_age: Optional[int] = None) -> Response:
+    """Weak ETag, Last-Modified and public Cache-Control for a shared cache"""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = _http_date(last_modified)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('HTTP_CACHE_MAX_AGE', 30) if max_age is None else max_age
+    return response
+
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    """Empty 304 carrying the same validators and caching headers"""
+    return cacheable(Response(status=304), etag, last_modified)
+
+
+def private(response: Response) -> Response:
+    """Per-user response: browsers may keep it, shared caches must not"""
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
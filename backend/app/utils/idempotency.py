@@ -0,0 +1,137 @@
+# backend/app/utils/idempotency.py
+"""
+Idempotency Keys for DataFair Survey System
+Wiederholte Requests mit gleichem Idempotency-Key liefern die gespeicherte Antwort,
+ohne die Aktion (Abgabe, Auszahlung, Bonus) erneut auszuführen
+
+The first request inserts an 'in_progress' row - the unique constraint on
+(user_id, scope, key) is the lock. Duplicates arriving while it runs wait for the
+stored response instead of executing. Only successful (2xx) responses are stored;
+on errors the row is released so a retry executes again. Rows expire after
+IDEMPOTENCY_KEY_TTL_HOURS and are purged in small batches on insert.
+"""
+
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, current_app, jsonify, make_response, request
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+
+from ..database import db
+from ..models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+def idempotent(view):
+    """Route decorator (below @login_required) - requests without the header run as before"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.headers.get(IDEMPOTENCY_HEADER) or '').strip()
+        if not key or not current_user.is_authenticated:
+            return view(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} must be at most 255 characters'}), 400
+
+        record_id, stored = _begin(current_user.id, request.endpoint, key, _request_hash())
+        if stored is not None:
+            return stored
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            _release(record_id)
+            raise
+        _finish(record_id, response)
+        return response
+    return wrapper
+
+
+def _request_hash() -> str:
+    """Fingerprint of the request - a key reused for a different request is rejected"""
+    body = request.get_json(silent=True)
+    payload = json.dumps(body, sort_keys=True) if body is not None else request.get_data(as_text=True)
+    return hashlib.sha256(f'{request.method} {request.path} {payload}'.encode('utf-8')).hexdigest()
+
+
+def _begin(user_id: int, scope: str, key: str, request_hash: str):
+    """Claim the key -> (record id, None), or (None, response to return instead of executing)"""
+    config = current_app.config
+    deadline = time.monotonic() + config.get('IDEMPOTENCY_WAIT_SECONDS', 10)
+    stale_after = timedelta(seconds=config.get('IDEMPOTENCY_LOCK_SECONDS', 300))
+
+    while True:
+        now = datetime.utcnow()
+        _purge_expired(now, user_id, scope, key)
+        record = IdempotencyKey(
+            user_id=user_id, scope=scope, key=key, request_hash=request_hash, status='in_progress',
+            created_at=now, expires_at=now + timedelta(hours=config.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+        )
+        db.session.add(record)
+        try:
+            db.session.commit()
+            return record.id, None
+        except IntegrityError:
+            db.session.rollback()
+
+        # Someone else holds the key - wait for its outcome
+        while True:
+            existing = IdempotencyKey.query.filter_by(user_id=user_id, scope=scope, key=key).first()
+            if existing is None:
+                break  # released after an error - claim again
+            if existing.request_hash != request_hash:
+                return None, (jsonify({'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'}), 422)
+            if existing.status == 'completed':
+                return None, _replay(existing)
+            if existing.created_at < datetime.utcnow() - stale_after:
+                # The process handling it died - take the key over
+                db.session.delete(existing)
+                db.session.commit()
+                break
+            if time.monotonic() >= deadline:
+                return None, (jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409)
+            db.session.rollback()  # end the read transaction so the next poll sees new commits
+            time.sleep(0.05)
+
+
+def _purge_expired(now: datetime, user_id: int, scope: str, key: str):
+    """Drop this key if it expired plus a bounded batch of other expired keys"""
+    IdempotencyKey.query.filter(
+        IdempotencyKey.user_id == user_id, IdempotencyKey.scope == scope, IdempotencyKey.key == key,
+        IdempotencyKey.expires_at <= now
+    ).delete(synchronize_session=False)
+
+    batch = db.session.query(IdempotencyKey.id).filter(IdempotencyKey.expires_at <= now)\
+                      .limit(current_app.config.get('IDEMPOTENCY_PURGE_BATCH', 100))
+    IdempotencyKey.query.filter(IdempotencyKey.id.in_(batch)).delete(synchronize_session=False)
+
+
+def _replay(record: IdempotencyKey) -> Response:
+    response = Response(record.response_body, status=record.response_status, mimetype='application/json')
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _finish(record_id: int, response: Response):
+    """Store a successful response; release the key otherwise so the client can retry"""
+    if not 200 <= response.status_code < 300:
+        _release(record_id)
+        return
+    record = db.session.get(IdempotencyKey, record_id)
+    if record is None:
+        return
+    record.status = 'completed'
+    record.response_status = response.status_code
+    record.response_body = response.get_data(as_text=True)
+    db.session.commit()
+
+
+def _release(record_id: int):
+    db.session.rollback()
+    IdempotencyKey.query.filter_by(id=record_id).delete(synchronize_session=False)
+    db.session.commit()
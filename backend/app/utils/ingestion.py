@@ -0,0 +1,438 @@
+# backend/app/utils/ingestion.py
+"""
+Write-Behind Ingestion for DataFair Survey System
+Optionaler Modus (INGESTION_MODE = 'queue'): Abgaben werden synchron geprüft, sofort
+bestätigt und in eine dauerhafte lokale Queue geschrieben; ein Writer-Thread übernimmt
+sie gebündelt in Transaktionen zu je INGESTION_BATCH_SIZE Antworten
+
+The queue is a separate SQLite file (WAL, synchronous=FULL), so an acknowledged
+submission survives a crash and appending never waits for the main database's write
+lock. Capacity and quota checks count queued-but-unapplied submissions as reserved;
+these reservations live in process memory, so queue mode assumes a single app process.
+A submission whose response holds a slot lease (reservations.py) needs no capacity check;
+its lease is converted when the batch is applied.
+Applying is idempotent - a response that is already completed is skipped - so a crash
+between the main commit and the queue acknowledgement cannot double count.
+A failing batch is retried one submission at a time; a submission that still fails is
+moved to the queue's dead_letters table (with its error) so it cannot stall the queue.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import bindparam, case
+
+from ..database import db
+from ..models import Survey, SurveyResponse, SurveyQuota, Earning
+from .answer_store import store_answers_bulk
+from .autosave import clear_drafts
+from .completion_times import record_completion
+from .quotas import matching_quotas, segment_answers
+from .reservations import convert_reservations, holds_reservation
+from .recommendations import survey_changed
+from .response_analytics import record_responses
+
+
+class IngestionQueue:
+    """Durable FIFO of submissions in a local SQLite file"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS submissions ('
+                           'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                           'response_id INTEGER NOT NULL UNIQUE, '
+                           'payload TEXT NOT NULL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS dead_letters ('
+                           'id INTEGER PRIMARY KEY, '
+                           'response_id INTEGER NOT NULL, '
+                           'payload TEXT NOT NULL, '
+                           'error TEXT, '
+                           'failed_at TEXT NOT NULL)')
+        self._conn.commit()
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """Persist one submission - False if this response is already queued"""
+        with self._lock:
+            try:
+                self._conn.execute('INSERT INTO submissions (response_id, payload) VALUES (?, ?)',
+                                   (record['response_id'], json.dumps(record, default=str)))
+                self._conn.commit()
+                return True
+            except sqlite3.IntegrityError:
+                self._conn.rollback()
+                return False
+
+    def peek(self, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """Oldest submissions, not removed until ack()"""
+        with self._lock:
+            rows = self._conn.execute('SELECT id, payload FROM submissions ORDER BY id LIMIT ?', (limit,)).fetchall()
+        return [(queue_id, json.loads(payload)) for queue_id, payload in rows]
+
+    def ack(self, queue_ids: List[int]):
+        with self._lock:
+            self._conn.executemany('DELETE FROM submissions WHERE id = ?', [(queue_id,) for queue_id in queue_ids])
+            self._conn.commit()
+
+    def dead_letter(self, queue_id: int, record: Dict[str, Any], error: str):
+        """Move a submission that cannot be applied out of the queue (one transaction)"""
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO dead_letters (id, response_id, payload, error, failed_at) '
+                               'VALUES (?, ?, ?, ?, ?)',
+                               (queue_id, record['response_id'], json.dumps(record, default=str),
+                                error[:1000], datetime.utcnow().isoformat()))
+            self._conn.execute('DELETE FROM submissions WHERE id = ?', (queue_id,))
+            self._conn.commit()
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent dead-lettered submissions for inspection"""
+        with self._lock:
+            rows = self._conn.execute('SELECT id, response_id, error, failed_at FROM dead_letters '
+                                      'ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [{'queue_id': queue_id, 'response_id': response_id, 'error': error, 'failed_at': failed_at}
+                for queue_id, response_id, error, failed_at in rows]
+
+    def dead_letter_size(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM dead_letters').fetchone()[0]
+
+    def contains(self, response_id: int) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM submissions WHERE response_id = ?',
+                                      (response_id,)).fetchone() is not None
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM submissions').fetchone()[0]
+
+
+class IngestionMetrics:
+    """Counters of the ingestion writer since process start (thread-safe snapshot for /health)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.applied = 0
+        self.failed_batches = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.last_error = None
+
+    def record_batch(self, applied: int):
+        with self._lock:
+            self.batches += 1
+            self.applied += applied
+
+    def record_failed_batch(self, size: int, error: str):
+        with self._lock:
+            self.failed_batches += 1
+            self.retried += size
+            self.last_error = error
+
+    def record_dead_letter(self, error: str):
+        with self._lock:
+            self.dead_lettered += 1
+            self.last_error = error
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'applied_submissions': self.applied,
+                'failed_batches': self.failed_batches,
+                'retried_submissions': self.retried,
+                'dead_lettered': self.dead_lettered,
+                'last_error': self.last_error
+            }
+
+
+metrics = IngestionMetrics()
+
+
+class IngestionService:
+    """Validates and enqueues submissions; a writer thread applies them in batches"""
+
+    def __init__(self, app, queue: IngestionQueue):
+        self.app = app
+        self.queue = queue
+        self.batch_size = app.config.get('INGESTION_BATCH_SIZE', 500)
+        self.flush_interval = app.config.get('INGESTION_FLUSH_INTERVAL', 0.2)
+        self._lock = threading.Lock()        # reservations + main-DB commits of the writer
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._thread = None
+        # Reservations of queued submissions (recovered from the queue on start)
+        self.pending_surveys = Counter()
+        self.pending_quotas = Counter()
+        for _, record in queue.peek(queue.size() or 1):
+            self._reserve(record, 1)
+
+    def _reserve(self, record: Dict[str, Any], sign: int):
+        if not record.get('leased'):
+            self.pending_surveys[record['survey_id']] += sign
+        for quota_id in record.get('quota_ids', []):
+            self.pending_quotas[quota_id] += sign
+
+    # =========================
+    # REQUEST SIDE
+    # =========================
+
+    def submit(self, survey: Survey, survey_response: SurveyResponse, answers: Dict[str, Any],
+               quality: Tuple[Optional[float], Optional[str]] = (None, None)) -> Optional[str]:
+        """
+        Check capacity and quotas against committed counters plus queued submissions,
+        then persist the submission. Returns an error message or None when accepted.
+        quality is the (quality_score, quality_flags) pair stored with the response.
+        """
+        quotas = SurveyQuota.query.filter_by(survey_id=survey.id).all()
+        matching = matching_quotas(quotas, segment_answers(survey_response.user_id, answers)) if quotas else []
+        record = {
+            'response_id': survey_response.id,
+            'survey_id': survey.id,
+            'user_id': survey_response.user_id,
+            'responses': answers,
+            'started_at': survey_response.started_at.isoformat() if survey_response.started_at else None,
+            'completed_at': datetime.utcnow().isoformat(),
+            'quota_ids': [quota.id for quota in matching],
+            'leased': holds_reservation(survey_response.id),
+            'quality_score': quality[0],
+            'quality_flags': quality[1]
+        }
+
+        with self._lock:
+            if not record['leased']:
+                total, reserved = db.session.query(Survey.total_responses, Survey.reserved_slots)\
+                                            .filter(Survey.id == survey.id).one()
+                if (total or 0) + (reserved or 0) + self.pending_surveys[survey.id] >= survey.max_responses:
+                    return 'Survey has reached maximum responses'
+            counts = dict(db.session.query(SurveyQuota.id, SurveyQuota.current_count)
+                            .filter(SurveyQuota.id.in_(record['quota_ids']))) if matching else {}
+            for quota in matching:
+                if counts.get(quota.id, 0) + self.pending_quotas[quota.id] >= quota.max_responses:
+                    return f'Quota for your segment is full: {quota.segment}'
+            if not self.queue.append(record):
+                return 'Survey already submitted'
+            self._reserve(record, 1)
+            self._idle.clear()
+
+        if self.pending_surveys.total() >= self.batch_size:
+            self._wakeup.set()
+        self.start()
+        return None
+
+    # =========================
+    # WRITER SIDE
+    # =========================
+
+    def start(self):
+        """Start the writer thread once"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='ingestion-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    while self.flush_once():
+                        pass
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Ingestion writer error: {str(e)}")
+                finally:
+                    db.session.remove()
+            if not self.queue.size():
+                self._idle.set()
+
+    def flush_once(self) -> int:
+        """
+        Apply the next batch (needs an app context) - returns the number of queue entries handled.
+        If the batch fails, its submissions are retried one by one and the ones that still fail
+        are dead-lettered, so a single bad submission never blocks the queue.
+        """
+        batch = self.queue.peek(self.batch_size)
+        if not batch:
+            return 0
+
+        try:
+            surveys, applied = self.apply_batch([record for _, record in batch])
+            self.queue.ack([queue_id for queue_id, _ in batch])
+        except Exception as e:
+            db.session.rollback()
+            metrics.record_failed_batch(len(batch), str(e))
+            print(f"Ingestion batch error, retrying {len(batch)} submissions one by one: {str(e)}")
+            surveys, applied = self._apply_one_by_one(batch)
+        metrics.record_batch(len(applied))
+
+        # Side effects outside the transaction, once the submissions are out of the queue
+        for survey in surveys:
+            db.session.refresh(survey)
+            survey_changed(survey)
+        for record in applied:
+            if record.get('started_at'):
+                record_completion(record['survey_id'], datetime.fromisoformat(record['started_at']),
+                                  datetime.fromisoformat(record['completed_at']))
+        return len(batch)
+
+    def _apply_one_by_one(self, batch: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Survey], List[Dict[str, Any]]]:
+        surveys, applied = {}, []
+        for queue_id, record in batch:
+            try:
+                record_surveys, record_applied = self.apply_batch([record])
+            except Exception as e:
+                db.session.rollback()
+                # Leave the queue and release the reservation together, like a commit does
+                with self._lock:
+                    self.queue.dead_letter(queue_id, record, str(e))
+                    self._reserve(record, -1)
+                metrics.record_dead_letter(str(e))
+                print(f"Ingestion dead-lettered response {record['response_id']}: {str(e)}")
+                continue
+            self.queue.ack([queue_id])
+            surveys.update((survey.id, survey) for survey in record_surveys)
+            applied.extend(record_applied)
+        return list(surveys.values()), applied
+
+    def apply_batch(self, records: List[Dict[str, Any]]) -> Tuple[List[Survey], List[Dict[str, Any]]]:
+        """
+        One transaction for the whole batch: responses, counters, quotas, aggregates, answers, earnings
+        -> (surveys touched, records applied); already completed responses are skipped
+        """
+        response_ids = [record['response_id'] for record in records]
+        still_open = dict(db.session.query(SurveyResponse.id, SurveyResponse.survey_version_id).filter(
+            SurveyResponse.id.in_(response_ids), SurveyResponse.is_completed == False))
+        applied = [record for record in records if record['response_id'] in still_open]
+
+        surveys = {}
+        if applied:
+            surveys = {survey.id: survey for survey in
+                       Survey.query.filter(Survey.id.in_({record['survey_id'] for record in applied})).all()}
+
+            response_table = SurveyResponse.__table__
+            db.session.execute(
+                response_table.update().where(response_table.c.id == bindparam('b_id'))
+                .values(responses=bindparam('b_responses'), completed_at=bindparam('b_completed_at'),
+                        is_completed=True, updated_at=bindparam('b_completed_at'),
+                        quality_score=bindparam('b_quality_score'), quality_flags=bindparam('b_quality_flags')),
+                [{'b_id': record['response_id'], 'b_responses': json.dumps(record['responses']),
+                  'b_completed_at': datetime.fromisoformat(record['completed_at']),
+                  'b_quality_score': record.get('quality_score'), 'b_quality_flags': record.get('quality_flags')}
+                 for record in applied]
+            )
+
+            survey_counts = Counter(record['survey_id'] for record in applied)
+            converted = convert_reservations(record['response_id'] for record in applied)
+            survey_table = Survey.__table__
+            db.session.execute(
+                survey_table.update().where(survey_table.c.id == bindparam('b_id'))
+                .values(total_responses=survey_table.c.total_responses + bindparam('b_count'),
+                        reserved_slots=survey_table.c.reserved_slots - bindparam('b_converted')),
+                [{'b_id': survey_id, 'b_count': count, 'b_converted': converted.get(survey_id, 0)}
+                 for survey_id, count in survey_counts.items()]
+            )
+
+            quota_counts = Counter(quota_id for record in applied for quota_id in record.get('quota_ids', []))
+            if quota_counts:
+                quota_table = SurveyQuota.__table__
+                new_count = quota_table.c.current_count + bindparam('b_count')
+                db.session.execute(
+                    quota_table.update().where(quota_table.c.id == bindparam('b_id'))
+                    .values(current_count=new_count,
+                            is_full=case((new_count >= quota_table.c.max_responses, True), else_=False)),
+                    [{'b_id': quota_id, 'b_count': count} for quota_id, count in quota_counts.items()]
+                )
+
+            for survey_id, survey in surveys.items():
+                record_responses(survey, [(still_open[record['response_id']], record['responses'])
+                                          for record in applied if record['survey_id'] == survey_id])
+            store_answers_bulk([(record['survey_id'], record['response_id'], record['responses'])
+                                for record in applied])
+            clear_drafts([record['response_id'] for record in applied])
+
+            db.session.execute(Earning.__table__.insert(), [
+                survey_earning_row(surveys[record['survey_id']], record['response_id'], record['user_id'],
+                                   datetime.fromisoformat(record['completed_at']))
+                for record in applied if record['survey_id'] in surveys
+            ])
+
+        # Commit and release the reservations together - capacity checks never see both or neither
+        with self._lock:
+            db.session.commit()
+            for record in records:
+                self._reserve(record, -1)
+        return list(surveys.values()), applied
+
+    def drain(self, timeout: float = 60) -> bool:
+        """Wait until every queued submission is applied"""
+        deadline = time.monotonic() + timeout
+        self.start()
+        while self.queue.size():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._wakeup.set()
+            self._idle.wait(min(remaining, self.flush_interval))
+        return True
+
+
+def survey_earning_row(survey: Survey, response_id: int, user_id: int, earned_at: datetime) -> Dict[str, Any]:
+    """Earning booked for a completed survey response (column dict for bulk inserts)"""
+    return {
+        'user_id': user_id,
+        'survey_response_id': response_id,
+        'amount': survey.reward_amount or 0,
+        'source_type': 'survey',
+        'description': f'Umfrage abgeschlossen: {survey.title}'[:200],
+        'status': 'earned',
+        'earned_at': earned_at
+    }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def queue_mode_enabled() -> bool:
+    return current_app.config.get('INGESTION_MODE', 'sync') == 'queue'
+
+
+def get_ingestion_service() -> IngestionService:
+    """Process-wide ingestion service (opens the queue and recovers reservations on first use)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                app = current_app._get_current_object()
+                _service = IngestionService(app, IngestionQueue(app.config['INGESTION_QUEUE_PATH']))
+    return _service
+
+
+def ingestion_status() -> Dict[str, Any]:
+    """Writer metrics plus queue and dead-letter sizes (sizes only once the queue is open)"""
+    status = metrics.snapshot()
+    if _service is not None:
+        status['queued'] = _service.queue.size()
+        status['dead_letters'] = _service.queue.dead_letter_size()
+    return status
+
+
+def start_ingestion_writer(app):
+    """Call at startup in queue mode - applies submissions left in the queue by a previous run"""
+    with app.app_context():
+        get_ingestion_service().start()
@@ -0,0 +1,76 @@
+# backend/app/utils/jobs.py
+"""
+Background Jobs for DataFair Survey System
+Führt langlaufende Aufgaben in einem eigenen Thread aus und speichert den Fortschritt
+"""
+
+import json
+import secrets
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from flask import current_app
+
+from ..database import db
+from ..models import BackgroundJob
+
+
+def start_background_job(job_type: str, target: Callable[..., None], user_id: int = None,
+                         status_token: bool = False, **kwargs) -> BackgroundJob:
+    """
+    Create a job record and run ``target(job, **kwargs)`` in a daemon thread.
+    status_token=True gives the job a random token for status lookups without a login.
+    """
+    job = BackgroundJob(job_type=job_type, user_id=user_id, status='pending',
+                        status_token=secrets.token_urlsafe(32) if status_token else None)
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    thread = threading.Thread(
+        target=_run_job,
+        args=(app, job.id, target, kwargs),
+        name=f'{job_type}-{job.id}',
+        daemon=True
+    )
+    thread.start()
+
+    return job
+
+
+def _run_job(app, job_id: int, target: Callable[..., None], kwargs: Dict[str, Any]):
+    """Thread entry point - runs the job inside its own app context and session"""
+    with app.app_context():
+        try:
+            job = db.session.get(BackgroundJob, job_id)
+            job.status = 'running'
+            job.started_at = datetime.utcnow()
+            db.session.commit()
+
+            target(job, **kwargs)
+
+            job.status = 'completed'
+            job.completed_at = datetime.utcnow()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Background job {job_id} failed: {str(e)}")
+            job = db.session.get(BackgroundJob, job_id)
+            if job:
+                job.status = 'failed'
+                job.error_message = str(e)
+                job.completed_at = datetime.utcnow()
+                db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def update_job_progress(job: BackgroundJob, processed: int = 0, step: str = None):
+    """Add processed items to the job (and a per-step counter) without committing"""
+    job.processed_items = (job.processed_items or 0) + processed
+
+    if step:
+        details = json.loads(job.progress_data) if job.progress_data else {}
+        details[step] = details.get(step, 0) + processed
+        job.progress_data = json.dumps(details)
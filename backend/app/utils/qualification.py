@@ -0,0 +1,229 @@
+# backend/app/utils/qualification.py
+"""
+Qualification Criteria Compiler for DataFair Survey System
+Übersetzt Qualifikationskriterien einmalig in wiederverwendbare Prädikate (gecacht)
+
+Supported criteria:
+    {
+        'questions': [{'id': 'tech_interest', 'required_answer': True, 'disqualify_reason': '...'}],
+        'demographics': {'age': {'min': 18, 'max': 65}, 'location': ['Germany', 'Austria']},
+        'rules': [
+            {'field': 'income', 'min': 2000},
+            {'field': 'country', 'in': ['DE', 'AT']},
+            {'any': [{'field': 'pets', 'eq': 'dog'}, {'field': 'pets', 'eq': 'cat'}]},
+            {'not': {'field': 'job', 'eq': 'market_research'}, 'reason': '...'}
+        ]
+    }
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Union
+
+DEFAULT_REASON = 'Qualifikationskriterien nicht erfüllt'
+MISSING_REASON = 'Nicht alle Qualifikationsfragen beantwortet'
+QUALIFIED_REASON = 'Alle Qualifikationskriterien erfüllt'
+NO_CRITERIA_REASON = 'Keine Qualifikationskriterien erforderlich'
+
+_MISSING = object()
+
+# A predicate returns None when the answers pass, otherwise the disqualification reason
+Predicate = Callable[[Dict[str, Any]], Optional[str]]
+
+
+class CompiledCriteria:
+    """Reusable predicate for one set of qualification criteria"""
+
+    __slots__ = ('predicate', 'is_empty')
+
+    def __init__(self, predicate: Predicate, is_empty: bool = False):
+        self.predicate = predicate
+        self.is_empty = is_empty
+
+    def __call__(self, answers: Dict[str, Any]) -> bool:
+        return self.predicate(answers) is None
+
+    def check(self, answers: Dict[str, Any]) -> Dict[str, Any]:
+        """Same result format as SurveyEngine.check_qualification"""
+        if self.is_empty:
+            return {'qualified': True, 'reason': NO_CRITERIA_REASON}
+        reason = self.predicate(answers)
+        if reason is None:
+            return {'qualified': True, 'reason': QUALIFIED_REASON}
+        return {'qualified': False, 'reason': reason}
+
+
+def compile_criteria(criteria: Union[Dict[str, Any], str, None]) -> CompiledCriteria:
+    """
+    Compile criteria (dict or stored JSON string) into a predicate.
+    The cache is keyed by the JSON text only: stored strings are used as they are,
+    dicts are serialized canonically, so identical criteria share one instance.
+    """
+    if not criteria:
+        return _compile_cached('{}')
+    if isinstance(criteria, str):
+        return _compile_cached(criteria)
+    return _compile_cached(json.dumps(criteria, sort_keys=True, default=str))
+
+
+@lru_cache(maxsize=2048)
+def _compile_cached(key: str) -> CompiledCriteria:
+    criteria = json.loads(key)
+    if not criteria:
+        return CompiledCriteria(_always_pass, is_empty=True)
+
+    predicates = []
+    if criteria.get('questions'):
+        predicates.append(_compile_questions(criteria['questions']))
+    for field, constraint in criteria.get('demographics', {}).items():
+        predicates.append(_compile_demographic(field, constraint))
+    for rule in criteria.get('rules', []):
+        predicates.append(_compile_rule(rule))
+
+    return CompiledCriteria(_all_of(predicates))
+
+
+def _always_pass(answers):
+    return None
+
+
+def _all_of(predicates) -> Predicate:
+    if not predicates:
+        return _always_pass
+    if len(predicates) == 1:
+        return predicates[0]
+
+    predicates = tuple(predicates)
+
+    def predicate(answers):
+        for check in predicates:
+            reason = check(answers)
+            if reason is not None:
+                return reason
+        return None
+    return predicate
+
+
+def _compile_questions(questions) -> Predicate:
+    """Legacy screening questions: answer must exist and match required_answer if given"""
+    # Pre-extracted tuples - the hot loop does no dict lookups on the criteria
+    compiled = tuple(
+        (question['id'], question.get('required_answer'),
+         question.get('disqualify_reason', DEFAULT_REASON))
+        for question in questions
+    )
+
+    def predicate(answers):
+        for question_id, required_answer, reason in compiled:
+            value = answers.get(question_id, _MISSING)
+            if value is _MISSING:
+                return MISSING_REASON
+            if required_answer is not None and not matches(value, required_answer):
+                return reason
+        return None
+    return predicate
+
+
+def _compile_demographic(field: str, constraint: Any) -> Predicate:
+    """Profile attribute constraint - unknown attributes do not disqualify"""
+    if isinstance(constraint, dict):
+        rule = dict(constraint, field=field)
+    elif isinstance(constraint, list):
+        rule = {'field': field, 'in': constraint}
+    else:
+        rule = {'field': field, 'eq': constraint}
+    rule.setdefault('reason', DEFAULT_REASON)
+    check = _compile_rule(rule)
+
+    def predicate(answers):
+        if field not in answers:
+            return None
+        return check(answers)
+    return predicate
+
+
+def _compile_rule(rule: Dict[str, Any]) -> Predicate:
+    """Compile equality, membership, range and boolean combination rules"""
+    reason = rule.get('reason', DEFAULT_REASON)
+
+    if 'all' in rule:
+        return _all_of([_compile_rule(child) for child in rule['all']])
+
+    if 'any' in rule:
+        children = tuple(_compile_rule(child) for child in rule['any'])
+
+        def any_predicate(answers):
+            for check in children:
+                if check(answers) is None:
+                    return None
+            return reason
+        return any_predicate
+
+    if 'not' in rule:
+        child = _compile_rule(rule['not'])
+
+        def not_predicate(answers):
+            return reason if child(answers) is None else None
+        return not_predicate
+
+    field = rule['field']
+    checks = []
+    if 'eq' in rule:
+        expected = rule['eq']
+        checks.append(lambda value: matches(value, expected))
+    if 'ne' in rule:
+        unexpected = rule['ne']
+        checks.append(lambda value: not matches(value, unexpected))
+    if 'in' in rule:
+        allowed = _as_set(rule['in'])
+        checks.append(lambda value: _contains(allowed, value))
+    if 'not_in' in rule:
+        excluded = _as_set(rule['not_in'])
+        checks.append(lambda value: not _contains(excluded, value))
+    if 'min' in rule:
+        minimum = rule['min']
+        checks.append(lambda value: _is_number(value) and value >= minimum)
+    if 'max' in rule:
+        maximum = rule['max']
+        checks.append(lambda value: _is_number(value) and value <= maximum)
+    if not checks:
+        raise ValueError(f'Unsupported qualification rule: {rule}')
+    checks = tuple(checks)
+
+    def predicate(answers):
+        value = answers.get(field, _MISSING)
+        if value is _MISSING:
+            return MISSING_REASON
+        for check in checks:
+            if not check(value):
+                return reason
+        return None
+    return predicate
+
+
+def matches(value, expected) -> bool:
+    """Equality - a multiple choice answer matches if the expected option is selected"""
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+def _as_set(values):
+    try:
+        return frozenset(values)
+    except TypeError:
+        return tuple(values)
+
+
+def _contains(allowed, value) -> bool:
+    # Multiple choice answers qualify if any selected option is allowed
+    if isinstance(value, list):
+        return any(_contains(allowed, item) for item in value)
+    try:
+        return value in allowed
+    except TypeError:
+        return False
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,118 @@
+# backend/app/utils/quotas.py
+"""
+Segment Quotas for DataFair Survey System
+Zählt Antworten pro Umfrage-Segment (Altersgruppe, Region, ...) mit atomaren,
+bedingten Inkrementen - jedes Segment schließt unabhängig
+
+Counters are only ever changed with
+    UPDATE ... SET current_count = current_count + 1 WHERE id = ? AND current_count < max_responses
+so concurrent submitters can never push a segment past its cap: the database
+serializes the row update and the loser sees rowcount 0.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, update
+
+from ..database import db
+from ..models import Survey, SurveyQuota
+from .eligibility_index import load_user_answers
+from .qualification import compile_criteria
+
+
+def segment_answers(user_id: int, responses: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Attributes that decide segment membership: profile answers, overridden by survey answers"""
+    answers = load_user_answers(user_id)
+    if isinstance(responses, dict):
+        answers.update(responses)
+    return answers
+
+
+def matching_quotas(quotas: List[SurveyQuota], answers: Dict[str, Any]) -> List[SurveyQuota]:
+    """Quotas whose segment criteria the answers satisfy (compiled predicates are cached)"""
+    return [quota for quota in quotas if compile_criteria(quota.criteria)(answers)]
+
+
+def full_segments(survey_id: int, user_id: int) -> List[str]:
+    """
+    Full segments the user belongs to - for start_survey.
+    One indexed lookup of the survey's full quotas; answers are only loaded if any is full.
+    """
+    full = SurveyQuota.query.filter_by(survey_id=survey_id, is_full=True).all()
+    if not full:
+        return []
+    return [quota.segment for quota in matching_quotas(full, segment_answers(user_id))]
+
+
+def claim_survey_slot(survey_id: int) -> bool:
+    """Atomically count one response against Survey.max_responses, leased slots excluded (caller commits)"""
+    result = db.session.execute(
+        update(Survey)
+        .where(Survey.id == survey_id, Survey.total_responses + Survey.reserved_slots < Survey.max_responses)
+        .values(total_responses=Survey.total_responses + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def claim_quotas(survey_id: int, user_id: int, responses: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Count one response against every segment it falls into (caller commits).
+    Returns the name of a full segment - the caller must roll back - or None on success.
+    """
+    quotas = SurveyQuota.query.filter_by(survey_id=survey_id).all()
+    if not quotas:
+        return None
+
+    for quota in matching_quotas(quotas, segment_answers(user_id, responses)):
+        result = db.session.execute(
+            update(SurveyQuota)
+            .where(SurveyQuota.id == quota.id, SurveyQuota.current_count < SurveyQuota.max_responses)
+            .values(current_count=SurveyQuota.current_count + 1,
+                    is_full=case((SurveyQuota.current_count + 1 >= SurveyQuota.max_responses, True),
+                                 else_=False))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return quota.segment
+    return None
+
+
+def set_quotas(survey_id: int, definitions: List[Dict[str, Any]]) -> List[SurveyQuota]:
+    """
+    Replace a survey's quota definitions (caller commits).
+    Counters of segments that keep their name are preserved.
+    """
+    existing = {quota.segment: quota for quota in SurveyQuota.query.filter_by(survey_id=survey_id).all()}
+    quotas = []
+    for definition in definitions:
+        segment = str(definition.get('segment') or '').strip()[:100]
+        criteria = definition.get('criteria')
+        max_responses = definition.get('max_responses')
+        if not segment or not isinstance(criteria, dict) or not isinstance(max_responses, int) or max_responses < 0:
+            raise ValueError(f'Invalid quota definition: {definition}')
+        criteria_json = json.dumps(criteria, sort_keys=True)
+        try:
+            compile_criteria(criteria_json)  # reject unsupported rules before saving
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f'Invalid quota criteria for {segment}: {e}')
+
+        quota = existing.pop(segment, None)
+        if quota is None:
+            quota = SurveyQuota(survey_id=survey_id, segment=segment, current_count=0)
+            db.session.add(quota)
+        quota.criteria = criteria_json
+        quota.max_responses = max_responses
+        quota.is_full = (quota.current_count or 0) >= max_responses
+        quotas.append(quota)
+
+    for quota in existing.values():
+        db.session.delete(quota)
+    return quotas
+
+
+def quota_status(survey_id: int) -> List[Dict[str, Any]]:
+    """Current counters of all segments of a survey"""
+    return [quota.to_dict() for quota in
+            SurveyQuota.query.filter_by(survey_id=survey_id).order_by(SurveyQuota.segment).all()]
@@ -0,0 +1,284 @@
+# backend/app/utils/recommendations.py
+"""
+Survey Recommendation Service for DataFair Survey System
+Hält pro Nutzer eine vorsortierte Kandidatenliste (erwartete Vergütung pro Minute),
+gefiltert nach Qualifikation, Restkapazität und bereits begonnenen Umfragen
+
+The global ranking of open surveys and the per-user lists are kept sorted by
+(-Survey.reward_per_minute, survey id) and updated incrementally: a survey opening or
+closing touches only the cached lists, starting a survey removes one entry from
+that user's list. Reading the top k is a slice of the user's list.
+
+Those events (survey_changed, survey_started, user_changed and catalog_events.publish)
+are plain function calls within one process, and the service lives in that process's
+memory on top of the eligibility index. It therefore needs a single app process as well:
+a second worker would keep ranking surveys that filled up, closed or changed elsewhere.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from ..database import db
+from ..models import Survey, SurveyResponse
+from .eligibility_index import bitmap_from_ids, get_eligibility_index, iter_ids
+
+
+class SurveyCard:
+    """What the ranking needs to know about one open survey"""
+
+    __slots__ = ('survey_id', 'rank_key', 'remaining', 'criteria', 'ends_at')
+
+    def __init__(self, survey_id, reward_per_minute, remaining, criteria, ends_at):
+        self.survey_id = survey_id
+        self.rank_key = (-(reward_per_minute or 0.0), survey_id)
+        self.remaining = remaining
+        self.criteria = criteria
+        self.ends_at = ends_at
+
+
+class UserCandidates:
+    """Ranked candidate list of one user plus the surveys they already started"""
+
+    __slots__ = ('ranked', 'taken')
+
+    def __init__(self, ranked: List[tuple], taken: set):
+        self.ranked = ranked
+        self.taken = taken
+
+
+class RecommendationService:
+    """Precomputed, incrementally maintained survey recommendations"""
+
+    def __init__(self, max_users: int = 10000):
+        self._lock = threading.RLock()
+        self.max_users = max_users
+        self.cards = {}             # survey_id -> SurveyCard of every open survey
+        self.ranking = []           # sorted rank keys of all open surveys
+        self._pending = []          # heap of (starts_at, survey_id) for surveys not yet started
+        self._users = OrderedDict() # user_id -> UserCandidates (LRU, at most max_users)
+
+    # =========================
+    # SURVEY EVENTS
+    # =========================
+
+    def build(self):
+        """Load all open and upcoming surveys (one query) and drop cached user lists"""
+        now = datetime.utcnow()
+        cards, pending = {}, []
+        for row in db.session.query(Survey.id, Survey.is_active, Survey.reward_per_minute,
+                                    Survey.max_responses, Survey.total_responses, Survey.reserved_slots,
+                                    Survey.qualification_criteria, Survey.starts_at, Survey.ends_at)\
+                             .filter(Survey.is_active == True):
+            if row.starts_at and row.starts_at > now:
+                pending.append((row.starts_at, row.id))
+                continue
+            card = self._card(row, now)
+            if card is not None:
+                cards[card.survey_id] = card
+
+        heapq.heapify(pending)
+        with self._lock:
+            self.cards = cards
+            self.ranking = sorted(card.rank_key for card in cards.values())
+            self._pending = pending
+            self._users.clear()
+
+    @staticmethod
+    def _card(survey, now) -> Optional[SurveyCard]:
+        """Card for a survey that is open right now, None otherwise"""
+        if not survey.is_active:
+            return None
+        if survey.starts_at and survey.starts_at > now:
+            return None
+        if survey.ends_at and survey.ends_at <= now:
+            return None
+        remaining = (survey.max_responses or 0) - (survey.total_responses or 0) - (survey.reserved_slots or 0)
+        if remaining <= 0:
+            return None
+        return SurveyCard(survey.id, survey.reward_per_minute, remaining, survey.qualification_criteria,
+                          survey.ends_at)
+
+    def refresh_survey(self, survey: Survey):
+        """Survey opened, closed, changed or received a response - re-rank only if needed"""
+        now = datetime.utcnow()
+        card = self._card(survey, now)
+        with self._lock:
+            upcoming = (survey.starts_at, survey.id)
+            if survey.is_active and survey.starts_at and survey.starts_at > now and upcoming not in self._pending:
+                heapq.heappush(self._pending, upcoming)
+
+            old = self.cards.get(survey.id)
+            if card is None:
+                if old is not None:
+                    self._remove(old)
+                return
+            if old is not None and old.rank_key == card.rank_key and old.criteria == card.criteria:
+                # Capacity or end date changed - the order stays the same
+                old.remaining = card.remaining
+                old.ends_at = card.ends_at
+                return
+            if old is not None:
+                self._remove(old)
+            self._add(card)
+
+    def remove_survey(self, survey_id: int):
+        """Survey closed (deactivated, expired or full)"""
+        with self._lock:
+            card = self.cards.get(survey_id)
+            if card is not None:
+                self._remove(card)
+
+    def _add(self, card: SurveyCard):
+        self.cards[card.survey_id] = card
+        insort(self.ranking, card.rank_key)
+        if not self._users:
+            return
+
+        # One bitmap AND finds the cached users that qualify for the new survey
+        eligible = get_eligibility_index().eligible_users(card.survey_id, card.criteria)
+        eligible &= bitmap_from_ids(self._users)
+        for user_id in iter_ids(eligible):
+            candidates = self._users[user_id]
+            if card.survey_id not in candidates.taken:
+                insort(candidates.ranked, card.rank_key)
+
+    def _remove(self, card: SurveyCard):
+        del self.cards[card.survey_id]
+        _discard(self.ranking, card.rank_key)
+        for candidates in self._users.values():
+            _discard(candidates.ranked, card.rank_key)
+
+    def _open_due_surveys(self, now):
+        """Open surveys whose starts_at has passed since they were scheduled"""
+        due = []
+        while self._pending and self._pending[0][0] <= now:
+            due.append(heapq.heappop(self._pending)[1])
+        for survey in Survey.query.filter(Survey.id.in_(due)).all() if due else []:
+            self.refresh_survey(survey)
+
+    # =========================
+    # USER EVENTS
+    # =========================
+
+    def mark_taken(self, user_id: int, survey_id: int):
+        """User started a survey - it is never recommended to them again"""
+        with self._lock:
+            candidates = self._users.get(user_id)
+            if candidates is None:
+                return
+            candidates.taken.add(survey_id)
+            card = self.cards.get(survey_id)
+            if card is not None:
+                _discard(candidates.ranked, card.rank_key)
+
+    def invalidate_user(self, user_id: int):
+        """Qualification answers changed or account deleted - rebuilt on next read"""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def _candidates(self, user_id: int) -> UserCandidates:
+        candidates = self._users.get(user_id)
+        if candidates is not None:
+            self._users.move_to_end(user_id)
+            return candidates
+
+        taken = {survey_id for survey_id, in
+                 db.session.query(SurveyResponse.survey_id).filter(SurveyResponse.user_id == user_id)}
+        index = get_eligibility_index()
+        eligible = set(index.eligible_surveys(user_id, {
+            survey_id: card.criteria for survey_id, card in self.cards.items() if survey_id not in taken
+        }))
+        # The global ranking is already sorted - filtering keeps the order
+        ranked = [key for key in self.ranking if key[1] in eligible]
+
+        candidates = UserCandidates(ranked, taken)
+        self._users[user_id] = candidates
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return candidates
+
+    # =========================
+    # QUERIES
+    # =========================
+
+    def recommend(self, user_id: int, limit: int = 5, exclude: Iterable[int] = ()) -> List[int]:
+        """Top survey ids for a user - walks the precomputed list, O(limit) in the common case"""
+        if limit <= 0:
+            return []
+        exclude = set(exclude)
+        now = datetime.utcnow()
+        with self._lock:
+            self._open_due_surveys(now)
+            candidates = self._candidates(user_id)
+
+            result, expired = [], []
+            for key in candidates.ranked:
+                survey_id = key[1]
+                card = self.cards[survey_id]
+                if card.ends_at and card.ends_at <= now:
+                    expired.append(card)
+                    continue
+                if survey_id in exclude:
+                    continue
+                result.append(survey_id)
+                if len(result) >= limit:
+                    break
+
+            # Expiry is noticed lazily on read
+            for card in expired:
+                self._remove(card)
+            return result
+
+
+def _discard(ranked: List[tuple], key: tuple):
+    position = bisect_left(ranked, key)
+    if position < len(ranked) and ranked[position] == key:
+        del ranked[position]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_recommendation_service() -> RecommendationService:
+    """Process-wide service, built from the database on first use (needs an app context)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from flask import current_app
+                service = RecommendationService(current_app.config.get('RECOMMENDATION_CACHE_USERS', 10000))
+                service.build()
+                _service = service
+    return _service
+
+
+def recommend_surveys(user_id: int, limit: int = 5, exclude: Iterable[int] = ()) -> List[Survey]:
+    """Recommended Survey objects in ranking order"""
+    survey_ids = get_recommendation_service().recommend(user_id, limit, exclude)
+    if not survey_ids:
+        return []
+    surveys = {survey.id: survey for survey in Survey.query.filter(Survey.id.in_(survey_ids)).all()}
+    return [surveys[survey_id] for survey_id in survey_ids if survey_id in surveys]
+
+
+def survey_changed(survey: Survey):
+    """Hook for survey state changes (no-op while the service has not been built)"""
+    if _service is not None:
+        _service.refresh_survey(survey)
+
+
+def survey_started(user_id: int, survey_id: int):
+    """Hook for a newly started response (no-op while the service has not been built)"""
+    if _service is not None:
+        _service.mark_taken(user_id, survey_id)
+
+
+def user_changed(user_id: int):
+    """Qualification answers changed or account deleted - drop the cached list (no-op while not built)"""
+    if _service is not None:
+        _service.invalidate_user(user_id)
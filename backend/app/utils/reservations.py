@@ -0,0 +1,204 @@
+# backend/app/utils/reservations.py
+"""
+Capacity Reservations for DataFair Survey System
+Beim Start wird ein Platz für SURVEY_RESERVATION_TTL Sekunden reserviert (Lease), bei der
+Abgabe in eine Antwort umgewandelt; abgelaufene Leases gibt ein Sweeper in Batches frei
+
+Survey.reserved_slots counts live leases, so available capacity is
+max_responses - total_responses - reserved_slots, read from one row. Taking a lease is
+one conditional UPDATE on that row; overselling is impossible for the same reason as in
+quotas.claim_survey_slot. Whoever deletes a survey_reservations row (submit or sweeper,
+DELETE ... RETURNING) owns the counter change, so a lease is released exactly once.
+"""
+
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from flask import current_app
+from sqlalchemy import bindparam, select, update
+
+from ..database import db
+from ..models import Survey, SurveyReservation, SurveyResponse
+from .quotas import claim_survey_slot
+from .recommendations import survey_changed
+
+
+def reservation_ttl() -> timedelta:
+    return timedelta(seconds=current_app.config.get('SURVEY_RESERVATION_TTL', 3600))
+
+
+def _take_slot(survey_id: int) -> bool:
+    result = db.session.execute(
+        update(Survey)
+        .where(Survey.id == survey_id,
+               Survey.total_responses + Survey.reserved_slots < Survey.max_responses)
+        .values(reserved_slots=Survey.reserved_slots + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _release(released: Counter):
+    """Give back released leases: survey_id -> count (caller commits)"""
+    if not released:
+        return
+    survey_table = Survey.__table__
+    db.session.execute(
+        survey_table.update().where(survey_table.c.id == bindparam('b_id'))
+        .values(reserved_slots=survey_table.c.reserved_slots - bindparam('b_count')),
+        [{'b_id': survey_id, 'b_count': count} for survey_id, count in released.items()]
+    )
+
+
+def reserve_slot(survey: Survey, response: SurveyResponse,
+                 now: Optional[datetime] = None) -> Optional[SurveyReservation]:
+    """
+    Lease one slot for a started response (caller commits, response must be flushed).
+    A full survey first frees its own expired leases; None if it is still full.
+    """
+    now = now or datetime.utcnow()
+    if not _take_slot(survey.id):
+        if not release_expired(now, survey_id=survey.id) or not _take_slot(survey.id):
+            return None
+    reservation = SurveyReservation(survey_id=survey.id, response_id=response.id,
+                                    user_id=response.user_id, expires_at=now + reservation_ttl())
+    db.session.add(reservation)
+    return reservation
+
+
+def convert_reservations(response_ids: Iterable[int]) -> Counter:
+    """
+    Remove the leases of submitted responses -> survey_id -> count removed (caller commits
+    and moves that many from reserved_slots to total_responses). Expired but not yet swept
+    leases still count: the slot was never given away.
+    """
+    response_ids = list(response_ids)
+    if not response_ids:
+        return Counter()
+    table = SurveyReservation.__table__
+    rows = db.session.execute(table.delete().where(table.c.response_id.in_(response_ids))
+                                  .returning(table.c.survey_id))
+    return Counter(survey_id for survey_id, in rows)
+
+
+def convert_reservation(survey_id: int, response_id: int) -> bool:
+    """
+    Count a submitted response against Survey.max_responses (caller commits).
+    With a lease the slot is guaranteed; without one (swept, or started before leases
+    existed) the response needs a free slot like any new start.
+    """
+    if convert_reservations([response_id]):
+        db.session.execute(
+            update(Survey).where(Survey.id == survey_id)
+            .values(reserved_slots=Survey.reserved_slots - 1, total_responses=Survey.total_responses + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return True
+    return claim_survey_slot(survey_id)
+
+
+def holds_reservation(response_id: int) -> bool:
+    return db.session.query(SurveyReservation.id).filter_by(response_id=response_id).first() is not None
+
+
+def release_expired(now: Optional[datetime] = None, batch_size: int = 1000,
+                    survey_id: Optional[int] = None) -> Counter:
+    """
+    Delete up to batch_size expired leases (oldest first) and give their slots back
+    (caller commits) -> survey_id -> number released.
+    """
+    now = now or datetime.utcnow()
+    table = SurveyReservation.__table__
+    expired = select(table.c.id).where(table.c.expires_at <= now)
+    if survey_id is not None:
+        expired = expired.where(table.c.survey_id == survey_id)
+    expired = expired.order_by(table.c.expires_at).limit(batch_size)
+
+    rows = db.session.execute(table.delete().where(table.c.id.in_(expired.scalar_subquery()),
+                                                   table.c.expires_at <= now)
+                                  .returning(table.c.survey_id))
+    released = Counter(row_survey_id for row_survey_id, in rows)
+    _release(released)
+    return released
+
+
+def release_reservations(response_ids: Iterable[int]) -> Counter:
+    """Responses are discarded unsubmitted: drop their leases and give the slots back (caller commits)"""
+    released = convert_reservations(response_ids)
+    _release(released)
+    return released
+
+
+def release_user_reservations(user_id: int) -> Counter:
+    """Account deletion: drop the user's leases and give their slots back (caller commits)"""
+    table = SurveyReservation.__table__
+    rows = db.session.execute(table.delete().where(table.c.user_id == user_id).returning(table.c.survey_id))
+    released = Counter(survey_id for survey_id, in rows)
+    _release(released)
+    return released
+
+
+def sweep_expired(now: Optional[datetime] = None, batch_size: int = 1000) -> Dict[int, int]:
+    """Release every expired lease, one committed batch at a time -> survey_id -> count"""
+    now = now or datetime.utcnow()
+    total = Counter()
+    while True:
+        released = release_expired(now, batch_size)
+        db.session.commit()
+        total.update(released)
+        if sum(released.values()) < batch_size:
+            break
+
+    # Freed capacity can bring a full survey back into the recommendations
+    if total:
+        for survey in Survey.query.filter(Survey.id.in_(total.keys())).all():
+            survey_changed(survey)
+    return dict(total)
+
+
+class ReservationSweeper:
+    """Background thread: release expired leases every SURVEY_RESERVATION_SWEEP_INTERVAL seconds"""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config.get('SURVEY_RESERVATION_SWEEP_INTERVAL', 30)
+        self.batch_size = app.config.get('SURVEY_RESERVATION_SWEEP_BATCH', 1000)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='reservation-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    sweep_expired(batch_size=self.batch_size)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Reservation sweeper error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def start_reservation_sweeper(app):
+    """Call at startup: release leases that expired while the app was down, then sweep periodically"""
+    global _sweeper
+    with app.app_context():
+        sweep_expired(batch_size=app.config.get('SURVEY_RESERVATION_SWEEP_BATCH', 1000))
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = ReservationSweeper(app)
+            _sweeper.start()
+    return _sweeper
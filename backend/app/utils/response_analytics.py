@@ -0,0 +1,373 @@
+# backend/app/utils/response_analytics.py
+"""
+Response Analytics Engine for DataFair Survey System
+Pflegt Auswertungen pro Frage inkrementell bei jeder Abgabe, statt alle Antworten neu zu parsen
+
+A submit never reads and writes back an aggregate: the batch is summarised in Python and
+added with single UPDATE statements - answer counts and option/bucket counters as
+count = count + n, the numeric statistics as a Welford merge of old and batch values -
+so concurrent submits cannot overwrite each other. Missing rows are inserted first
+(a concurrent insert of the same row is harmless).
+
+The rebuild remembers which responses it scanned. Its final transaction locks the
+survey row (submits update it before their aggregates), so no submit can commit
+in between, folds in every completed response the scan missed and swaps the aggregates.
+
+Aggregates are kept per survey version: a response is counted against the questions of
+the version it was answered on (survey_version_id), so editing a survey never mixes
+answers to old and new questions. Responses from before versioning are kept under
+version 0 and read with the survey's current questions, like their validation does.
+"""
+
+import json
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from ..database import db
+from ..models import Survey, SurveyResponse, QuestionAggregate, QuestionAggregateCount
+from .jobs import update_job_progress
+from .survey_versions import version_questions
+
+# Stored length of an option/bucket value (same as survey_answers.text_value)
+VALUE_MAX_LENGTH = 500
+
+# survey_version_id of aggregates over responses without a version
+UNVERSIONED = 0
+
+
+def load_questions(survey: Survey) -> List[Dict[str, Any]]:
+    """Parse the survey's question JSON (empty list on missing/broken data)"""
+    if not survey.questions:
+        return []
+    try:
+        questions = json.loads(survey.questions) if isinstance(survey.questions, str) else survey.questions
+    except (TypeError, ValueError):
+        return []
+    return questions if isinstance(questions, list) else []
+
+
+def questions_for_version(survey: Survey, version_id: Optional[int]) -> List[Dict[str, Any]]:
+    """Questions a response of this version answered (current questions without a version)"""
+    if version_id:
+        return version_questions(version_id)
+    return load_questions(survey)
+
+
+class QuestionAccumulator:
+    """In-memory aggregate of a batch of answers to one question"""
+
+    def __init__(self, question: Dict[str, Any]):
+        self.bucket_width = question.get('bucket_width', 1) or 1
+        # Free text is only counted, never aggregated by value
+        self.count_text_values = question.get('type') != 'text'
+        self.answer_count = 0
+        self.option_counts = {}
+        self.histogram = {}
+        self.numeric_count = 0
+        self.numeric_mean = 0.0
+        self.numeric_m2 = 0.0
+        self.numeric_min = None
+        self.numeric_max = None
+
+    def add(self, value: Any):
+        """Add one answer - lists/booleans/strings count as options, numbers update running stats"""
+        if value is None or value == '' or value == []:
+            return
+        self.answer_count += 1
+
+        if isinstance(value, list):
+            for item in value:
+                self._count_option(item)
+        elif isinstance(value, bool):
+            self._count_option(value)
+        elif isinstance(value, (int, float)):
+            self._add_number(float(value))
+        elif self.count_text_values:
+            self._count_option(value)
+
+    def _count_option(self, value: Any):
+        key = json.dumps(value) if isinstance(value, bool) else str(value)[:VALUE_MAX_LENGTH]
+        self.option_counts[key] = self.option_counts.get(key, 0) + 1
+
+    def _add_number(self, value: float):
+        if math.isnan(value) or math.isinf(value):
+            return
+        # Welford's online algorithm - numerically stable running mean/variance
+        self.numeric_count += 1
+        delta = value - self.numeric_mean
+        self.numeric_mean += delta / self.numeric_count
+        self.numeric_m2 += delta * (value - self.numeric_mean)
+        self.numeric_min = value if self.numeric_min is None else min(self.numeric_min, value)
+        self.numeric_max = value if self.numeric_max is None else max(self.numeric_max, value)
+
+        bucket = math.floor(value / self.bucket_width) * self.bucket_width
+        key = str(int(bucket)) if float(bucket).is_integer() else str(bucket)
+        self.histogram[key] = self.histogram.get(key, 0) + 1
+
+    def count_rows(self, survey_id: int, version_id: int, question_id: str) -> List[Dict[str, Any]]:
+        """Option and histogram counters as question_aggregate_counts rows"""
+        return [{'survey_id': survey_id, 'survey_version_id': version_id, 'question_id': question_id,
+                 'kind': kind, 'value': value, 'count': count}
+                for kind, counts in (('option', self.option_counts), ('bucket', self.histogram))
+                for value, count in counts.items()]
+
+
+def record_response(survey: Survey, answers: Dict[str, Any], version_id: Optional[int] = None):
+    """Fold one submitted response into the aggregates of its survey version (caller commits)"""
+    record_responses(survey, [(version_id, answers)])
+
+
+def record_responses(survey: Survey, responses: List[Tuple[Optional[int], Dict[str, Any]]]):
+    """
+    Fold a batch of (survey_version_id, answers) into the survey's aggregates -
+    atomic increments per version, no read-modify-write
+    """
+    by_version = {}
+    for version_id, answers in responses:
+        if isinstance(answers, dict):
+            by_version.setdefault(version_id or UNVERSIONED, []).append(answers)
+
+    for version_id, answers_list in by_version.items():
+        accumulators = {}
+        for question in questions_for_version(survey, version_id):
+            question_id = str(question.get('id'))
+            acc = QuestionAccumulator(question)
+            for answers in answers_list:
+                if question_id in answers:
+                    acc.add(answers[question_id])
+            if acc.answer_count:
+                accumulators[question_id] = acc
+
+        _add_to_aggregates(survey.id, version_id, accumulators)
+
+
+def _add_to_aggregates(survey_id: int, version_id: int, accumulators: Dict[str, QuestionAccumulator]):
+    """Add batch aggregates to the stored ones with single UPDATE statements (caller commits)"""
+    if not accumulators:
+        return
+    aggregate_table = QuestionAggregate.__table__
+    count_table = QuestionAggregateCount.__table__
+    now = datetime.utcnow()
+
+    _insert_missing(aggregate_table, survey_id, version_id, ('question_id',), [
+        {'survey_id': survey_id, 'survey_version_id': version_id, 'question_id': question_id, 'answer_count': 0,
+         'numeric_count': 0, 'numeric_mean': 0.0, 'numeric_m2': 0.0, 'updated_at': now}
+        for question_id in accumulators
+    ])
+    counts = [row for question_id, acc in accumulators.items()
+              for row in acc.count_rows(survey_id, version_id, question_id)]
+    _insert_missing(count_table, survey_id, version_id, ('question_id', 'kind', 'value'),
+                    [dict(row, count=0) for row in counts])
+
+    if counts:
+        db.session.execute(
+            count_table.update().where(count_table.c.survey_id == bindparam('b_survey_id'),
+                                       count_table.c.survey_version_id == bindparam('b_version_id'),
+                                       count_table.c.question_id == bindparam('b_question_id'),
+                                       count_table.c.kind == bindparam('b_kind'),
+                                       count_table.c.value == bindparam('b_value'))
+            .values(count=count_table.c.count + bindparam('b_count')),
+            [{'b_survey_id': survey_id, 'b_version_id': version_id, 'b_question_id': row['question_id'],
+              'b_kind': row['kind'],
+              'b_value': row['value'], 'b_count': row['count']} for row in counts]
+        )
+
+    row_match = (aggregate_table.c.survey_id == bindparam('b_survey_id'),
+                 aggregate_table.c.survey_version_id == bindparam('b_version_id'),
+                 aggregate_table.c.question_id == bindparam('b_question_id'))
+    answer_count = aggregate_table.c.answer_count + bindparam('b_answers')
+    plain = [{'b_survey_id': survey_id, 'b_version_id': version_id, 'b_question_id': question_id,
+              'b_answers': acc.answer_count}
+             for question_id, acc in accumulators.items() if not acc.numeric_count]
+    if plain:
+        db.session.execute(aggregate_table.update().where(*row_match)
+                           .values(answer_count=answer_count, updated_at=now), plain)
+
+    numeric = [{'b_survey_id': survey_id, 'b_version_id': version_id, 'b_question_id': question_id,
+                'b_answers': acc.answer_count,
+                'b_count': acc.numeric_count, 'b_mean': acc.numeric_mean, 'b_m2': acc.numeric_m2,
+                'b_min': acc.numeric_min, 'b_max': acc.numeric_max}
+               for question_id, acc in accumulators.items() if acc.numeric_count]
+    if numeric:
+        # Parallel Welford merge - every SET expression sees the values before the update
+        old_count, old_mean = aggregate_table.c.numeric_count, aggregate_table.c.numeric_mean
+        old_min, old_max = aggregate_table.c.numeric_min, aggregate_table.c.numeric_max
+        batch_count = bindparam('b_count', type_=db.Integer)
+        batch_min, batch_max = bindparam('b_min', type_=db.Float), bindparam('b_max', type_=db.Float)
+        total = old_count + batch_count
+        delta = bindparam('b_mean', type_=db.Float) - old_mean
+        db.session.execute(
+            aggregate_table.update().where(*row_match).values(
+                answer_count=answer_count,
+                numeric_count=total,
+                numeric_mean=old_mean + delta * batch_count / total,
+                numeric_m2=aggregate_table.c.numeric_m2 + bindparam('b_m2', type_=db.Float)
+                + delta * delta * old_count * batch_count / total,
+                numeric_min=case((or_(old_min.is_(None), old_min > batch_min), batch_min), else_=old_min),
+                numeric_max=case((or_(old_max.is_(None), old_max < batch_max), batch_max), else_=old_max),
+                updated_at=now
+            ),
+            numeric
+        )
+
+
+def _insert_missing(table, survey_id: int, version_id: int, key: Iterable[str], rows: List[Dict[str, Any]]):
+    """Insert the rows whose key does not exist yet - one that a concurrent submit inserted is skipped"""
+    key = tuple(key)
+    if not rows:
+        return
+    existing = set(db.session.execute(
+        select(*[table.c[column] for column in key]).where(
+            table.c.survey_id == survey_id,
+            table.c.survey_version_id == version_id,
+            table.c.question_id.in_({row['question_id'] for row in rows}))
+    ).all())
+    missing = [row for row in rows if tuple(row[column] for column in key) not in existing]
+    if not missing:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert(), missing)
+    except IntegrityError:
+        for row in missing:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(table.insert(), [row])
+            except IntegrityError:
+                pass
+
+
+def get_results(survey: Survey, version_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Aggregated results of one survey version (default: the current one) in question order -
+    O(questions + options), no response is parsed
+    """
+    if version_id is None:
+        version_id = survey.current_version_id or UNVERSIONED
+    scope = {'survey_id': survey.id, 'survey_version_id': version_id}
+    rows = {row.question_id: row for row in QuestionAggregate.query.filter_by(**scope).all()}
+    counts = {}
+    for row in QuestionAggregateCount.query.filter_by(**scope).order_by(QuestionAggregateCount.id):
+        counts.setdefault((row.question_id, row.kind), {})[row.value] = row.count
+
+    results = []
+    for question in questions_for_version(survey, version_id):
+        question_id = str(question.get('id'))
+        row = rows.get(question_id)
+        data = row.to_dict(counts.get((question_id, 'option')), counts.get((question_id, 'bucket'))) if row \
+            else {'question_id': question_id, 'answer_count': 0, 'option_counts': {}}
+        data['text'] = question.get('text') or question.get('question')
+        data['type'] = question.get('type')
+        results.append(data)
+
+    return {
+        'survey_id': survey.id,
+        'survey_version_id': version_id or None,
+        'total_responses': survey.total_responses,
+        'questions': results
+    }
+
+
+def _iter_completed(survey_id: int, columns, chunk_size: int):
+    """Keyset-paginated batches of completed responses, chunk_size rows per query"""
+    last_id = 0
+    while True:
+        rows = db.session.query(SurveyResponse.id, *columns).filter(
+            SurveyResponse.survey_id == survey_id,
+            SurveyResponse.is_completed == True,
+            SurveyResponse.id > last_id
+        ).order_by(SurveyResponse.id).limit(chunk_size).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield rows
+
+
+def _parse_answers(raw) -> Dict[str, Any]:
+    try:
+        answers = json.loads(raw) if isinstance(raw, str) else raw
+    except (TypeError, ValueError):
+        return {}
+    return answers if isinstance(answers, dict) else {}
+
+
+class ResponseIdSet:
+    """Bitmap of response ids - one bit per id instead of a Python int in a set"""
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, response_id: int):
+        byte = response_id >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(max(byte + 1, 2 * len(self.bits)) - len(self.bits)))
+        self.bits[byte] |= 1 << (response_id & 7)
+
+    def __contains__(self, response_id: int) -> bool:
+        byte = response_id >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (response_id & 7)))
+
+
+def rebuild_aggregates_job(job, survey_id: int, chunk_size: int = 1000):
+    """
+    Background job: recompute a survey's aggregates (all versions) from the raw responses in chunks.
+    Responses the scan missed (completed behind it or after it) are folded in during the
+    final write, which holds the survey row lock so no submit commits in between.
+    """
+    survey = db.session.get(Survey, survey_id)
+    # version id -> {question id: accumulator}
+    accumulators: Dict[int, Dict[str, QuestionAccumulator]] = {}
+    scanned = ResponseIdSet()
+
+    def fold(rows):
+        for row in rows:
+            scanned.add(row.id)
+            version_id = row.survey_version_id or UNVERSIONED
+            version = accumulators.get(version_id)
+            if version is None:
+                version = accumulators[version_id] = {str(q.get('id')): QuestionAccumulator(q)
+                                                      for q in questions_for_version(survey, version_id)}
+            answers = _parse_answers(row.responses)
+            for question_id, acc in version.items():
+                if question_id in answers:
+                    acc.add(answers[question_id])
+
+    job.total_items = SurveyResponse.query.filter_by(survey_id=survey_id, is_completed=True).count()
+    db.session.commit()
+
+    columns = [SurveyResponse.survey_version_id, SurveyResponse.responses]
+    for rows in _iter_completed(survey_id, columns, chunk_size):
+        fold(rows)
+        update_job_progress(job, len(rows), 'responses')
+        db.session.commit()
+
+    # Final transaction: lock out submits, then catch up on what the scan missed and swap
+    db.session.query(Survey.id).filter(Survey.id == survey_id).with_for_update().scalar()
+    QuestionAggregateCount.query.filter_by(survey_id=survey_id).delete(synchronize_session=False)
+    QuestionAggregate.query.filter_by(survey_id=survey_id).delete(synchronize_session=False)
+
+    missed = [row.id for rows in _iter_completed(survey_id, [], chunk_size * 10)
+              for row in rows if row.id not in scanned]
+    for start in range(0, len(missed), chunk_size):
+        rows = db.session.query(SurveyResponse.id, *columns)\
+                         .filter(SurveyResponse.id.in_(missed[start:start + chunk_size])).all()
+        fold(rows)
+        update_job_progress(job, len(rows), 'responses')
+
+    now = datetime.utcnow()
+    for version_id, version in accumulators.items():
+        for question_id, acc in version.items():
+            db.session.add(QuestionAggregate(
+                survey_id=survey_id, survey_version_id=version_id, question_id=question_id,
+                answer_count=acc.answer_count, numeric_count=acc.numeric_count, numeric_mean=acc.numeric_mean,
+                numeric_m2=acc.numeric_m2, numeric_min=acc.numeric_min, numeric_max=acc.numeric_max,
+                updated_at=now))
+    counts = [row for version_id, version in accumulators.items() for question_id, acc in version.items()
+              for row in acc.count_rows(survey_id, version_id, question_id)]
+    if counts:
+        db.session.execute(QuestionAggregateCount.__table__.insert(), counts)
+    db.session.commit()
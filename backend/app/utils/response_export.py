@@ -0,0 +1,275 @@
+# backend/app/utils/response_export.py
+"""
+Response Export for DataFair Survey System
+Streamt Rohantworten blockweise als CSV, Parquet oder Arrow - flach nach dem Fragen-Schema
+
+Responses are flattened against the questions of the version they were answered on. The
+export's columns are the union over the current version and every version with completed
+responses (current version first); a column a version does not have stays empty, and
+survey_version tells the rows apart. A column whose type differs between versions is
+exported as string.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..database import db
+from ..models import Survey, SurveyResponse, SurveyVersion
+from .response_analytics import UNVERSIONED, questions_for_version
+
+# Optional dependency - only needed for Parquet/Arrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+# Columns written before the answer columns
+META_COLUMNS = [
+    ('response_id', 'int'),
+    ('survey_version', 'int'),
+    ('started_at', 'timestamp'),
+    ('completed_at', 'timestamp'),
+    ('completion_seconds', 'float'),
+    ('quality_score', 'float'),
+]
+
+NUMERIC_TYPES = ('scale', 'number', 'rating')
+
+
+def build_columns(questions: List[Dict[str, Any]]) -> List[Tuple[str, str, str, Any]]:
+    """
+    Flatten the question schema into (column, kind, question_id, option) tuples.
+    Multiple choice questions become one boolean column per option.
+    """
+    columns = []
+    for question in questions:
+        question_id = str(question.get('id'))
+        question_type = question.get('type')
+
+        if question_type == 'multiple_choice' and question.get('options'):
+            for option in question['options']:
+                columns.append((f'{question_id}__{option}', 'bool', question_id, option))
+        elif question_type in NUMERIC_TYPES:
+            columns.append((question_id, 'float', question_id, None))
+        elif question_type == 'boolean':
+            columns.append((question_id, 'bool', question_id, None))
+        else:
+            columns.append((question_id, 'string', question_id, None))
+    return columns
+
+
+def flatten_answers(answers: Dict[str, Any], columns) -> List[Any]:
+    """Map one answers dict onto the flat column layout (None for missing/invalid values)"""
+    values = []
+    for _, kind, question_id, option in columns:
+        value = answers.get(question_id)
+        if option is not None:
+            selected = value if isinstance(value, list) else [value]
+            values.append(None if value is None else option in selected)
+        elif value is None:
+            values.append(None)
+        elif kind == 'float':
+            try:
+                values.append(float(value))
+            except (TypeError, ValueError):
+                values.append(None)
+        elif kind == 'bool':
+            values.append(bool(value))
+        elif isinstance(value, (list, dict)):
+            values.append(json.dumps(value, ensure_ascii=False))
+        else:
+            values.append(str(value))
+    return values
+
+
+def export_versions(survey: Survey) -> List[Tuple[int, Optional[int]]]:
+    """(version id, version number) of the current version and of every version with completed responses"""
+    used = {version_id or UNVERSIONED for version_id, in db.session.query(SurveyResponse.survey_version_id).filter(
+        SurveyResponse.survey_id == survey.id, SurveyResponse.is_completed == True).distinct()}
+    current = survey.current_version_id or UNVERSIONED
+    used.add(current)
+    numbers = dict(db.session.query(SurveyVersion.id, SurveyVersion.version).filter(SurveyVersion.id.in_(used)))
+    # Current version first, then the older ones newest first (unversioned responses last)
+    return sorted(((version_id, numbers.get(version_id)) for version_id in used),
+                  key=lambda item: (item[0] != current, -(item[1] or 0)))
+
+
+class ExportLayout:
+    """Union of the answer columns of all exported versions, plus each version's place in it"""
+
+    def __init__(self, survey: Survey):
+        self.columns: List[Tuple[str, str, str, Any]] = []
+        positions: Dict[str, int] = {}
+        version_columns = {}
+        for version_id, number in export_versions(survey):
+            columns = build_columns(questions_for_version(survey, version_id))
+            for column in columns:
+                position = positions.get(column[0])
+                if position is None:
+                    positions[column[0]] = len(self.columns)
+                    self.columns.append(column)
+                elif self.columns[position][1] != column[1]:
+                    self.columns[position] = (column[0], 'string', *self.columns[position][2:])
+            version_columns[version_id] = (number, columns)
+
+        # version id -> (version number, union positions, columns with the union's kinds)
+        self.versions = {
+            version_id: (number, [positions[column[0]] for column in columns],
+                         [(column[0], self.columns[positions[column[0]]][1], column[2], column[3])
+                          for column in columns])
+            for version_id, (number, columns) in version_columns.items()
+        }
+
+    def row(self, version_id: Optional[int], answers: Dict[str, Any]) -> Tuple[Optional[int], List[Any]]:
+        """-> (version number, answer values in union column order)"""
+        version_id = version_id or UNVERSIONED
+        if version_id not in self.versions:
+            # Published after the header was written - its answers fill the columns that exist
+            version = db.session.get(SurveyVersion, version_id)
+            self.versions[version_id] = (version.version if version else None,
+                                         list(range(len(self.columns))), self.columns)
+        number, positions, columns = self.versions[version_id]
+        values = [None] * len(self.columns)
+        for position, value in zip(positions, flatten_answers(answers, columns)):
+            values[position] = value
+        return number, values
+
+
+def iter_response_rows(survey_id: int, layout: ExportLayout, chunk_size: int = 5000) -> Iterator[List[List[Any]]]:
+    """Keyset-paginated chunks of flattened rows (meta columns + answer columns)"""
+    last_id = 0
+    while True:
+        chunk = db.session.query(
+            SurveyResponse.id,
+            SurveyResponse.survey_version_id,
+            SurveyResponse.started_at,
+            SurveyResponse.completed_at,
+            SurveyResponse.quality_score,
+            SurveyResponse.responses
+        ).filter(
+            SurveyResponse.survey_id == survey_id,
+            SurveyResponse.is_completed == True,
+            SurveyResponse.id > last_id
+        ).order_by(SurveyResponse.id).limit(chunk_size).all()
+        if not chunk:
+            return
+        last_id = chunk[-1].id
+
+        rows = []
+        for response_id, version_id, started_at, completed_at, quality_score, raw in chunk:
+            try:
+                answers = json.loads(raw) if raw else {}
+            except ValueError:
+                answers = {}
+            if not isinstance(answers, dict):
+                answers = {}
+            duration = (completed_at - started_at).total_seconds() if started_at and completed_at else None
+            number, values = layout.row(version_id, answers)
+            rows.append([response_id, number, started_at, completed_at, duration, quality_score] + values)
+        yield rows
+
+
+def iter_csv(survey: Survey, chunk_size: int = 5000) -> Iterator[bytes]:
+    """CSV export, one encoded block per chunk"""
+    layout = ExportLayout(survey)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([name for name, _ in META_COLUMNS] + [column[0] for column in layout.columns])
+    for rows in iter_response_rows(survey.id, layout, chunk_size):
+        for row in rows:
+            writer.writerow([
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Header-only export for surveys without responses
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(columns):
+    types = {'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_(),
+             'string': pa.string(), 'timestamp': pa.timestamp('us')}
+    fields = [pa.field(name, types[kind]) for name, kind in META_COLUMNS]
+    fields += [pa.field(name, types[kind]) for name, kind, _, _ in columns]
+    return pa.schema(fields)
+
+
+def iter_columnar(survey: Survey, export_format: str, chunk_size: int = 5000) -> Iterator[bytes]:
+    """Parquet (one row group per chunk) or Arrow IPC stream (one record batch per chunk)"""
+    if pa is None:
+        raise RuntimeError('pyarrow is required for Parquet/Arrow export')
+
+    layout = ExportLayout(survey)
+    schema = _arrow_schema(layout.columns)
+    sink = _ChunkSink()
+
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    for rows in iter_response_rows(survey.id, layout, chunk_size):
+        # Transpose the row chunk into columns - memory is bounded by chunk_size
+        arrays = [pa.array(list(values), type=field.type) for values, field in zip(zip(*rows), schema)]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+        if export_format == 'parquet':
+            writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            writer.write_batch(batch)
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def iter_export(survey: Survey, export_format: str, chunk_size: int = 5000) -> Iterator[bytes]:
+    """Dispatch to the writer for the requested format"""
+    if export_format == 'csv':
+        return iter_csv(survey, chunk_size)
+    return iter_columnar(survey, export_format, chunk_size)
+
+
+def format_available(export_format: str) -> bool:
+    """Check that the format is known and its optional dependency installed"""
+    if export_format not in EXPORT_FORMATS:
+        return False
+    return export_format == 'csv' or pa is not None
@@ -0,0 +1,259 @@
+# backend/app/utils/response_quality.py
+"""
+Response Quality Scoring for DataFair Survey System
+Bewertet jede Abgabe beim Submit: zu schnell (Speeder), immer dieselbe Antwort in
+Fragenblöcken (Straight-Lining) und mehrfache Abgaben von derselben IP / demselben Gerät
+
+quality_score is 1.0 for a clean response and drops with every signal:
+    speeder         completion time below QUALITY_SPEEDER_RATIO * estimated_duration
+    straight_liner  identical answers across a grid (>= QUALITY_GRID_MIN_ITEMS questions
+                    sharing one answer scale), penalty = share of straight-lined grids
+    duplicate_device / shared_ip
+                    this survey was already submitted from the same IP + user agent / IP
+
+IP and device collisions are answered by Bloom filters of (survey, ip[, user agent]) keys
+instead of a database lookup: fixed memory (two generations of QUALITY_SKETCH_CAPACITY keys,
+the older one is dropped when the newer fills up), no false negatives within the window and
+a false-positive rate of QUALITY_SKETCH_ERROR_RATE. Scoring only reads the sketches; a
+submission's origin is recorded (record_origin) once it has been committed or enqueued, so a
+rejected submit never flags the retry.
+
+The sketches are process-local and warmed from recent responses on first use. With several
+worker processes they disagree: a worker only sees the origins it accepted itself plus what
+it loaded at warm-up, so a duplicate that reaches another worker may go unflagged. The
+duplicate flags are a best-effort signal, not an exact per-survey check.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import select
+
+from ..database import db
+from ..models import Survey, SurveyResponse
+from .survey_versions import version_schema
+
+# Weights of the signals in the score (a response with every signal scores 0)
+SPEED_WEIGHT = 0.5
+STRAIGHTLINE_WEIGHT = 0.3
+DEVICE_WEIGHT = 0.2
+SHARED_IP_WEIGHT = 0.1
+
+# version id -> grid plan; versions never change, so entries never go stale
+GRID_PLANS_MAX = 4096
+_grid_plans: Dict[int, List[List[str]]] = {}
+
+
+class BloomFilter:
+    """Fixed-size set sketch: no false negatives, tunable false-positive rate"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 64)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> bool:
+        """Insert the key - True if it was (probably) present already"""
+        present = True
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class CollisionSketch:
+    """Two Bloom filter generations - remembers the last capacity..2*capacity keys"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.current or (self.previous is not None and key in self.previous)
+
+    def add(self, key: str):
+        self.current.add(key)
+        if self.current.count >= self.capacity:
+            self.previous, self.current = self.current, BloomFilter(self.capacity, self.error_rate)
+
+    def memory_bytes(self) -> int:
+        return len(self.current.bits) + (len(self.previous.bits) if self.previous is not None else 0)
+
+
+def build_grid_plan(questions: List[Dict[str, Any]], min_items: int) -> List[List[str]]:
+    """
+    Grids of a question list: question ids grouped by answer scale (scale range, option list
+    or an explicit 'grid' key); only groups with at least min_items questions count.
+    """
+    groups: Dict[Tuple, List[str]] = {}
+    for question in questions:
+        if not isinstance(question, dict) or question.get('id') is None:
+            continue
+        kind = question.get('type')
+        if question.get('grid') is not None:
+            key = ('grid', str(question['grid']))
+        elif kind == 'scale':
+            key = ('scale', question.get('scale_min', 1), question.get('scale_max', 5))
+        elif kind in ('rating', 'number') and 'min' in question and 'max' in question:
+            key = ('rating', question['min'], question['max'])
+        elif kind in ('single_choice', 'single') and question.get('options'):
+            key = ('choice', json.dumps(question['options'], sort_keys=True, default=str))
+        else:
+            continue
+        groups.setdefault(key, []).append(str(question['id']))
+    return [ids for ids in groups.values() if len(ids) >= min_items]
+
+
+def grid_plan_for(survey_response: SurveyResponse, survey: Survey, min_items: int) -> List[List[str]]:
+    """Grid plan of the version the response was started on (cached by version id)"""
+    version_id = survey_response.survey_version_id
+    plan = _grid_plans.get(version_id) if version_id else None
+    if plan is not None:
+        return plan
+
+    schema = version_schema(version_id) if version_id else None
+    raw = schema[1] if schema else survey.questions
+    try:
+        questions = json.loads(raw) if isinstance(raw, str) and raw.strip() else (raw or [])
+    except ValueError:
+        questions = []
+    plan = build_grid_plan(questions if isinstance(questions, list) else [], min_items)
+    if version_id:
+        if len(_grid_plans) >= GRID_PLANS_MAX:
+            _grid_plans.clear()
+        _grid_plans[version_id] = plan
+    return plan
+
+
+def straightlined_share(plan: List[List[str]], answers: Dict[str, Any], min_items: int) -> float:
+    """Share of grids answered with one identical value throughout"""
+    if not plan:
+        return 0.0
+    straight = 0
+    for question_ids in plan:
+        values = [answers[question_id] for question_id in question_ids if answers.get(question_id) is not None]
+        if len(values) >= min_items and all(value == values[0] for value in values):
+            straight += 1
+    return straight / len(plan)
+
+
+class QualityScorer:
+    """Scores submissions; holds the IP/device sketches of this process"""
+
+    def __init__(self, config):
+        self.speeder_ratio = config.get('QUALITY_SPEEDER_RATIO', 0.33)
+        self.grid_min_items = config.get('QUALITY_GRID_MIN_ITEMS', 4)
+        capacity = config.get('QUALITY_SKETCH_CAPACITY', 500000)
+        error_rate = config.get('QUALITY_SKETCH_ERROR_RATE', 0.001)
+        self.ips = CollisionSketch(capacity, error_rate)
+        self.devices = CollisionSketch(capacity, error_rate)
+        self._lock = threading.Lock()
+
+    def warm(self, since: datetime, limit: int):
+        """
+        Load the IP/device keys of recently completed responses - on a separate connection,
+        so only committed rows count (not the submission being scored right now)
+        """
+        table = SurveyResponse.__table__
+        query = select(table.c.survey_id, table.c.ip_address, table.c.user_agent)\
+            .where(table.c.is_completed == True, table.c.completed_at >= since, table.c.ip_address.isnot(None))\
+            .order_by(table.c.completed_at.desc()).limit(limit)
+        with db.engine.connect() as connection:
+            for survey_id, ip_address, user_agent in connection.execute(query):
+                self._observe(survey_id, ip_address, user_agent)
+
+    def _seen(self, survey_id: int, ip_address: Optional[str], user_agent: Optional[str]) -> Tuple[bool, bool]:
+        """(ip seen before, device seen before) - read only"""
+        if not ip_address:
+            return False, False
+        with self._lock:
+            return (f'{survey_id}|{ip_address}' in self.ips,
+                    f'{survey_id}|{ip_address}|{user_agent or ""}' in self.devices)
+
+    def _observe(self, survey_id: int, ip_address: Optional[str], user_agent: Optional[str]):
+        """Record an accepted submission's origin"""
+        if not ip_address:
+            return
+        with self._lock:
+            self.ips.add(f'{survey_id}|{ip_address}')
+            self.devices.add(f'{survey_id}|{ip_address}|{user_agent or ""}')
+
+    def score(self, survey: Survey, survey_response: SurveyResponse, answers: Dict[str, Any],
+              completed_at: Optional[datetime] = None) -> Tuple[float, List[str]]:
+        """Quality of one submission -> (score 0..1, flags); does not record its IP/device"""
+        flags, penalty = [], 0.0
+
+        completed_at = completed_at or survey_response.completed_at or datetime.utcnow()
+        expected = (survey.estimated_duration or 5) * 60
+        if survey_response.started_at and expected > 0:
+            ratio = max((completed_at - survey_response.started_at).total_seconds(), 0) / expected
+            if ratio < self.speeder_ratio:
+                flags.append('speeder')
+                penalty += SPEED_WEIGHT * (self.speeder_ratio - ratio) / self.speeder_ratio
+
+        plan = grid_plan_for(survey_response, survey, self.grid_min_items)
+        share = straightlined_share(plan, answers, self.grid_min_items)
+        if share:
+            flags.append('straight_liner')
+            penalty += STRAIGHTLINE_WEIGHT * share
+
+        shared_ip, same_device = self._seen(survey.id, survey_response.ip_address, survey_response.user_agent)
+        if same_device:
+            flags.append('duplicate_device')
+            penalty += DEVICE_WEIGHT
+        elif shared_ip:
+            flags.append('shared_ip')
+            penalty += SHARED_IP_WEIGHT
+
+        return round(max(1.0 - penalty, 0.0), 4), flags
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_quality_scorer() -> QualityScorer:
+    """Process-wide scorer (sketches warmed from the last 30 days on first use)"""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                config = current_app.config
+                scorer = QualityScorer(config)
+                scorer.warm(datetime.utcnow() - timedelta(days=30), config.get('QUALITY_SKETCH_CAPACITY', 500000))
+                _scorer = scorer
+    return _scorer
+
+
+def score_response(survey: Survey, survey_response: SurveyResponse, answers: Dict[str, Any],
+                   completed_at: Optional[datetime] = None) -> Tuple[float, str]:
+    """(quality_score, quality_flags JSON) for the response columns"""
+    score, flags = get_quality_scorer().score(survey, survey_response, answers, completed_at)
+    return score, json.dumps(flags)
+
+
+def record_origin(survey_response: SurveyResponse):
+    """Call after the submission was committed or enqueued - later ones from its IP/device get flagged"""
+    get_quality_scorer()._observe(survey_response.survey_id, survey_response.ip_address, survey_response.user_agent)
@@ -0,0 +1,177 @@
+# backend/app/utils/response_reaper.py
+"""
+Abandoned-Response Reaper for DataFair Survey System
+Löscht begonnene, aber nie abgeschickte Antworten, die älter als ABANDONED_RESPONSE_AGE_HOURS
+sind - in begrenzten Batches, damit der Schreib-Lock nie lange gehalten wird
+
+Stale rows are found through idx_survey_responses_stale (is_completed, started_at), oldest
+first. Each batch deletes the responses together with their autosave deltas and slot leases
+(the slots go back to the survey) in one transaction. A run stops after
+RESPONSE_REAPER_MAX_BATCHES; the next run continues where it left off. Users whose response
+was reaped can start the survey again.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+
+from ..database import db
+from ..models import SurveyResponse
+from .autosave import clear_drafts
+from .recommendations import user_changed
+from .reservations import release_reservations
+
+
+class ReaperMetrics:
+    """Counters of the reaper since process start (thread-safe snapshot for /health)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.batches = 0
+        self.reclaimed = 0
+        self.released_slots = 0
+        self.seconds = 0.0
+        self.errors = 0
+        self.last_run = None
+
+    def record(self, run: Dict[str, Any]):
+        with self._lock:
+            self.runs += 1
+            self.batches += run['batches']
+            self.reclaimed += run['reclaimed']
+            self.released_slots += run['released_slots']
+            self.seconds += run['seconds']
+            self.last_run = run
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'runs': self.runs,
+                'batches': self.batches,
+                'reclaimed_responses': self.reclaimed,
+                'released_slots': self.released_slots,
+                'seconds_spent': round(self.seconds, 3),
+                'errors': self.errors,
+                'last_run': self.last_run
+            }
+
+
+metrics = ReaperMetrics()
+
+
+def _queued_response_ids(response_ids: List[int]) -> set:
+    """Responses waiting in the write-behind queue are submitted, not abandoned"""
+    from . import ingestion
+    if ingestion._service is None:
+        return set()
+    return {response_id for response_id in response_ids if ingestion._service.queue.contains(response_id)}
+
+
+def reap_batch(cutoff: datetime, batch_size: int) -> Dict[str, int]:
+    """Delete up to batch_size unfinished responses started before cutoff (commits)"""
+    rows = db.session.query(SurveyResponse.id, SurveyResponse.user_id)\
+                     .filter(SurveyResponse.is_completed == False, SurveyResponse.started_at < cutoff)\
+                     .order_by(SurveyResponse.started_at)\
+                     .limit(batch_size).all()
+    if not rows:
+        return {'found': 0, 'reclaimed': 0, 'released_slots': 0}
+
+    queued = _queued_response_ids([response_id for response_id, _ in rows])
+    stale = [(response_id, user_id) for response_id, user_id in rows if response_id not in queued]
+    response_ids = [response_id for response_id, _ in stale]
+
+    released = release_reservations(response_ids)
+    clear_drafts(response_ids)
+    # is_completed is checked again: a response submitted since the select is kept
+    reclaimed = SurveyResponse.query.filter(SurveyResponse.id.in_(response_ids),
+                                            SurveyResponse.is_completed == False)\
+                                    .delete(synchronize_session=False) if response_ids else 0
+    db.session.commit()
+
+    # The survey can be started (and recommended) again
+    for user_id in {user_id for _, user_id in stale if user_id}:
+        user_changed(user_id)
+    return {'found': len(rows), 'reclaimed': reclaimed, 'released_slots': sum(released.values())}
+
+
+def reap_abandoned_responses(max_age: Optional[timedelta] = None, batch_size: Optional[int] = None,
+                             max_batches: Optional[int] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """One reaper run: at most max_batches batches, recorded in metrics -> run summary"""
+    config = current_app.config
+    max_age = max_age or timedelta(hours=config.get('ABANDONED_RESPONSE_AGE_HOURS', 24))
+    batch_size = batch_size or config.get('RESPONSE_REAPER_BATCH', 500)
+    max_batches = max_batches or config.get('RESPONSE_REAPER_MAX_BATCHES', 20)
+    cutoff = (now or datetime.utcnow()) - max_age
+
+    start = time.perf_counter()
+    run = {'started_at': datetime.utcnow().isoformat(), 'cutoff': cutoff.isoformat(),
+           'batches': 0, 'reclaimed': 0, 'released_slots': 0}
+    for _ in range(max_batches):
+        result = reap_batch(cutoff, batch_size)
+        if not result['found']:
+            break
+        run['batches'] += 1
+        run['reclaimed'] += result['reclaimed']
+        run['released_slots'] += result['released_slots']
+        if result['found'] < batch_size or not result['reclaimed']:
+            break  # backlog done, or only queued submissions left at the head
+    run['seconds'] = round(time.perf_counter() - start, 4)
+
+    metrics.record(run)
+    if run['reclaimed']:
+        print(f"Response reaper: reclaimed {run['reclaimed']} abandoned responses in {run['seconds']:.2f}s")
+    return run
+
+
+class ResponseReaper:
+    """Background thread: one reaper run every RESPONSE_REAPER_INTERVAL seconds"""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config.get('RESPONSE_REAPER_INTERVAL', 300)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='response-reaper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    reap_abandoned_responses()
+                except Exception as e:
+                    db.session.rollback()
+                    metrics.record_error()
+                    print(f"Response reaper error: {str(e)}")
+                finally:
+                    db.session.remove()
+            if self._stop.wait(self.interval):
+                return
+
+
+_reaper = None
+_reaper_lock = threading.Lock()
+
+
+def start_response_reaper(app):
+    """Call at startup - the first run happens right away in the reaper thread"""
+    global _reaper
+    with _reaper_lock:
+        if _reaper is None:
+            _reaper = ResponseReaper(app)
+            _reaper.start()
+    return _reaper
@@ -0,0 +1,269 @@
+# backend/app/utils/response_validation.py
+"""
+Response Validator Compiler for DataFair Survey System
+Übersetzt das Fragen-Schema einer Umfrage einmalig in eine gecachte Prüffunktion,
+die eine Abgabe in einem Durchgang validiert
+
+Supported question schema (Survey.questions):
+    {'id': 'q1', 'type': 'single_choice', 'options': [...], 'required': True}
+    {'id': 'q2', 'type': 'multiple_choice', 'options': [...], 'min_selections': 1, 'max_selections': 3}
+    {'id': 'q3', 'type': 'scale', 'scale_min': 1, 'scale_max': 5}
+    {'id': 'q4', 'type': 'number', 'min': 0, 'max': 120}      # also 'rating'
+    {'id': 'q5', 'type': 'boolean'}
+    {'id': 'q6', 'type': 'text', 'max_length': 500}
+    plus optional skip logic per question ('show_if', 'branches' - see skip_logic.py)
+
+Validators are cached by survey version (versions are immutable, so the cache is never
+invalidated); identical question sets share one validator. A response is validated
+against the version it was started on.
+"""
+
+import json
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..models import SurveyResponse
+from .skip_logic import QuestionGraph, compile_graph
+from .survey_versions import version_schema
+
+DEFAULT_TEXT_MAX_LENGTH = 5000
+
+# version id -> validator; versions never change, so entries never go stale
+VERSION_VALIDATORS_MAX = 4096
+_version_validators = {}
+
+# A check returns None when the value is valid, otherwise the error message
+Check = Callable[[Any], Optional[str]]
+
+
+class CompiledValidator:
+    """Reusable validation function for one question schema"""
+
+    __slots__ = ('checks', 'required', 'has_schema', 'graph')
+
+    def __init__(self, checks: Dict[str, Check], required: tuple, graph: QuestionGraph):
+        self.checks = checks
+        self.required = required
+        self.has_schema = bool(checks)
+        self.graph = graph
+
+    def __call__(self, answers: Dict[str, Any], partial: bool = False) -> Dict[str, str]:
+        """
+        Errors per question id (empty dict = valid). partial=True validates an autosave:
+        required questions may be missing and None clears an answer.
+        Surveys without a question schema accept any answers.
+        A full submission is checked against the questions shown for its answers: hidden
+        questions are never required and their answers are ignored.
+        """
+        if not self.has_schema:
+            return {}
+
+        hidden = self.graph.hidden_questions(answers) if not partial else ()
+        required = self.graph.required_questions(answers, hidden) if hidden else self.required
+        errors = {}
+        checks = self.checks
+        for question_id, value in answers.items():
+            check = checks.get(question_id)
+            if check is None:
+                errors[question_id] = 'Unknown question'
+            elif question_id in hidden:
+                continue
+            elif value is None:
+                if not partial and question_id in required:
+                    errors[question_id] = 'Answer is required'
+            else:
+                message = check(value)
+                if message is not None:
+                    errors[question_id] = message
+
+        if not partial:
+            for question_id in required:
+                if question_id not in errors and _is_blank(answers.get(question_id)):
+                    errors[question_id] = 'Answer is required'
+        return errors
+
+    def shown_answers(self, answers: Dict[str, Any]) -> Dict[str, Any]:
+        """Answers without those to questions hidden by skip logic (stale autosaves included)"""
+        if not self.graph.conditional:
+            return answers
+        hidden = self.graph.hidden_questions(answers)
+        return {question_id: value for question_id, value in answers.items() if question_id not in hidden}
+
+
+def compile_validator(questions: Union[List[Dict[str, Any]], str, None]) -> CompiledValidator:
+    """Compile a question schema (list or stored JSON string) - identical schemas share one instance"""
+    if not questions:
+        return _compile_cached('[]')
+    if isinstance(questions, str):
+        return _compile_cached(questions)
+    return _compile_cached(json.dumps(questions, sort_keys=True, default=str))
+
+
+def validator_for_version(version_id: int) -> CompiledValidator:
+    validator = _version_validators.get(version_id)
+    if validator is None:
+        schema = version_schema(version_id)
+        validator = _compile_cached(schema[1] if schema else '[]')
+        if len(_version_validators) >= VERSION_VALIDATORS_MAX:
+            _version_validators.clear()
+        _version_validators[version_id] = validator
+    return validator
+
+
+def validator_for(survey_response: SurveyResponse) -> CompiledValidator:
+    """Validator of the version the response was started on (legacy responses: current questions)"""
+    if survey_response.survey_version_id:
+        return validator_for_version(survey_response.survey_version_id)
+    return compile_validator(survey_response.survey.questions)
+
+
+def validate_responses(survey_response: SurveyResponse, answers: Dict[str, Any],
+                       partial: bool = False) -> Dict[str, str]:
+    """Validate answers against the question schema of the response's survey version"""
+    return validator_for(survey_response)(answers, partial=partial)
+
+
+def shown_answers(survey_response: SurveyResponse, answers: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop answers to questions the skip logic of the response's version hides"""
+    return validator_for(survey_response).shown_answers(answers)
+
+
+def question_graph(survey_response: SurveyResponse) -> QuestionGraph:
+    """Compiled skip logic of the response's version (cached with its validator)"""
+    return validator_for(survey_response).graph
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(key: str) -> CompiledValidator:
+    try:
+        questions = json.loads(key)
+    except ValueError:
+        questions = []
+    if not isinstance(questions, list):
+        questions = []
+
+    checks, required = {}, []
+    for question in questions:
+        if not isinstance(question, dict) or question.get('id') is None:
+            continue
+        question_id = str(question['id'])
+        checks[question_id] = _compile_question(question)
+        if question.get('required'):
+            required.append(question_id)
+
+    try:
+        graph = compile_graph(questions)
+    except ValueError:
+        # Stored before skip logic was checked on publish - show every question
+        graph = compile_graph([{key: value for key, value in question.items() if key not in ('show_if', 'branches')}
+                               for question in questions if isinstance(question, dict)])
+    return CompiledValidator(checks, tuple(required), graph)
+
+
+def _compile_question(question: Dict[str, Any]) -> Check:
+    question_type = question.get('type')
+
+    if question_type in ('single_choice', 'single'):
+        return _compile_single_choice(question.get('options'))
+    if question_type in ('multiple_choice', 'multiple'):
+        return _compile_multiple_choice(question)
+    if question_type == 'scale':
+        return _compile_number(question.get('scale_min', question.get('min')),
+                               question.get('scale_max', question.get('max')), integer=True)
+    if question_type in ('number', 'rating'):
+        return _compile_number(question.get('min'), question.get('max'), integer=False)
+    if question_type == 'boolean':
+        return _check_boolean
+    if question_type == 'text':
+        return _compile_text(question.get('max_length') or DEFAULT_TEXT_MAX_LENGTH)
+    # Untyped or unknown question types: any JSON value
+    return _accept_any
+
+
+def _compile_single_choice(options) -> Check:
+    allowed = _as_set(options)
+
+    def check(value):
+        if isinstance(value, (list, dict)):
+            return 'Expected a single option'
+        if allowed is not None and not _contains(allowed, value):
+            return 'Unknown option'
+        return None
+    return check
+
+
+def _compile_multiple_choice(question: Dict[str, Any]) -> Check:
+    allowed = _as_set(question.get('options'))
+    min_selections = question.get('min_selections')
+    max_selections = question.get('max_selections')
+
+    def check(value):
+        # A scalar counts as a single selection
+        selected = value if isinstance(value, list) else [value]
+        for item in selected:
+            if isinstance(item, (list, dict)):
+                return 'Expected a list of options'
+            if allowed is not None and not _contains(allowed, item):
+                return 'Unknown option'
+        count = len(selected)
+        if len(set(map(str, selected))) != count:
+            return 'Duplicate option'
+        if min_selections is not None and count < min_selections:
+            return f'Select at least {min_selections} options'
+        if max_selections is not None and count > max_selections:
+            return f'Select at most {max_selections} options'
+        return None
+    return check
+
+
+def _compile_number(minimum, maximum, integer: bool) -> Check:
+    def check(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            return 'Expected a number'
+        if integer and value != int(value):
+            return 'Expected a whole number'
+        if minimum is not None and value < minimum:
+            return f'Must be at least {minimum}'
+        if maximum is not None and value > maximum:
+            return f'Must be at most {maximum}'
+        return None
+    return check
+
+
+def _compile_text(max_length: int) -> Check:
+    def check(value):
+        if not isinstance(value, str):
+            return 'Expected text'
+        if len(value) > max_length:
+            return f'Must be at most {max_length} characters'
+        return None
+    return check
+
+
+def _check_boolean(value):
+    return None if isinstance(value, bool) else 'Expected true or false'
+
+
+def _accept_any(value):
+    return None
+
+
+def _as_set(options):
+    if not options:
+        return None
+    try:
+        return frozenset(options)
+    except TypeError:
+        return tuple(options)
+
+
+def _contains(allowed, value) -> bool:
+    try:
+        return value in allowed
+    except TypeError:
+        return False
+
+
+def _is_blank(value) -> bool:
+    return value is None or value == '' or value == []
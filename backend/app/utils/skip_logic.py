@@ -0,0 +1,237 @@
+# backend/app/utils/skip_logic.py
+"""
+Skip Logic Engine for DataFair Survey System
+Übersetzt Bedingungen (show_if) und Sprünge (branches) einer Fragenliste einmalig in einen
+gerichteten azyklischen Graphen, aus dem sichtbare, nächste und Pflichtfragen berechnet werden
+
+Supported question keys (rules use the qualification rule format):
+    {'id': 'q3', 'show_if': {'field': 'q1', 'eq': 'yes'}}               # also a list of rules
+    {'id': 'q4', 'branches': [{'if': {'field': 'q4', 'in': ['no', 'never']}, 'goto': 'q9'},
+                              {'if': {'field': 'q4', 'eq': 'stop'}, 'goto': 'end'}]}
+
+Conditions may only refer to earlier questions (a branch also to its own question) and jumps
+only go forward, so question order is a topological order and the graph cannot contain a cycle.
+A hidden question counts as unanswered for every later condition and is never required.
+The graph is compiled with the validator of a survey version and cached with it.
+"""
+
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from .qualification import compile_criteria
+
+END = 'end'
+
+
+class _VisibleAnswers:
+    """Read-only answers view that hides the answers of hidden questions"""
+
+    __slots__ = ('answers', 'hidden')
+
+    def __init__(self, answers: Dict[str, Any], hidden: set):
+        self.answers = answers
+        self.hidden = hidden
+
+    def get(self, key, default=None):
+        if key in self.hidden:
+            return default
+        return self.answers.get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key not in self.hidden and key in self.answers
+
+
+class QuestionGraph:
+    """Compiled skip logic of one question list"""
+
+    __slots__ = ('order', 'conditions', 'jumps', 'dependents', 'required', 'conditional')
+
+    def __init__(self, order: tuple, conditions: Dict[int, tuple], jumps: Dict[int, tuple],
+                 dependents: Dict[str, FrozenSet[str]], required: tuple):
+        self.order = order
+        # question index -> (show_if predicate or None, indexes of questions that can jump over it)
+        self.conditions = conditions
+        # question index -> ((predicate, target index), ...) - the first matching branch wins
+        self.jumps = jumps
+        # question id -> ids of all questions whose visibility depends on it (transitively)
+        self.dependents = dependents
+        self.required = required
+        self.conditional = bool(conditions)
+
+    def _walk(self, answers: Dict[str, Any], stop_at_unanswered: bool = False):
+        """Visit the questions in order -> (hidden ids, first visible unanswered id)"""
+        hidden = set()
+        view = _VisibleAnswers(answers, hidden)
+        targets, next_question = {}, None
+        conditions, jumps = self.conditions, self.jumps
+        for index, question_id in enumerate(self.order):
+            condition = conditions.get(index)
+            if condition is not None:
+                show_if, jumpers = condition
+                if any(targets.get(source, 0) > index for source in jumpers) or \
+                        (show_if is not None and not show_if(view)):
+                    hidden.add(question_id)
+                    continue
+            if next_question is None and _is_blank(answers.get(question_id)):
+                next_question = question_id
+                if stop_at_unanswered:
+                    break
+            branches = jumps.get(index)
+            if branches is not None:
+                for predicate, target in branches:
+                    if predicate(view):
+                        targets[index] = target
+                        break
+        return hidden, next_question
+
+    def hidden_questions(self, answers: Dict[str, Any]) -> FrozenSet[str]:
+        """Questions not shown for these answers"""
+        if not self.conditional:
+            return frozenset()
+        return frozenset(self._walk(answers)[0])
+
+    def visible_questions(self, answers: Dict[str, Any]) -> List[str]:
+        hidden = self.hidden_questions(answers)
+        return [question_id for question_id in self.order if question_id not in hidden]
+
+    def next_question(self, answers: Dict[str, Any]) -> Optional[str]:
+        """First shown question without an answer (None = ready to submit); stops walking there"""
+        if not self.conditional:
+            for question_id in self.order:
+                if _is_blank(answers.get(question_id)):
+                    return question_id
+            return None
+        return self._walk(answers, stop_at_unanswered=True)[1]
+
+    def required_questions(self, answers: Dict[str, Any], hidden: Optional[FrozenSet[str]] = None) -> List[str]:
+        """Required questions that are shown for these answers"""
+        if hidden is None:
+            hidden = self.hidden_questions(answers)
+        return [question_id for question_id in self.required if question_id not in hidden]
+
+    def affects(self, question_ids) -> bool:
+        """Can answering these questions show or hide another question?"""
+        dependents = self.dependents
+        return any(dependents.get(str(question_id)) for question_id in question_ids)
+
+    def navigation(self, answers: Dict[str, Any]) -> Dict[str, Any]:
+        """Next question, shown questions and unanswered required questions in one pass"""
+        if self.conditional:
+            hidden, next_question = self._walk(answers)
+        else:
+            hidden, next_question = frozenset(), self.next_question(answers)
+        return {
+            'next_question': next_question,
+            'visible_questions': [question_id for question_id in self.order if question_id not in hidden],
+            'missing_required': [question_id for question_id in self.required_questions(answers, hidden)
+                                 if _is_blank(answers.get(question_id))]
+        }
+
+
+def compile_graph(questions: List[Dict[str, Any]]) -> QuestionGraph:
+    """Compile the skip logic of a question list - raises ValueError for invalid references"""
+    entries = [question for question in questions if isinstance(question, dict) and question.get('id') is not None]
+    order = tuple(str(question['id']) for question in entries)
+    position = {question_id: index for index, question_id in enumerate(order)}
+
+    show_ifs, jumps, inputs = {}, {}, {index: set() for index in range(len(order))}
+    for index, question in enumerate(entries):
+        question_id = order[index]
+        if question.get('show_if'):
+            criteria = _as_criteria(question['show_if'], question_id)
+            for field in _referenced_fields(criteria):
+                if position.get(field, index) >= index:
+                    raise ValueError(f'show_if of question {question_id} must refer to an earlier question, '
+                                     f'not {field}')
+                inputs[index].add(field)
+            show_ifs[index] = _compile(criteria, question_id)
+        if question.get('branches'):
+            jumps[index] = _compile_branches(question['branches'], question_id, index, position)
+
+    # A jump from source over question j makes j depend on the source and its branch rules
+    jumpers = {}
+    for source, branches in jumps.items():
+        fields = {order[source]}
+        for branch in entries[source]['branches']:
+            fields.update(_referenced_fields(_as_criteria(branch['if'], order[source])))
+        for index in range(source + 1, max(target for _, target in branches)):
+            jumpers.setdefault(index, []).append(source)
+            inputs[index].update(fields)
+
+    conditions = {index: (show_ifs.get(index), tuple(jumpers.get(index, ())))
+                  for index in set(show_ifs) | set(jumpers)}
+
+    # Transitive dependents in reverse topological order (conditions only look backwards)
+    dependents = {question_id: set() for question_id in order}
+    for index in range(len(order) - 1, -1, -1):
+        question_id = order[index]
+        for field in inputs[index]:
+            dependents[field].add(question_id)
+            dependents[field].update(dependents[question_id])
+
+    required = tuple(order[index] for index, question in enumerate(entries) if question.get('required'))
+    return QuestionGraph(order, conditions, jumps,
+                         {question_id: frozenset(ids) for question_id, ids in dependents.items() if ids},
+                         required)
+
+
+def _compile_branches(branches, question_id: str, index: int, position: Dict[str, int]) -> tuple:
+    if not isinstance(branches, list):
+        raise ValueError(f'branches of question {question_id} must be a list')
+    compiled = []
+    for branch in branches:
+        if not isinstance(branch, dict) or not branch.get('if') or branch.get('goto') in (None, ''):
+            raise ValueError(f'every branch of question {question_id} needs "if" and "goto"')
+        goto = str(branch['goto'])
+        target = len(position) if goto == END else position.get(goto)
+        if target is None or target <= index:
+            raise ValueError(f'branch of question {question_id} must jump forward, not to {goto}')
+        criteria = _as_criteria(branch['if'], question_id)
+        for field in _referenced_fields(criteria):
+            if position.get(field, index + 1) > index:
+                raise ValueError(f'branch of question {question_id} must refer to this or an earlier '
+                                 f'question, not {field}')
+        compiled.append((_compile(criteria, question_id), target))
+    return tuple(compiled)
+
+
+def _as_criteria(condition, question_id: str) -> Dict[str, Any]:
+    """A rule, a list of rules or full qualification criteria -> criteria dict"""
+    if isinstance(condition, list):
+        return {'rules': condition}
+    if isinstance(condition, dict):
+        if any(key in condition for key in ('rules', 'questions', 'demographics')):
+            return condition
+        return {'rules': [condition]}
+    raise ValueError(f'invalid condition in question {question_id}')
+
+
+def _compile(criteria: Dict[str, Any], question_id: str):
+    try:
+        return compile_criteria(criteria)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError(f'invalid condition in question {question_id}')
+
+
+def _referenced_fields(criteria: Dict[str, Any]) -> set:
+    fields = set()
+    for question in criteria.get('questions') or []:
+        if isinstance(question, dict) and 'id' in question:
+            fields.add(str(question['id']))
+    fields.update(str(field) for field in (criteria.get('demographics') or {}))
+    stack = list(criteria.get('rules') or [])
+    while stack:
+        rule = stack.pop()
+        if not isinstance(rule, dict):
+            continue
+        if 'field' in rule:
+            fields.add(str(rule['field']))
+        for key in ('all', 'any'):
+            if isinstance(rule.get(key), list):
+                stack.extend(rule[key])
+        if 'not' in rule:
+            stack.append(rule['not'])
+    return fields
+
+
+def _is_blank(value) -> bool:
+    return value is None or value == '' or value == []
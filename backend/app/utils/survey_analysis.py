@@ -0,0 +1,426 @@
+# backend/app/utils/survey_analysis.py
+"""
+Survey Analysis Engine for DataFair Survey System
+Lädt die Antworten einer Umfrage(-Version) einmal in spaltenweise NumPy-Arrays und
+berechnet Kreuztabellen, gewichtete Randverteilungen und Raking-Gewichte vektorisiert
+
+A frame holds the sorted ids of the completed responses (respondents) and, per question
+that was asked for, the answers from survey_answers as (response id, label code) arrays -
+one entry per selected option, so multiple choice questions work like single ones.
+Crosstabs are one np.bincount over combined codes, margins one weighted bincount, and each
+raking iteration one bincount plus one scaling per target question.
+
+Frames are cached per (survey, version) - version None covers all versions - and kept
+current incrementally: every ANALYSIS_REFRESH_SECONDS the responses completed since the
+last check are appended (their answers loaded for the columns already in memory); a
+changed respondent count (deleted responses) reloads the frame.
+
+NumPy is an optional dependency - analysis_available() tells whether it is installed.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from ..database import db
+from ..models import SurveyAnswer, SurveyResponse
+from .answer_store import _value_key
+
+# Optional dependency - only needed for the analysis endpoints
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Bound parameters per IN (...) list - stays below SQLite's variable limit
+IN_CHUNK = 500
+
+# Responses applied by the write-behind queue can carry a completed_at slightly in the past
+COMPLETED_AT_SLACK = timedelta(minutes=5)
+
+
+def analysis_available() -> bool:
+    return np is not None
+
+
+class AnswerColumn:
+    """Answers to one question: parallel response id / label code arrays"""
+
+    def __init__(self):
+        self.labels: List[str] = []
+        self.lookup: Dict[str, int] = {}
+        self.response_ids = np.empty(0, dtype=np.int64)
+        self.codes = np.empty(0, dtype=np.int32)
+        self.single = True
+        self._mapped = None
+
+    def extend(self, rows):
+        """Append (response_id, text, number, bool) rows from survey_answers"""
+        if not rows:
+            return
+        response_ids, *values = zip(*rows)
+        raw_codes = {}
+        for raw in set(zip(*values)):
+            label = _value_key(*raw)
+            code = self.lookup.get(label)
+            if code is None:
+                code = self.lookup[label] = len(self.labels)
+                self.labels.append(label)
+            raw_codes[raw] = code
+        codes = [raw_codes[raw] for raw in zip(*values)]
+        self.response_ids = np.concatenate([self.response_ids, np.array(response_ids, dtype=np.int64)])
+        self.codes = np.concatenate([self.codes, np.array(codes, dtype=np.int32)])
+        self.single = np.unique(self.response_ids).size == self.response_ids.size
+        self._mapped = None
+
+    def numbers(self):
+        """Numeric value per label (NaN for text and boolean labels)"""
+        values = np.full(len(self.labels), np.nan)
+        for code, label in enumerate(self.labels):
+            if label not in ('true', 'false'):
+                try:
+                    values[code] = float(label)
+                except ValueError:
+                    pass
+        return values
+
+    def mapped(self, frame: 'SurveyFrame') -> Tuple[Any, Any]:
+        """(respondent row, code) per answer - answers of other versions/removed responses dropped"""
+        if self._mapped is not None and self._mapped[0] == frame.generation:
+            return self._mapped[1], self._mapped[2]
+        respondents = frame.respondents
+        positions = np.searchsorted(respondents, self.response_ids)
+        valid = positions < respondents.size
+        valid[valid] = respondents[positions[valid]] == self.response_ids[valid]
+        rows, codes = positions[valid], self.codes[valid]
+        self._mapped = (frame.generation, rows, codes)
+        return rows, codes
+
+
+class SurveyFrame:
+    """Respondents of one survey (version) plus lazily loaded answer columns"""
+
+    def __init__(self, survey_id: int, version_id: Optional[int] = None):
+        self.survey_id = survey_id
+        self.version_id = version_id
+        self.respondents = np.empty(0, dtype=np.int64)
+        self.completed_until = None
+        self.columns: Dict[str, AnswerColumn] = {}
+        self.generation = 0
+        self.checked_at = None
+        self.lock = threading.RLock()
+
+    # =========================
+    # LOADING
+    # =========================
+
+    def _responses(self):
+        query = db.session.query(SurveyResponse.id).filter(SurveyResponse.survey_id == self.survey_id,
+                                                           SurveyResponse.is_completed == True)
+        if self.version_id is not None:
+            query = query.filter(SurveyResponse.survey_version_id == self.version_id)
+        return query
+
+    def _load(self):
+        ids = db.session.connection().execute(self._responses().order_by(SurveyResponse.id).statement)
+        self.respondents = np.array(ids.scalars().all(), dtype=np.int64)
+        self.completed_until = self._responses().with_entities(func.max(SurveyResponse.completed_at)).scalar()
+        self.columns = {}
+        self.generation += 1
+
+    def refresh(self, interval: float):
+        """Append responses completed since the last check (at most every interval seconds)"""
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < interval:
+            return
+        self.checked_at = now
+        if self.completed_until is None:
+            self._load()
+            return
+
+        recent = self._responses().with_entities(SurveyResponse.id, SurveyResponse.completed_at)\
+                                  .filter(SurveyResponse.completed_at >= self.completed_until - COMPLETED_AT_SLACK)
+        new_ids, latest = [], self.completed_until
+        for response_id, completed_at in recent:
+            new_ids.append(response_id)
+            if completed_at and completed_at > latest:
+                latest = completed_at
+        added = np.setdiff1d(np.array(new_ids, dtype=np.int64), self.respondents)
+        if added.size:
+            self.respondents = np.union1d(self.respondents, added)
+            self.completed_until = latest
+            self.generation += 1
+            for question_id, column in self.columns.items():
+                column.extend(self._answer_rows(question_id, added.tolist()))
+
+        if self._responses().count() != self.respondents.size:
+            self._load()  # responses were deleted
+
+    def _answer_rows(self, question_id: str, response_ids: Optional[List[int]] = None):
+        # Core select - ORM row processing would dominate at millions of answers
+        query = select(SurveyAnswer.response_id, SurveyAnswer.text_value, SurveyAnswer.numeric_value,
+                       SurveyAnswer.bool_value).where(SurveyAnswer.survey_id == self.survey_id,
+                                                      SurveyAnswer.question_id == question_id)
+        if response_ids is None:
+            return db.session.connection().execute(query).fetchall()
+        rows = []
+        for start in range(0, len(response_ids), IN_CHUNK):
+            chunk = query.where(SurveyAnswer.response_id.in_(response_ids[start:start + IN_CHUNK]))
+            rows.extend(db.session.connection().execute(chunk).fetchall())
+        return rows
+
+    def column(self, question_id: str) -> AnswerColumn:
+        column = self.columns.get(question_id)
+        if column is None:
+            column = AnswerColumn()
+            column.extend(self._answer_rows(question_id))
+            self.columns[question_id] = column
+        return column
+
+    # =========================
+    # VECTORS
+    # =========================
+
+    def dense(self, question_id: str):
+        """Code per respondent (-1 = unanswered) - single-answer questions only"""
+        column = self.column(question_id)
+        if not column.single:
+            raise ValueError(f'{question_id} has several answers per response')
+        rows, codes = column.mapped(self)
+        dense = np.full(self.respondents.size, -1, dtype=np.int32)
+        dense[rows] = codes
+        return dense
+
+    def mask(self, filters) -> Any:
+        """Respondents matching all (question_id, operator, value) filters of answer_store.parse_filters"""
+        mask = np.ones(self.respondents.size, dtype=bool)
+        for question_id, operator, raw in filters:
+            column = self.column(question_id)
+            rows, codes = column.mapped(self)
+            numbers = column.numbers()
+            try:
+                number = float(raw)
+            except ValueError:
+                number = None
+            if operator in ('>=', '<='):
+                if number is None:
+                    raise ValueError(f'Range filter needs a number: {question_id}{operator}{raw}')
+                with np.errstate(invalid='ignore'):
+                    matches = numbers >= number if operator == '>=' else numbers <= number
+            else:
+                matches = np.array([label == raw or label == raw.lower() for label in column.labels], dtype=bool)
+                if number is not None:
+                    matches |= numbers == number
+            hit = np.zeros(self.respondents.size, dtype=bool)
+            hit[rows[matches[codes]]] = True
+            mask &= hit
+        return mask
+
+    # =========================
+    # ANALYSIS
+    # =========================
+
+    def crosstab(self, row_question: str, column_question: str, weights) -> Tuple[Any, List[str], List[str]]:
+        """Weighted counts row label x column label (multiple choice: every selected pair counts)"""
+        row_column, col_column = self.column(row_question), self.column(column_question)
+        if not col_column.single and row_column.single:
+            table, columns, rows = self.crosstab(column_question, row_question, weights)
+            return table.T, rows, columns
+
+        rows_a, codes_a = row_column.mapped(self)
+        rows_b, codes_b = col_column.mapped(self)
+        size_a, size_b = len(row_column.labels), len(col_column.labels)
+        if col_column.single:
+            dense_b = np.full(self.respondents.size, -1, dtype=np.int64)
+            dense_b[rows_b] = codes_b
+            paired = dense_b[rows_a]
+            valid = paired >= 0
+            combined = codes_a[valid].astype(np.int64) * size_b + paired[valid]
+            table = np.bincount(combined, weights=weights[rows_a[valid]], minlength=size_a * size_b)
+            table = table.reshape(size_a, size_b)
+        else:
+            # Join the answer lists on the respondent row: B sorted by row, each A answer
+            # paired with its row's run of B answers - memory grows with the pairs, not rows x labels
+            order = np.argsort(rows_b, kind='stable')
+            sorted_rows, sorted_codes = rows_b[order], codes_b[order].astype(np.int64)
+            starts = np.searchsorted(sorted_rows, rows_a, side='left')
+            counts = np.searchsorted(sorted_rows, rows_a, side='right') - starts
+            pair_a = np.repeat(np.arange(rows_a.size), counts)
+            offsets = np.arange(pair_a.size) - np.repeat(np.cumsum(counts) - counts, counts)
+            pair_b = np.repeat(starts, counts) + offsets
+            combined = codes_a[pair_a].astype(np.int64) * size_b + sorted_codes[pair_b]
+            table = np.bincount(combined, weights=weights[rows_a[pair_a]], minlength=size_a * size_b)
+            table = table.reshape(size_a, size_b)
+        return table, row_column.labels, col_column.labels
+
+    def margins(self, question_id: str, weights) -> Tuple[Any, float, List[str]]:
+        """(weighted count per label, weighted respondents who answered, labels)"""
+        column = self.column(question_id)
+        rows, codes = column.mapped(self)
+        counts = np.bincount(codes, weights=weights[rows], minlength=len(column.labels))
+        respondents = rows if column.single else np.unique(rows)
+        base = float(weights[respondents].sum())
+        return counts, base, column.labels
+
+    def rake(self, targets: Dict[str, Dict[str, float]], weights, max_iterations: int,
+             tolerance: float) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Iterative proportional fitting: scale weights until every target question's weighted
+        shares match its target shares. Respondents without an answer (or with a label that
+        has no target) keep their weight for that question.
+        """
+        dimensions = []
+        for question_id, shares in targets.items():
+            if not isinstance(shares, dict) or not shares:
+                raise ValueError(f'targets for {question_id} must map answers to shares')
+            labels = [str(label) for label in shares]
+            target = np.array([float(shares[label]) for label in shares])
+            if (target < 0).any() or target.sum() <= 0:
+                raise ValueError(f'targets for {question_id} must be positive shares')
+            column = self.column(question_id)
+            dense = self.dense(question_id)
+            index = np.full(len(column.labels) + 1, -1, dtype=np.int64)
+            for position, label in enumerate(labels):
+                code = column.lookup.get(label)
+                if code is not None:
+                    index[code] = position
+            codes = index[dense]  # dense -1 -> last slot -> -1
+            dimensions.append((question_id, labels, target / target.sum(), codes, codes >= 0))
+
+        weights = weights.astype(np.float64).copy()
+        iterations, deviation = 0, 0.0
+        for iterations in range(1, max_iterations + 1):
+            deviation = 0.0
+            for _, labels, target, codes, valid in dimensions:
+                totals = np.bincount(codes[valid], weights=weights[valid], minlength=len(labels))
+                base = totals.sum()
+                if base <= 0:
+                    continue
+                deviation = max(deviation, float(np.abs(totals / base - target).max()))
+                factors = np.divide(target * base, totals, out=np.ones_like(totals), where=totals > 0)
+                weights[valid] *= factors[codes[valid]]
+            if deviation < tolerance:
+                break
+
+        unreachable = {}
+        for question_id, labels, target, codes, valid in dimensions:
+            present = np.bincount(codes[valid], minlength=len(labels)) > 0
+            missing = [label for label, share, found in zip(labels, target, present) if share > 0 and not found]
+            if missing:
+                unreachable[question_id] = missing
+
+        active = weights[weights > 0]
+        efficiency = float(active.sum() ** 2 / (active.size * (active ** 2).sum())) if active.size else 0.0
+        diagnostics = {
+            'iterations': iterations,
+            'converged': deviation < tolerance,
+            'max_deviation': round(deviation, 8),
+            'min_weight': round(float(active.min()), 6) if active.size else None,
+            'max_weight': round(float(active.max()), 6) if active.size else None,
+            'efficiency': round(efficiency, 6),
+            'design_effect': round(1 / efficiency, 6) if efficiency else None,
+            'unreachable': unreachable  # target answers nobody gave - their shares cannot be met
+        }
+        return weights, diagnostics
+
+
+_frames: 'OrderedDict[Tuple[int, Optional[int]], SurveyFrame]' = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def get_frame(survey_id: int, version_id: Optional[int] = None) -> SurveyFrame:
+    """Cached, refreshed frame of a survey version (LRU of ANALYSIS_CACHE_SURVEYS frames)"""
+    key = (survey_id, version_id)
+    with _frames_lock:
+        frame = _frames.get(key)
+        if frame is None:
+            frame = _frames[key] = SurveyFrame(survey_id, version_id)
+            while len(_frames) > current_app.config.get('ANALYSIS_CACHE_SURVEYS', 16):
+                _frames.popitem(last=False)
+        else:
+            _frames.move_to_end(key)
+    with frame.lock:
+        frame.refresh(current_app.config.get('ANALYSIS_REFRESH_SECONDS', 30))
+    return frame
+
+
+def _weights(frame: SurveyFrame, filters, targets) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """Respondent weights: filtered-out respondents 0, raked to targets if given"""
+    weights = frame.mask(filters).astype(np.float64)
+    if not targets:
+        return weights, None
+    config = current_app.config
+    return frame.rake(targets, weights, config.get('RAKING_MAX_ITERATIONS', 50),
+                      config.get('RAKING_TOLERANCE', 1e-6))
+
+
+def _table_dict(table, row_labels: List[str], column_labels: List[str], weighted: bool) -> Dict[str, Dict[str, Any]]:
+    result = {}
+    for row_index, row_label in enumerate(row_labels):
+        cells = {column_labels[column_index]: _number(value, weighted)
+                 for column_index, value in enumerate(table[row_index]) if value}
+        if cells:
+            result[row_label] = cells
+    return result
+
+
+def _number(value, weighted: bool):
+    return round(float(value), 4) if weighted else int(round(float(value)))
+
+
+def crosstab_report(survey_id: int, row_question: str, column_question: str, segment: Optional[str] = None,
+                    filters=(), targets: Optional[Dict[str, Dict[str, float]]] = None,
+                    version_id: Optional[int] = None) -> Dict[str, Any]:
+    """Crosstab (optionally per segment answer) with totals and raking diagnostics"""
+    frame = get_frame(survey_id, version_id)
+    with frame.lock:
+        weights, raking = _weights(frame, filters, targets)
+        weighted = raking is not None
+
+        def report(slice_weights):
+            table, row_labels, column_labels = frame.crosstab(row_question, column_question, slice_weights)
+            return {
+                'table': _table_dict(table, row_labels, column_labels, weighted),
+                'row_totals': {label: _number(value, weighted) for label, value in zip(row_labels, table.sum(axis=1)) if value},
+                'column_totals': {label: _number(value, weighted)
+                                  for label, value in zip(column_labels, table.sum(axis=0)) if value},
+                'total': _number(table.sum(), weighted)
+            }
+
+        result = dict(report(weights), row=row_question, column=column_question, weighted=weighted,
+                      respondents=int((weights > 0).sum()), raking=raking)
+        if segment:
+            column = frame.column(segment)
+            rows, codes = column.mapped(frame)
+            segments = {}
+            for code, label in enumerate(column.labels):
+                members = np.zeros(frame.respondents.size, dtype=bool)
+                members[rows[codes == code]] = True
+                if (weights[members] > 0).any():
+                    segments[label] = report(np.where(members, weights, 0.0))
+            result.update(segment=segment, segments=segments)
+        return result
+
+
+def margins_report(survey_id: int, question_ids: List[str], filters=(),
+                   targets: Optional[Dict[str, Dict[str, float]]] = None,
+                   version_id: Optional[int] = None) -> Dict[str, Any]:
+    """Weighted counts and shares per answer for each question"""
+    frame = get_frame(survey_id, version_id)
+    with frame.lock:
+        weights, raking = _weights(frame, filters, targets)
+        weighted = raking is not None
+        margins = {}
+        for question_id in question_ids:
+            counts, base, labels = frame.margins(question_id, weights)
+            margins[question_id] = {
+                'base': _number(base, weighted),
+                'counts': {label: _number(value, weighted) for label, value in zip(labels, counts) if value},
+                'shares': {label: round(float(value) / base, 6) for label, value in zip(labels, counts) if value and base}
+            }
+        return {'questions': margins, 'weighted': weighted, 'respondents': int((weights > 0).sum()), 'raking': raking}
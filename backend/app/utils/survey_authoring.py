@@ -0,0 +1,317 @@
+# backend/app/utils/survey_authoring.py
+"""
+Bulk Survey Authoring for DataFair Survey System
+Legt viele Umfragen in einem Aufruf an oder aktualisiert sie (Upsert über external_id):
+ein Validierungsdurchgang, eine Abfrage für vorhandene Umfragen, Bulk-Inserts/-Updates
+
+Each item is {'external_id': ..., 'title': ..., 'questions': [...], ...} (see FIELDS).
+Unknown external ids are created, known ones get only the fields the item carries; an
+item that changes nothing is reported as unchanged. Invalid items are reported with their
+errors and skipped, the valid ones are written in one transaction. Questions are published
+as survey versions (question sets deduplicated by content hash like publish_version).
+"""
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from ..database import db
+from ..models import QuestionSet, Survey, SurveyTransition, SurveyVersion
+from .catalog_events import publish
+from .qualification import compile_criteria
+from .survey_scheduler import apply_due_transitions, schedule_changed, sync_schedule
+from .survey_versions import canonical_questions, check_questions, content_hash, get_question_set
+
+# Writable fields of a bulk item (external_id identifies the survey)
+FIELDS = ('title', 'description', 'category', 'reward_amount', 'estimated_duration', 'max_responses',
+          'questions', 'qualification_criteria', 'is_active', 'starts_at', 'ends_at')
+EXTERNAL_ID_MAX_LENGTH = 100
+
+# Bound parameters per IN (...) list - stays below SQLite's variable limit
+IN_CHUNK = 500
+
+CREATED, UPDATED, UNCHANGED, INVALID = 'created', 'updated', 'unchanged', 'invalid'
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """ISO 8601 string (or None) -> naive UTC datetime; raises ValueError"""
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def validate_item(item: Any, config) -> Tuple[Optional[str], Dict[str, Any], Dict[str, str]]:
+    """One bulk item -> (external_id, normalized values, errors per field)"""
+    if not isinstance(item, dict):
+        return None, {}, {'item': 'must be an object'}
+
+    errors, values = {}, {}
+    external_id = item.get('external_id')
+    if isinstance(external_id, int) and not isinstance(external_id, bool):
+        external_id = str(external_id)
+    if not isinstance(external_id, str) or not external_id.strip():
+        errors['external_id'] = 'is required'
+        external_id = None
+    elif len(external_id) > EXTERNAL_ID_MAX_LENGTH:
+        errors['external_id'] = f'must be at most {EXTERNAL_ID_MAX_LENGTH} characters'
+
+    for key in item:
+        if key != 'external_id' and key not in FIELDS:
+            errors[key] = 'unknown field'
+
+    if 'title' in item:
+        title = item['title']
+        if not isinstance(title, str) or not title.strip() or len(title) > 200:
+            errors['title'] = 'must be a non-empty text of at most 200 characters'
+        else:
+            values['title'] = title.strip()
+    if 'description' in item:
+        if item['description'] is not None and not isinstance(item['description'], str):
+            errors['description'] = 'must be text'
+        else:
+            values['description'] = item['description']
+    if 'category' in item:
+        category = item['category']
+        if category is not None and (not isinstance(category, str) or len(category) > 50):
+            errors['category'] = 'must be text of at most 50 characters'
+        else:
+            values['category'] = category
+
+    if 'reward_amount' in item:
+        minimum, maximum = config.get('MIN_REWARD_AMOUNT', 1.0), config.get('MAX_REWARD_AMOUNT', 100.0)
+        try:
+            if isinstance(item['reward_amount'], bool):
+                raise InvalidOperation
+            reward = Decimal(str(item['reward_amount'])).quantize(Decimal('0.01'))
+            if not minimum <= reward <= maximum:
+                raise InvalidOperation
+            values['reward_amount'] = reward
+        except (InvalidOperation, ValueError):
+            errors['reward_amount'] = f'must be a number between {minimum} and {maximum}'
+    for key in ('estimated_duration', 'max_responses'):
+        if key in item:
+            value = item[key]
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                errors[key] = 'must be a positive whole number'
+            else:
+                values[key] = value
+    if 'is_active' in item:
+        if not isinstance(item['is_active'], bool):
+            errors['is_active'] = 'must be true or false'
+        else:
+            values['is_active'] = item['is_active']
+
+    if 'questions' in item:
+        try:
+            values['questions'] = canonical_questions(check_questions(item['questions']))
+        except ValueError as e:
+            errors['questions'] = str(e)
+    if 'qualification_criteria' in item:
+        criteria = item['qualification_criteria']
+        try:
+            if criteria is not None and not isinstance(criteria, dict):
+                raise ValueError
+            compile_criteria(criteria)
+            values['qualification_criteria'] = json.dumps(criteria, sort_keys=True) if criteria else None
+        except (KeyError, TypeError, ValueError, AttributeError):
+            errors['qualification_criteria'] = 'invalid qualification criteria'
+
+    for key in ('starts_at', 'ends_at'):
+        if key in item:
+            try:
+                values[key] = parse_timestamp(item[key])
+            except ValueError:
+                errors[key] = 'must be an ISO 8601 timestamp'
+    if values.get('starts_at') and values.get('ends_at') and values['ends_at'] <= values['starts_at']:
+        errors['ends_at'] = 'must be after starts_at'
+
+    return external_id, values, errors
+
+
+def _existing_surveys(external_ids: List[str]) -> Dict[str, Any]:
+    """external_id -> current row of the writable columns (one query per IN_CHUNK ids)"""
+    columns = [Survey.id, Survey.external_id, Survey.owner_id, Survey.current_version_id] + [getattr(Survey, key) for key in FIELDS]
+    existing = {}
+    for start in range(0, len(external_ids), IN_CHUNK):
+        for row in db.session.query(*columns).filter(Survey.external_id.in_(external_ids[start:start + IN_CHUNK])):
+            existing[row.external_id] = row
+    return existing
+
+
+def _changes(row, values: Dict[str, Any]) -> Dict[str, Any]:
+    changes = {}
+    for key, value in values.items():
+        current = getattr(row, key)
+        if key == 'questions':
+            current = canonical_questions(current)
+        elif key == 'reward_amount' and current is not None:
+            current = Decimal(str(current)).quantize(Decimal('0.01'))
+        if current != value:
+            changes[key] = value
+    return changes
+
+
+def _question_set_ids(canonicals: List[str]) -> Dict[str, int]:
+    """content hash -> question_sets.id, inserting the missing snapshots in one statement"""
+    by_hash = {content_hash(canonical): canonical for canonical in canonicals}
+    hashes = list(by_hash)
+    ids = {}
+    for start in range(0, len(hashes), IN_CHUNK):
+        ids.update(db.session.query(QuestionSet.content_hash, QuestionSet.id)
+                             .filter(QuestionSet.content_hash.in_(hashes[start:start + IN_CHUNK])))
+    missing = [{'content_hash': digest, 'questions': by_hash[digest], 'created_at': datetime.utcnow()}
+               for digest in hashes if digest not in ids]
+    if missing:
+        try:
+            with db.session.begin_nested():
+                ids.update(db.session.execute(insert(QuestionSet).returning(QuestionSet.content_hash,
+                                                                            QuestionSet.id), missing).all())
+        except IntegrityError:
+            # Another request stored some of these snapshots meanwhile
+            for row in missing:
+                ids[row['content_hash']] = get_question_set(row['questions']).id
+    return ids
+
+
+def _publish_versions(questions_by_survey: Dict[int, str]) -> Dict[int, int]:
+    """New current version per survey -> survey id: version id (caller updates the surveys)"""
+    if not questions_by_survey:
+        return {}
+    set_ids = _question_set_ids(list(set(questions_by_survey.values())))
+    survey_ids = list(questions_by_survey)
+    last = {}
+    for start in range(0, len(survey_ids), IN_CHUNK):
+        last.update(db.session.query(SurveyVersion.survey_id, db.func.max(SurveyVersion.version))
+                              .filter(SurveyVersion.survey_id.in_(survey_ids[start:start + IN_CHUNK]))
+                              .group_by(SurveyVersion.survey_id))
+    now = datetime.utcnow()
+    rows = [{'survey_id': survey_id, 'version': last.get(survey_id, 0) + 1,
+             'question_set_id': set_ids[content_hash(canonical)], 'created_at': now}
+            for survey_id, canonical in questions_by_survey.items()]
+    return dict(db.session.execute(insert(SurveyVersion).returning(SurveyVersion.survey_id, SurveyVersion.id),
+                                   rows).all())
+
+
+def _sync_schedules(survey_ids: List[int]):
+    """Transition rows for surveys whose starts_at/ends_at were written (two queries per chunk)"""
+    for start in range(0, len(survey_ids), IN_CHUNK):
+        chunk = survey_ids[start:start + IN_CHUNK]
+        existing = {}
+        for transition in SurveyTransition.query.filter(SurveyTransition.survey_id.in_(chunk)):
+            existing.setdefault(transition.survey_id, []).append(transition)
+        for survey in Survey.query.filter(Survey.id.in_(chunk)):
+            sync_schedule(survey, existing.get(survey.id, []))
+
+
+def _notify(survey_ids: List[int]):
+    """Catalog listeners and recommendations for the written surveys (after commit)"""
+    columns = (Survey.id, Survey.is_active, Survey.reward_amount, Survey.estimated_duration, Survey.max_responses,
+               Survey.total_responses, Survey.reserved_slots, Survey.qualification_criteria,
+               Survey.starts_at, Survey.ends_at)
+    for start in range(0, len(survey_ids), IN_CHUNK):
+        for row in db.session.query(*columns).filter(Survey.id.in_(survey_ids[start:start + IN_CHUNK])):
+            publish(row, 'bulk')
+
+
+def bulk_upsert(items: List[Any], dry_run: bool = False, owner_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Create or update surveys by external_id -> summary with one result per item (input order).
+    dry_run validates and reports what would happen without writing. With an owner_id (customer)
+    new surveys belong to that user and surveys of anyone else are reported invalid, not touched.
+    """
+    config = current_app.config
+    results, pending = [], {}
+    for index, item in enumerate(items):
+        external_id, values, errors = validate_item(item, config)
+        if external_id is not None and external_id in pending and not errors:
+            errors = {'external_id': f'duplicate of item {pending[external_id][0]}'}
+        result = {'index': index, 'external_id': external_id}
+        if errors:
+            result.update(status=INVALID, errors=errors)
+        else:
+            pending[external_id] = (index, values)
+        results.append(result)
+
+    existing = _existing_surveys(list(pending))
+    creates, updates = [], []
+    for external_id, (index, values) in pending.items():
+        row = existing.get(external_id)
+        if row is None:
+            if 'title' not in values:
+                results[index].update(status=INVALID, errors={'title': 'is required for a new survey'})
+                continue
+            results[index]['status'] = CREATED
+            creates.append((index, external_id, values))
+            continue
+        if owner_id is not None and row.owner_id != owner_id:
+            results[index].update(status=INVALID, errors={'external_id': 'belongs to a survey you do not own'})
+            continue
+        results[index]['id'] = row.id
+        changes = _changes(row, values)
+        results[index]['status'] = UPDATED if changes else UNCHANGED
+        if changes:
+            updates.append((index, row, changes))
+
+    if not dry_run and (creates or updates):
+        _write(creates, updates, results, config, owner_id)
+
+    summary = {status: 0 for status in (CREATED, UPDATED, UNCHANGED, INVALID)}
+    for result in results:
+        summary[result['status']] += 1
+    return dict(summary, dry_run=dry_run, results=results)
+
+
+def _write(creates, updates, results, config, owner_id):
+    now = datetime.utcnow()
+    rows = []
+    for _, external_id, values in creates:
+        row = {'external_id': external_id, 'description': None, 'category': None, 'reward_amount': Decimal('0.00'),
+               'estimated_duration': config.get('DEFAULT_SURVEY_DURATION', 5),
+               'max_responses': config.get('MAX_SURVEY_RESPONSES', 1000), 'questions': '[]',
+               'qualification_criteria': None, 'is_active': True, 'starts_at': None, 'ends_at': None,
+               'total_responses': 0, 'reserved_slots': 0, 'owner_id': owner_id, 'created_at': now, 'updated_at': now,
+               'content_updated_at': now}
+        row.update(values)
+        # Bulk statements skip the ORM flush hook that keeps reward_per_minute in sync
+        row['reward_per_minute'] = Survey.compute_reward_per_minute(row['reward_amount'], row['estimated_duration'])
+        rows.append(row)
+    created_ids = dict(db.session.execute(insert(Survey).returning(Survey.external_id, Survey.id), rows).all()) \
+        if rows else {}
+
+    changes_by_id, questions = {}, {}
+    for (index, external_id, values), row in zip(creates, rows):
+        survey_id = created_ids[external_id]
+        results[index]['id'] = survey_id
+        questions[survey_id] = row['questions']
+    for index, current, changes in updates:
+        changes = dict(changes, updated_at=now, content_updated_at=now)
+        if 'reward_amount' in changes or 'estimated_duration' in changes:
+            changes['reward_per_minute'] = Survey.compute_reward_per_minute(
+                changes.get('reward_amount', current.reward_amount),
+                changes.get('estimated_duration', current.estimated_duration))
+        if 'questions' in changes:
+            questions[current.id] = changes['questions']
+        changes_by_id[current.id] = changes
+
+    for survey_id, version_id in _publish_versions(questions).items():
+        changes_by_id.setdefault(survey_id, {})['current_version_id'] = version_id
+    # ORM bulk UPDATE by primary key, grouped into one executemany per set of columns
+    db.session.execute(update(Survey), [dict(changes, id=survey_id) for survey_id, changes in changes_by_id.items()])
+
+    scheduled = [results[index]['id'] for index, _, values in creates if values.get('starts_at') or values.get('ends_at')]
+    scheduled += [current.id for _, current, changes in updates if 'starts_at' in changes or 'ends_at' in changes]
+    _sync_schedules(scheduled)
+    db.session.commit()
+
+    if scheduled:
+        apply_due_transitions()
+        schedule_changed()
+    _notify(list(created_ids.values()) + [current.id for _, current, _ in updates])
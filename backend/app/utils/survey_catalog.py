@@ -0,0 +1,132 @@
+# backend/app/utils/survey_catalog.py
+"""
+Survey Catalog Queries for DataFair Survey System
+Gefilterter, sortierter Umfragekatalog mit Cursor-Paginierung (Keyset statt OFFSET)
+
+Every sort order walks one of the idx_surveys_catalog_* indexes (is_active, [category,]
+sort column, id) backwards; the cursor is the (sort value, id) of the last row, so page N
+costs the same as page 1. Reward range and duration filters are checked while walking the
+index, "not completed by me" is an anti-join on unique_user_survey.
+"""
+
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, tuple_
+
+from ..database import db
+from ..models import Survey, SurveyResponse
+
+# sort name -> column (always descending, id breaks ties)
+SORT_COLUMNS = {
+    'newest': Survey.created_at,
+    'reward': Survey.reward_amount,
+    'reward_per_minute': Survey.reward_per_minute,
+}
+DEFAULT_SORT = 'newest'
+
+
+class CatalogQueryError(ValueError):
+    """Invalid filter, sort or cursor parameter"""
+
+
+def encode_cursor(sort: str, survey: Survey) -> str:
+    value = getattr(survey, SORT_COLUMNS[sort].key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    raw = json.dumps([sort, value, survey.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """Cursor -> (sort value, id); raises CatalogQueryError for foreign or damaged cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, value, survey_id = json.loads(raw)
+        if cursor_sort != sort:
+            raise CatalogQueryError('cursor belongs to a different sort order')
+        if sort == 'newest':
+            value = datetime.fromisoformat(value)
+        elif sort == 'reward':
+            value = Decimal(value)
+        else:
+            value = float(value)
+        return value, int(survey_id)
+    except CatalogQueryError:
+        raise
+    except (ValueError, TypeError, ArithmeticError):
+        raise CatalogQueryError('invalid cursor')
+
+
+def parse_filters(args) -> Dict[str, Any]:
+    """Query-string arguments -> filter dict (raises CatalogQueryError)"""
+    sort = args.get('sort', DEFAULT_SORT)
+    if sort not in SORT_COLUMNS:
+        raise CatalogQueryError(f"sort must be one of: {', '.join(SORT_COLUMNS)}")
+
+    filters = {'sort': sort, 'category': (args.get('category') or '').strip() or None}
+    for name in ('min_reward', 'max_reward'):
+        value = args.get(name)
+        try:
+            filters[name] = Decimal(value) if value not in (None, '') else None
+        except ArithmeticError:
+            raise CatalogQueryError(f'{name} must be a number')
+    max_duration = args.get('max_duration')
+    if max_duration not in (None, ''):
+        try:
+            filters['max_duration'] = int(max_duration)
+        except ValueError:
+            raise CatalogQueryError('max_duration must be an integer (minutes)')
+    else:
+        filters['max_duration'] = None
+    filters['exclude_completed'] = (args.get('exclude_completed') or '').lower() in ('1', 'true', 'yes')
+    return filters
+
+
+def catalog_page(filters: Dict[str, Any], limit: int, cursor: Optional[str] = None,
+                 user_id: Optional[int] = None) -> Tuple[List[Survey], Optional[str]]:
+    """
+    One page of active surveys -> (surveys, next cursor or None).
+    exclude_completed only applies with a user_id.
+    """
+    sort = filters['sort']
+    column = SORT_COLUMNS[sort]
+    query = Survey.query.filter(Survey.is_active == True)
+
+    if filters.get('category'):
+        query = query.filter(Survey.category == filters['category'])
+    if filters.get('min_reward') is not None:
+        query = query.filter(Survey.reward_amount >= filters['min_reward'])
+    if filters.get('max_reward') is not None:
+        query = query.filter(Survey.reward_amount <= filters['max_reward'])
+    if filters.get('max_duration') is not None:
+        query = query.filter(Survey.estimated_duration <= filters['max_duration'])
+    if filters.get('exclude_completed') and user_id:
+        completed = db.session.query(SurveyResponse.id).filter(
+            and_(SurveyResponse.user_id == user_id,
+                 SurveyResponse.survey_id == Survey.id,
+                 SurveyResponse.is_completed == True))
+        query = query.filter(~completed.exists())
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        query = query.filter(tuple_(column, Survey.id) < tuple_(value, last_id))
+
+    rows = query.order_by(column.desc(), Survey.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(sort, page[-1]) if len(rows) > limit else None
+    return page, next_cursor
+
+
+def completed_survey_ids(user_id: int, survey_ids: List[int]) -> set:
+    """Which of these surveys the user already has a response for (one query per page)"""
+    if not survey_ids:
+        return set()
+    rows = db.session.query(SurveyResponse.survey_id)\
+                     .filter(SurveyResponse.user_id == user_id, SurveyResponse.survey_id.in_(survey_ids))
+    return {survey_id for survey_id, in rows}
@@ -1,54 +1,36 @@
 # backend/app/utils/survey_engine.py
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
-from sqlalchemy import and_, or_
-from ..models.survey import Survey, SurveyResponse, QualificationResponse
-from .. import db
+from typing import Dict, Iterable, List, Any
+from ..models import Survey, SurveyResponse
+from ..database import db
+from .qualification import compile_criteria
+from .recommendations import recommend_surveys
 
 class SurveyEngine:
     def check_qualification(self, criteria: Dict[str, Any], answers: Dict[str, Any], user_id: int) -> Dict[str, Any]:
-        """Check if user qualifies for survey"""
+        """Check if user qualifies for survey (criteria are compiled once and cached)"""
         try:
-            if not criteria:
-                return {'qualified': True, 'reason': 'Keine Qualifikationskriterien erforderlich'}
-            
-            # Check custom qualification questions
-            if 'questions' in criteria:
-                for question in criteria['questions']:
-                    question_id = question['id']
-                    required_answer = question.get('required_answer')
-                    
-                    if question_id not in answers:
-                        return {'qualified': False, 'reason': 'Nicht alle Qualifikationsfragen beantwortet'}
-                    
-                    user_answer = answers[question_id]
-                    
-                    if required_answer is not None and user_answer != required_answer:
-                        return {
-                            'qualified': False,
-                            'reason': question.get('disqualify_reason', 'Qualifikationskriterien nicht erfüllt')
-                        }
-                        
-            return {'qualified': True, 'reason': 'Alle Qualifikationskriterien erfüllt'}
+            return compile_criteria(criteria).check(answers)
             
         except Exception as e:
             return {'qualified': False, 'reason': f'Fehler bei der Qualifikationsprüfung: {str(e)}'}
     
-    def get_alternative_surveys(self, user_id: int, excluded_category: str = None, limit: int = 5) -> List[Survey]:
-        """Get alternative surveys for user"""
-        query = db.session.query(Survey).filter(
-            and_(
-                Survey.status == 'active',
-                or_(Survey.expires_at.is_(None), Survey.expires_at > datetime.utcnow()),
-                ~Survey.id.in_(
-                    db.session.query(SurveyResponse.survey_id).filter(
-                        SurveyResponse.user_id == user_id
-                    )
-                )
-            )
-        )
-        
-        if excluded_category:
-            query = query.filter(Survey.category != excluded_category)
-        
-        return query.order_by(Survey.base_reward.desc()).limit(limit).all()
\ No newline at end of file
+    def check_surveys_for_user(self, criteria_by_survey: Dict[int, Any], answers: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+        """Screen one user against many surveys in a single pass"""
+        return {
+            survey_id: self.check_qualification(criteria, answers, None)
+            for survey_id, criteria in criteria_by_survey.items()
+        }
+    
+    def qualified_users(self, criteria: Any, answers_by_user: Dict[int, Dict[str, Any]]) -> List[int]:
+        """Screen many users against one survey in a single pass - returns qualified user ids"""
+        predicate = compile_criteria(criteria)
+        return [user_id for user_id, answers in answers_by_user.items() if predicate(answers)]
+    
+    def load_criteria(self, surveys: Iterable[Survey]) -> Dict[int, Any]:
+        """{survey_id: stored criteria JSON} - compiled predicates are cached per JSON string"""
+        return {survey.id: survey.qualification_criteria or {} for survey in surveys}
+    
+    def get_alternative_surveys(self, user_id: int, exclude_survey_id: int = None, limit: int = 5) -> List[Survey]:
+        """Get alternative surveys for user (e.g. after a disqualification) from the precomputed ranking"""
+        exclude = [exclude_survey_id] if exclude_survey_id else []
+        return recommend_surveys(user_id, limit, exclude)
@@ -0,0 +1,195 @@
+# backend/app/utils/survey_scheduler.py
+"""
+Survey Scheduler for DataFair Survey System
+Aktiviert und deaktiviert Umfragen genau zu starts_at / ends_at; geplante Übergänge
+werden in survey_transitions gespeichert und nach einem Neustart nachgeholt
+
+Each survey with starts_at/ends_at gets one 'activate'/'deactivate' row per time.
+The scheduler thread keeps the pending rows in a heap and sleeps until the earliest
+one is due. Applying a row is a conditional UPDATE (applied_at IS NULL), so several
+processes can run the scheduler and every transition still happens exactly once.
+Transitions that fell due while the app was down are applied at startup, in order.
+"""
+
+import heapq
+import threading
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+
+from ..database import db
+from ..models import Survey, SurveyTransition
+from .catalog_events import publish
+
+ACTIVATE = 'activate'
+DEACTIVATE = 'deactivate'
+
+
+def desired_transitions(survey: Survey) -> Set[Tuple[str, datetime]]:
+    """(action, due_at) pairs the survey's schedule asks for"""
+    wanted = set()
+    if survey.starts_at:
+        wanted.add((ACTIVATE, survey.starts_at))
+    if survey.ends_at:
+        wanted.add((DEACTIVATE, survey.ends_at))
+    return wanted
+
+
+def sync_schedule(survey: Survey, existing: Optional[List[SurveyTransition]] = None,
+                  now: Optional[datetime] = None):
+    """
+    Bring the survey's transition rows in line with starts_at/ends_at (caller commits).
+    Pending rows for old times are dropped; a survey that has not started yet is hidden.
+    """
+    now = now or datetime.utcnow()
+    if existing is None:
+        existing = SurveyTransition.query.filter_by(survey_id=survey.id).all()
+    wanted = desired_transitions(survey)
+
+    known, closed_by_schedule = set(), False
+    for transition in existing:
+        key = (transition.action, transition.due_at)
+        if key not in wanted and transition.applied_at is None:
+            db.session.delete(transition)
+        else:
+            known.add(key)
+        if transition.action == DEACTIVATE and transition.applied_at is not None:
+            closed_by_schedule = True
+
+    for action, due_at in wanted:
+        if (action, due_at) in known:
+            continue
+        db.session.add(SurveyTransition(survey_id=survey.id, action=action, due_at=due_at))
+        if action == ACTIVATE and due_at > now:
+            survey.is_active = False
+        elif action == DEACTIVATE and due_at > now and closed_by_schedule \
+                and not (survey.starts_at and survey.starts_at > now):
+            survey.is_active = True  # end date extended after the survey had expired
+
+
+def sync_all_schedules():
+    """Startup reconcile: transition rows for every scheduled survey (two queries)"""
+    surveys = Survey.query.filter((Survey.starts_at.isnot(None)) | (Survey.ends_at.isnot(None))).all()
+    existing = {}
+    for transition in SurveyTransition.query.all():
+        existing.setdefault(transition.survey_id, []).append(transition)
+    for survey in surveys:
+        sync_schedule(survey, existing.get(survey.id, []))
+    # Schedules cleared meanwhile leave pending rows behind
+    scheduled = {survey.id for survey in surveys}
+    for survey_id, transitions in existing.items():
+        if survey_id not in scheduled:
+            for transition in transitions:
+                if transition.applied_at is None:
+                    db.session.delete(transition)
+    db.session.commit()
+
+
+def apply_due_transitions(now: Optional[datetime] = None) -> List[Survey]:
+    """Apply every pending transition that is due, oldest first - returns the changed surveys"""
+    now = now or datetime.utcnow()
+    due = SurveyTransition.query.filter(SurveyTransition.applied_at.is_(None), SurveyTransition.due_at <= now)\
+                                .order_by(SurveyTransition.due_at, SurveyTransition.id).all()
+    changed = {}
+    for transition in due:
+        claimed = SurveyTransition.query.filter(SurveyTransition.id == transition.id,
+                                                SurveyTransition.applied_at.is_(None))\
+                                        .update({'applied_at': now}, synchronize_session=False)
+        if not claimed:
+            continue  # another process applied it
+        survey = db.session.get(Survey, transition.survey_id)
+        if survey is None:
+            continue
+        if transition.action == ACTIVATE:
+            # Catch-up: an activation whose survey has ended meanwhile stays closed
+            survey.is_active = not (survey.ends_at and survey.ends_at <= now)
+        else:
+            survey.is_active = False
+        changed[survey.id] = (survey, transition.action)
+    db.session.commit()
+
+    for survey, action in changed.values():
+        publish(survey, action)
+    return [survey for survey, _ in changed.values()]
+
+
+class SurveyScheduler:
+    """Heap of pending transitions; a thread sleeps until the earliest is due"""
+
+    def __init__(self, app):
+        self.app = app
+        self.rescan_seconds = app.config.get('SURVEY_SCHEDULER_RESCAN_SECONDS', 60)
+        self._heap = []             # (due_at, transition_id)
+        self._reload = True
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='survey-scheduler', daemon=True)
+            self._thread.start()
+
+    def reload(self):
+        """Schedules changed - re-read pending transitions before sleeping again"""
+        with self._condition:
+            self._reload = True
+            self._condition.notify()
+
+    def _load(self):
+        rows = db.session.query(SurveyTransition.due_at, SurveyTransition.id)\
+                         .filter(SurveyTransition.applied_at.is_(None)).all()
+        heap = [tuple(row) for row in rows]
+        heapq.heapify(heap)
+        with self._condition:
+            self._heap = heap
+
+    def _run(self):
+        while True:
+            failed = False
+            with self.app.app_context():
+                try:
+                    if self._reload:
+                        self._reload = False
+                        self._load()
+                    if self._heap and self._heap[0][0] <= datetime.utcnow():
+                        apply_due_transitions()
+                        self._load()
+                except Exception as e:
+                    db.session.rollback()
+                    failed = True
+                    print(f"Survey scheduler error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+            with self._condition:
+                if self._reload:
+                    continue
+                timeout = 1 if failed else self.rescan_seconds
+                if self._heap:
+                    timeout = min(timeout, max((self._heap[0][0] - datetime.utcnow()).total_seconds(), 0))
+                if timeout > 0:
+                    self._condition.wait(timeout)
+                if timeout >= self.rescan_seconds:
+                    self._reload = True  # periodic rescan picks up rows written by other processes
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_survey_scheduler(app):
+    """Call at startup: catch up on missed transitions, then schedule the pending ones"""
+    global _scheduler
+    with app.app_context():
+        sync_all_schedules()
+        apply_due_transitions()
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SurveyScheduler(app)
+            _scheduler.start()
+    return _scheduler
+
+
+def schedule_changed():
+    """Hook for code that changed starts_at/ends_at (after commit) - no-op until the scheduler runs"""
+    if _scheduler is not None:
+        _scheduler.reload()
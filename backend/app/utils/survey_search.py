@@ -0,0 +1,135 @@
+# backend/app/utils/survey_search.py
+"""
+Full-Text Survey Search for DataFair Survey System
+Volltextsuche über Titel und Beschreibung - SQLite FTS5 bzw. PostgreSQL tsvector,
+sortiert nach Relevanz (bm25) kombiniert mit der Vergütung
+
+SQLite: external-content FTS5 table surveys_fts over surveys, kept in sync by triggers.
+PostgreSQL: generated tsvector column surveys.search_vector with a GIN index.
+Both are created on first use (ensure_search_index) and backfilled from existing rows.
+
+Score = relevance * (1 + SEARCH_REWARD_WEIGHT * reward / (reward + SEARCH_REWARD_PIVOT)):
+relevance decides, the reward boost saturates so a high reward cannot bury a good match.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+
+from flask import current_app
+from sqlalchemy import text
+
+from ..database import db
+
+# Title matches weigh twice as much as description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 5.0
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS surveys_fts USING fts5(
+        title, description, content='surveys', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS surveys_fts_insert AFTER INSERT ON surveys BEGIN
+        INSERT INTO surveys_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS surveys_fts_delete AFTER DELETE ON surveys BEGIN
+        INSERT INTO surveys_fts(surveys_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS surveys_fts_update AFTER UPDATE OF title, description ON surveys BEGIN
+        INSERT INTO surveys_fts(surveys_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO surveys_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE surveys ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('german', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('german', coalesce(description, '')), 'B')) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_surveys_search ON surveys USING GIN (search_vector)",
+]
+
+_ready = set()   # engine urls with an index in place
+_lock = threading.Lock()
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def ensure_search_index():
+    """Create the search index (and backfill it) if this database has none yet"""
+    engine = db.engine
+    key = str(engine.url)
+    if key in _ready:
+        return
+    with _lock:
+        if key in _ready:
+            return
+        dialect = engine.dialect.name
+        with engine.begin() as connection:
+            if dialect == 'sqlite':
+                existing = {name for name, in connection.execute(text(
+                    "SELECT name FROM sqlite_master WHERE name LIKE 'surveys_fts%'"))}
+                if not {'surveys_fts', 'surveys_fts_insert', 'surveys_fts_delete',
+                        'surveys_fts_update'} <= existing:
+                    for statement in SQLITE_DDL:
+                        connection.execute(text(statement))
+                    connection.execute(text("INSERT INTO surveys_fts(surveys_fts) VALUES ('rebuild')"))
+            elif dialect == 'postgresql':
+                for statement in POSTGRES_DDL:
+                    connection.execute(text(statement))
+        _ready.add(key)
+
+
+def match_expression(query: str) -> str:
+    """User input -> safe FTS5 query: every word must match, the last one as a prefix"""
+    tokens = TOKEN_PATTERN.findall(query or '')
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_surveys(query: str, limit: int, offset: int = 0) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Active surveys matching the query, best first -> (rows, has_more).
+    Each row: id, title, description, reward_amount, estimated_duration, score.
+    """
+    ensure_search_index()
+    config = current_app.config
+    params = {
+        'limit': limit + 1, 'offset': offset,
+        'reward_weight': config.get('SEARCH_REWARD_WEIGHT', 0.5),
+        'reward_pivot': config.get('SEARCH_REWARD_PIVOT', 5.0),
+    }
+    boost = '(1.0 + :reward_weight * s.reward_amount / (s.reward_amount + :reward_pivot))'
+
+    if db.engine.dialect.name == 'postgresql':
+        params['query'] = ' '.join(TOKEN_PATTERN.findall(query or ''))
+        if not params['query']:
+            return [], False
+        sql = f"""
+            SELECT s.id, s.title, s.description, s.reward_amount, s.estimated_duration,
+                   ts_rank_cd(s.search_vector, websearch_to_tsquery('german', :query)) * {boost} AS score
+            FROM surveys s
+            WHERE s.search_vector @@ websearch_to_tsquery('german', :query) AND s.is_active
+            ORDER BY score DESC, s.id
+            LIMIT :limit OFFSET :offset"""
+    else:
+        params['match'] = match_expression(query)
+        if not params['match']:
+            return [], False
+        params.update(title_weight=TITLE_WEIGHT, description_weight=DESCRIPTION_WEIGHT)
+        # bm25() is negative - smaller is better
+        sql = f"""
+            SELECT s.id, s.title, s.description, s.reward_amount, s.estimated_duration,
+                   -bm25(surveys_fts, :title_weight, :description_weight) * {boost} AS score
+            FROM surveys_fts
+            JOIN surveys s ON s.id = surveys_fts.rowid
+            WHERE surveys_fts MATCH :match AND s.is_active = 1
+            ORDER BY score DESC, s.id
+            LIMIT :limit OFFSET :offset"""
+
+    rows = [dict(row._mapping) for row in db.session.execute(text(sql), params)]
+    return rows[:limit], len(rows) > limit
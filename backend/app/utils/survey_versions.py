@@ -0,0 +1,147 @@
+# backend/app/utils/survey_versions.py
+"""
+Survey Versions for DataFair Survey System
+Jede veröffentlichte Fragen-Version ist unveränderlich und wird einmal unter ihrem
+Inhalts-Hash gespeichert (dedupliziert über alle Umfragen); Antworten merken sich ihre Version
+
+Survey.questions stays as a copy of the current version for existing readers. Editing it
+in place no longer rewrites history: current_version_id() notices the change and publishes
+it as a new version, while responses keep pointing at the version they were started on.
+Because versions never change, anything derived from one (validators, parsed questions)
+is cached by version id without invalidation.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from ..database import db
+from ..models import Survey, SurveyVersion, QuestionSet
+from .skip_logic import compile_graph
+
+# version id -> (content hash, canonical questions JSON); versions are immutable
+VERSION_CACHE_MAX = 4096
+_version_cache: Dict[int, Tuple[str, str]] = {}
+# survey id -> (questions text, version id) of the last version check
+_published: Dict[int, Tuple[str, int]] = {}
+_lock = threading.Lock()
+
+
+def canonical_questions(questions: Any) -> str:
+    """Stable JSON for hashing - key order and whitespace do not create new versions"""
+    if isinstance(questions, str):
+        try:
+            questions = json.loads(questions) if questions.strip() else []
+        except ValueError:
+            questions = []
+    return json.dumps(questions or [], sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def content_hash(canonical: str) -> str:
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def check_questions(questions: Any) -> List[Dict[str, Any]]:
+    """Validate a question list before publishing - raises ValueError"""
+    if not isinstance(questions, list):
+        raise ValueError('questions must be a list')
+    seen = set()
+    for question in questions:
+        if not isinstance(question, dict) or question.get('id') in (None, ''):
+            raise ValueError('every question needs an id')
+        question_id = str(question['id'])
+        if question_id in seen:
+            raise ValueError(f'duplicate question id: {question_id}')
+        seen.add(question_id)
+    # Skip logic must only refer to earlier questions and jump forward
+    compile_graph(questions)
+    return questions
+
+
+def get_question_set(canonical: str) -> QuestionSet:
+    """Existing snapshot with this content or a new one (caller commits)"""
+    digest = content_hash(canonical)
+    question_set = QuestionSet.query.filter_by(content_hash=digest).first()
+    if question_set is not None:
+        return question_set
+    try:
+        with db.session.begin_nested():
+            question_set = QuestionSet(content_hash=digest, questions=canonical)
+            db.session.add(question_set)
+    except IntegrityError:
+        # Another request stored the same content meanwhile
+        question_set = QuestionSet.query.filter_by(content_hash=digest).one()
+    return question_set
+
+
+def publish_version(survey: Survey, questions: Any) -> Tuple[SurveyVersion, bool]:
+    """
+    Make questions the survey's current version -> (version, created).
+    Unchanged content returns the current version (caller commits).
+    """
+    canonical = canonical_questions(questions)
+    current = db.session.get(SurveyVersion, survey.current_version_id) if survey.current_version_id else None
+    if current is not None and current.question_set.content_hash == content_hash(canonical):
+        return current, False
+
+    question_set = get_question_set(canonical)
+    last = db.session.query(db.func.max(SurveyVersion.version)).filter_by(survey_id=survey.id).scalar() or 0
+    try:
+        with db.session.begin_nested():
+            version = SurveyVersion(survey_id=survey.id, version=last + 1, question_set=question_set)
+            db.session.add(version)
+    except IntegrityError:
+        # Another request published this survey meanwhile - use its version
+        db.session.refresh(survey)
+        return db.session.get(SurveyVersion, survey.current_version_id), False
+
+    survey.questions = canonical
+    survey.current_version_id = version.id
+    _remember(version.id, version.question_set)
+    return version, True
+
+
+def current_version_id(survey: Survey) -> int:
+    """
+    Version id of the survey's current questions; publishes a version when there is none
+    yet or Survey.questions was edited in place (caller commits).
+    """
+    raw = survey.questions or ''
+    with _lock:
+        known = _published.get(survey.id)
+    if known is not None and known[1] == survey.current_version_id and known[0] == raw:
+        return known[1]
+
+    version, _ = publish_version(survey, raw)
+    with _lock:
+        _published[survey.id] = (survey.questions or '', version.id)
+    return version.id
+
+
+def version_schema(version_id: int) -> Optional[Tuple[str, str]]:
+    """(content hash, canonical questions JSON) of a version - cached, never invalidated"""
+    cached = _version_cache.get(version_id)
+    if cached is not None:
+        return cached
+    row = db.session.query(QuestionSet.content_hash, QuestionSet.questions)\
+                    .join(SurveyVersion, SurveyVersion.question_set_id == QuestionSet.id)\
+                    .filter(SurveyVersion.id == version_id).first()
+    if row is None:
+        return None
+    _remember(version_id, row)
+    return _version_cache[version_id]
+
+
+def version_questions(version_id: int) -> List[Dict[str, Any]]:
+    schema = version_schema(version_id)
+    return json.loads(schema[1]) if schema else []
+
+
+def _remember(version_id: int, question_set):
+    with _lock:
+        if len(_version_cache) >= VERSION_CACHE_MAX:
+            _version_cache.clear()
+        _version_cache[version_id] = (question_set.content_hash, question_set.questions)
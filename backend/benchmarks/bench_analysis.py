@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Vectorized Survey Analysis
+Legt N abgeschlossene Antworten an (Standard: 1.000.000, 5 Fragen inkl. Mehrfachauswahl) und
+vergleicht Kreuztabelle, Randverteilungen und Raking über NumPy-Spalten mit Python-Schleifen
+über die geparsten SurveyResponse.responses
+
+Usage: python benchmarks/bench_analysis.py [N] [REPEATS]
+"""
+
+import json
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, peak_rss_mb, timed
+
+from app.database import db
+from app.models import Survey, SurveyAnswer, SurveyResponse
+from app.utils.answer_store import build_answer_rows
+from app.utils.survey_analysis import analysis_available, crosstab_report, get_frame, margins_report
+
+REGIONS = ['Nord', 'Ost', 'Süd', 'West', 'Mitte']
+AGES = ['18-29', '30-44', '45-59', '60+']
+DEVICES = ['Smartphone', 'Laptop', 'Tablet', 'Smart Watch']
+TARGETS = {
+    'region': {'Nord': 0.2, 'Ost': 0.15, 'Süd': 0.25, 'West': 0.3, 'Mitte': 0.1},
+    'age': {'18-29': 0.2, '30-44': 0.25, '45-59': 0.3, '60+': 0.25},
+    'gender': {'f': 0.51, 'm': 0.49}
+}
+
+
+def seed(count, rng, batch=20000):
+    """Bulk insert count completed responses plus their survey_answers rows"""
+    survey = Survey(title='Analysis Benchmark', questions='[]', reward_amount=1, max_responses=count)
+    db.session.add(survey)
+    db.session.commit()
+
+    now = datetime.utcnow()
+    for offset in range(0, count, batch):
+        responses, answer_rows = [], []
+        for response_id in range(offset + 1, min(offset + batch, count) + 1):
+            answers = {
+                'region': rng.choices(REGIONS, weights=[3, 1, 3, 2, 1])[0],
+                'age': rng.choices(AGES, weights=[4, 3, 2, 1])[0],
+                'gender': 'f' if rng.random() < 0.4 else 'm',
+                'income': rng.randint(1, 10),
+                'devices': rng.sample(DEVICES, rng.randint(1, 3))
+            }
+            responses.append({'id': response_id, 'user_id': response_id, 'survey_id': survey.id,
+                              'responses': json.dumps(answers), 'is_completed': True,
+                              'started_at': now - timedelta(minutes=10), 'completed_at': now})
+            answer_rows.extend(build_answer_rows(survey.id, response_id, answers))
+        for row in answer_rows:
+            for column in ('text_value', 'numeric_value', 'bool_value'):
+                row.setdefault(column, None)
+        db.session.execute(SurveyResponse.__table__.insert(), responses)
+        db.session.execute(SurveyAnswer.__table__.insert(), answer_rows)
+        db.session.commit()
+    return survey.id
+
+
+def python_loop(survey_id):
+    """Baseline: parse every response and count/rake in interpreted loops"""
+    parsed = [json.loads(responses) for responses, in
+              db.session.query(SurveyResponse.responses).filter_by(survey_id=survey_id, is_completed=True)]
+
+    table = Counter()
+    for answers in parsed:
+        for device in answers['devices']:
+            table[(answers['region'], device)] += 1
+
+    weights = [1.0] * len(parsed)
+    for _ in range(50):
+        deviation = 0.0
+        for question_id, shares in TARGETS.items():
+            totals = Counter()
+            for index, answers in enumerate(parsed):
+                totals[answers[question_id]] += weights[index]
+            base = sum(totals.values())
+            deviation = max(deviation, max(abs(totals[label] / base - share) for label, share in shares.items()))
+            factors = {label: shares[label] * base / totals[label] for label in shares}
+            weights = [weight * factors[answers[question_id]] for weight, answers in zip(weights, parsed)]
+        if deviation < 1e-6:
+            break
+
+    income = Counter()
+    for weight, answers in zip(weights, parsed):
+        income[answers['income']] += weight
+    return table, income
+
+
+def median_ms(function, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(count, repeats):
+    if not analysis_available():
+        print("numpy not installed - nothing to benchmark")
+        return False
+
+    rng = random.Random(49)
+    app = create_bench_app()
+    app.config['ANALYSIS_REFRESH_SECONDS'] = 3600
+
+    with app.app_context():
+        with timed(f"Seed {count:,} responses", count):
+            survey_id = seed(count, rng)
+        db.session.execute(db.text('ANALYZE'))
+
+        start = time.perf_counter()
+        table, income = python_loop(survey_id)
+        loop_ms = (time.perf_counter() - start) * 1000
+        print(f"python loop (parse + crosstab + raking + weighted margin): {loop_ms:,.0f} ms")
+
+        with timed("frame load (respondents + 5 columns)"):
+            frame = get_frame(survey_id)
+            for question_id in ('region', 'age', 'gender', 'income', 'devices'):
+                frame.column(question_id)
+        print(f"  peak RSS {peak_rss_mb():.1f} MB")
+
+        crosstab_ms = median_ms(lambda: crosstab_report(survey_id, 'region', 'devices'), repeats)
+        segment_ms = median_ms(lambda: crosstab_report(survey_id, 'region', 'income', segment='age'), repeats)
+        margins_ms = median_ms(lambda: margins_report(survey_id, ['region', 'age', 'gender', 'income']), repeats)
+        raked_ms = median_ms(lambda: margins_report(survey_id, ['income'], targets=TARGETS), repeats)
+        print(f"crosstab region x devices (multi-select): {crosstab_ms:.1f} ms")
+        print(f"crosstab region x income by age segment:  {segment_ms:.1f} ms")
+        print(f"margins of 4 questions:                   {margins_ms:.1f} ms")
+        print(f"raking to 3 targets + weighted margin:    {raked_ms:.1f} ms")
+
+        vectorized = crosstab_report(survey_id, 'region', 'devices')['table']
+        raked = margins_report(survey_id, ['income'], targets=TARGETS)
+        print(f"  raking: {raked['raking']}")
+
+    same_table = all(vectorized[region].get(device, 0) == table[(region, device)]
+                     for region in REGIONS for device in DEVICES)
+    same_margin = all(abs(raked['questions']['income']['counts'][str(value)] - income[value]) < 1e-3 * count
+                      for value in income)
+    print(f"results match python loop: crosstab {same_table}, raked margin {same_margin}")
+    return same_table and same_margin and raked_ms < loop_ms
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 5) else 1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Bulk Survey Authoring
+Legt N Umfragen (Standard: 10000, je 20 Fragen, 10% mit Zeitplan) über bulk_upsert an,
+schickt dieselben Daten erneut (alles unverändert) und mit geänderten Belohnungen/Fragen,
+und vergleicht mit dem zeilenweisen Anlegen (Titel-Abfrage + publish_version pro Umfrage)
+
+Usage: python benchmarks/bench_bulk_authoring.py [SURVEYS] [CHUNK]
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, timed
+
+from app.database import db
+from app.models import Survey, SurveyTransition, SurveyVersion
+from app.utils.survey_authoring import bulk_upsert
+from app.utils.survey_versions import publish_version
+
+
+def items(count, rng, prefix='acme'):
+    start = datetime.utcnow() + timedelta(days=1)
+    surveys = []
+    for i in range(count):
+        item = {
+            'external_id': f'{prefix}-{i}', 'title': f'Umfrage {i}', 'category': rng.choice(['tech', 'finance', 'travel']),
+            'reward_amount': round(rng.uniform(1, 15), 2), 'estimated_duration': rng.choice([5, 10, 15]),
+            'questions': [{'id': f'q{j}', 'type': 'scale', 'scale_min': 1, 'scale_max': rng.choice([5, 7])}
+                          for j in range(20)]
+        }
+        if i % 10 == 0:
+            item['starts_at'] = (start + timedelta(hours=i % 48)).isoformat()
+        surveys.append(item)
+    return surveys
+
+
+def upsert_all(surveys, chunk):
+    totals = {}
+    for start in range(0, len(surveys), chunk):
+        summary = bulk_upsert(surveys[start:start + chunk])
+        for status in ('created', 'updated', 'unchanged', 'invalid'):
+            totals[status] = totals.get(status, 0) + summary[status]
+    return totals
+
+
+def row_by_row(surveys):
+    """The seed-script pattern: one existence check, insert and version publish per survey"""
+    for item in surveys:
+        if Survey.query.filter_by(title=item['title']).first() is not None:
+            continue
+        survey = Survey(title=item['title'], category=item['category'], reward_amount=item['reward_amount'],
+                        estimated_duration=item['estimated_duration'])
+        db.session.add(survey)
+        db.session.flush()
+        publish_version(survey, item['questions'])
+        db.session.commit()
+
+
+def run(count, chunk):
+    rng = random.Random(48)
+    app = create_bench_app()
+    surveys = items(count, rng)
+
+    with app.app_context():
+        with timed(f"bulk_upsert: create {count} surveys (chunks of {chunk})", count):
+            created = upsert_all(surveys, chunk)
+        print(f"  {created}; versions {SurveyVersion.query.count()}, transitions {SurveyTransition.query.count()}")
+
+        with timed(f"bulk_upsert: resend {count} unchanged surveys", count):
+            unchanged = upsert_all(surveys, chunk)
+        print(f"  {unchanged}")
+
+        for item in surveys[::2]:
+            item['reward_amount'] = round(item['reward_amount'] + 1, 2)
+            item['questions'] = item['questions'] + [{'id': 'extra', 'type': 'text'}]
+        with timed(f"bulk_upsert: update {count // 2} of {count} surveys", count):
+            updated = upsert_all(surveys, chunk)
+        print(f"  {updated}; versions {SurveyVersion.query.count()}")
+
+        legacy = items(count // 10, rng, prefix='legacy')
+        for item in legacy:
+            item['title'] = 'Legacy ' + item['title']
+        with timed(f"row by row: create {len(legacy)} surveys", len(legacy)):
+            row_by_row(legacy)
+
+    return created['created'] == count and unchanged['unchanged'] == count and updated['updated'] == count // 2
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 1000) else 1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Survey Catalog
+Legt N Umfragen an (Standard: 100000) und misst /api/surveys/available mit Filtern,
+Sortierung und Cursor-Paginierung gegenüber dem alten Vollabruf aller aktiven Umfragen
+
+Usage: python benchmarks/bench_catalog.py [SURVEYS] [REQUESTS]
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, timed
+
+from app.database import db
+from app.models import Survey
+
+CATEGORIES = ['technology', 'lifestyle', 'shopping', 'finance', 'travel', 'health', 'mobility', 'media']
+
+
+def seed(count, rng):
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for i in range(count):
+        reward = round(rng.uniform(0.5, 15), 2)
+        duration = rng.choice([3, 5, 8, 10, 15, 20, 30])
+        batch.append({
+            'title': f'Umfrage {i}', 'questions': '[{"id": "q1", "type": "text"}]',
+            'category': rng.choice(CATEGORIES), 'reward_amount': reward, 'estimated_duration': duration,
+            'reward_per_minute': Survey.compute_reward_per_minute(reward, duration),
+            'max_responses': 1000, 'total_responses': 0, 'is_active': rng.random() < 0.8,
+            'created_at': start + timedelta(seconds=rng.randint(0, 365 * 86400))
+        })
+        if len(batch) == 10000:
+            db.session.execute(Survey.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Survey.__table__.insert(), batch)
+    db.session.commit()
+
+
+def latencies(client, params_list):
+    samples = []
+    for params in params_list:
+        start = time.perf_counter()
+        response = client.get('/api/surveys/available', query_string=params)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_json()
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def random_params(rng):
+    params = {'sort': rng.choice(['newest', 'reward', 'reward_per_minute'])}
+    if rng.random() < 0.5:
+        params['category'] = rng.choice(CATEGORIES)
+    if rng.random() < 0.3:
+        params['min_reward'] = rng.choice([1, 2, 5])
+    if rng.random() < 0.3:
+        params['max_duration'] = rng.choice([5, 10, 15])
+    return params
+
+
+def run(survey_count, request_count):
+    rng = random.Random(42)
+    app = create_bench_app()
+    app.config['TESTING'] = True
+    from app.routes.surveys import surveys_bp
+    app.register_blueprint(surveys_bp, url_prefix='/api/surveys')
+
+    with app.app_context():
+        with timed(f"Insert {survey_count} surveys", survey_count):
+            seed(survey_count, rng)
+        db.session.execute(db.text('ANALYZE'))
+
+    client = app.test_client()
+    params_list = [random_params(rng) for _ in range(request_count)]
+    p50, p95 = latencies(client, params_list)
+    print(f"First page, random filters/sort ({request_count} requests): p50 {p50:.2f} ms, p95 {p95:.2f} ms")
+
+    # Deep pages: follow the cursor 50 pages in, then time the next page
+    deep = []
+    for params in params_list[:20]:
+        cursor = None
+        for _ in range(50):
+            body = client.get('/api/surveys/available', query_string=dict(params, cursor=cursor or '')).get_json()
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+        if cursor:
+            deep.append(dict(params, cursor=cursor))
+    if deep:
+        p50, p95 = latencies(client, deep)
+        print(f"Page 51 via cursor ({len(deep)} requests): p50 {p50:.2f} ms, p95 {p95:.2f} ms")
+
+    # Baseline: the old endpoint loaded and serialized every active survey per request
+    with app.app_context():
+        start = time.perf_counter()
+        surveys = Survey.query.filter_by(is_active=True).all()
+        payload = [{'id': s.id, 'title': s.title, 'reward_amount': float(s.reward_amount),
+                    'created_at': s.created_at.isoformat()} for s in surveys]
+        elapsed = (time.perf_counter() - start) * 1000
+    print(f"Unpaginated load of all {len(payload)} active surveys (old behaviour, query only): {elapsed:.2f} ms")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 300)
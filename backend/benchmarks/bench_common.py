@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared helpers for the DataFair benchmark scripts
+Erstellt eine eigenständige App mit temporärer SQLite-Datenbank
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+# Add backend directory to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from flask import Flask
+
+from app.database import db
+from config import Config
+
+
+def create_bench_app(db_path=None, engine_options=None):
+    """Flask app bound to a throwaway SQLite file (never touches instance/datafair.db)"""
+    db_path = db_path or os.path.join(tempfile.mkdtemp(prefix='datafair_bench_'), 'bench.db')
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options or {}
+    db.init_app(app)
+
+    with app.app_context():
+        from app import models  # noqa: F401 - register all tables
+        db.create_all()
+
+    print(f"Benchmark database: {db_path}")
+    return app
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+@contextmanager
+def timed(label, count=None):
+    """Print wall time (and throughput if count is given) for the block"""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    if count:
+        print(f"{label}: {elapsed:.3f}s ({count / elapsed:,.0f}/s)")
+    else:
+        print(f"{label}: {elapsed:.3f}s")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Completion Time Sketches
+Fügt N Bearbeitungszeiten (Standard: 1.000.000, log-normal verteilt) über W Worker-Skizzen
+(Standard: 16) ein, führt sie zusammen und vergleicht Median/p90/p99 mit exakten Quantilen
+aus einem Scan von started_at/completed_at über N Antworten in der Datenbank
+
+Usage: python benchmarks/bench_completion_times.py [N] [WORKERS]
+"""
+
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, timed
+
+from app.database import db
+from app.models import Survey, SurveyDurationSketch, SurveyResponse
+from app.utils.completion_times import CompletionTimeTracker, DurationSketch
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def seed(count, durations, batch=50000):
+    survey = Survey(title='Duration Benchmark', questions='[]', reward_amount=1, max_responses=count)
+    db.session.add(survey)
+    db.session.commit()
+
+    now = datetime.utcnow()
+    for offset in range(0, count, batch):
+        db.session.execute(SurveyResponse.__table__.insert(), [
+            {'user_id': i + 1, 'survey_id': survey.id, 'responses': '{}', 'is_completed': True,
+             'started_at': now - timedelta(seconds=durations[i]), 'completed_at': now}
+            for i in range(offset, min(offset + batch, count))
+        ])
+        db.session.commit()
+    return survey.id
+
+
+def exact_quantiles(survey_id):
+    """Baseline: fetch every completion time and sort"""
+    durations = sorted((completed_at - started_at).total_seconds() for started_at, completed_at in
+                       db.session.query(SurveyResponse.started_at, SurveyResponse.completed_at)
+                       .filter_by(survey_id=survey_id, is_completed=True))
+    return {q: durations[int(q * (len(durations) - 1))] for q in QUANTILES}
+
+
+def run(count, workers):
+    rng = random.Random(50)
+    durations = [min(rng.lognormvariate(6.2, 0.7), 86400) for _ in range(count)]
+    app = create_bench_app()
+
+    with app.app_context():
+        with timed(f"Seed {count:,} completed responses"):
+            survey_id = seed(count, durations)
+
+        start = time.perf_counter()
+        exact = exact_quantiles(survey_id)
+        scan_ms = (time.perf_counter() - start) * 1000
+        print(f"exact quantiles (scan + sort {count:,} rows): {scan_ms:,.0f} ms")
+
+        trackers = [CompletionTimeTracker(app.config) for _ in range(workers)]
+        with timed(f"observe {count:,} completions across {workers} workers", count):
+            for index, seconds in enumerate(durations):
+                trackers[index % workers].observe(survey_id, seconds)
+
+        with timed(f"flush {workers} worker deltas (revision-checked merge)", workers):
+            for tracker in trackers:
+                tracker.flush()
+
+        row = SurveyDurationSketch.query.filter_by(survey_id=survey_id).one()
+        start = time.perf_counter()
+        sketch = DurationSketch.from_dict(json.loads(row.sketch))
+        estimates = {q: sketch.quantile(q) for q in QUANTILES}
+        read_ms = (time.perf_counter() - start) * 1000
+        survey = db.session.get(Survey, survey_id)
+
+    print(f"sketch quantiles (load + query): {read_ms:.2f} ms, {len(sketch.buckets)} buckets, "
+          f"{len(row.sketch):,} bytes stored, n={sketch.count:,}")
+    ok = sketch.count == count
+    for q in QUANTILES:
+        error = abs(estimates[q] - exact[q]) / exact[q]
+        print(f"  p{int(q * 100)}: sketch {estimates[q]:.1f}s, exact {exact[q]:.1f}s, relative error {error:.4f}")
+        ok &= error <= app.config.get('DURATION_SKETCH_ACCURACY', 0.01) * 1.01
+    print(f"survey: median {survey.median_duration_seconds}s, p90 {survey.p90_duration_seconds}s, "
+          f"estimated_duration {survey.estimated_duration} min")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 16) else 1)
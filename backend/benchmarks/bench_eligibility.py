@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Eligibility Inverted Index
+Baut den Index für N Nutzer (Standard: 1.000.000) und misst Zielgruppen-Abfragen
+
+Usage: python benchmarks/bench_eligibility.py [USERS] [SURVEYS]
+"""
+
+import json
+import random
+import sys
+import time
+
+from bench_common import peak_rss_mb, timed
+
+from app.utils.eligibility_index import EligibilityIndex
+from app.utils.qualification import compile_criteria
+
+LOCATIONS = ['DE', 'AT', 'CH', 'FR', 'NL', 'IT']
+PETS = ['dog', 'cat', 'fish', 'bird']
+
+
+def make_rows(rng, user_count):
+    """Synthetic qualification_answers rows: (user_id, question_id, JSON value)"""
+    for user_id in range(1, user_count + 1):
+        yield user_id, 'age', json.dumps(rng.randint(16, 80))
+        yield user_id, 'location', json.dumps(rng.choice(LOCATIONS))
+        yield user_id, 'tech_interest', json.dumps(rng.random() < 0.6)
+        if rng.random() < 0.5:
+            yield user_id, 'pets', json.dumps(rng.sample(PETS, rng.randint(1, 2)))
+
+
+def make_criteria(rng):
+    return {
+        'questions': [{'id': 'tech_interest', 'required_answer': rng.random() < 0.7}],
+        'demographics': {'age': {'min': rng.randint(16, 30), 'max': rng.randint(40, 80)},
+                         'location': rng.sample(LOCATIONS, 3)},
+        'rules': [{'any': [{'field': 'pets', 'in': rng.sample(PETS, 2)},
+                           {'not': {'field': 'age', 'max': 25}}]}]
+    }
+
+
+def run(user_count, survey_count):
+    rng = random.Random(3)
+    index = EligibilityIndex()
+    with timed(f"Build index for {user_count:,} users", user_count):
+        index.load(range(1, user_count + 1), make_rows(rng, user_count))
+    print(f"Peak RSS: {peak_rss_mb():.1f} MB")
+
+    surveys = {survey_id: json.dumps(make_criteria(rng)) for survey_id in range(1, survey_count + 1)}
+
+    start = time.perf_counter()
+    counts = [index.eligible_users(survey_id, criteria).bit_count() for survey_id, criteria in surveys.items()]
+    elapsed = (time.perf_counter() - start) / survey_count
+    print(f"Eligible users for a survey (cold): {elapsed * 1000:.2f} ms avg, "
+          f"{sum(counts) / len(counts):,.0f} users avg")
+
+    start = time.perf_counter()
+    for survey_id, criteria in surveys.items():
+        index.eligible_users(survey_id, criteria)
+    print(f"Eligible users for a survey (cached): {(time.perf_counter() - start) / survey_count * 1e6:.1f} µs avg")
+
+    sample_users = rng.sample(range(1, user_count + 1), 100)
+    start = time.perf_counter()
+    for user_id in sample_users:
+        index.eligible_surveys(user_id, surveys)
+    print(f"Eligible surveys for a user ({survey_count} surveys): "
+          f"{(time.perf_counter() - start) / len(sample_users) * 1000:.2f} ms avg")
+
+    start = time.perf_counter()
+    for user_id in sample_users:
+        answers = {'age': rng.randint(16, 80), 'location': rng.choice(LOCATIONS), 'tech_interest': True}
+        index.update_user(user_id, {}, answers)
+    print(f"Incremental answer update: {(time.perf_counter() - start) / len(sample_users) * 1000:.2f} ms avg")
+
+    # Baseline: predicate per user (what check_qualification for every user amounts to)
+    answers_sample = [{'age': rng.randint(16, 80), 'location': rng.choice(LOCATIONS),
+                       'tech_interest': rng.random() < 0.6} for _ in range(100000)]
+    predicate = compile_criteria(surveys[1])
+    start = time.perf_counter()
+    for answers in answers_sample:
+        predicate(answers)
+    per_user = (time.perf_counter() - start) / len(answers_sample)
+    print(f"Baseline predicate scan: ~{per_user * user_count * 1000:,.0f} ms per survey for {user_count:,} users")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200)
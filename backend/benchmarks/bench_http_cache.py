@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: HTTP Caching
+Legt N Umfragen an (Standard: 100000, je 40 Fragen) und vergleicht volle Antworten von
+/api/surveys/available und /api/surveys/{id} mit bedingten Anfragen (If-None-Match -> 304)
+
+Usage: python benchmarks/bench_http_cache.py [SURVEYS] [REQUESTS]
+"""
+
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, timed
+
+from app.database import db
+from app.models import Survey
+
+QUESTIONS = json.dumps([{'id': f'q{i}', 'type': 'single_choice', 'options': ['a', 'b', 'c', 'd']}
+                        for i in range(40)])
+
+
+def seed(count, rng):
+    start = datetime.utcnow() - timedelta(days=365)
+    for offset in range(0, count, 10000):
+        db.session.execute(Survey.__table__.insert(), [
+            {'title': f'Umfrage {i}', 'questions': QUESTIONS, 'reward_amount': 2, 'estimated_duration': 10,
+             'reward_per_minute': 0.2, 'max_responses': 1000, 'total_responses': 0, 'reserved_slots': 0,
+             'is_active': True, 'created_at': start + timedelta(seconds=rng.randint(0, 365 * 86400))}
+            for i in range(offset, min(offset + 10000, count))
+        ])
+    db.session.commit()
+
+
+def latencies(client, paths, etags=None):
+    samples, sent, tags = [], 0, {}
+    for path in paths:
+        headers = {'If-None-Match': etags[path]} if etags else {}
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == (304 if etags else 200), response.status_code
+        sent += len(response.data)
+        tags[path] = response.headers['ETag']
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1], sent / len(paths), tags
+
+
+def run(survey_count, request_count):
+    rng = random.Random(47)
+    app = create_bench_app()
+    app.config['TESTING'] = True
+    from app.routes.surveys import surveys_bp
+    app.register_blueprint(surveys_bp, url_prefix='/api/surveys')
+
+    with app.app_context():
+        with timed(f"Insert {survey_count} surveys", survey_count):
+            seed(survey_count, rng)
+        db.session.execute(db.text('ANALYZE'))
+
+    client = app.test_client()
+    catalog = [f'/api/surveys/available?limit=100&sort={rng.choice(["newest", "reward"])}' for _ in range(request_count)]
+    details = [f'/api/surveys/{rng.randint(1, survey_count)}' for _ in range(request_count)]
+
+    ok = True
+    for label, paths in (('catalog page (100 surveys)', catalog), ('survey detail (40 questions)', details)):
+        full = latencies(client, paths)
+        revalidated = latencies(client, paths, full[3])
+        print(f"{label}:")
+        print(f"  200 full      p50 {full[0]:.2f} ms, p95 {full[1]:.2f} ms, {full[2]:.0f} bytes")
+        print(f"  304 revalidate p50 {revalidated[0]:.2f} ms, p95 {revalidated[1]:.2f} ms, {revalidated[2]:.0f} bytes")
+        ok &= revalidated[0] < full[0]
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 500) else 1)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Idempotency Keys under Concurrency
+Schickt N gleichzeitige Auszahlungs- und Bonus-Requests (Standard: 50) mit demselben
+Idempotency-Key und prüft, dass genau einer ausgeführt wird
+
+Usage: python benchmarks/bench_idempotency.py [DUPLICATES]
+"""
+
+import sys
+import threading
+import time
+
+from bench_common import create_bench_app
+
+from flask_login import LoginManager
+
+from app.database import db
+from app.models import User, Earning, Payout, Activity
+
+
+def create_app():
+    app = create_bench_app(engine_options={'connect_args': {'timeout': 60}, 'pool_size': 20, 'max_overflow': 200})
+    app.config['TESTING'] = True
+
+    login_manager = LoginManager()
+    login_manager.init_app(app)
+
+    @login_manager.user_loader
+    def load_user(user_id):
+        return db.session.get(User, int(user_id))
+
+    from app.routes.earning_routes import earning_bp
+    app.register_blueprint(earning_bp, url_prefix='/api')
+    return app
+
+
+def logged_in_client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def fire(app, user_id, duplicates, path, payload, key):
+    """duplicates identical requests released at the same moment; returns [(status, body, replayed)]"""
+    clients = [logged_in_client(app, user_id) for _ in range(duplicates)]
+    barrier = threading.Barrier(duplicates)
+    results = []
+
+    def worker(client):
+        barrier.wait()
+        response = client.post(path, json=payload, headers={'Idempotency-Key': key})
+        results.append((response.status_code, response.get_data(as_text=True),
+                        response.headers.get('Idempotent-Replayed') == 'true'))
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def check(label, results, executed_rows):
+    statuses = {status for status, _, _ in results}
+    bodies = {body for _, body, _ in results}
+    replayed = sum(1 for _, _, flag in results if flag)
+    ok = statuses == {200} and len(bodies) == 1 and executed_rows == 1 and replayed == len(results) - 1
+    print(f"{label}: {len(results)} requests -> {executed_rows} executed, {replayed} replayed, "
+          f"statuses {sorted(statuses)}, {len(bodies)} distinct bodies {'OK' if ok else 'FAILED'}")
+    return ok
+
+
+def run(duplicates):
+    app = create_app()
+    with app.app_context():
+        user = User(email='bench@bench.local', password_hash='x', first_name='Bench', last_name='User')
+        db.session.add(user)
+        db.session.commit()
+        db.session.add(Earning(user_id=user.id, amount=1000, source_type='survey', description='Seed'))
+        db.session.commit()
+        user_id = user.id
+
+    start = time.perf_counter()
+    payout_results = fire(app, user_id, duplicates, '/api/payout', {'amount': 25, 'method': 'paypal'}, 'payout-1')
+    elapsed = time.perf_counter() - start
+    with app.app_context():
+        ok = check('POST /api/payout', payout_results, Payout.query.count())
+
+    bonus_results = fire(app, user_id, duplicates, '/api/earnings/bonus', {'amount': 5, 'description': 'Promo'},
+                         'bonus-1')
+    with app.app_context():
+        ok &= check('POST /api/earnings/bonus', bonus_results,
+                    Earning.query.filter_by(source_type='bonus').count())
+        ok &= Activity.query.count() == 2
+    print(f"Duplicate burst handled in {elapsed:.3f}s")
+
+    # Sequential retries: a replay skips the balance queries and inserts
+    client = logged_in_client(app, user_id)
+    start = time.perf_counter()
+    for _ in range(200):
+        client.post('/api/payout', json={'amount': 25, 'method': 'paypal'}, headers={'Idempotency-Key': 'payout-1'})
+    print(f"Replayed retry: {(time.perf_counter() - start) / 200 * 1000:.2f} ms per request")
+
+    response = client.post('/api/payout', json={'amount': 30, 'method': 'paypal'},
+                           headers={'Idempotency-Key': 'payout-1'})
+    print(f"Same key, different body: {response.status_code}")
+    ok &= response.status_code == 422
+
+    print("Duplicates collapsed to one execution" if ok else "Idempotency check FAILED")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 50) else 1)
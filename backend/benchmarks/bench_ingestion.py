@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Survey Completion Ingestion (sync vs. write-behind queue)
+Schickt N Abgaben (Standard: 2000) von gleichzeitigen Clients an POST /submit und misst
+abgeschlossene Abgaben pro Sekunde - im Queue-Modus bis alles in die Datenbank übernommen ist
+
+Usage: python benchmarks/bench_ingestion.py [COMPLETIONS] [CLIENTS]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from bench_common import create_bench_app
+
+from flask_login import LoginManager
+
+from app.database import db
+from app.models import User, Survey, SurveyResponse, SurveyAnswer, Earning
+
+SURVEYS = 10
+QUESTIONS = [{'id': f'q{i}', 'type': 'single_choice', 'options': ['a', 'b', 'c', 'd']} for i in range(8)]
+
+
+def create_app(mode):
+    app = create_bench_app(engine_options={'connect_args': {'timeout': 60}, 'pool_size': 20, 'max_overflow': 100})
+    app.config['TESTING'] = True
+    app.config['INGESTION_MODE'] = mode
+    app.config['INGESTION_QUEUE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='datafair_queue_'), 'queue.db')
+
+    login_manager = LoginManager()
+    login_manager.init_app(app)
+
+    @login_manager.user_loader
+    def load_user(user_id):
+        return db.session.get(User, int(user_id))
+
+    from app.routes.surveys import surveys_bp
+    app.register_blueprint(surveys_bp, url_prefix='/api/surveys')
+    return app
+
+
+def seed(completions):
+    """One started (open) response per user, spread over SURVEYS surveys"""
+    now = datetime.utcnow()
+    db.session.execute(Survey.__table__.insert(), [
+        {'title': f'Survey {i}', 'questions': json.dumps(QUESTIONS), 'reward_amount': 1.5,
+         'max_responses': completions, 'total_responses': 0, 'is_active': True, 'created_at': now}
+        for i in range(SURVEYS)
+    ])
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'user{i}@bench.local', 'password_hash': 'x', 'first_name': 'Bench', 'last_name': str(i),
+         'is_active': True, 'created_at': now}
+        for i in range(1, completions + 1)
+    ])
+    db.session.execute(SurveyResponse.__table__.insert(), [
+        {'user_id': user_id, 'survey_id': user_id % SURVEYS + 1, 'is_completed': False, 'started_at': now}
+        for user_id in range(1, completions + 1)
+    ])
+    db.session.commit()
+
+
+def submit_all(app, completions, clients):
+    """clients threads each submit for their share of users; returns the status codes"""
+    statuses = []
+
+    def worker(user_ids):
+        client = app.test_client()
+        for user_id in user_ids:
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+            answers = {question['id']: question['options'][(user_id + i) % 4] for i, question in enumerate(QUESTIONS)}
+            response = client.post(f'/api/surveys/{user_id % SURVEYS + 1}/submit', json={'responses': answers})
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(range(offset, completions + 1, clients),))
+               for offset in range(1, clients + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+def run_mode(mode, completions, clients):
+    app = create_app(mode)
+    with app.app_context():
+        seed(completions)
+
+    start = time.perf_counter()
+    statuses = submit_all(app, completions, clients)
+    acknowledged = time.perf_counter() - start
+
+    with app.app_context():
+        if mode == 'queue':
+            from app.utils.ingestion import get_ingestion_service
+            get_ingestion_service().drain(600)
+        applied = time.perf_counter() - start
+
+        completed = SurveyResponse.query.filter_by(is_completed=True).count()
+        counters = db.session.query(db.func.sum(Survey.total_responses)).scalar() or 0
+        earnings = Earning.query.filter_by(source_type='survey').count()
+        answers = SurveyAnswer.query.count()
+
+    codes = sorted(set(statuses))
+    print(f"{mode}: acknowledged {len(statuses)} in {acknowledged:.3f}s "
+          f"({len(statuses) / acknowledged:,.0f}/s, mean latency {acknowledged / len(statuses) * clients * 1000:.2f} ms), "
+          f"applied in {applied:.3f}s ({completions / applied:,.0f} completions/s), status codes {codes}")
+    ok = completed == counters == earnings == completions and answers == completions * len(QUESTIONS)
+    print(f"  completed {completed}, counters {counters}, earnings {earnings}, answers {answers} "
+          f"{'OK' if ok else 'MISMATCH'}")
+    return ok, completions / applied
+
+
+def run(completions, clients):
+    ok_sync, sync_rate = run_mode('sync', completions, clients)
+    ok_queue, queue_rate = run_mode('queue', completions, clients)
+    print(f"Write-behind speedup: {queue_rate / sync_rate:.1f}x sustained completions/s")
+    return ok_sync and ok_queue
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 16) else 1)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Compiled Qualification Predicates
+Vergleicht die alte, interpretierte Prüfung mit den kompilierten Prädikaten
+
+Usage: python benchmarks/bench_qualification.py [SURVEYS] [USERS]
+"""
+
+import json
+import random
+import sys
+
+from bench_common import timed
+
+from app.utils.survey_engine import SurveyEngine
+from app.utils.qualification import compile_criteria
+
+
+def interpreted_check(criteria, answers):
+    """The previous check_qualification loop (questions only, interpreted on every call)"""
+    if not criteria:
+        return {'qualified': True, 'reason': 'Keine Qualifikationskriterien erforderlich'}
+    for question in criteria.get('questions', []):
+        if question['id'] not in answers:
+            return {'qualified': False, 'reason': 'Nicht alle Qualifikationsfragen beantwortet'}
+        required_answer = question.get('required_answer')
+        if required_answer is not None and answers[question['id']] != required_answer:
+            return {'qualified': False, 'reason': question.get('disqualify_reason', '')}
+    return {'qualified': True, 'reason': 'Alle Qualifikationskriterien erfüllt'}
+
+
+def make_criteria(rng, index):
+    return {
+        'questions': [{'id': f'screen_{rng.randint(0, 20)}', 'required_answer': rng.random() < 0.8}
+                      for _ in range(rng.randint(1, 4))],
+        'demographics': {'age': {'min': rng.randint(16, 30), 'max': rng.randint(40, 80)},
+                         'location': rng.sample(['DE', 'AT', 'CH', 'FR', 'NL'], 3)},
+        'rules': [{'any': [{'field': 'income', 'min': rng.randint(500, 3000)},
+                           {'field': 'employed', 'eq': True}]}]
+    }
+
+
+def make_answers(rng):
+    answers = {f'screen_{i}': rng.random() < 0.8 for i in range(21)}
+    answers.update({'age': rng.randint(16, 80), 'location': rng.choice(['DE', 'AT', 'CH', 'FR', 'NL']),
+                    'income': rng.randint(0, 5000), 'employed': rng.random() < 0.6})
+    return answers
+
+
+def run(survey_count, user_count):
+    rng = random.Random(7)
+    engine = SurveyEngine()
+    full_criteria = {i: make_criteria(rng, i) for i in range(survey_count)}
+    question_criteria = {i: {'questions': c['questions']} for i, c in full_criteria.items()}
+    users = {u: make_answers(rng) for u in range(user_count)}
+    checks = survey_count * user_count
+
+    print("--- Screening questions only (what the legacy loop understands) ---")
+    with timed(f"Interpreted legacy loop, {checks:,} checks", checks):
+        for answers in users.values():
+            for criteria in question_criteria.values():
+                interpreted_check(criteria, answers)
+
+    compiled = {i: compile_criteria(c) for i, c in question_criteria.items()}
+    with timed(f"Compiled predicates, {checks:,} checks", checks):
+        for answers in users.values():
+            for predicate in compiled.values():
+                predicate(answers)
+
+    print("--- Full criteria (questions + demographics + boolean rules) ---")
+    stored = {i: json.dumps(c) for i, c in full_criteria.items()}
+    with timed(f"check_qualification with reused dict criteria, {checks:,} checks", checks):
+        for answers in users.values():
+            for criteria in full_criteria.values():
+                engine.check_qualification(criteria, answers, None)
+
+    with timed(f"check_surveys_for_user with stored JSON, {checks:,} checks", checks):
+        for answers in users.values():
+            engine.check_surveys_for_user(stored, answers)
+
+    with timed(f"qualified_users, {survey_count} surveys x {user_count:,} users", checks):
+        qualified = sum(len(engine.qualified_users(c, users)) for c in stored.values())
+    print(f"  {qualified:,} qualified (user, survey) pairs")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
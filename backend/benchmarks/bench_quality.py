@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Response Quality Scoring
+Bewertet N Abgaben (Standard: 200000) einer Umfrage mit 40 Fragen (davon 4 Matrix-Blöcke)
+und misst die Zusatzlatenz pro Abgabe sowie den Speicher der IP-/Geräte-Sketches
+gegenüber einer exakten Menge aller Schlüssel
+
+Usage: python benchmarks/bench_quality.py [SUBMISSIONS] [DISTINCT_IPS]
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, peak_rss_mb
+
+from app.database import db
+from app.models import Survey, SurveyResponse
+from app.utils.response_quality import get_quality_scorer, record_origin
+from app.utils.survey_versions import publish_version
+
+AGENTS = [f'Mozilla/5.0 (Device {i}) AppleWebKit/537.36 Chrome/{100 + i % 30}.0' for i in range(200)]
+
+
+def questions():
+    items = []
+    for grid in range(4):
+        items += [{'id': f'g{grid}_{i}', 'type': 'scale', 'scale_min': 1, 'scale_max': 5 + grid} for i in range(6)]
+    items += [{'id': f'c{i}', 'type': 'single_choice', 'options': [f'o{j}' for j in range(i % 4 + 2)]}
+              for i in range(8)]
+    items += [{'id': f't{i}', 'type': 'text'} for i in range(8)]
+    return items
+
+
+def submission(rng, schema, straight):
+    answers = {}
+    for question in schema:
+        if question['type'] == 'scale':
+            answers[question['id']] = 3 if straight else rng.randint(question['scale_min'], question['scale_max'])
+        elif question['type'] == 'single_choice':
+            answers[question['id']] = rng.choice(question['options'])
+        else:
+            answers[question['id']] = 'Antwort'
+    return answers
+
+
+def run(count, distinct_ips):
+    rng = random.Random(45)
+    app = create_bench_app()
+    schema = questions()
+    with app.app_context():
+        survey = Survey(title='Quality Survey', questions='[]', reward_amount=1, estimated_duration=10)
+        db.session.add(survey)
+        db.session.flush()
+        version, _ = publish_version(survey, schema)
+        db.session.commit()
+
+        scorer = get_quality_scorer()
+        now = datetime.utcnow()
+        cases = []
+        for i in range(count):
+            response = SurveyResponse(survey_id=survey.id, survey_version_id=version.id,
+                                      started_at=now - timedelta(seconds=rng.randint(60, 1200)),
+                                      ip_address=f'10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, distinct_ips // 65536)}',
+                                      user_agent=rng.choice(AGENTS))
+            cases.append((response, submission(rng, schema, straight=rng.random() < 0.05)))
+
+        samples, flagged = [], {}
+        for response, answers in cases:
+            start = time.perf_counter()
+            score, flags = scorer.score(survey, response, answers, now)
+            record_origin(response)  # every benchmark submission is accepted
+            samples.append((time.perf_counter() - start) * 1e6)
+            for flag in flags:
+                flagged[flag] = flagged.get(flag, 0) + 1
+
+    samples.sort()
+    print(f"Scored {count} submissions ({len(schema)} questions, 4 grids)")
+    print(f"  per submission: p50 {statistics.median(samples):.1f} µs, p99 {samples[int(count * 0.99) - 1]:.1f} µs, "
+          f"max {samples[-1]:.1f} µs")
+    print(f"  flags: {flagged}")
+
+    keys = {f'{survey.id}|{response.ip_address}|{response.user_agent}' for response, _ in cases}
+    exact = sum(sys.getsizeof(key) for key in keys) + sys.getsizeof(keys)
+    sketches = scorer.ips.memory_bytes() + scorer.devices.memory_bytes()
+    print(f"  sketch memory {sketches / 1e6:.1f} MB (fixed) vs exact device set {exact / 1e6:.1f} MB "
+          f"for {len(keys)} keys; peak RSS {peak_rss_mb():.0f} MB")
+    return samples[int(count * 0.99) - 1] < 1000
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 1000000) else 1)
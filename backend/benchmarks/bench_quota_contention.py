@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Segment Quota Contention
+Lässt N gleichzeitige Abgaben (Standard: 400 Threads) um knappe Quoten konkurrieren
+und prüft, dass kein Zähler sein Limit überschreitet
+
+Usage: python benchmarks/bench_quota_contention.py [SUBMITTERS]
+"""
+
+import json
+import random
+import sys
+import threading
+from datetime import datetime
+
+from bench_common import create_bench_app, timed
+
+from sqlalchemy.exc import OperationalError
+
+from app.database import db
+from app.models import Survey, SurveyQuota, User, QualificationAnswer
+from app.utils.quotas import claim_survey_slot, claim_quotas, set_quotas
+
+SURVEY_CAP = 300
+QUOTAS = [
+    {'segment': 'age_18_29', 'criteria': {'rules': [{'field': 'age', 'min': 18, 'max': 29}]}, 'max_responses': 60},
+    {'segment': 'age_30_49', 'criteria': {'rules': [{'field': 'age', 'min': 30, 'max': 49}]}, 'max_responses': 60},
+    {'segment': 'region_de', 'criteria': {'rules': [{'field': 'region', 'eq': 'DE'}]}, 'max_responses': 100},
+]
+
+
+def seed(submitters):
+    rng = random.Random(5)
+    now = datetime.utcnow()
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'user{i}@bench.local', 'password_hash': 'x', 'first_name': 'Bench', 'last_name': str(i),
+         'is_active': True, 'created_at': now}
+        for i in range(1, submitters + 1)
+    ])
+    profiles = {i: {'age': rng.randint(18, 70), 'region': rng.choice(['DE', 'AT', 'CH'])}
+                for i in range(1, submitters + 1)}
+    db.session.execute(QualificationAnswer.__table__.insert(), [
+        {'user_id': user_id, 'question_id': field, 'value': json.dumps(value), 'answered_at': now, 'updated_at': now}
+        for user_id, profile in profiles.items() for field, value in profile.items()
+    ])
+    survey = Survey(title='Quota Survey', questions='[]', reward_amount=1, max_responses=SURVEY_CAP)
+    db.session.add(survey)
+    db.session.flush()
+    set_quotas(survey.id, QUOTAS)
+    db.session.commit()
+    return survey.id
+
+
+def submit_atomic(survey_id, user_id):
+    """What submit_survey does: conditional increments, roll back on a full segment"""
+    if not claim_survey_slot(survey_id):
+        db.session.rollback()
+        return False
+    if claim_quotas(survey_id, user_id):
+        db.session.rollback()
+        return False
+    db.session.commit()
+    return True
+
+
+def submit_naive(survey_id, user_id):
+    """Former pattern: read the counter, check in Python, write the incremented value"""
+    survey = db.session.get(Survey, survey_id, populate_existing=True)
+    if survey.total_responses >= survey.max_responses:
+        return False
+    survey.total_responses += 1
+    db.session.commit()
+    return True
+
+
+def hammer(app, survey_id, submitters, submit):
+    """All submitters start at once; returns (accepted user ids, user ids that hit a database error)"""
+    barrier = threading.Barrier(submitters)
+    accepted, errors = [], []
+
+    def worker(user_id):
+        with app.app_context():
+            barrier.wait()
+            try:
+                if submit(survey_id, user_id):
+                    accepted.append(user_id)
+            except OperationalError:
+                db.session.rollback()
+                errors.append(user_id)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in range(1, submitters + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return accepted, errors
+
+
+def reset_counters(survey_id):
+    db.session.query(Survey).filter_by(id=survey_id).update({'total_responses': 0})
+    db.session.query(SurveyQuota).filter_by(survey_id=survey_id).update({'current_count': 0, 'is_full': False})
+    db.session.commit()
+
+
+def run(submitters):
+    # Threads wait for the SQLite write lock instead of failing immediately
+    app = create_bench_app(engine_options={'connect_args': {'timeout': 60},
+                                           'pool_size': 20, 'max_overflow': submitters})
+    with app.app_context():
+        survey_id = seed(submitters)
+        profiles = {}
+        for row in QualificationAnswer.query.all():
+            profiles.setdefault(row.user_id, {})[row.question_id] = row.parsed_value
+
+    ok = True
+    for name, submit, cap in (('naive read-check-write', submit_naive, submitters // 2),
+                              ('atomic conditional increments', submit_atomic, SURVEY_CAP)):
+        with app.app_context():
+            reset_counters(survey_id)
+            db.session.query(Survey).filter_by(id=survey_id).update({'max_responses': cap})
+            db.session.commit()
+
+        with timed(f"{name}: {submitters} concurrent submitters"):
+            accepted, errors = hammer(app, survey_id, submitters, submit)
+
+        with app.app_context():
+            total = db.session.get(Survey, survey_id).total_responses
+            print(f"  accepted {len(accepted)}, counter {total}, cap {cap}, errors {len(errors)}")
+            if submit is submit_naive:
+                print(f"  lost updates: {len(accepted) - total}, overshoot: {max(len(accepted) - cap, 0)}")
+                continue
+
+            ok &= total == len(accepted) <= cap
+            for quota in SurveyQuota.query.filter_by(survey_id=survey_id).order_by(SurveyQuota.segment):
+                members = sum(1 for user_id in accepted if quota.segment in _segments(profiles[user_id]))
+                correct = quota.current_count == members <= quota.max_responses
+                ok &= correct
+                print(f"  {quota.segment}: counter {quota.current_count}, accepted members {members}, "
+                      f"cap {quota.max_responses} {'OK' if correct else 'MISMATCH'}")
+
+    print("Quota counters consistent" if ok else "Quota counters INCONSISTENT")
+    return ok
+
+
+def _segments(profile):
+    segments = set()
+    if 18 <= profile['age'] <= 29:
+        segments.add('age_18_29')
+    if 30 <= profile['age'] <= 49:
+        segments.add('age_30_49')
+    if profile['region'] == 'DE':
+        segments.add('region_de')
+    return segments
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 400) else 1)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Abandoned-Response Reaper
+Legt N Antworten an (Standard: 1000000, davon 10% abgebrochen und alt) und misst das
+Aufräumen in Batches - Durchsatz, Dauer pro Batch (= Sperrdauer) und die Suche nach
+alten Antworten mit und ohne Index (is_completed, started_at)
+
+Usage: python benchmarks/bench_reaper.py [RESPONSES] [BATCH_SIZE]
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, timed
+
+from sqlalchemy import text
+
+from app.database import db
+from app.models import Survey, SurveyResponse, User
+from app.utils.response_reaper import reap_batch
+
+SURVEYS = 500
+STALE_SHARE = 0.1
+
+
+def seed(count, rng):
+    now = datetime.utcnow()
+    users = count // SURVEYS + 1
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'user{i}@bench.local', 'password_hash': 'x', 'first_name': 'Bench', 'last_name': str(i),
+         'is_active': True, 'created_at': now}
+        for i in range(1, users + 1)
+    ])
+    db.session.execute(Survey.__table__.insert(), [
+        {'title': f'Survey {i}', 'questions': '[]', 'reward_amount': 1, 'estimated_duration': 5,
+         'reward_per_minute': 0.2, 'max_responses': count, 'total_responses': 0, 'reserved_slots': 0,
+         'is_active': True, 'created_at': now}
+        for i in range(SURVEYS)
+    ])
+    for start in range(0, count, 50000):
+        rows = []
+        for i in range(start, min(start + 50000, count)):
+            started_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+            completed = rng.random() > STALE_SHARE
+            rows.append({'survey_id': i % SURVEYS + 1, 'user_id': i // SURVEYS + 1, 'started_at': started_at,
+                         'completed_at': started_at + timedelta(minutes=8) if completed else None,
+                         'is_completed': completed, 'responses': '{"q1": "a"}' if completed else None})
+        db.session.execute(SurveyResponse.__table__.insert(), rows)
+    db.session.commit()
+
+
+def find_latency(cutoff, batch_size, indexed, repeats=20):
+    hint = '' if indexed else 'NOT INDEXED '
+    sql = text(f"SELECT id, user_id FROM survey_responses {hint}"
+               "WHERE is_completed = 0 AND started_at < :cutoff ORDER BY started_at LIMIT :limit")
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        db.session.execute(sql, {'cutoff': cutoff, 'limit': batch_size}).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(response_count, batch_size):
+    rng = random.Random(44)
+    app = create_bench_app()
+    with app.app_context():
+        with timed(f"Seed {response_count} responses"):
+            seed(response_count, rng)
+
+        cutoff = datetime.utcnow() - timedelta(hours=24)
+        stale = SurveyResponse.query.filter(SurveyResponse.is_completed == False,
+                                            SurveyResponse.started_at < cutoff).count()
+        print(f"Stale unfinished responses (> 24h): {stale}")
+        indexed = find_latency(cutoff, batch_size, True)
+        scan = find_latency(cutoff, batch_size, False, repeats=3)
+        print(f"Find oldest {batch_size} stale: index {indexed:.2f} ms, table scan {scan:.2f} ms")
+
+        batch_ms, reclaimed = [], 0
+        with timed(f"Reap {stale} stale responses (batches of {batch_size})", stale):
+            while True:
+                start = time.perf_counter()
+                result = reap_batch(cutoff, batch_size)
+                batch_ms.append((time.perf_counter() - start) * 1000)
+                reclaimed += result['reclaimed']
+                if result['found'] < batch_size:
+                    break
+        batch_ms.sort()
+        print(f"  {len(batch_ms)} batches, per batch p50 {statistics.median(batch_ms):.1f} ms, "
+              f"max {batch_ms[-1]:.1f} ms")
+
+        left = SurveyResponse.query.filter(SurveyResponse.is_completed == False,
+                                           SurveyResponse.started_at < cutoff).count()
+        ok = reclaimed == stale and left == 0
+        print(f"  reclaimed {reclaimed}, stale left {left} {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 500) else 1)
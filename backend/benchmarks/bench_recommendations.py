@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Precomputed Survey Recommendations
+Vergleicht die vorberechneten Kandidatenlisten mit der NOT-IN-Unterabfrage
+bei N Antworten (Standard: 1.000.000)
+
+Usage: python benchmarks/bench_recommendations.py [RESPONSES] [USERS] [SURVEYS]
+"""
+
+import json
+import random
+import sys
+import time
+from datetime import datetime
+
+from bench_common import create_bench_app, peak_rss_mb, timed
+
+from sqlalchemy import or_
+
+from app.database import db
+from app.models import Survey, SurveyResponse, User, QualificationAnswer
+from app.utils.eligibility_index import get_eligibility_index
+from app.utils.recommendations import RecommendationService
+
+LOCATIONS = ['DE', 'AT', 'CH']
+SAMPLE_USERS = 200
+
+
+def seed(response_count, user_count, survey_count, batch=50000):
+    """Users, surveys (10% with a location rule) and response_count responses"""
+    rng = random.Random(7)
+    now = datetime.utcnow()
+
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'user{i}@bench.local', 'password_hash': 'x', 'first_name': 'Bench', 'last_name': str(i),
+         'is_active': True, 'created_at': now}
+        for i in range(1, user_count + 1)
+    ])
+    db.session.execute(QualificationAnswer.__table__.insert(), [
+        {'user_id': i, 'question_id': 'location', 'value': json.dumps(rng.choice(LOCATIONS)),
+         'answered_at': now, 'updated_at': now}
+        for i in range(1, user_count + 1)
+    ])
+    surveys = []
+    for i in range(1, survey_count + 1):
+        reward, duration = round(rng.uniform(0.5, 10), 2), rng.randint(2, 30)
+        surveys.append({
+            'title': f'Survey {i}', 'questions': '[]', 'reward_amount': reward, 'estimated_duration': duration,
+            # Bulk inserts skip the ORM hook that keeps the ranking column in sync
+            'reward_per_minute': Survey.compute_reward_per_minute(reward, duration),
+            'max_responses': response_count, 'total_responses': 0, 'is_active': rng.random() < 0.9,
+            'is_published': True, 'created_at': now, 'updated_at': now,
+            'qualification_criteria': json.dumps({'demographics': {'location': rng.choice(LOCATIONS)}})
+            if rng.random() < 0.1 else None
+        })
+    db.session.execute(Survey.__table__.insert(), surveys)
+    db.session.commit()
+
+    # Every user answers the same number of distinct surveys
+    per_user = max(1, min(survey_count, response_count // user_count))
+    table = SurveyResponse.__table__
+    rows = []
+    for user_id in range(1, user_count + 1):
+        for survey_id in rng.sample(range(1, survey_count + 1), per_user):
+            rows.append({'user_id': user_id, 'survey_id': survey_id, 'responses': '{}',
+                         'started_at': now, 'completed_at': now, 'is_completed': True})
+        if len(rows) >= batch:
+            db.session.execute(table.insert(), rows)
+            db.session.commit()
+            rows = []
+    if rows:
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+    return user_count * per_user
+
+
+def subquery_alternatives(user_id, limit=5):
+    """Baseline: the former get_alternative_surveys query (ranked by reward per minute)"""
+    return db.session.query(Survey.id).filter(
+        Survey.is_active == True,
+        or_(Survey.ends_at.is_(None), Survey.ends_at > datetime.utcnow()),
+        Survey.total_responses < Survey.max_responses,
+        ~Survey.id.in_(
+            db.session.query(SurveyResponse.survey_id).filter(SurveyResponse.user_id == user_id)
+        )
+    ).order_by((Survey.reward_amount / Survey.estimated_duration).desc(), Survey.id).limit(limit).all()
+
+
+def run(response_count, user_count, survey_count):
+    app = create_bench_app()
+    with app.app_context():
+        with timed(f"Seed {response_count:,} responses"):
+            seeded = seed(response_count, user_count, survey_count)
+        print(f"{seeded:,} responses, {user_count:,} users, {survey_count:,} surveys")
+
+        rng = random.Random(11)
+        users = rng.sample(range(1, user_count + 1), SAMPLE_USERS)
+
+        start = time.perf_counter()
+        for user_id in users:
+            subquery_alternatives(user_id)
+        baseline = (time.perf_counter() - start) / len(users)
+        print(f"NOT IN subquery: {baseline * 1000:.2f} ms per call")
+
+        with timed("Build eligibility index"):
+            get_eligibility_index()
+        service = RecommendationService(max_users=user_count)
+        with timed("Build recommendation ranking"):
+            service.build()
+
+        start = time.perf_counter()
+        for user_id in users:
+            service.recommend(user_id, 5)
+        cold = (time.perf_counter() - start) / len(users)
+        print(f"Recommendation, first read per user (builds list): {cold * 1000:.2f} ms")
+
+        start = time.perf_counter()
+        rounds = 50
+        for _ in range(rounds):
+            for user_id in users:
+                service.recommend(user_id, 5)
+        warm = (time.perf_counter() - start) / (rounds * len(users))
+        print(f"Recommendation, precomputed list: {warm * 1e6:.1f} µs per call "
+              f"({baseline / warm:,.0f}x faster than the subquery)")
+
+        start = time.perf_counter()
+        for user_id in users:
+            service.mark_taken(user_id, service.recommend(user_id, 1)[0])
+        print(f"Incremental update (user started a survey): "
+              f"{(time.perf_counter() - start) / len(users) * 1e6:.1f} µs per event")
+
+        survey = Survey(title='New Survey', questions='[]', reward_amount=50, estimated_duration=5,
+                        max_responses=1000, is_active=True)
+        db.session.add(survey)
+        db.session.commit()
+        with timed(f"Incremental update (survey opened, {len(users)} cached users)"):
+            service.refresh_survey(survey)
+        survey.is_active = False
+        with timed("Incremental update (survey closed)"):
+            service.refresh_survey(survey)
+
+        print(f"Peak RSS: {peak_rss_mb():.1f} MB")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 1000)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Capacity Reservations
+Lässt N gleichzeitige Starts (Standard: 400 Threads) um knappe Plätze konkurrieren,
+gibt L abgelaufene Leases (Standard: 200000) in Batches frei und vergleicht das Lesen
+der freien Kapazität (Zähler) mit dem Zählen der Leases und Antworten
+
+Usage: python benchmarks/bench_reservations.py [STARTERS] [LEASES]
+"""
+
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, timed
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+
+from app.database import db
+from app.models import Survey, SurveyReservation, SurveyResponse, User
+from app.utils.reservations import reserve_slot, sweep_expired
+
+SURVEY_CAP = 150
+SURVEYS = 1000
+
+
+def seed_users(count):
+    now = datetime.utcnow()
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'user{i}@bench.local', 'password_hash': 'x', 'first_name': 'Bench', 'last_name': str(i),
+         'is_active': True, 'created_at': now}
+        for i in range(1, count + 1)
+    ])
+    db.session.commit()
+
+
+def contention(app, starters):
+    """All starters try to lease a slot of one survey at the same moment"""
+    with app.app_context():
+        survey = Survey(title='Contended Survey', questions='[]', reward_amount=1, max_responses=SURVEY_CAP)
+        db.session.add(survey)
+        db.session.commit()
+        survey_id = survey.id
+
+    barrier = threading.Barrier(starters)
+    leased, errors = [], []
+
+    def worker(user_id):
+        with app.app_context():
+            barrier.wait()
+            try:
+                survey = db.session.get(Survey, survey_id)
+                response = SurveyResponse(survey_id=survey_id, user_id=user_id, is_completed=False)
+                db.session.add(response)
+                db.session.flush()
+                if reserve_slot(survey, response):
+                    db.session.commit()
+                    leased.append(user_id)
+                else:
+                    db.session.rollback()
+            except OperationalError:
+                db.session.rollback()
+                errors.append(user_id)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in range(1, starters + 1)]
+    with timed(f"{starters} concurrent starts for {SURVEY_CAP} slots"):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    with app.app_context():
+        survey = db.session.get(Survey, survey_id)
+        leases = SurveyReservation.query.filter_by(survey_id=survey_id).count()
+        ok = len(leased) == leases == survey.reserved_slots <= SURVEY_CAP
+        print(f"  leased {len(leased)}, reserved_slots {survey.reserved_slots}, lease rows {leases}, "
+              f"errors {len(errors)} {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+
+def seed_leases(count, rng):
+    """count expired leases spread over SURVEYS surveys (responses included)"""
+    now = datetime.utcnow()
+    db.session.execute(Survey.__table__.insert(), [
+        {'title': f'Survey {i}', 'questions': '[]', 'reward_amount': 1, 'estimated_duration': 5,
+         'reward_per_minute': 0.2, 'max_responses': count, 'total_responses': 0, 'reserved_slots': 0,
+         'is_active': True, 'created_at': now}
+        for i in range(SURVEYS)
+    ])
+    survey_ids = [survey_id for survey_id, in db.session.query(Survey.id).filter(Survey.title.like('Survey %'))]
+
+    # Lease i: survey i % SURVEYS, user i // SURVEYS + 1 (one response per user and survey)
+    for start in range(0, count, 20000):
+        chunk = range(start, min(start + 20000, count))
+        rows = [{'survey_id': survey_ids[i % SURVEYS], 'user_id': i // SURVEYS + 1,
+                 'started_at': now, 'is_completed': False} for i in chunk]
+        first_id = (db.session.query(func.max(SurveyResponse.id)).scalar() or 0) + 1
+        db.session.execute(SurveyResponse.__table__.insert(), rows)
+        db.session.execute(SurveyReservation.__table__.insert(), [
+            {'survey_id': row['survey_id'], 'response_id': first_id + offset, 'user_id': row['user_id'],
+             'expires_at': now - timedelta(seconds=rng.randint(1, 3600)), 'created_at': now}
+            for offset, row in enumerate(rows)
+        ])
+    for survey_id, leases in db.session.query(SurveyReservation.survey_id, func.count(SurveyReservation.id))\
+                                       .group_by(SurveyReservation.survey_id).all():
+        db.session.query(Survey).filter_by(id=survey_id).update({'reserved_slots': leases})
+    db.session.commit()
+    return survey_ids
+
+
+def capacity_reads(survey_ids, rng, reads=2000):
+    sample = [rng.choice(survey_ids) for _ in range(reads)]
+
+    start = time.perf_counter()
+    for survey_id in sample:
+        db.session.query(Survey.max_responses - Survey.total_responses - Survey.reserved_slots)\
+                  .filter(Survey.id == survey_id).scalar()
+    counter_us = (time.perf_counter() - start) / reads * 1e6
+
+    start = time.perf_counter()
+    for survey_id in sample:
+        db.session.query(func.count(SurveyReservation.id)).filter(SurveyReservation.survey_id == survey_id,
+                                                                  SurveyReservation.expires_at > datetime.utcnow())\
+                  .scalar()
+        db.session.query(func.count(SurveyResponse.id)).filter(SurveyResponse.survey_id == survey_id,
+                                                               SurveyResponse.is_completed == True).scalar()
+    counting_us = (time.perf_counter() - start) / reads * 1e6
+    print(f"Available capacity per read: counter {counter_us:.1f} µs, counting leases+responses {counting_us:.1f} µs")
+
+
+def run(starters, lease_count):
+    rng = random.Random(43)
+    # Threads wait for the SQLite write lock instead of failing immediately
+    app = create_bench_app(engine_options={'connect_args': {'timeout': 60},
+                                           'pool_size': 20, 'max_overflow': starters})
+    with app.app_context():
+        seed_users(max(starters, lease_count // SURVEYS + 1))
+    ok = contention(app, starters)
+
+    with app.app_context():
+        with timed(f"Seed {lease_count} expired leases"):
+            survey_ids = seed_leases(lease_count, rng)
+        capacity_reads(survey_ids, rng)
+
+        batch_size = app.config.get('SURVEY_RESERVATION_SWEEP_BATCH', 1000)
+        with timed(f"Sweep {lease_count} expired leases (batches of {batch_size})", lease_count):
+            released = sweep_expired(batch_size=batch_size)
+
+        leftover = db.session.query(func.coalesce(func.sum(Survey.reserved_slots), 0))\
+                             .filter(Survey.id.in_(survey_ids)).scalar()
+        consistent = sum(released.values()) == lease_count and leftover == 0
+        print(f"  released {sum(released.values())}, reserved_slots left {leftover} "
+              f"{'OK' if consistent else 'MISMATCH'}")
+        ok &= consistent
+
+    print("Reservation counters consistent" if ok else "Reservation counters INCONSISTENT")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 400,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 200000) else 1)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Streaming Response Export
+Exportiert N Antworten (Standard: 1.000.000) als CSV/Parquet/Arrow und misst Zeit und Speicher
+
+Usage: python benchmarks/bench_response_export.py [N]
+"""
+
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+from bench_common import create_bench_app, peak_rss_mb, timed
+
+from app.database import db
+from app.models import Survey, SurveyResponse
+from app.utils.response_export import iter_export, format_available
+
+QUESTIONS = [
+    {'id': 'q1', 'type': 'single_choice', 'options': ['Täglich', 'Wöchentlich', 'Monatlich', 'Selten']},
+    {'id': 'q2', 'type': 'scale', 'scale_min': 1, 'scale_max': 10},
+    {'id': 'q3', 'type': 'multiple_choice', 'options': ['Smartphone', 'Laptop', 'Tablet', 'Smart Watch']},
+    {'id': 'q4', 'type': 'boolean'},
+    {'id': 'q5', 'type': 'text'},
+]
+
+
+def seed(count, batch=50000):
+    """Bulk insert count completed responses"""
+    survey = Survey(title='Benchmark Survey', questions=json.dumps(QUESTIONS), reward_amount=1.00,
+                    max_responses=count)
+    db.session.add(survey)
+    db.session.commit()
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    table = SurveyResponse.__table__
+    for offset in range(0, count, batch):
+        rows = []
+        for i in range(offset, min(offset + batch, count)):
+            answers = {
+                'q1': rng.choice(QUESTIONS[0]['options']),
+                'q2': rng.randint(1, 10),
+                'q3': rng.sample(QUESTIONS[2]['options'], rng.randint(1, 3)),
+                'q4': rng.random() < 0.5,
+                'q5': 'Freitext Antwort' if rng.random() < 0.3 else ''
+            }
+            rows.append({'user_id': i + 1, 'survey_id': survey.id, 'responses': json.dumps(answers),
+                         'started_at': now - timedelta(seconds=rng.randint(60, 900)),
+                         'completed_at': now, 'is_completed': True})
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+    return survey
+
+
+def run(count):
+    app = create_bench_app()
+    with app.app_context():
+        with timed(f"Seed {count:,} responses", count):
+            survey = seed(count)
+
+        print(f"Peak RSS after seeding: {peak_rss_mb():.1f} MB")
+        for export_format in ('csv', 'parquet', 'arrow'):
+            if not format_available(export_format):
+                print(f"{export_format}: skipped (pyarrow not installed)")
+                continue
+            total_bytes = 0
+            with timed(f"Export {export_format}", count):
+                for block in iter_export(survey, export_format, chunk_size=5000):
+                    total_bytes += len(block)
+            print(f"  {total_bytes / 1024 / 1024:.1f} MB written, peak RSS {peak_rss_mb():.1f} MB")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
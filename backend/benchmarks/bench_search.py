@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Full-Text Survey Search
+Legt N Umfragen an (Standard: 100000) und misst die Latenz von /api/surveys/search
+(FTS5, bm25 + Vergütung) gegenüber einem LIKE '%term%'-Scan über Titel und Beschreibung
+
+Usage: python benchmarks/bench_search.py [SURVEYS] [QUERIES]
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from bench_common import create_bench_app, timed
+
+from sqlalchemy import or_
+
+from app.database import db
+from app.models import Survey
+
+TOPICS = ['Mobilität', 'Ernährung', 'Umwelt', 'Gesundheit', 'Finanzen', 'Reisen', 'Technologie', 'Wohnen',
+          'Energie', 'Streaming', 'Mode', 'Sport', 'Bildung', 'Arbeit', 'Haustiere', 'Versicherung']
+SYLLABLES = ['ber', 'kon', 'sum', 'mark', 'zeit', 'wert', 'land', 'bau', 'fahr', 'rad', 'tech', 'netz', 'haus',
+             'geld', 'plan', 'kauf', 'spiel', 'werk', 'bild', 'form', 'wahl', 'kunst', 'licht', 'stoff']
+QUERIES = ['mobilität', 'umwelt', 'finanzen reisen', 'gesundheit', 'streaming', 'energie wohnen']
+
+
+def vocabulary(rng, size=5000):
+    """Synthetic German-like words; drawn with a Zipf-like skew like real text"""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.sample(SYLLABLES, rng.randint(2, 4))).capitalize())
+    return sorted(words)
+
+
+def zipf_sampler(words, rng):
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return lambda k: rng.choices(words, weights=weights, k=k)
+
+
+def seed(count, rng, words):
+    draw = zipf_sampler(words, rng)
+    now = datetime.utcnow()
+    batch = []
+    for i in range(count):
+        batch.append({
+            'title': f"{rng.choice(TOPICS)}: {' '.join(draw(4))}",
+            'description': ' '.join(draw(25)),
+            'questions': '[]', 'reward_amount': round(rng.uniform(0.5, 10), 2), 'estimated_duration': 5,
+            'max_responses': 1000, 'total_responses': 0, 'is_active': rng.random() < 0.9, 'created_at': now
+        })
+        if len(batch) == 10000:
+            db.session.execute(Survey.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Survey.__table__.insert(), batch)
+    db.session.commit()
+
+
+def latencies(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def like_search(query, limit=20):
+    """Baseline: every word as LIKE '%word%' on title or description (full table scan)"""
+    filters = [or_(Survey.title.ilike(f'%{word}%'), Survey.description.ilike(f'%{word}%'))
+               for word in query.split()]
+    return Survey.query.filter(Survey.is_active == True, *filters)\
+                       .order_by(Survey.reward_amount.desc()).limit(limit).all()
+
+
+def run(survey_count, query_count):
+    rng = random.Random(41)
+    app = create_bench_app()
+    app.config['TESTING'] = True
+    from app.routes.surveys import surveys_bp
+    app.register_blueprint(surveys_bp, url_prefix='/api/surveys')
+
+    words = vocabulary(rng)
+    with app.app_context():
+        from app.utils.survey_search import ensure_search_index
+        ensure_search_index()  # triggers index every insert below
+        with timed(f"Insert {survey_count} surveys (FTS triggers)", survey_count):
+            seed(survey_count, rng, words)
+
+    # Typical searches: a topic, or one or two content words from the middle of the vocabulary
+    queries = [rng.choice(QUERIES) if rng.random() < 0.3 else ' '.join(rng.sample(words[50:2000], rng.randint(1, 2)))
+               for _ in range(query_count)]
+    client = app.test_client()
+    response = client.get('/api/surveys/search', query_string={'q': 'umwelt'})
+    top = response.get_json()['results'][:3]
+    print("Top results for 'umwelt':")
+    for row in top:
+        print(f"  {row['score']:>8.3f}  {row['reward_amount']:>5.2f} EUR  {row['title']}")
+
+    fts_p50, fts_p95 = latencies(lambda q: client.get('/api/surveys/search', query_string={'q': q}), queries)
+    print(f"GET /api/surveys/search (FTS5): p50 {fts_p50:.2f} ms, p95 {fts_p95:.2f} ms")
+
+    with app.app_context():
+        like_p50, like_p95 = latencies(like_search, queries[:max(query_count // 10, 5)])
+    print(f"LIKE '%term%' scan (query only): p50 {like_p50:.2f} ms, p95 {like_p95:.2f} ms")
+    print(f"Speedup at p50: {like_p50 / fts_p50:.1f}x")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200)
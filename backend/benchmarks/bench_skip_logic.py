@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Skip Logic
+Kompiliert eine Umfrage mit Q Fragen (Standard: 200, jede vierte mit Bedingung, jede zehnte
+mit Sprung) und berechnet N-mal (Standard: 100000) nächste Frage, sichtbare und fehlende
+Pflichtfragen - gecachter Graph gegenüber Neu-Kompilieren pro Anfrage
+
+Usage: python benchmarks/bench_skip_logic.py [QUESTIONS] [EVALUATIONS]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from bench_common import create_bench_app
+
+from app.utils.response_validation import compile_validator
+from app.utils.skip_logic import compile_graph
+
+
+def questions(count):
+    items = []
+    for i in range(count):
+        question = {'id': f'q{i}', 'type': 'single_choice', 'options': ['a', 'b', 'c'], 'required': i % 3 == 0}
+        if i % 4 == 3:
+            question['show_if'] = {'any': [{'field': f'q{i - 1}', 'eq': 'a'}, {'field': f'q{i - 3}', 'ne': 'c'}]}
+        if i % 10 == 5 and i + 4 < count:
+            question['branches'] = [{'if': {'field': f'q{i}', 'eq': 'c'}, 'goto': f'q{i + 4}'}]
+        items.append(question)
+    return items
+
+
+def answer_sets(rng, schema, count):
+    sets = []
+    for _ in range(count):
+        answered = rng.randint(0, len(schema))
+        sets.append({question['id']: rng.choice(question['options']) for question in schema[:answered]})
+    return sets
+
+
+def measure(label, evaluations, function, sets):
+    samples = []
+    for answers in sets[:evaluations]:
+        start = time.perf_counter()
+        function(answers)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    print(f"  {label}: p50 {statistics.median(samples):.1f} µs, p99 {samples[int(len(samples) * 0.99) - 1]:.1f} µs")
+    return statistics.median(samples)
+
+
+def run(question_count, evaluations):
+    rng = random.Random(46)
+    app = create_bench_app()
+    schema = questions(question_count)
+    sets = answer_sets(rng, schema, evaluations)
+
+    with app.app_context():
+        start = time.perf_counter()
+        validator = compile_validator(schema)
+        print(f"Compiled {question_count} questions (validator + graph) in {(time.perf_counter() - start) * 1000:.1f} ms")
+        graph = validator.graph
+
+        print(f"Navigation ({evaluations} answer sets):")
+        cached = measure('cached graph', evaluations, graph.navigation, sets)
+        uncached = measure('compile per request', max(evaluations // 100, 100),
+                           lambda answers: compile_graph(schema).navigation(answers), sets)
+        measure('next question only', evaluations, graph.next_question, sets)
+        measure('full submit validation', evaluations, validator, sets)
+
+        hidden, skipped = [], 0
+        for answers in sets:
+            hidden_ids = graph.hidden_questions(answers)
+            hidden.append(len(hidden_ids))
+            skipped += len(hidden_ids.intersection(answers))
+        affecting = sum(1 for question in schema if graph.affects([question['id']]))
+        print(f"  hidden per answer set: avg {statistics.mean(hidden):.1f} of {question_count}; "
+              f"{skipped} answers to hidden questions dropped")
+        print(f"  autosaves that need navigation: {affecting} of {question_count} questions have dependents")
+        print(f"  cached graph {uncached / cached:.0f}x faster than compiling per request")
+    return cached < uncached
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 100000) else 1)
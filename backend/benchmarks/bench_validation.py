@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Compiled Response Validation
+Validiert N Abgaben (Standard: 100000) gegen ein Fragen-Schema mit Q Fragen (Standard: 40)
+und vergleicht den kompilierten Validator mit einer pro Abgabe interpretierten Prüfung
+
+Usage: python benchmarks/bench_validation.py [RESPONSES] [QUESTIONS]
+"""
+
+import json
+import random
+import sys
+import time
+
+import bench_common  # noqa: F401 - puts the backend on sys.path
+
+from app.utils.response_validation import compile_validator
+
+OPTIONS = ['Täglich', 'Wöchentlich', 'Monatlich', 'Selten', 'Nie']
+
+
+def build_schema(question_count):
+    kinds = ['single_choice', 'multiple_choice', 'scale', 'text', 'boolean', 'number']
+    questions = []
+    for i in range(question_count):
+        kind = kinds[i % len(kinds)]
+        question = {'id': f'q{i}', 'type': kind, 'required': i % 3 == 0}
+        if kind in ('single_choice', 'multiple_choice'):
+            question['options'] = OPTIONS
+        if kind == 'multiple_choice':
+            question['max_selections'] = 3
+        if kind == 'scale':
+            question.update({'scale_min': 1, 'scale_max': 7})
+        if kind == 'number':
+            question.update({'min': 0, 'max': 120})
+        questions.append(question)
+    return questions
+
+
+def build_responses(questions, count, rng):
+    responses = []
+    for _ in range(count):
+        answers = {}
+        for question in questions:
+            kind = question['type']
+            if kind == 'single_choice':
+                answers[question['id']] = rng.choice(OPTIONS)
+            elif kind == 'multiple_choice':
+                answers[question['id']] = rng.sample(OPTIONS, rng.randint(1, 3))
+            elif kind == 'scale':
+                answers[question['id']] = rng.randint(1, 7)
+            elif kind == 'text':
+                answers[question['id']] = 'Antwort ' * rng.randint(1, 10)
+            elif kind == 'boolean':
+                answers[question['id']] = rng.random() < 0.5
+            else:
+                answers[question['id']] = rng.randint(0, 120)
+        if rng.random() < 0.05:
+            answers[questions[2]['id']] = 99  # out of range
+        responses.append(answers)
+    return responses
+
+
+def interpreted_validate(questions_json, answers):
+    """Baseline: parse the schema and dispatch on the question type for every submission"""
+    errors = {}
+    questions = {str(question['id']): question for question in json.loads(questions_json)}
+    for question_id, value in answers.items():
+        question = questions.get(question_id)
+        if question is None:
+            errors[question_id] = 'Unknown question'
+            continue
+        kind = question.get('type')
+        if kind == 'single_choice':
+            if value not in question.get('options', []):
+                errors[question_id] = 'Unknown option'
+        elif kind == 'multiple_choice':
+            selected = value if isinstance(value, list) else [value]
+            if any(item not in question.get('options', []) for item in selected):
+                errors[question_id] = 'Unknown option'
+            elif len(selected) > question.get('max_selections', len(selected)):
+                errors[question_id] = 'Too many options'
+        elif kind in ('scale', 'number'):
+            low = question.get('scale_min', question.get('min'))
+            high = question.get('scale_max', question.get('max'))
+            if not isinstance(value, (int, float)) or (low is not None and value < low) \
+                    or (high is not None and value > high):
+                errors[question_id] = 'Out of range'
+        elif kind == 'text':
+            if not isinstance(value, str):
+                errors[question_id] = 'Expected text'
+        elif kind == 'boolean':
+            if not isinstance(value, bool):
+                errors[question_id] = 'Expected true or false'
+    for question_id, question in questions.items():
+        if question.get('required') and answers.get(question_id) in (None, '', []):
+            errors[question_id] = 'Answer is required'
+    return errors
+
+
+def measure(label, validate, responses):
+    start = time.perf_counter()
+    invalid = sum(1 for answers in responses if validate(answers))
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed / len(responses) * 1e6:.1f} µs per response "
+          f"({len(responses) / elapsed:,.0f}/s, {invalid} invalid)")
+    return elapsed, invalid
+
+
+def run(response_count, question_count):
+    rng = random.Random(38)
+    questions = build_schema(question_count)
+    questions_json = json.dumps(questions)
+    responses = build_responses(questions, response_count, rng)
+    print(f"{response_count} responses, {question_count} questions")
+
+    start = time.perf_counter()
+    compile_validator(questions_json)
+    print(f"Compile (first call): {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    # Cache lookup included: each submit fetches the validator for the stored schema
+    compiled_time, compiled_invalid = measure(
+        'compiled validator', lambda answers: compile_validator(questions_json)(answers), responses)
+    interpreted_time, interpreted_invalid = measure(
+        'interpreted per submission', lambda answers: interpreted_validate(questions_json, answers), responses)
+
+    print(f"Speedup: {interpreted_time / compiled_time:.1f}x")
+    return compiled_invalid == interpreted_invalid
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else 40) else 1)
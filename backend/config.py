@@ -51,6 +51,33 @@ class Config:
     MAX_SURVEY_RESPONSES = 1000
     MIN_REWARD_AMOUNT = 1.00  # EUR
     MAX_REWARD_AMOUNT = 100.00  # EUR
+    RECOMMENDATION_CACHE_USERS = 10000  # per-user recommendation lists kept in memory (single app process, see README)
+    AUTOSAVE_COMPACT_THRESHOLD = 50  # autosave deltas per response before they are folded into a snapshot
+    SEARCH_REWARD_WEIGHT = 0.5  # max. relative score boost from the reward in /api/surveys/search
+    SEARCH_REWARD_PIVOT = 5.0  # reward (EUR) that earns half of that boost
+    SURVEY_SCHEDULER_ENABLED = os.environ.get('SURVEY_SCHEDULER_ENABLED', 'True').lower() in ['true', '1', 'on']
+    SURVEY_SCHEDULER_RESCAN_SECONDS = 60  # pending transitions are re-read at least this often
+    SURVEY_RESERVATION_TTL = 3600  # seconds a started survey holds its slot
+    SURVEY_RESERVATION_SWEEP_INTERVAL = 30  # seconds between expiry sweeps
+    SURVEY_RESERVATION_SWEEP_BATCH = 1000  # expired leases released per transaction
+    ABANDONED_RESPONSE_AGE_HOURS = 24  # unfinished responses older than this are deleted (> reservation TTL)
+    RESPONSE_REAPER_INTERVAL = 300  # seconds between reaper runs
+    RESPONSE_REAPER_BATCH = 500  # responses deleted per transaction
+    RESPONSE_REAPER_MAX_BATCHES = 20  # per run - a large backlog is worked off over several runs
+    QUALITY_SPEEDER_RATIO = 0.33  # faster than this share of estimated_duration counts as speeding
+    QUALITY_GRID_MIN_ITEMS = 4  # questions sharing one answer scale that form a grid
+    QUALITY_SKETCH_CAPACITY = 500000  # IP/device keys per sketch generation (two generations kept)
+    QUALITY_SKETCH_ERROR_RATE = 0.001  # false-positive rate of the IP/device collision sketches
+    SURVEY_BULK_MAX_ITEMS = 1000  # surveys per POST /api/surveys/bulk request (the CLI sends chunks)
+    ANALYSIS_CACHE_SURVEYS = 16  # survey (version) frames of columnar answers kept in memory per worker
+    ANALYSIS_REFRESH_SECONDS = 30  # how long a frame is used before newly completed responses are appended
+    RAKING_MAX_ITERATIONS = 50  # iterative proportional fitting passes before giving up
+    RAKING_TOLERANCE = 1e-6  # largest allowed gap between weighted and target shares
+    DURATION_SKETCH_ACCURACY = 0.01  # relative error of completion time quantiles
+    DURATION_SKETCH_MAX_BUCKETS = 512  # memory bound per sketch (lowest buckets are collapsed first)
+    DURATION_SKETCH_FLUSH_SECONDS = 60  # how often a worker merges its completion times into the database
+    DURATION_CALIBRATION_MIN_SAMPLES = 30  # completions before estimated_duration follows the median
+    DURATION_AUTO_CALIBRATE = True  # False keeps the hand-entered estimated_duration
     
     # Security settings
     PASSWORD_MIN_LENGTH = 6
@@ -80,10 +107,34 @@ class Config:
     PAYPAL_CLIENT_SECRET = os.environ.get('PAYPAL_CLIENT_SECRET')
     PAYPAL_SANDBOX = os.environ.get('PAYPAL_SANDBOX', 'True').lower() in ['true', '1', 'on']
     
+    # Background job settings
+    ACCOUNT_DELETION_CHUNK_SIZE = 500  # rows per transaction
+    EXPORT_BATCH_SIZE = 1000  # rows per server-side cursor fetch
+    ANALYTICS_REBUILD_CHUNK_SIZE = 1000  # responses per chunk when rebuilding aggregates
+    ANSWER_BACKFILL_CHUNK_SIZE = 1000  # responses per transaction when normalizing answers
+    RESPONSE_EXPORT_CHUNK_SIZE = 5000  # responses per chunk in survey exports
+    EXPORT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'exports')
+    EXPORT_ARCHIVE_TTL_HOURS = 24  # a finished export archive is deleted after this long
+    EXPORT_SWEEP_INTERVAL = 600  # seconds between sweeps for expired export archives
+    
+    # Idempotency settings (Idempotency-Key header on submit, payout and bonus)
+    IDEMPOTENCY_KEY_TTL_HOURS = 24  # stored responses are replayed for this long
+    IDEMPOTENCY_WAIT_SECONDS = 10  # duplicates wait this long for the in-flight request
+    IDEMPOTENCY_LOCK_SECONDS = 300  # in-progress keys older than this are taken over
+    IDEMPOTENCY_PURGE_BATCH = 100  # expired keys deleted per new key
+    
+    # Ingestion settings ('queue' = write-behind: acknowledge submits, apply them in batches;
+    # reservations are kept in memory, so queue mode needs a single app process)
+    INGESTION_MODE = os.environ.get('INGESTION_MODE', 'sync')
+    INGESTION_QUEUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'ingestion_queue.db')
+    INGESTION_BATCH_SIZE = 500  # submissions applied per transaction
+    INGESTION_FLUSH_INTERVAL = 0.2  # seconds the writer waits for a batch to fill
+    
     # API settings
     API_RATE_LIMIT = os.environ.get('API_RATE_LIMIT', '100 per hour')
     API_PAGINATION_DEFAULT = 20
     API_PAGINATION_MAX = 100
+    HTTP_CACHE_MAX_AGE = 30  # seconds shared caches may serve public survey/catalog responses unchecked
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bulk Survey Import for DataFair Survey System
+Importiert Umfragen aus einer JSON-Datei (Liste oder {"surveys": [...]}) oder JSON Lines
+über dieselbe Upsert-Logik wie POST /api/surveys/bulk
+
+Usage: python import_surveys.py surveys.json [--dry-run] [--chunk 1000]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add the current directory to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+
+def load_items(path):
+    """Survey items of a .json file (list or {"surveys": [...]}) or a .jsonl file"""
+    with open(path, encoding='utf-8') as handle:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in handle if line.strip()]
+        data = json.load(handle)
+    return data.get('surveys', []) if isinstance(data, dict) else data
+
+
+def import_surveys(path, dry_run=False, chunk=None):
+    """Upsert all surveys of the file in chunks -> True if every item was valid"""
+    from flask import Flask
+    from app.database import db, init_db
+    from app.utils.survey_authoring import bulk_upsert
+    from config import Config
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    init_db(app)
+
+    items = load_items(path)
+    chunk = chunk or app.config.get('SURVEY_BULK_MAX_ITEMS', 1000)
+    totals = {'created': 0, 'updated': 0, 'unchanged': 0, 'invalid': 0}
+
+    with app.app_context():
+        db.create_all()
+        for start in range(0, len(items), chunk):
+            summary = bulk_upsert(items[start:start + chunk], dry_run=dry_run)
+            for status in totals:
+                totals[status] += summary[status]
+            for result in summary['results']:
+                if result['status'] == 'invalid':
+                    print(f"❌ Item {start + result['index']} ({result['external_id']}): {result['errors']}")
+
+    mode = ' (dry run - nothing written)' if dry_run else ''
+    print(f"✅ {len(items)} surveys: {totals['created']} created, {totals['updated']} updated, "
+          f"{totals['unchanged']} unchanged, {totals['invalid']} invalid{mode}")
+    return totals['invalid'] == 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Create or update surveys in bulk (upsert by external_id)')
+    parser.add_argument('path', help='.json (list or {"surveys": [...]}) or .jsonl file')
+    parser.add_argument('--dry-run', action='store_true', help='validate and report without writing')
+    parser.add_argument('--chunk', type=int, help='surveys per transaction (default: SURVEY_BULK_MAX_ITEMS)')
+    args = parser.parse_args()
+    sys.exit(0 if import_surveys(args.path, args.dry_run, args.chunk) else 1)
@@ -0,0 +1,416 @@
+# backend/migrations/add_survey_platform_tables.py
+"""Add tables, columns and indexes of the survey platform features
+
+Revision ID: survey_002
+Revises: survey_001
+Create Date: 2026-10-19 12:00:00.000000
+
+app.py runs db.create_all() on start, which creates missing tables but never changes
+existing ones. Every step below first looks at the live schema and only adds what is
+missing, so the revision completes on a database built from the previous models whether
+it runs before or after the first start of the new code. batch_alter_table keeps it
+working on SQLite, which cannot ALTER constraints in place.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'survey_002'
+down_revision = 'survey_001'
+branch_labels = None
+depends_on = None
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def _create_table(name, *elements, indexes=()):
+    """op.create_table plus its indexes - skipped if db.create_all() already created the table"""
+    if _inspector().has_table(name):
+        return
+    op.create_table(name, *elements)
+    for index_name, columns in indexes:
+        op.create_index(index_name, name, columns)
+
+
+def _drop_table(name):
+    if _inspector().has_table(name):
+        op.drop_table(name)
+
+
+def _extend_table(table, columns=(), indexes=(), foreign_keys=(), unique=()):
+    """Add the missing columns (with their foreign keys / unique constraints) and indexes"""
+    inspector = _inspector()
+    existing = {column['name'] for column in inspector.get_columns(table)}
+    existing_indexes = {index['name'] for index in inspector.get_indexes(table)}
+    added = {column.name for column in columns if column.name not in existing}
+    missing_indexes = [(name, index_columns) for name, index_columns in indexes if name not in existing_indexes]
+    if not added and not missing_indexes:
+        return
+    with op.batch_alter_table(table) as batch:
+        for column in columns:
+            if column.name in added:
+                batch.add_column(column)
+        for name, column, referred in foreign_keys:
+            if column in added:
+                batch.create_foreign_key(name, referred, [column], ['id'])
+        for name, column in unique:
+            if column in added:
+                batch.create_unique_constraint(name, [column])
+        for name, index_columns in missing_indexes:
+            batch.create_index(name, index_columns)
+
+
+def _shrink_table(table, columns=(), indexes=(), foreign_keys=(), unique=()):
+    """Undo _extend_table for whatever of it exists"""
+    inspector = _inspector()
+    existing = {column['name'] for column in inspector.get_columns(table)}
+    existing_indexes = {index['name'] for index in inspector.get_indexes(table)}
+    existing_constraints = {fk['name'] for fk in inspector.get_foreign_keys(table)} | \
+                           {constraint['name'] for constraint in inspector.get_unique_constraints(table)}
+    with op.batch_alter_table(table) as batch:
+        for name, _ in indexes:
+            if name in existing_indexes:
+                batch.drop_index(name)
+        for name, _ in unique:
+            if name in existing_constraints:
+                batch.drop_constraint(name, type_='unique')
+        for name, _, _ in foreign_keys:
+            if name in existing_constraints:
+                batch.drop_constraint(name, type_='foreignkey')
+        for column in columns:
+            if column in existing:
+                batch.drop_column(column)
+
+
+def _make_nullable(table, column):
+    if not {info['name']: info for info in _inspector().get_columns(table)}[column]['nullable']:
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(column, existing_type=sa.Integer(), nullable=True)
+
+SURVEY_CATALOG_INDEXES = [
+    ('idx_surveys_catalog_reward', ['is_active', 'reward_amount', 'id']),
+    ('idx_surveys_catalog_rpm', ['is_active', 'reward_per_minute', 'id']),
+    ('idx_surveys_catalog_newest', ['is_active', 'created_at', 'id']),
+    ('idx_surveys_catalog_category_reward', ['is_active', 'category', 'reward_amount', 'id']),
+    ('idx_surveys_catalog_category_rpm', ['is_active', 'category', 'reward_per_minute', 'id']),
+    ('idx_surveys_catalog_category_newest', ['is_active', 'category', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    """Create the new tables, add the new columns and indexes to the existing ones"""
+
+    # Account deletion: job table, user_id = NULL on the rows kept for accounting
+    _create_table(
+        'background_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_type', sa.String(length=50), nullable=False),
+        sa.Column('user_id', sa.Integer()),
+        sa.Column('status', sa.String(length=20)),
+        sa.Column('status_token', sa.String(length=64), unique=True),
+        sa.Column('total_items', sa.Integer()),
+        sa.Column('processed_items', sa.Integer()),
+        sa.Column('progress_data', sa.Text()),
+        sa.Column('error_message', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('completed_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        indexes=[('ix_background_jobs_job_type', ['job_type']), ('ix_background_jobs_user_id', ['user_id'])]
+    )
+    for table in ('survey_responses', 'earnings', 'payouts'):
+        _make_nullable(table, 'user_id')
+
+    # Export archives expire (see utils/data_export.py)
+    _extend_table('background_jobs', columns=[sa.Column('expires_at', sa.DateTime())],
+                  indexes=[('ix_background_jobs_expires_at', ['expires_at'])])
+
+    # Per-question aggregates
+    _create_table(
+        'question_aggregates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('survey_id', sa.Integer(), sa.ForeignKey('surveys.id'), nullable=False),
+        sa.Column('survey_version_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.String(length=50), nullable=False),
+        sa.Column('answer_count', sa.Integer()),
+        sa.Column('numeric_count', sa.Integer()),
+        sa.Column('numeric_mean', sa.Float()),
+        sa.Column('numeric_m2', sa.Float()),
+        sa.Column('numeric_min', sa.Float()),
+        sa.Column('numeric_max', sa.Float()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('survey_id', 'survey_version_id', 'question_id', name='unique_survey_version_question')
+    )
+    _create_table(
+        'question_aggregate_counts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('survey_id', sa.Integer(), sa.ForeignKey('surveys.id'), nullable=False),
+        sa.Column('survey_version_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.String(length=50), nullable=False),
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('value', sa.String(length=500), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('survey_id', 'survey_version_id', 'question_id', 'kind', 'value',
+                            name='unique_survey_version_question_value')
+    )
+
+    # Roles and survey owners (see utils/access.py)
+    _extend_table('users', columns=[
+        sa.Column('role', sa.String(length=20), nullable=False, server_default='panelist')
+    ])
+    _extend_table('surveys', columns=[sa.Column('owner_id', sa.Integer())],
+                  foreign_keys=[('fk_surveys_owner_id_users', 'owner_id', 'users')],
+                  indexes=[('ix_surveys_owner_id', ['owner_id'])])
+
+    # Normalized answers
+    _create_table(
+        'survey_answers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('survey_id', sa.Integer(), sa.ForeignKey('surveys.id'), nullable=False),
+        sa.Column('question_id', sa.String(length=50), nullable=False),
+        sa.Column('response_id', sa.Integer(), sa.ForeignKey('survey_responses.id'), nullable=False),
+        sa.Column('answer_index', sa.Integer()),
+        sa.Column('text_value', sa.String(length=500)),
+        sa.Column('numeric_value', sa.Float()),
+        sa.Column('bool_value', sa.Boolean()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('survey_id', 'question_id', 'response_id', 'answer_index', name='unique_answer'),
+        indexes=[('idx_survey_answers_text', ['survey_id', 'question_id', 'text_value']),
+                 ('idx_survey_answers_numeric', ['survey_id', 'question_id', 'numeric_value']),
+                 ('idx_survey_answers_bool', ['survey_id', 'question_id', 'bool_value']),
+                 ('idx_survey_answers_response', ['response_id'])]
+    )
+
+    # Qualification criteria (JSON) per survey
+    _extend_table('surveys', columns=[sa.Column('qualification_criteria', sa.Text())])
+
+    # Profile answers of the eligibility index
+    _create_table(
+        'qualification_answers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('question_id', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.Text()),
+        sa.Column('answered_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'question_id', name='unique_user_qualification'),
+        indexes=[('ix_qualification_answers_user_id', ['user_id'])]
+    )
+
+    # Segment quotas
+    _create_table(
+        'survey_quotas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('survey_id', sa.Integer(), sa.ForeignKey('surveys.id'), nullable=False),
+        sa.Column('segment', sa.String(length=100), nullable=False),
+        sa.Column('criteria', sa.Text(), nullable=False),
+        sa.Column('max_responses', sa.Integer(), nullable=False),
+        sa.Column('current_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('is_full', sa.Boolean(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('survey_id', 'segment', name='unique_survey_segment'),
+        indexes=[('idx_survey_quotas_full', ['survey_id', 'is_full'])]
+    )
+
+    # Autosave deltas
+    _create_table(
+        'response_deltas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('response_id', sa.Integer(), sa.ForeignKey('survey_responses.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('question_id', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        indexes=[('idx_response_deltas_response', ['response_id', 'id']),
+                 ('ix_response_deltas_user_id', ['user_id'])]
+    )
+
+    # Idempotency keys
+    _create_table(
+        'idempotency_keys',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('scope', sa.String(length=100), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('request_hash', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=20)),
+        sa.Column('response_status', sa.Integer()),
+        sa.Column('response_body', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'scope', 'key', name='unique_idempotency_key'),
+        indexes=[('ix_idempotency_keys_expires_at', ['expires_at'])]
+    )
+
+    # Survey versions: content-addressed question sets, version pinned on every response
+    _create_table(
+        'question_sets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False, unique=True),
+        sa.Column('questions', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    _create_table(
+        'survey_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('survey_id', sa.Integer(), sa.ForeignKey('surveys.id'), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('question_set_id', sa.Integer(), sa.ForeignKey('question_sets.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('survey_id', 'version', name='unique_survey_version')
+    )
+    _extend_table('surveys', columns=[sa.Column('current_version_id', sa.Integer())])
+    _extend_table('survey_responses', columns=[sa.Column('survey_version_id', sa.Integer())],
+                  foreign_keys=[('fk_survey_responses_version', 'survey_version_id', 'survey_versions')])
+
+    # Scheduled activation/expiry
+    _create_table(
+        'survey_transitions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('survey_id', sa.Integer(), sa.ForeignKey('surveys.id'), nullable=False),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        sa.Column('due_at', sa.DateTime(), nullable=False),
+        sa.Column('applied_at', sa.DateTime()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('survey_id', 'action', 'due_at', name='unique_survey_transition'),
+        indexes=[('idx_survey_transitions_pending', ['applied_at', 'due_at'])]
+    )
+
+    # Catalog: category filter, reward per minute sort key, keyset pagination indexes
+    _extend_table('surveys', columns=[
+        sa.Column('category', sa.String(length=50)),
+        sa.Column('reward_per_minute', sa.Float(), server_default='0')
+    ], indexes=SURVEY_CATALOG_INDEXES)
+    # Existing surveys: the ORM flush hook keeps reward_per_minute in sync from now on
+    op.execute('UPDATE surveys SET reward_per_minute = ROUND(CAST(COALESCE(reward_amount, 0) AS FLOAT) / '
+               'CASE WHEN COALESCE(estimated_duration, 5) < 1 THEN 1 ELSE COALESCE(estimated_duration, 5) END, 4)')
+
+    # Slot leases: live leases per survey, counters default to 0 in SQL as well
+    _extend_table('surveys', columns=[sa.Column('reserved_slots', sa.Integer(), server_default='0')])
+    if {info['name']: info for info in _inspector().get_columns('surveys')}['total_responses']['default'] is None:
+        with op.batch_alter_table('surveys') as batch:
+            batch.alter_column('total_responses', existing_type=sa.Integer(), server_default='0')
+    _create_table(
+        'survey_reservations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('survey_id', sa.Integer(), sa.ForeignKey('surveys.id'), nullable=False),
+        sa.Column('response_id', sa.Integer(), sa.ForeignKey('survey_responses.id'), nullable=False, unique=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        indexes=[('idx_survey_reservations_expiry', ['expires_at']),
+                 ('idx_survey_reservations_survey', ['survey_id', 'expires_at'])]
+    )
+
+    # Abandoned-response reaper
+    _extend_table('survey_responses', indexes=[('idx_survey_responses_stale', ['is_completed', 'started_at'])])
+
+    # Response quality score
+    _extend_table('survey_responses', columns=[
+        sa.Column('quality_score', sa.Float()),
+        sa.Column('quality_flags', sa.Text())
+    ])
+
+    # Catalog validators: changes of catalog fields only
+    columns = {info['name'] for info in _inspector().get_columns('surveys')}
+    _extend_table('surveys', columns=[sa.Column('content_updated_at', sa.DateTime())],
+                  indexes=[('idx_surveys_content_updated_at', ['content_updated_at'])])
+    if 'content_updated_at' not in columns:
+        op.execute('UPDATE surveys SET content_updated_at = COALESCE(updated_at, created_at)')
+
+    # Bulk authoring key
+    _extend_table('surveys', columns=[sa.Column('external_id', sa.String(length=100))],
+                  unique=[('uq_surveys_external_id', 'external_id')])
+
+    # Analysis frames: completed responses per survey
+    _extend_table('survey_responses',
+                  indexes=[('idx_survey_responses_completed', ['survey_id', 'is_completed', 'completed_at'])])
+
+    # Completion times
+    _extend_table('surveys', columns=[
+        sa.Column('median_duration_seconds', sa.Integer()),
+        sa.Column('p90_duration_seconds', sa.Integer()),
+        sa.Column('duration_samples', sa.Integer(), server_default='0')
+    ])
+    _create_table(
+        'survey_duration_sketches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('survey_id', sa.Integer(), sa.ForeignKey('surveys.id'), nullable=False, unique=True),
+        sa.Column('sketch', sa.Text(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), server_default='0'),
+        sa.Column('revision', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    """Drop what upgrade() added"""
+
+    _drop_table('survey_duration_sketches')
+    _shrink_table('surveys', columns=['duration_samples', 'p90_duration_seconds', 'median_duration_seconds'])
+
+    _shrink_table('survey_responses',
+                  indexes=[('idx_survey_responses_completed', ['survey_id', 'is_completed', 'completed_at'])])
+
+    _shrink_table('surveys', columns=['external_id'], unique=[('uq_surveys_external_id', 'external_id')])
+
+    _shrink_table('surveys', columns=['content_updated_at'],
+                  indexes=[('idx_surveys_content_updated_at', ['content_updated_at'])])
+
+    _shrink_table('survey_responses', columns=['quality_flags', 'quality_score'])
+
+    _shrink_table('survey_responses', indexes=[('idx_survey_responses_stale', ['is_completed', 'started_at'])])
+
+    _drop_table('survey_reservations')
+    _shrink_table('surveys', columns=['reserved_slots'])
+
+    _shrink_table('surveys', columns=['reward_per_minute', 'category'], indexes=SURVEY_CATALOG_INDEXES)
+
+    _drop_table('survey_transitions')
+
+    _shrink_table('survey_responses', columns=['survey_version_id'],
+                  foreign_keys=[('fk_survey_responses_version', 'survey_version_id', 'survey_versions')])
+    _shrink_table('surveys', columns=['current_version_id'])
+    _drop_table('survey_versions')
+    _drop_table('question_sets')
+
+    _drop_table('idempotency_keys')
+
+    _drop_table('response_deltas')
+
+    _drop_table('survey_quotas')
+
+    _drop_table('qualification_answers')
+
+    _shrink_table('surveys', columns=['qualification_criteria'])
+
+    _drop_table('survey_answers')
+
+    _shrink_table('surveys', columns=['owner_id'], foreign_keys=[('fk_surveys_owner_id_users', 'owner_id', 'users')],
+                  indexes=[('ix_surveys_owner_id', ['owner_id'])])
+    _shrink_table('users', columns=['role'])
+
+    _drop_table('question_aggregate_counts')
+    _drop_table('question_aggregates')
+
+    if _inspector().has_table('background_jobs'):
+        _shrink_table('background_jobs', columns=['expires_at'],
+                      indexes=[('ix_background_jobs_expires_at', ['expires_at'])])
+
+    # user_id stays nullable - anonymized rows have none
+    _drop_table('background_jobs')
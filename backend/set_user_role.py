@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+User Role Script for DataFair Survey System
+Vergibt die Rolle eines Nutzers (panelist, customer, admin) - Rollen werden nie über die API gesetzt
+
+Usage: python set_user_role.py user@example.com admin
+"""
+
+import argparse
+import os
+import sys
+
+# Add the current directory to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+
+def set_user_role(email, role):
+    """Set the role of the user with this email -> True on success"""
+    from flask import Flask
+    from app.database import db, init_db
+    from app.models import User
+    from app.utils.access import ROLES
+    from config import Config
+
+    if role not in ROLES:
+        print(f"❌ Unknown role {role} - use one of: {', '.join(ROLES)}")
+        return False
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    init_db(app)
+
+    with app.app_context():
+        user = User.query.filter_by(email=email.strip().lower()).first()
+        if user is None:
+            print(f"❌ No user with email {email}")
+            return False
+        user.role = role
+        db.session.commit()
+        print(f"✅ {user.email} is now {role}")
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Set the role of a user')
+    parser.add_argument('email')
+    parser.add_argument('role', help='panelist, customer or admin')
+    args = parser.parse_args()
+    sys.exit(0 if set_user_role(args.email, args.role) else 1)
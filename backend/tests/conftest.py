@@ -0,0 +1,114 @@
+# backend/tests/conftest.py
+"""
+Pytest Fixtures for DataFair Survey System
+App mit frischer SQLite-Datenbank pro Test, Test-Client und Nutzer-Helfer
+
+Run from backend/: python -m pytest -q tests
+"""
+
+import importlib
+import os
+import sys
+from collections import OrderedDict
+
+import pytest
+from flask import Flask, g
+from flask_login import LoginManager
+from werkzeug.security import generate_password_hash
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import db
+from app.models import User
+from config import Config
+
+PASSWORD = 'secret123'
+
+# Process-wide caches and singletons that would otherwise leak between test databases
+MODULE_STATE = {
+    'app.utils.catalog_events': {'_listeners': list, '_version': lambda: 0},
+    'app.utils.completion_times': {'_tracker': lambda: None, '_flusher': lambda: None},
+    'app.utils.data_export': {'_sweeper': lambda: None},
+    'app.utils.eligibility_index': {'_index': lambda: None},
+    'app.utils.ingestion': {'_service': lambda: None},
+    'app.utils.recommendations': {'_service': lambda: None},
+    'app.utils.reservations': {'_sweeper': lambda: None},
+    'app.utils.response_quality': {'_scorer': lambda: None, '_grid_plans': dict},
+    'app.utils.response_reaper': {'_reaper': lambda: None},
+    'app.utils.response_validation': {'_version_validators': dict},
+    'app.utils.survey_analysis': {'_frames': OrderedDict},
+    'app.utils.survey_scheduler': {'_scheduler': lambda: None},
+    'app.utils.survey_search': {'_ready': set},
+    'app.utils.survey_versions': {'_version_cache': dict, '_published': dict},
+}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    for module_name, attributes in MODULE_STATE.items():
+        module = importlib.import_module(module_name)
+        for name, factory in attributes.items():
+            monkeypatch.setattr(module, name, factory())
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI='sqlite:///' + str(tmp_path / 'test.db'),
+        INGESTION_QUEUE_PATH=str(tmp_path / 'queue.db'),
+        EXPORT_FOLDER=str(tmp_path / 'exports'),
+        INGESTION_MODE='sync',
+    )
+    db.init_app(app)
+
+    login_manager = LoginManager()
+    login_manager.init_app(app)
+
+    @login_manager.user_loader
+    def load_user(user_id):
+        return db.session.get(User, int(user_id))
+
+    # Requests share the test's app context (and its g) - forget the logged-in user after each one
+    @app.teardown_request
+    def forget_login(exception=None):
+        g.pop('_login_user', None)
+
+    from app.routes.auth import auth_bp
+    from app.routes.api import api_bp
+    from app.routes.surveys import surveys_bp
+    from app.routes.user_routes import user_bp
+    from app.routes.earning_routes import earning_bp
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(surveys_bp, url_prefix='/api/surveys')
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(earning_bp, url_prefix='/api')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def make_user(app):
+    """make_user('a@x.de', role='admin') -> committed, verified User"""
+    def make(email, role='panelist', **fields):
+        user = User(email=email, password_hash=generate_password_hash(PASSWORD), first_name='Test',
+                    last_name='User', is_verified=True, role=role, **fields)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def login(app):
+    """login(user) -> test client with an authenticated session"""
+    def make(user):
+        client = app.test_client()
+        response = client.post('/auth/login', json={'email': user.email, 'password': PASSWORD})
+        assert response.status_code == 200, response.get_json()
+        return client
+    return make
@@ -0,0 +1,50 @@
+# backend/tests/test_completion_times.py
+import json
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import Survey, SurveyDurationSketch, SurveyResponse
+from app.utils.completion_times import CompletionTimeFlusher, get_completion_tracker
+
+
+def test_submit_only_buffers_and_the_flusher_writes(app, make_user, login):
+    app.config.update(DURATION_SKETCH_FLUSH_SECONDS=0, DURATION_CALIBRATION_MIN_SAMPLES=1)
+    survey = Survey(title='Timed', questions=json.dumps([{'id': 'q1', 'type': 'text'}]),
+                    reward_amount=1, max_responses=10, estimated_duration=20)
+    db.session.add(survey)
+    user = make_user('timed@x.de')
+    db.session.commit()
+
+    client = login(user)
+    assert client.post(f'/api/surveys/{survey.id}/start').status_code in (200, 201)
+    response = SurveyResponse.query.filter_by(user_id=user.id).one()
+    response.started_at = datetime.utcnow() - timedelta(minutes=4)
+    db.session.commit()
+    assert client.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': 'x'}}).status_code == 200
+
+    # Even with a zero interval the request itself writes nothing
+    assert SurveyDurationSketch.query.count() == 0
+    assert get_completion_tracker().pending() == 1
+
+    flusher = CompletionTimeFlusher(app)
+    assert flusher.flush() == 1
+    assert get_completion_tracker().pending() == 0
+    db.session.expire_all()
+    assert SurveyDurationSketch.query.one().sample_count == 1
+    assert db.session.get(Survey, survey.id).estimated_duration == 4
+
+
+def test_shutdown_flushes_what_is_still_buffered(app):
+    survey = Survey(title='Timed', questions='[]', max_responses=10)
+    db.session.add(survey)
+    db.session.commit()
+
+    flusher = CompletionTimeFlusher(app)
+    flusher.start()
+    get_completion_tracker().observe(survey.id, 90)
+    flusher.shutdown()
+
+    assert not flusher._thread.is_alive()
+    db.session.expire_all()
+    assert SurveyDurationSketch.query.one().sample_count == 1
+    assert db.session.get(Survey, survey.id).median_duration_seconds == 90
@@ -0,0 +1,62 @@
+# backend/tests/test_data_export.py
+import os
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import BackgroundJob, User
+from app.utils.account_deletion import delete_account_job
+from app.utils.data_export import export_archive_job, get_export_path, sweep_expired_exports
+
+
+def finished_export(user):
+    job = BackgroundJob(job_type='data_export', user_id=user.id, status='running')
+    db.session.add(job)
+    db.session.commit()
+    export_archive_job(job)
+    job.status = 'completed'
+    db.session.commit()
+    return job
+
+
+def test_archives_expire_and_are_swept(app, make_user, login):
+    user = make_user('export@x.de')
+    client = login(user)
+    job = finished_export(user)
+    path = get_export_path(job)
+    assert os.path.exists(path)
+    assert job.expires_at > datetime.utcnow() + timedelta(hours=23)
+    assert client.get(f'/api/profile/export/{job.id}/download').status_code == 200
+
+    # Not yet due: nothing is removed
+    assert sweep_expired_exports() == 0
+    assert sweep_expired_exports(now=job.expires_at) == 1
+    assert not os.path.exists(path)
+    db.session.expire_all()
+    assert db.session.get(BackgroundJob, job.id).status == 'expired'
+    assert client.get(f'/api/profile/export/{job.id}/download').status_code == 410
+
+
+def test_download_is_refused_once_expired_even_before_the_sweep(app, make_user, login):
+    user = make_user('export@x.de')
+    client = login(user)
+    job = finished_export(user)
+    job.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert client.get(f'/api/profile/export/{job.id}/download').status_code == 410
+
+
+def test_account_deletion_removes_the_users_archives(app, make_user):
+    user, other = make_user('gone@x.de'), make_user('stays@x.de')
+    paths = [get_export_path(finished_export(user)) for _ in range(2)]
+    open(paths[0] + '.part', 'wb').close()  # left over by an interrupted export
+    kept = get_export_path(finished_export(other))
+
+    job = BackgroundJob(job_type='account_deletion', user_id=user.id, status='running')
+    db.session.add(job)
+    db.session.commit()
+    delete_account_job(job)
+
+    assert not any(os.path.exists(path) for path in paths + [paths[0] + '.part'])
+    assert os.path.exists(kept)
+    assert db.session.get(User, user.id) is None
+    assert BackgroundJob.query.filter_by(job_type='data_export', user_id=user.id, status='completed').count() == 0
@@ -0,0 +1,78 @@
+# backend/tests/test_eligibility_index.py
+import json
+
+from app.database import db
+from app.models import Survey
+from app.utils.eligibility_index import EligibilityIndex, get_eligibility_index, iter_ids, number_bucket
+from app.utils.qualification import compile_criteria
+
+
+def add_survey(**fields):
+    survey = Survey(title=fields.pop('title', 'Survey'), questions='[]', **fields)
+    db.session.add(survey)
+    db.session.commit()
+    return survey
+
+
+def test_user_registered_after_build_is_eligible(app, make_user):
+    open_survey = add_survey(title='Open')
+    screened = add_survey(title='Screened', qualification_criteria=json.dumps({'rules': [{'field': 'age', 'min': 18}]}))
+    make_user('early@x.de')
+    index = get_eligibility_index()
+    index.eligible_users(open_survey.id, None)  # cache the survey bitmap before the registration
+
+    response = app.test_client().post('/auth/register', json={
+        'email': 'late@x.de', 'password': 'secret123', 'first_name': 'Late', 'last_name': 'User'})
+    assert response.status_code in (200, 201), response.get_json()
+    late_id = response.get_json()['user']['id']
+
+    assert late_id in iter_ids(index.eligible_users(open_survey.id, None))
+    client = app.test_client()
+    client.post('/auth/login', json={'email': 'late@x.de', 'password': 'secret123'})
+    eligible = client.get('/api/surveys/eligible').get_json()
+    assert [survey['id'] for survey in eligible['surveys']] == [open_survey.id]
+    assert screened.id not in [survey['id'] for survey in eligible['surveys']]
+
+
+def test_unknown_user_is_treated_as_without_answers():
+    index = EligibilityIndex()
+    index.load([1], [(1, 'age', '30')])
+    criteria = {'open': None, 'adults': json.dumps({'rules': [{'field': 'age', 'min': 18}]})}
+    assert index.eligible_surveys(7, criteria) == ['open']
+    assert index.eligible_surveys(1, criteria) == ['open', 'adults']
+
+
+def test_numeric_ranges_match_compiled_predicates():
+    values = [-12.5, 0, 0.07, 3, 17, 18, 18.5, 19, 64.99, 65, 99, 100, 101, 1234, 1250, 99999]
+    rows = [(user_id, 'income', json.dumps(value)) for user_id, value in enumerate(values, start=1)]
+    index = EligibilityIndex()
+    index.load(range(1, len(values) + 1), rows)
+    assert len(index.numbers['income']) < len(values)
+
+    bounds = [(18, 65), (18.2, None), (None, 0), (0.05, 3), (1240, 1250), (100, 100), (-13, -12)]
+    for minimum, maximum in bounds:
+        rule = {'field': 'income'}
+        if minimum is not None:
+            rule['min'] = minimum
+        if maximum is not None:
+            rule['max'] = maximum
+        predicate = compile_criteria({'rules': [rule]})
+        expected = [user_id for user_id, value in enumerate(values, start=1) if predicate({'income': value})]
+        assert list(iter_ids(index.evaluate({'rules': [rule]}))) == expected, rule
+
+
+def test_numeric_updates_keep_ranges_exact():
+    index = EligibilityIndex()
+    index.load([1, 2], [(1, 'age', '30'), (2, 'age', '31')])
+    index.update_user(1, {'age': 30}, {'age': 39})
+    index.update_user(3, {}, {'age': 35})
+    assert list(iter_ids(index.evaluate({'rules': [{'field': 'age', 'min': 32, 'max': 36}]}))) == [3]
+    index.remove_user(3, {'age': 35})
+    assert list(iter_ids(index.evaluate({'rules': [{'field': 'age', 'min': 30}]}))) == [1, 2]
+
+
+def test_number_bucket_keeps_two_significant_digits():
+    assert number_bucket(1234) == 1200
+    assert number_bucket(42) == 42
+    assert number_bucket(0) == 0
+    assert number_bucket(-1234) == -1300
@@ -0,0 +1,63 @@
+# backend/tests/test_http_cache.py
+import pytest
+
+from app.database import db
+from app.models import Survey
+
+
+@pytest.fixture
+def catalog(app):
+    surveys = [Survey(title=f'Survey {i}', questions='[]', reward_amount=i, max_responses=10) for i in range(1, 4)]
+    db.session.add_all(surveys)
+    db.session.commit()
+    return surveys
+
+
+def test_catalog_revalidation_returns_304(app, catalog):
+    client = app.test_client()
+    first = client.get('/api/surveys/available')
+    assert first.status_code == 200
+    assert 'public' in first.headers['Cache-Control']
+    etag = first.headers['ETag']
+
+    again = client.get('/api/surveys/available', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+
+    since = client.get('/api/surveys/available', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert since.status_code == 304
+
+
+def test_catalog_etag_survives_starts_but_not_content_changes(app, catalog, make_user, login):
+    client = app.test_client()
+    etag = client.get('/api/surveys/available').headers['ETag']
+    assert 'total_responses' not in client.get('/api/surveys/available').get_json()['surveys'][0]
+
+    panelist = login(make_user('p@x.de'))
+    assert panelist.post(f'/api/surveys/{catalog[0].id}/start').status_code == 200
+    assert client.get('/api/surveys/available', headers={'If-None-Match': etag}).status_code == 304
+
+    overlay = client.get(f'/api/surveys/available/overlay?ids={catalog[0].id},{catalog[1].id}').get_json()
+    assert overlay['availability'] == [
+        {'id': catalog[0].id, 'total_responses': 0, 'available_slots': 9},
+        {'id': catalog[1].id, 'total_responses': 0, 'available_slots': 10},
+    ]
+    assert overlay['completed_survey_ids'] == [] and overlay['user_authenticated'] is False
+
+    survey = db.session.get(Survey, catalog[1].id)
+    survey.title = 'Renamed'
+    db.session.commit()
+    changed = client.get('/api/surveys/available', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_survey_detail_revalidation(app, catalog):
+    client = app.test_client()
+    detail = client.get(f'/api/surveys/{catalog[0].id}')
+    assert detail.status_code == 200
+    assert client.get(f'/api/surveys/{catalog[0].id}',
+                      headers={'If-None-Match': detail.headers['ETag']}).status_code == 304
+    assert client.get(f'/api/surveys/{catalog[1].id}',
+                      headers={'If-None-Match': detail.headers['ETag']}).status_code == 200
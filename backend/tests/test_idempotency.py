@@ -0,0 +1,94 @@
+# backend/tests/test_idempotency.py
+import json
+import threading
+import time
+
+from app.database import db
+from app.models import Earning, IdempotencyKey, Survey, SurveyResponse
+
+QUESTIONS = [{'id': 'q1', 'type': 'single_choice', 'options': ['yes', 'no'], 'required': True}]
+
+
+def started(login, make_user):
+    survey = Survey(title='Once', questions=json.dumps(QUESTIONS), reward_amount=2, max_responses=10)
+    db.session.add(survey)
+    db.session.commit()
+    client = login(make_user('once@x.de'))
+    assert client.post(f'/api/surveys/{survey.id}/start').status_code == 200
+    return survey, client
+
+
+def test_retried_submit_replays_the_stored_response(app, make_user, login):
+    survey, client = started(login, make_user)
+    headers = {'Idempotency-Key': 'submit-1'}
+    body = {'responses': {'q1': 'yes'}}
+
+    first = client.post(f'/api/surveys/{survey.id}/submit', json=body, headers=headers)
+    second = client.post(f'/api/surveys/{survey.id}/submit', json=body, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert 'Idempotent-Replayed' not in first.headers
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json() == first.get_json()
+    assert Earning.query.count() == 1
+    db.session.expire_all()
+    assert db.session.get(Survey, survey.id).total_responses == 1
+
+    # The same key for a different request is refused, not replayed
+    other = client.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': 'no'}}, headers=headers)
+    assert other.status_code == 422
+
+
+def test_failed_request_releases_the_key(app, make_user, login):
+    survey, client = started(login, make_user)
+    headers = {'Idempotency-Key': 'submit-2'}
+
+    invalid = client.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': 'maybe'}}, headers=headers)
+    assert invalid.status_code == 400
+    assert IdempotencyKey.query.count() == 0
+
+    # A retry with the same key (and a fixed body) executes
+    retry = client.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': 'no'}}, headers=headers)
+    assert retry.status_code == 200 and 'Idempotent-Replayed' not in retry.headers
+    assert IdempotencyKey.query.one().status == 'completed'
+
+
+def test_concurrent_duplicates_execute_once(app, make_user, login, monkeypatch):
+    survey = Survey(title='Once', questions=json.dumps(QUESTIONS), reward_amount=2, max_responses=10)
+    db.session.add(survey)
+    db.session.commit()
+    user = make_user('twice@x.de')
+    clients = [login(user), login(user)]
+    assert clients[0].post(f'/api/surveys/{survey.id}/start').status_code == 200
+
+    # Hold the first request inside the view until the duplicate has arrived
+    from app.routes import surveys
+    entered, validate = threading.Event(), surveys.validate_responses
+
+    def slow_validate(*args, **kwargs):
+        entered.set()
+        time.sleep(0.5)
+        return validate(*args, **kwargs)
+    monkeypatch.setattr(surveys, 'validate_responses', slow_validate)
+
+    results = [None, None]
+
+    def submit(index):
+        results[index] = clients[index].post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': 'yes'}},
+                                             headers={'Idempotency-Key': 'double-click'})
+    first = threading.Thread(target=submit, args=(0,))
+    first.start()
+    assert entered.wait(5)
+    second = threading.Thread(target=submit, args=(1,))
+    second.start()
+    first.join(10)
+    second.join(10)
+
+    assert results[0].status_code == 200 and 'Idempotent-Replayed' not in results[0].headers
+    assert results[1].status_code == 409 or (
+        results[1].status_code == 200 and results[1].headers['Idempotent-Replayed'] == 'true'
+        and results[1].get_json() == results[0].get_json())
+    db.session.expire_all()
+    assert Earning.query.count() == 1
+    assert SurveyResponse.query.filter_by(is_completed=True).count() == 1
+    assert db.session.get(Survey, survey.id).total_responses == 1
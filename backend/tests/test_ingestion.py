@@ -0,0 +1,70 @@
+# backend/tests/test_ingestion.py
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import Survey, SurveyResponse, Earning
+from app.utils import ingestion
+from app.utils.ingestion import get_ingestion_service
+
+
+def queued_record(survey, response, **overrides):
+    record = {
+        'response_id': response.id, 'survey_id': survey.id, 'user_id': response.user_id,
+        'responses': {'q1': 'yes'}, 'started_at': (datetime.utcnow() - timedelta(minutes=4)).isoformat(),
+        'completed_at': datetime.utcnow().isoformat(), 'quota_ids': [], 'leased': False,
+        'quality_score': None, 'quality_flags': None
+    }
+    record.update(overrides)
+    return record
+
+
+def test_failing_submission_is_dead_lettered_and_the_rest_applied(app, make_user, monkeypatch):
+    app.config['INGESTION_MODE'] = 'queue'
+    monkeypatch.setattr(ingestion, 'metrics', ingestion.IngestionMetrics())
+    survey = Survey(title='Queued', questions='[]', reward_amount=1, max_responses=10)
+    db.session.add(survey)
+    users = [make_user(f'q{i}@x.de') for i in range(3)]
+    responses = [SurveyResponse(user_id=user.id, survey_id=survey.id) for user in users]
+    db.session.add_all(responses)
+    db.session.commit()
+
+    service = get_ingestion_service()
+    service.queue.append(queued_record(survey, responses[0]))
+    service.queue.append(queued_record(survey, responses[1], completed_at='not a timestamp'))
+    service.queue.append(queued_record(survey, responses[2]))
+    service._reserve(queued_record(survey, responses[0]), 3)
+
+    assert service.flush_once() == 3
+    assert service.queue.size() == 0
+    assert [letter['response_id'] for letter in service.queue.dead_letters()] == [responses[1].id]
+    assert service.pending_surveys[survey.id] == 0
+
+    db.session.expire_all()
+    completed = {response.id for response in SurveyResponse.query.filter_by(is_completed=True)}
+    assert completed == {responses[0].id, responses[2].id}
+    assert db.session.get(Survey, survey.id).total_responses == 2
+    assert Earning.query.count() == 2
+
+    status = ingestion.ingestion_status()
+    assert status['failed_batches'] == 1
+    assert status['dead_lettered'] == 1
+    assert status['applied_submissions'] == 2
+    assert status['dead_letters'] == 1 and status['queued'] == 0
+
+
+def test_flush_is_idempotent_for_already_completed_responses(app, make_user):
+    app.config['INGESTION_MODE'] = 'queue'
+    survey = Survey(title='Queued', questions='[]', max_responses=10)
+    db.session.add(survey)
+    user = make_user('done@x.de')
+    response = SurveyResponse(user_id=user.id, survey_id=survey.id, is_completed=True)
+    db.session.add(response)
+    db.session.commit()
+
+    service = get_ingestion_service()
+    service.queue.append(queued_record(survey, response))
+    service._reserve(queued_record(survey, response), 1)
+    assert service.flush_once() == 1
+    db.session.expire_all()
+    assert db.session.get(Survey, survey.id).total_responses == 0
+    assert service.pending_surveys[survey.id] == 0
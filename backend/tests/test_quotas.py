@@ -0,0 +1,54 @@
+# backend/tests/test_quotas.py
+import json
+
+from app.database import db
+from app.models import Survey, SurveyQuota
+
+QUESTIONS = [{'id': 'region', 'type': 'single_choice', 'options': ['north', 'south'], 'required': True}]
+NORTH = {'segment': 'north', 'criteria': {'rules': [{'field': 'region', 'eq': 'north'}]}, 'max_responses': 1}
+
+
+def test_full_segment_rejects_the_submit_without_touching_the_counters(app, make_user, login):
+    survey = Survey(title='Quota', questions=json.dumps(QUESTIONS), reward_amount=1, max_responses=10)
+    db.session.add(survey)
+    db.session.commit()
+    admin = login(make_user('admin@x.de', role='admin'))
+    assert admin.put(f'/api/surveys/{survey.id}/quotas', json={'quotas': [NORTH]}).status_code == 200
+
+    first, second, third = (login(make_user(f'{name}@x.de')) for name in 'abc')
+    for client in (first, second, third):
+        assert client.post(f'/api/surveys/{survey.id}/start').status_code == 200
+
+    assert first.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'region': 'north'}}).status_code == 200
+    quota = SurveyQuota.query.filter_by(survey_id=survey.id).one()
+    assert (quota.current_count, quota.is_full) == (1, True)
+
+    response = second.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'region': 'north'}})
+    assert response.status_code == 409 and response.get_json()['segment'] == 'north'
+    db.session.expire_all()
+    assert db.session.get(Survey, survey.id).total_responses == 1
+    assert SurveyQuota.query.filter_by(survey_id=survey.id).one().current_count == 1
+
+    # Other segments are not affected
+    assert third.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'region': 'south'}}).status_code == 200
+
+
+def test_redefining_quotas_keeps_the_counters_of_kept_segments(app, make_user, login):
+    survey = Survey(title='Quota', questions=json.dumps(QUESTIONS), reward_amount=1, max_responses=10)
+    db.session.add(survey)
+    db.session.commit()
+    admin = login(make_user('admin@x.de', role='admin'))
+    admin.put(f'/api/surveys/{survey.id}/quotas', json={'quotas': [NORTH]})
+    SurveyQuota.query.update({'current_count': 1, 'is_full': True})
+    db.session.commit()
+
+    south = dict(NORTH, segment='south', criteria={'rules': [{'field': 'region', 'eq': 'south'}]})
+    response = admin.put(f'/api/surveys/{survey.id}/quotas', json={'quotas': [dict(NORTH, max_responses=3), south]})
+    quotas = {quota['segment']: quota for quota in response.get_json()['quotas']}
+    assert (quotas['north']['current_count'], quotas['north']['is_full']) == (1, False)
+    assert quotas['south']['current_count'] == 0
+
+    invalid = admin.put(f'/api/surveys/{survey.id}/quotas', json={'quotas': [{'segment': 'x', 'max_responses': 1}]})
+    assert invalid.status_code == 400
+    assert login(make_user('panelist@x.de')).put(f'/api/surveys/{survey.id}/quotas',
+                                                 json={'quotas': [NORTH]}).status_code == 403
@@ -0,0 +1,17 @@
+# backend/tests/test_recommendations.py
+from app.database import db
+from app.models import Survey
+
+
+def test_ranking_and_payload_use_the_stored_reward_per_minute(app, make_user, login):
+    # Without an estimated duration the model assumes 5 minutes: 10 EUR -> 2 EUR/min
+    unknown_duration = Survey(title='Unknown duration', reward_amount=10, estimated_duration=0, max_responses=10)
+    quick = Survey(title='Quick', reward_amount=3, estimated_duration=1, max_responses=10)
+    db.session.add_all([unknown_duration, quick])
+    db.session.commit()
+
+    client = login(make_user('panelist@x.de'))
+    surveys = client.get('/api/surveys/recommended').get_json()['surveys']
+
+    assert [survey['id'] for survey in surveys] == [quick.id, unknown_duration.id]
+    assert [survey['reward_per_minute'] for survey in surveys] == [3.0, 2.0]
@@ -0,0 +1,75 @@
+# backend/tests/test_reservations.py
+import json
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import Survey, SurveyReservation, SurveyResponse
+from app.utils.reservations import sweep_expired
+
+QUESTIONS = [{'id': 'q1', 'type': 'boolean'}]
+
+
+def counters(survey_id):
+    db.session.expire_all()
+    survey = db.session.get(Survey, survey_id)
+    return survey.total_responses, survey.reserved_slots
+
+
+def leased_survey(max_responses):
+    survey = Survey(title='Leases', questions=json.dumps(QUESTIONS), reward_amount=1, max_responses=max_responses)
+    db.session.add(survey)
+    db.session.commit()
+    return survey
+
+
+def expire(user):
+    response = SurveyResponse.query.filter_by(user_id=user.id).one()
+    SurveyReservation.query.filter_by(response_id=response.id).update(
+        {'expires_at': datetime.utcnow() - timedelta(minutes=1)})
+    db.session.commit()
+
+
+def test_leases_never_oversell_and_convert_on_submit(app, make_user, login):
+    survey = leased_survey(2)
+    users = [make_user(f'{name}@x.de') for name in 'abc']
+    clients = [login(user) for user in users]
+
+    assert clients[0].post(f'/api/surveys/{survey.id}/start').status_code == 200
+    assert clients[1].post(f'/api/surveys/{survey.id}/start').status_code == 200
+    assert clients[2].post(f'/api/surveys/{survey.id}/start').status_code == 409
+    assert counters(survey.id) == (0, 2)
+
+    assert clients[0].post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': True}}).status_code == 200
+    assert counters(survey.id) == (1, 1)
+
+    # A full survey gives back its expired leases to the next start
+    expire(users[1])
+    assert clients[2].post(f'/api/surveys/{survey.id}/start').status_code == 200
+    assert counters(survey.id) == (1, 1)
+    assert SurveyReservation.query.count() == 1
+
+
+def test_submit_after_the_lease_was_taken_over_needs_a_free_slot(app, make_user, login):
+    survey = leased_survey(1)
+    a, b = make_user('a@x.de'), make_user('b@x.de')
+    client_a, client_b = login(a), login(b)
+
+    assert client_a.post(f'/api/surveys/{survey.id}/start').status_code == 200
+    expire(a)
+    assert client_b.post(f'/api/surveys/{survey.id}/start').status_code == 200
+    assert client_a.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': True}}).status_code == 409
+    assert client_b.post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': False}}).status_code == 200
+    assert counters(survey.id) == (1, 0)
+
+
+def test_sweeper_releases_expired_leases_in_batches(app, make_user, login):
+    survey = leased_survey(10)
+    users = [make_user(f'u{index}@x.de') for index in range(5)]
+    for user in users:
+        assert login(user).post(f'/api/surveys/{survey.id}/start').status_code == 200
+    for user in users[:3]:
+        expire(user)
+
+    assert sweep_expired(batch_size=2) == {survey.id: 3}
+    assert counters(survey.id) == (0, 2)
+    assert sweep_expired() == {}
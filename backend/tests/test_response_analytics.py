@@ -0,0 +1,128 @@
+# backend/tests/test_response_analytics.py
+import json
+import statistics
+import threading
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import BackgroundJob, Survey, SurveyResponse
+from app.utils import response_analytics
+from app.utils.response_analytics import get_results, rebuild_aggregates_job, record_responses
+
+QUESTIONS = [{'id': 'color', 'type': 'single_choice', 'options': ['red', 'blue']},
+             {'id': 'score', 'type': 'scale', 'scale_min': 1, 'scale_max': 10}]
+
+
+def _survey():
+    survey = Survey(title='Analytics', questions=json.dumps(QUESTIONS), reward_amount=1)
+    db.session.add(survey)
+    db.session.commit()
+    return survey
+
+
+def _results(survey):
+    return {question['question_id']: question for question in get_results(survey)['questions']}
+
+
+def test_concurrent_batches_are_added_not_overwritten(app):
+    survey = _survey()
+    survey_id = survey.id
+    scores = [[1, 2, 3], [4, 5, 2], [6, 9], [7, 8, 9, 10]]
+    barrier = threading.Barrier(len(scores))
+    errors = []
+
+    def submit(batch):
+        with app.app_context():
+            try:
+                survey_in_thread = db.session.get(Survey, survey_id)
+                barrier.wait(timeout=10)
+                record_responses(survey_in_thread, [(None, {'color': 'red' if score % 2 else 'blue', 'score': score})
+                                                    for score in batch])
+                db.session.commit()
+            except Exception as e:
+                errors.append(e)
+                barrier.abort()
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=submit, args=(batch,)) for batch in scores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+    values = [score for batch in scores for score in batch]
+    db.session.expire_all()
+    results = _results(survey)
+    assert results['color']['answer_count'] == len(values)
+    assert results['color']['option_counts'] == {'red': sum(v % 2 for v in values),
+                                                 'blue': sum(1 - v % 2 for v in values)}
+    numeric = results['score']['numeric']
+    assert numeric['count'] == len(values)
+    assert abs(numeric['mean'] - statistics.mean(values)) < 1e-9
+    assert abs(numeric['variance'] - statistics.variance(values)) < 1e-9
+    assert (numeric['min'], numeric['max']) == (1, 10)
+    assert sum(numeric['histogram'].values()) == len(values)
+
+
+def test_rebuild_folds_in_responses_completed_behind_the_scan(app, make_user, monkeypatch):
+    survey = _survey()
+    users = [make_user(f'p{index}@x.de') for index in range(4)]
+    # Started first (lowest id), completed while the rebuild is already past it
+    late = SurveyResponse(user_id=users[0].id, survey_id=survey.id, is_completed=False)
+    db.session.add(late)
+    db.session.commit()
+    for user, score in zip(users[1:], (2, 4, 6)):
+        db.session.add(SurveyResponse(user_id=user.id, survey_id=survey.id, is_completed=True,
+                                      completed_at=datetime.utcnow(), responses=json.dumps({'score': score})))
+    db.session.commit()
+
+    update_job_progress = response_analytics.update_job_progress
+
+    def complete_late_response(job, count, step):
+        if not late.is_completed:
+            late.is_completed = True
+            late.completed_at = datetime.utcnow() - timedelta(hours=1)
+            late.responses = json.dumps({'score': 8})
+            record_responses(survey, [(None, {'score': 8})])
+        update_job_progress(job, count, step)
+
+    monkeypatch.setattr(response_analytics, 'update_job_progress', complete_late_response)
+    job = BackgroundJob(job_type='results_rebuild', status='running')
+    db.session.add(job)
+    db.session.commit()
+    rebuild_aggregates_job(job, survey.id, chunk_size=1)
+
+    numeric = _results(survey)['score']['numeric']
+    assert numeric['count'] == 4
+    assert numeric['mean'] == 5
+    assert numeric['histogram'] == {'2': 1, '4': 1, '6': 1, '8': 1}
+
+
+def test_results_are_kept_per_survey_version(app, make_user, login):
+    survey = _survey()
+    owner = login(make_user('owner@x.de', role='admin'))
+    first, second = (login(make_user(f'{name}@x.de')) for name in 'ab')
+
+    assert first.post(f'/api/surveys/{survey.id}/start').status_code == 200
+    # The score question is replaced while the first panelist is still answering version 1
+    changed = [QUESTIONS[0], {'id': 'score', 'type': 'single_choice', 'options': ['low', 'high']}]
+    assert owner.post(f'/api/surveys/{survey.id}/versions', json={'questions': changed}).status_code == 201
+    assert second.post(f'/api/surveys/{survey.id}/start').status_code == 200
+
+    assert first.post(f'/api/surveys/{survey.id}/submit',
+                      json={'responses': {'color': 'red', 'score': 7}}).status_code == 200
+    assert second.post(f'/api/surveys/{survey.id}/submit',
+                       json={'responses': {'color': 'blue', 'score': 'high'}}).status_code == 200
+
+    current = {question['question_id']: question for question in
+               owner.get(f'/api/surveys/{survey.id}/results').get_json()['questions']}
+    assert current['color']['option_counts'] == {'blue': 1}
+    assert current['score']['option_counts'] == {'high': 1} and 'numeric' not in current['score']
+
+    first_version = {question['question_id']: question for question in
+                     owner.get(f'/api/surveys/{survey.id}/results?version=1').get_json()['questions']}
+    assert first_version['color']['option_counts'] == {'red': 1}
+    assert first_version['score']['numeric']['mean'] == 7
+    assert owner.get(f'/api/surveys/{survey.id}/results?version=9').status_code == 404
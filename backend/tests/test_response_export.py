@@ -0,0 +1,41 @@
+# backend/tests/test_response_export.py
+import csv
+import io
+import json
+
+from app.database import db
+from app.models import Survey
+
+QUESTIONS = [{'id': 'device', 'type': 'multiple_choice', 'options': ['phone', 'laptop']},
+             {'id': 'score', 'type': 'scale', 'scale_min': 1, 'scale_max': 10}]
+
+
+def test_each_response_is_exported_against_its_own_version(app, make_user, login):
+    survey = Survey(title='Export', questions=json.dumps(QUESTIONS), reward_amount=1)
+    db.session.add(survey)
+    db.session.commit()
+    owner = login(make_user('owner@x.de', role='admin'))
+    first, second = (login(make_user(f'{name}@x.de')) for name in 'ab')
+
+    assert first.post(f'/api/surveys/{survey.id}/start').status_code == 200
+    # Version 2 adds an option and turns score into free text
+    changed = [{'id': 'device', 'type': 'multiple_choice', 'options': ['phone', 'laptop', 'tablet']},
+               {'id': 'score', 'type': 'text'}]
+    assert owner.post(f'/api/surveys/{survey.id}/versions', json={'questions': changed}).status_code == 201
+    assert second.post(f'/api/surveys/{survey.id}/start').status_code == 200
+
+    assert first.post(f'/api/surveys/{survey.id}/submit',
+                      json={'responses': {'device': ['phone'], 'score': 7}}).status_code == 200
+    assert second.post(f'/api/surveys/{survey.id}/submit',
+                       json={'responses': {'device': ['tablet'], 'score': 'great'}}).status_code == 200
+
+    response = owner.get(f'/api/surveys/{survey.id}/export?format=csv')
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.data.decode('utf-8'))))
+    assert list(rows[0])[-4:] == ['device__phone', 'device__laptop', 'device__tablet', 'score']
+
+    by_version = {row['survey_version']: row for row in rows}
+    assert (by_version['1']['device__phone'], by_version['1']['device__tablet']) == ('True', '')
+    assert by_version['1']['score'] == '7'  # float in version 1, text in version 2 -> string column
+    assert (by_version['2']['device__phone'], by_version['2']['device__tablet']) == ('False', 'True')
+    assert by_version['2']['score'] == 'great'
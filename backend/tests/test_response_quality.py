@@ -0,0 +1,40 @@
+# backend/tests/test_response_quality.py
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import Survey, SurveyResponse
+from app.utils.response_quality import CollisionSketch, record_origin, score_response
+
+
+def started_response(survey, user, ip_address='10.0.0.1', user_agent='Browser/1'):
+    response = SurveyResponse(survey_id=survey.id, user_id=user.id, ip_address=ip_address, user_agent=user_agent,
+                              started_at=datetime.utcnow() - timedelta(minutes=10))
+    db.session.add(response)
+    db.session.commit()
+    return response
+
+
+def test_only_recorded_origins_flag_later_submissions(app, make_user):
+    survey = Survey(title='Quality', questions='[]', estimated_duration=5)
+    db.session.add(survey)
+    db.session.commit()
+    first = started_response(survey, make_user('a@x.de'))
+    second = started_response(survey, make_user('b@x.de'))
+    other_ip = started_response(survey, make_user('c@x.de'), ip_address='10.0.0.2')
+
+    # Scoring alone (e.g. a submit that is rejected afterwards) records nothing
+    assert score_response(survey, first, {}) == (1.0, '[]')
+    assert score_response(survey, second, {}) == (1.0, '[]')
+
+    record_origin(first)
+    assert score_response(survey, second, {}) == (0.8, '["duplicate_device"]')
+    assert score_response(survey, other_ip, {}) == (1.0, '[]')
+
+
+def test_collision_sketch_remembers_previous_generation():
+    sketch = CollisionSketch(capacity=100, error_rate=0.001)
+    for i in range(150):
+        sketch.add(f'key-{i}')
+    assert sketch.previous is not None
+    assert all(f'key-{i}' in sketch for i in range(150))
+    assert sum(f'other-{i}' in sketch for i in range(1000)) < 20
@@ -0,0 +1,40 @@
+# backend/tests/test_response_reaper.py
+import json
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import Survey, SurveyReservation, SurveyResponse
+from app.utils.response_reaper import reap_abandoned_responses
+
+
+def test_reaper_deletes_abandoned_responses_and_returns_their_slots(app, make_user, login):
+    survey = Survey(title='Reaped', questions=json.dumps([{'id': 'q1', 'type': 'boolean'}]),
+                    reward_amount=1, max_responses=10)
+    db.session.add(survey)
+    db.session.commit()
+    users = [make_user(f'{name}@x.de') for name in ('done', 'stale', 'swept', 'recent')]
+    clients = [login(user) for user in users]
+    for client in clients:
+        assert client.post(f'/api/surveys/{survey.id}/start').status_code == 200
+    assert clients[0].post(f'/api/surveys/{survey.id}/submit', json={'responses': {'q1': True}}).status_code == 200
+
+    old = datetime.utcnow() - timedelta(days=2)
+    SurveyResponse.query.filter(SurveyResponse.user_id.in_([users[0].id, users[1].id, users[2].id]))\
+                        .update({'started_at': old}, synchronize_session=False)
+    # 'swept' already lost its lease - nothing to give back for it
+    swept = SurveyResponse.query.filter_by(user_id=users[2].id).one()
+    SurveyReservation.query.filter_by(response_id=swept.id).delete()
+    Survey.query.filter_by(id=survey.id).update({'reserved_slots': Survey.reserved_slots - 1})
+    db.session.commit()
+
+    run = reap_abandoned_responses(max_age=timedelta(hours=24), batch_size=1)
+    assert (run['reclaimed'], run['released_slots'], run['batches']) == (2, 1, 2)
+
+    db.session.expire_all()
+    remaining = {response.user_id for response in SurveyResponse.query.all()}
+    assert remaining == {users[0].id, users[3].id}
+    survey = db.session.get(Survey, survey.id)
+    assert (survey.total_responses, survey.reserved_slots) == (1, 1)
+
+    # The reaped user can start again
+    assert clients[1].post(f'/api/surveys/{survey.id}/start').status_code == 200
@@ -0,0 +1,49 @@
+# backend/tests/test_response_validation.py
+from app.utils.response_validation import compile_validator
+
+QUESTIONS = [
+    {'id': 'q1', 'type': 'single_choice', 'options': ['yes', 'no'], 'required': True},
+    {'id': 'q2', 'type': 'multiple_choice', 'options': ['a', 'b', 'c'], 'min_selections': 1, 'max_selections': 2},
+    {'id': 'q3', 'type': 'scale', 'scale_min': 1, 'scale_max': 5},
+    {'id': 'q4', 'type': 'number', 'min': 0, 'max': 120},
+    {'id': 'q5', 'type': 'boolean'},
+    {'id': 'q6', 'type': 'text', 'max_length': 5},
+]
+
+
+def test_valid_submission_has_no_errors():
+    validator = compile_validator(QUESTIONS)
+    answers = {'q1': 'yes', 'q2': ['a', 'c'], 'q3': 5, 'q4': 12.5, 'q5': False, 'q6': 'short'}
+    assert validator(answers) == {}
+
+
+def test_every_question_type_reports_its_error():
+    validator = compile_validator(QUESTIONS)
+    errors = validator({'q1': 'maybe', 'q2': ['a', 'a'], 'q3': 2.5, 'q4': 121, 'q5': 'yes',
+                        'q6': 'too long', 'q7': 1})
+    assert errors == {
+        'q1': 'Unknown option',
+        'q2': 'Duplicate option',
+        'q3': 'Expected a whole number',
+        'q4': 'Must be at most 120',
+        'q5': 'Expected true or false',
+        'q6': 'Must be at most 5 characters',
+        'q7': 'Unknown question',
+    }
+    assert validator({'q1': 'no', 'q2': ['a', 'b', 'c']})['q2'] == 'Select at most 2 options'
+    assert validator({'q1': 'no', 'q2': []})['q2'] == 'Select at least 1 options'
+    assert validator({'q1': 'no', 'q4': True})['q4'] == 'Expected a number'
+    assert validator({'q1': 'no', 'q4': float('nan')})['q4'] == 'Expected a number'
+
+
+def test_required_answers_only_for_full_submissions():
+    validator = compile_validator(QUESTIONS)
+    assert validator({'q3': 4}) == {'q1': 'Answer is required'}
+    assert validator({'q1': None}) == {'q1': 'Answer is required'}
+    # An autosave may leave required questions open and clear answers with None
+    assert validator({'q3': 4, 'q1': None}, partial=True) == {}
+
+
+def test_identical_schemas_share_one_validator():
+    assert compile_validator(QUESTIONS) is compile_validator([dict(question) for question in QUESTIONS])
+    assert compile_validator(None)({'anything': 1}) == {}
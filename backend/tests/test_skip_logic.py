@@ -0,0 +1,59 @@
+# backend/tests/test_skip_logic.py
+import pytest
+
+from app.utils.response_validation import compile_validator
+from app.utils.skip_logic import compile_graph
+
+QUESTIONS = [
+    {'id': 'q1', 'type': 'single_choice', 'options': ['yes', 'no'], 'required': True,
+     'branches': [{'if': {'field': 'q1', 'eq': 'no'}, 'goto': 'q4'}]},
+    {'id': 'q2', 'type': 'text', 'required': True},
+    {'id': 'q3', 'type': 'text', 'required': True, 'show_if': {'field': 'q2', 'eq': 'more'}},
+    {'id': 'q4', 'type': 'boolean', 'required': True,
+     'branches': [{'if': {'field': 'q4', 'eq': False}, 'goto': 'end'}]},
+    {'id': 'q5', 'type': 'text', 'required': True},
+]
+
+
+def test_branches_and_conditions_hide_questions():
+    graph = compile_graph(QUESTIONS)
+    assert graph.visible_questions({}) == ['q1', 'q2', 'q4', 'q5']
+    assert graph.visible_questions({'q1': 'yes', 'q2': 'more'}) == ['q1', 'q2', 'q3', 'q4', 'q5']
+    assert graph.hidden_questions({'q1': 'no', 'q2': 'more'}) == {'q2', 'q3'}
+    assert graph.hidden_questions({'q1': 'no', 'q4': False}) == {'q2', 'q3', 'q5'}
+
+
+def test_navigation_follows_the_shown_questions():
+    graph = compile_graph(QUESTIONS)
+    assert graph.next_question({}) == 'q1'
+    assert graph.next_question({'q1': 'no'}) == 'q4'
+    assert graph.next_question({'q1': 'no', 'q4': False}) is None
+    navigation = graph.navigation({'q1': 'yes', 'q2': 'more'})
+    assert navigation['next_question'] == 'q3'
+    assert navigation['missing_required'] == ['q3', 'q4', 'q5']
+
+
+def test_dependents_are_transitive():
+    graph = compile_graph(QUESTIONS)
+    assert graph.dependents['q1'] == {'q2', 'q3'}
+    assert graph.affects(['q2'])
+    assert not graph.affects(['q5'])
+
+
+@pytest.mark.parametrize('questions', [
+    [{'id': 'q1', 'show_if': {'field': 'q2', 'eq': 1}}, {'id': 'q2'}],
+    [{'id': 'q1'}, {'id': 'q2', 'branches': [{'if': {'field': 'q2', 'eq': 1}, 'goto': 'q1'}]}],
+    [{'id': 'q1', 'branches': [{'if': {'field': 'q1', 'eq': 1}, 'goto': 'missing'}]}],
+    [{'id': 'q1', 'branches': [{'goto': 'end'}]}],
+])
+def test_backward_references_and_cycles_are_rejected(questions):
+    with pytest.raises(ValueError):
+        compile_graph(questions)
+
+
+def test_validator_ignores_hidden_questions():
+    validator = compile_validator(QUESTIONS)
+    assert validator({'q1': 'no', 'q2': 'stale', 'q4': False}) == {}
+    assert validator({'q1': 'yes', 'q2': 'more', 'q4': True}) == {'q3': 'Answer is required',
+                                                                 'q5': 'Answer is required'}
+    assert validator.shown_answers({'q1': 'no', 'q2': 'stale', 'q4': True}) == {'q1': 'no', 'q4': True}
@@ -0,0 +1,65 @@
+# backend/tests/test_survey_analysis.py
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from app.utils.survey_analysis import AnswerColumn, SurveyFrame
+
+
+def frame_with(columns, respondents):
+    frame = SurveyFrame(survey_id=1)
+    frame.respondents = np.array(sorted(respondents), dtype=np.int64)
+    for question_id, rows in columns.items():
+        column = AnswerColumn()
+        column.extend([(response_id, label, None, None) for response_id, label in rows])
+        frame.columns[question_id] = column
+    return frame
+
+
+def expected_crosstab(frame, row_question, column_question, weights):
+    """Reference: every (row answer, column answer) pair of a respondent adds its weight"""
+    row_column, col_column = frame.column(row_question), frame.column(column_question)
+    table = np.zeros((len(row_column.labels), len(col_column.labels)))
+    rows_a, codes_a = row_column.mapped(frame)
+    rows_b, codes_b = col_column.mapped(frame)
+    for row_a, code_a in zip(rows_a, codes_a):
+        for row_b, code_b in zip(rows_b, codes_b):
+            if row_a == row_b:
+                table[code_a, code_b] += weights[row_a]
+    return table
+
+
+@pytest.fixture
+def frame():
+    rng = random.Random(7)
+    respondents = list(range(100, 160))
+    gender = [(response_id, rng.choice(['f', 'm', 'd'])) for response_id in respondents if rng.random() < 0.9]
+    brands = [(response_id, brand) for response_id in respondents for brand in ('a', 'b', 'c', 'd')
+              if rng.random() < 0.4]
+    rng.shuffle(brands)
+    channels = [(response_id, channel) for response_id in respondents for channel in ('tv', 'web')
+                if rng.random() < 0.5]
+    # Answers of a response outside the frame (other version) are ignored
+    brands.append((999, 'a'))
+    return frame_with({'gender': gender, 'brands': brands, 'channels': channels}, respondents)
+
+
+@pytest.mark.parametrize('row_question, column_question', [
+    ('gender', 'brands'), ('brands', 'gender'), ('brands', 'channels'), ('brands', 'brands'), ('gender', 'gender')
+])
+def test_crosstab_matches_pairwise_reference(frame, row_question, column_question):
+    weights = np.linspace(0.5, 2.0, frame.respondents.size)
+    table, row_labels, column_labels = frame.crosstab(row_question, column_question, weights)
+    assert row_labels == frame.column(row_question).labels
+    assert column_labels == frame.column(column_question).labels
+    np.testing.assert_allclose(table, expected_crosstab(frame, row_question, column_question, weights))
+
+
+def test_margins_count_each_respondent_once_in_the_base(frame):
+    weights = np.ones(frame.respondents.size)
+    counts, base, labels = frame.margins('brands', weights)
+    rows, _ = frame.column('brands').mapped(frame)
+    assert base == np.unique(rows).size
+    assert counts.sum() == rows.size
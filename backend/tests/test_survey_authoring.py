@@ -0,0 +1,69 @@
+# backend/tests/test_survey_authoring.py
+from app.database import db
+from app.models import Survey
+
+QUESTIONS = [{'id': 'q1', 'type': 'boolean'}]
+
+
+def statuses(summary):
+    return [result['status'] for result in summary['results']]
+
+
+def test_bulk_upsert_reports_one_result_per_item(app, make_user, login):
+    client = login(make_user('admin@x.de', role='admin'))
+    items = [
+        {'external_id': 'ext-1', 'title': 'First', 'questions': QUESTIONS, 'reward_amount': 1.5},
+        {'external_id': 'ext-2', 'title': 'Second'},
+        {'title': 'No key'},
+        {'external_id': 'ext-1', 'title': 'Again'},
+        {'external_id': 'ext-3', 'title': 'Bad', 'colour': 'red'},
+        {'external_id': 'ext-4', 'description': 'no title'},
+    ]
+    summary = client.post('/api/surveys/bulk', json={'surveys': items}).get_json()
+
+    assert statuses(summary) == ['created', 'created', 'invalid', 'invalid', 'invalid', 'invalid']
+    assert (summary['created'], summary['invalid'], summary['success']) == (2, 4, False)
+    errors = [result.get('errors') for result in summary['results']]
+    assert errors[2] == {'external_id': 'is required'}
+    assert errors[3] == {'external_id': 'duplicate of item 0'}
+    assert errors[4] == {'colour': 'unknown field'}
+    assert errors[5] == {'title': 'is required for a new survey'}
+    assert Survey.query.count() == 2
+
+    again = client.post('/api/surveys/bulk', json={'surveys': [
+        {'external_id': 'ext-1', 'title': 'First', 'questions': QUESTIONS, 'reward_amount': 1.5},
+        {'external_id': 'ext-2', 'title': 'Second, renamed'},
+    ]}).get_json()
+    assert statuses(again) == ['unchanged', 'updated']
+    assert again['success'] is True
+    assert [result['id'] for result in again['results']] == [result['id'] for result in summary['results'][:2]]
+    db.session.expire_all()
+    assert Survey.query.filter_by(external_id='ext-2').one().title == 'Second, renamed'
+
+
+def test_dry_run_writes_nothing(app, make_user, login):
+    client = login(make_user('admin@x.de', role='admin'))
+    summary = client.post('/api/surveys/bulk', json={'surveys': [{'external_id': 'dry', 'title': 'Dry'}],
+                                                     'dry_run': True}).get_json()
+    assert statuses(summary) == ['created'] and summary['dry_run'] is True
+    assert Survey.query.count() == 0
+
+
+def test_customers_only_update_their_own_surveys(app, make_user, login):
+    admin = login(make_user('admin@x.de', role='admin'))
+    customer_user = make_user('customer@x.de', role='customer')
+    customer = login(customer_user)
+    admin.post('/api/surveys/bulk', json={'surveys': [{'external_id': 'theirs', 'title': 'Theirs'}]})
+
+    summary = customer.post('/api/surveys/bulk', json={'surveys': [
+        {'external_id': 'theirs', 'title': 'Taken over'},
+        {'external_id': 'mine', 'title': 'Mine'},
+    ]}).get_json()
+    assert statuses(summary) == ['invalid', 'created']
+    assert summary['results'][0]['errors'] == {'external_id': 'belongs to a survey you do not own'}
+    db.session.expire_all()
+    assert Survey.query.filter_by(external_id='theirs').one().title == 'Theirs'
+    assert Survey.query.filter_by(external_id='mine').one().owner_id == customer_user.id
+
+    panelist = login(make_user('panelist@x.de'))
+    assert panelist.post('/api/surveys/bulk', json={'surveys': [{'external_id': 'x', 'title': 'X'}]}).status_code == 403
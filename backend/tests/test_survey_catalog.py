@@ -0,0 +1,59 @@
+# backend/tests/test_survey_catalog.py
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import Survey
+
+
+def add_surveys(rewards, offset=0, **fields):
+    created = datetime.utcnow() - timedelta(days=1)
+    surveys = [Survey(title=f'S{index}', questions='[]', reward_amount=reward, max_responses=10,
+                      created_at=created + timedelta(minutes=offset + index), **fields)
+               for index, reward in enumerate(rewards)]
+    db.session.add_all(surveys)
+    db.session.commit()
+    return surveys
+
+
+def walk(client, query):
+    pages, cursor = [], None
+    while True:
+        url = f'/api/surveys/available?{query}' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url).get_json()
+        pages.append([survey['id'] for survey in data['surveys']])
+        cursor = data['next_cursor']
+        assert data['has_more'] == (cursor is not None)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_every_survey_once_in_order(app):
+    surveys = add_surveys([3, 5, 5, 1, 4])
+    add_surveys([9], is_active=False)
+    pages = walk(app.test_client(), 'sort=reward&limit=2')
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    by_reward = sorted(surveys, key=lambda survey: (survey.reward_amount, survey.id), reverse=True)
+    assert [survey_id for page in pages for survey_id in page] == [survey.id for survey in by_reward]
+
+
+def test_surveys_added_between_pages_do_not_shift_the_next_page(app):
+    surveys = add_surveys([1, 2, 3, 4])
+    client = app.test_client()
+    first = client.get('/api/surveys/available?sort=newest&limit=2').get_json()
+    add_surveys([5], offset=10)  # newest - belongs before the cursor
+
+    second = client.get(f"/api/surveys/available?sort=newest&limit=2&cursor={first['next_cursor']}").get_json()
+    assert [survey['id'] for survey in first['surveys']] == [surveys[3].id, surveys[2].id]
+    assert [survey['id'] for survey in second['surveys']] == [surveys[1].id, surveys[0].id]
+    assert second['has_more'] is False
+
+
+def test_damaged_or_foreign_cursors_are_rejected(app):
+    add_surveys([1, 2, 3])
+    client = app.test_client()
+    cursor = client.get('/api/surveys/available?sort=reward&limit=1').get_json()['next_cursor']
+
+    assert client.get(f'/api/surveys/available?sort=newest&cursor={cursor}').status_code == 400
+    assert client.get('/api/surveys/available?cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/surveys/available?sort=random').status_code == 400
@@ -286,6 +286,17 @@ class DataFairAPI {
         return data;
     }
     
+    /**
+     * Get Live Slot Counts and Completion Flags for Surveys (overlay of the cached catalog)
+     */
+    async getSurveyOverlay(surveyIds) {
+        const data = await this.get(`/api/surveys/available/overlay?ids=${surveyIds.join(',')}`);
+        return {
+            availability: data.availability || [],
+            completed: data.completed_survey_ids || []
+        };
+    }
+    
     /**
      * Get Survey Details
      */